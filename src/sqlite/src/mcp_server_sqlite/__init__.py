@@ -4,16 +4,48 @@ import logging
 from pathlib import Path
 
 from .server import main
+from .transports import DEFAULT_HOST, DEFAULT_PORT, TRANSPORTS
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="SQLite MCP Server")
     parser.add_argument("--db-path", type=str, required=True, help="Path to SQLite database")
+    parser.add_argument(
+        "--in-memory",
+        action="store_true",
+        help="Serve reads from an in-memory snapshot of the database (refreshed when the file changes)",
+    )
+    parser.add_argument(
+        "--no-hot-reload",
+        action="store_true",
+        help="Do not watch the database, BLS workbook and reference JSON files for changes",
+    )
+    parser.add_argument(
+        "--transport",
+        choices=TRANSPORTS,
+        default="stdio",
+        help="stdio serves the launching client; streamable-http and sse serve many clients from one process",
+    )
+    parser.add_argument(
+        "--host", type=str, default=DEFAULT_HOST, help="Interface for the HTTP transports to bind to"
+    )
+    parser.add_argument(
+        "--port", type=int, default=DEFAULT_PORT, help="Port for the HTTP transports to listen on"
+    )
     return parser.parse_args()
 
 def run():
     logging.basicConfig(level=logging.INFO)
     args = parse_args()
-    asyncio.run(main(args.db_path))
+    asyncio.run(
+        main(
+            args.db_path,
+            in_memory=args.in_memory,
+            hot_reload=not args.no_hot_reload,
+            transport=args.transport,
+            host=args.host,
+            port=args.port,
+        )
+    )
 
 if __name__ == "__main__":
     run()
@@ -1,12 +1,31 @@
 import asyncio
 import argparse
+import logging
+import sys
 from .server import main
+from .transports import DEFAULT_HOST, DEFAULT_PORT, TRANSPORTS
 
 def parse_args():
     parser = argparse.ArgumentParser(description='MCP SQLite Server')
     parser.add_argument('--db-path', required=True, help='Path to SQLite database file')
+    parser.add_argument('--in-memory', action='store_true', help='Serve reads from an in-memory snapshot of the database')
+    parser.add_argument('--no-hot-reload', action='store_true', help='Do not watch data files for changes')
+    parser.add_argument('--transport', choices=TRANSPORTS, default='stdio', help='Transport to serve over')
+    parser.add_argument('--host', default=DEFAULT_HOST, help='Interface for the HTTP transports')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Port for the HTTP transports')
     return parser.parse_args()
 
 if __name__ == '__main__':
+    # stderr, since stdout carries the stdio transport
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
     args = parse_args()
-    asyncio.run(main(args.db_path)) 
\ No newline at end of file
+    asyncio.run(
+        main(
+            args.db_path,
+            in_memory=args.in_memory,
+            hot_reload=not args.no_hot_reload,
+            transport=args.transport,
+            host=args.host,
+            port=args.port,
+        )
+    ) 
\ No newline at end of file
@@ -0,0 +1,415 @@
+# analysis_store.py
+
+"""
+Precomputed job analyses stored in a side table of the DOT database.
+
+get_job_analysis() derives strength codes, SVP categories, GED descriptions,
+frequency details, noise levels, temperaments and obsolescence data from the raw
+DOT columns. This module runs that analysis once for every DOT row and stores the
+result as compact JSON keyed by Ncode, so report generation and TSA can read
+the analysis instead of recomputing it.
+
+The stored analyses are versioned by a hash of the modules and reference data
+that shape the analysis (config.py, ve_logic.py, ...) and of the DOT table
+contents. A stale or missing build is ignored and callers fall back to
+computing the analysis on the fly.
+
+Build offline with:
+    python -m mcp_server_sqlite.analysis_store --db-path /path/to/DOT.db
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import sqlite3
+import sys
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, TYPE_CHECKING
+
+from .ve_logic import get_job_analysis, resolve_applicable_ssr
+
+# For type checking only to avoid circular imports
+if TYPE_CHECKING:
+    from .db_handler import DatabaseHandler
+else:
+    DatabaseHandler = Any
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_TABLE = "job_analysis_cache"
+BUILD_TABLE = "job_analysis_cache_build"  # Filled by build() and renamed to ANALYSIS_TABLE
+META_TABLE = "job_analysis_meta"
+VERSION_KEY = "analysis_version"
+
+# Files whose contents affect the output of get_job_analysis()
+_PACKAGE_DIR = Path(__file__).parent
+VERSION_SOURCE_FILES = [
+    _PACKAGE_DIR / "config.py",
+    _PACKAGE_DIR / "ve_logic.py",
+    _PACKAGE_DIR / "analysis_utils.py",
+    _PACKAGE_DIR / "job_obsolescence.py",
+    _PACKAGE_DIR / "reference_json" / "obsolete_out_dated.json",
+]
+
+BUILD_BATCH_SIZE = 500
+
+
+def _hash_source_files(digest: "hashlib._Hash") -> None:
+    """Feeds the analysis source files into the digest."""
+    for path in VERSION_SOURCE_FILES:
+        digest.update(path.name.encode())
+        try:
+            digest.update(path.read_bytes())
+        except OSError as e:
+            logger.warning(f"Could not read {path} for analysis versioning: {e}")
+            digest.update(b"<missing>")
+
+
+def _hash_dot_table(conn: sqlite3.Connection, digest: "hashlib._Hash") -> None:
+    """Feeds the DOT table schema and rows (ordered by Ncode) into the digest."""
+    for column in conn.execute("PRAGMA table_info(DOT);"):
+        digest.update(repr(tuple(column)).encode())
+    for row in conn.execute("SELECT * FROM DOT ORDER BY Ncode;"):
+        digest.update(repr(tuple(row)).encode())
+
+
+def compute_dot_table_fingerprint(db_path: Path) -> str:
+    """Returns a hex digest of the DOT table schema and contents (side tables excluded)."""
+    digest = hashlib.sha256()
+    with closing(sqlite3.connect(db_path, timeout=10)) as conn:
+        _hash_dot_table(conn, digest)
+    return digest.hexdigest()
+
+
+def compute_analysis_version(
+    db_path: Path, dot_fingerprint: Optional[str] = None
+) -> str:
+    """
+    Computes the version hash for analyses built against a database.
+
+    Args:
+        db_path: Path to the DOT SQLite database.
+        dot_fingerprint: Precomputed compute_dot_table_fingerprint() result, if available.
+
+    Returns:
+        Hex digest combining the analysis source files and the DOT table contents.
+    """
+    digest = hashlib.sha256()
+    _hash_source_files(digest)
+    digest.update((dot_fingerprint or compute_dot_table_fingerprint(db_path)).encode())
+    return digest.hexdigest()
+
+
+def _apply_hearing_date(
+    analysis: Dict[str, Any], hearing_date_str: Optional[str]
+) -> Dict[str, Any]:
+    """Adjusts the hearing-date dependent fields of a stored analysis."""
+    if hearing_date_str:
+        analysis["applicable_ssr"] = resolve_applicable_ssr(hearing_date_str)
+    return analysis
+
+
+class AnalysisStore:
+    """Reads and builds precomputed job analyses for a DatabaseHandler."""
+
+    def __init__(self, db: DatabaseHandler, version: Optional[str] = None):
+        """
+        Initializes the AnalysisStore.
+
+        Args:
+            db: The DatabaseHandler whose database holds the DOT table.
+            version: current_version() already computed for this database (e.g. by
+                     the parent of a worker process), to skip hashing the DOT table.
+        """
+        self.db = db
+        self._dot_fingerprint: Optional[str] = None
+        self._current_version: Optional[str] = version
+        self._is_current: Optional[bool] = None  # Cached result of the version check
+
+    @property
+    def db_path(self) -> Path:
+        return self.db.db_path
+
+    def _connect(self) -> sqlite3.Connection:
+        """Opens a read connection (the handler's in-memory snapshot when enabled)."""
+        return self.db.connect()
+
+    def _connect_for_write(self) -> sqlite3.Connection:
+        """Opens a file connection in autocommit mode; build() manages its own transaction."""
+        return sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+
+    def dot_fingerprint(self) -> str:
+        """Returns the fingerprint of the DOT table this store was checked against (cached)."""
+        if self._dot_fingerprint is None:
+            self._dot_fingerprint = compute_dot_table_fingerprint(self.db_path)
+        return self._dot_fingerprint
+
+    def current_version(self) -> str:
+        """Returns the version hash for the current sources and DOT data (cached)."""
+        if self._current_version is None:
+            self._current_version = compute_analysis_version(
+                self.db_path, self.dot_fingerprint()
+            )
+        return self._current_version
+
+    def invalidate(self, dot_changed: bool = True) -> None:
+        """
+        Forgets the cached version check.
+
+        Args:
+            dot_changed: Also forget the DOT table fingerprint. Pass False when only
+                         the analysis sources (config, reference JSON) changed.
+        """
+        if dot_changed:
+            self._dot_fingerprint = None
+        self._current_version = None
+        self._is_current = None
+
+    def _stored_version(self, conn: sqlite3.Connection) -> Optional[str]:
+        """Reads the version of the stored build, or None if there is none."""
+        try:
+            row = conn.execute(
+                f"SELECT value FROM {META_TABLE} WHERE key = ?;", [VERSION_KEY]
+            ).fetchone()
+        except sqlite3.OperationalError:
+            return None  # Side tables not built yet
+        return row[0] if row else None
+
+    def is_available(self) -> bool:
+        """Returns True if a build exists and matches the current version."""
+        if self._is_current is None:
+            try:
+                with closing(self._connect()) as conn:
+                    stored_version = self._stored_version(conn)
+                self._is_current = (
+                    stored_version is not None
+                    and stored_version == self.current_version()
+                )
+            except sqlite3.Error as e:
+                logger.error(f"Could not check precomputed analysis version: {e}")
+                self._is_current = False
+            if not self._is_current:
+                logger.info(
+                    "Precomputed job analyses are missing or stale; analyses will be computed on demand."
+                )
+        return self._is_current
+
+    def status(self) -> Dict[str, Any]:
+        """Returns information about the stored build."""
+        with closing(self._connect()) as conn:
+            stored_version = self._stored_version(conn)
+            row_count = 0
+            if stored_version is not None:
+                row_count = conn.execute(
+                    f"SELECT COUNT(*) FROM {ANALYSIS_TABLE};"
+                ).fetchone()[0]
+        current_version = self.current_version()
+        return {
+            "table": ANALYSIS_TABLE,
+            "built": stored_version is not None,
+            "stored_version": stored_version,
+            "current_version": current_version,
+            "is_current": stored_version == current_version,
+            "row_count": row_count,
+        }
+
+    def build(self, force: bool = False) -> Dict[str, Any]:
+        """
+        Runs get_job_analysis for every DOT row and stores the results.
+
+        Args:
+            force: Rebuild even if the stored build is already current.
+
+        Returns:
+            Dictionary describing the build (rows written, duration, version).
+        """
+        self.invalidate()
+        version = self.current_version()
+        start_time = time.monotonic()
+
+        with self.db.own_write(), closing(self._connect_for_write()) as conn:
+            if not force and self._stored_version(conn) == version:
+                logger.info("Precomputed job analyses are already current.")
+                self._is_current = True
+                return {"status": "current", "version": version, "rows_written": 0}
+
+            conn.row_factory = sqlite3.Row
+            rows_written = 0
+            errors = 0
+            # Fill a separate table in short batches (readers are only blocked while a
+            # batch commits), then swap it in with the version in one transaction.
+            conn.execute(f"DROP TABLE IF EXISTS {BUILD_TABLE};")
+            conn.execute(
+                f"CREATE TABLE {BUILD_TABLE} ("
+                "Ncode INTEGER PRIMARY KEY, analysis_json TEXT NOT NULL);"
+            )
+            last_ncode = None
+            while True:
+                after = "" if last_ncode is None else f"WHERE Ncode > {int(last_ncode)}"
+                rows = conn.execute(
+                    f"SELECT * FROM DOT {after} ORDER BY Ncode LIMIT ?;",
+                    [BUILD_BATCH_SIZE],
+                ).fetchall()
+                if not rows:
+                    break
+                last_ncode = rows[-1]["Ncode"]
+                batch = []
+                for row in rows:
+                    job_data = dict(row)
+                    analysis = get_job_analysis(job_data)
+                    if "error" in analysis:
+                        errors += 1
+                        continue
+                    batch.append(
+                        (
+                            job_data["Ncode"],
+                            json.dumps(analysis, separators=(",", ":")),
+                        )
+                    )
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO {BUILD_TABLE} (Ncode, analysis_json) VALUES (?, ?);",
+                    batch,
+                )
+                rows_written += len(batch)
+
+            # The connection is in autocommit mode, so the swap needs an explicit
+            # transaction: readers see either the old build or the new one.
+            conn.execute("BEGIN IMMEDIATE;")
+            try:
+                conn.execute(f"DROP TABLE IF EXISTS {ANALYSIS_TABLE};")
+                conn.execute(f"ALTER TABLE {BUILD_TABLE} RENAME TO {ANALYSIS_TABLE};")
+                conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {META_TABLE} ("
+                    "key TEXT PRIMARY KEY, value TEXT);"
+                )
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {META_TABLE} (key, value) VALUES (?, ?);",
+                    [VERSION_KEY, version],
+                )
+                conn.execute("COMMIT;")
+            except BaseException:
+                conn.execute("ROLLBACK;")
+                raise
+        self.db.reload_snapshot()  # One copy for the whole build
+
+        self._is_current = True
+        duration = time.monotonic() - start_time
+        logger.info(
+            f"Built {rows_written} precomputed job analyses in {duration:.2f}s ({errors} errors)."
+        )
+        return {
+            "status": "built",
+            "version": version,
+            "rows_written": rows_written,
+            "errors": errors,
+            "duration_seconds": round(duration, 2),
+        }
+
+    def get_many(
+        self, ncodes: Iterable[int], hearing_date_str: Optional[str] = None
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Reads precomputed analyses for several Ncodes in one query.
+
+        Returns:
+            Mapping of Ncode to analysis; empty if no current build is available.
+        """
+        ncodes = list(dict.fromkeys(code for code in ncodes if code is not None))
+        if not ncodes or not self.is_available():
+            return {}
+        placeholders = ",".join("?" * len(ncodes))
+        try:
+            with closing(self._connect()) as conn:
+                rows = conn.execute(
+                    f"SELECT Ncode, analysis_json FROM {ANALYSIS_TABLE} WHERE Ncode IN ({placeholders});",
+                    ncodes,
+                ).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Error reading precomputed analyses: {e}")
+            return {}
+        return {
+            ncode: _apply_hearing_date(json.loads(analysis_json), hearing_date_str)
+            for ncode, analysis_json in rows
+        }
+
+    def get(
+        self, ncode: Optional[int], hearing_date_str: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Reads the precomputed analysis for one Ncode, or None if unavailable."""
+        if ncode is None:
+            return None
+        return self.get_many([ncode], hearing_date_str).get(ncode)
+
+    def get_or_compute(
+        self, job_data: Dict[str, Any], hearing_date_str: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Returns the analysis for a DOT row, preferring the precomputed copy.
+
+        Args:
+            job_data: DOT row dictionary (raw columns or find_job_data aliases).
+            hearing_date_str: Optional hearing date ('YYYY-MM-DD') to determine applicable SSR.
+        """
+        ncode = job_data.get("Ncode", job_data.get("NCode")) if job_data else None
+        analysis = self.get(ncode, hearing_date_str)
+        if analysis is not None:
+            return analysis
+        return get_job_analysis(job_data, hearing_date_str=hearing_date_str)
+
+
+def get_analyses_for_rows(
+    rows: List[Dict[str, Any]],
+    store: Optional[AnalysisStore] = None,
+    hearing_date_str: Optional[str] = None,
+) -> Dict[int, Dict[str, Any]]:
+    """
+    Returns analyses keyed by Ncode for DOT rows, reading precomputed analyses in bulk.
+
+    Args:
+        rows: DOT row dictionaries (must include Ncode).
+        store: Optional AnalysisStore; without one every analysis is computed.
+        hearing_date_str: Optional hearing date ('YYYY-MM-DD').
+    """
+    ncodes = [row.get("Ncode") for row in rows]
+    analyses = store.get_many(ncodes, hearing_date_str) if store else {}
+    for row in rows:
+        ncode = row.get("Ncode")
+        if ncode not in analyses:
+            analyses[ncode] = get_job_analysis(row, hearing_date_str=hearing_date_str)
+    return analyses
+
+
+def main():
+    """Command-line entry point for building the precomputed analysis table."""
+    parser = argparse.ArgumentParser(
+        description="Build precomputed job analyses for the DOT database"
+    )
+    parser.add_argument(
+        "--db-path", required=True, help="Path to the DOT SQLite database file"
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="Rebuild even if the build is current"
+    )
+    parser.add_argument(
+        "--status", action="store_true", help="Only print the build status"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    from .db_handler import DatabaseHandler
+
+    try:
+        store = AnalysisStore(DatabaseHandler(Path(args.db_path)))
+        result = store.status() if args.status else store.build(force=args.force)
+    except (FileNotFoundError, sqlite3.Error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
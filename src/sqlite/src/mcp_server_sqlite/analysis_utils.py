@@ -112,8 +112,29 @@ def load_tsa_analysis() -> Dict[str, Any]:
         return {"steps": []}  # Return empty steps if file not found or invalid
 
 
-# Load TSA data at module level
-TSA_DATA = load_tsa_analysis()
+# Loaded on first use (not at import) so server startup does not parse it
+_TSA_DATA: Optional[Dict[str, Any]] = None
+
+
+def get_tsa_data() -> Dict[str, Any]:
+    """Returns the TSA analysis data, loading it on first use."""
+    global _TSA_DATA
+    if _TSA_DATA is None:
+        _TSA_DATA = load_tsa_analysis()
+    return _TSA_DATA
+
+
+def reload_tsa_data() -> None:
+    """Reloads the TSA analysis data (e.g. after tsa_analysis.json changed)."""
+    global _TSA_DATA
+    _TSA_DATA = load_tsa_analysis()
+
+
+def __getattr__(name: str) -> Any:
+    # Keep TSA_DATA available as a module attribute
+    if name == "TSA_DATA":
+        return get_tsa_data()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # --- DOT Code/Ncode Conversion Utilities ---
@@ -386,10 +407,11 @@ def get_tsa_step_requirements(step_number: int) -> Dict[str, Any]:
     Returns:
         Dictionary containing step requirements and guidance
     """
-    if not TSA_DATA or "steps" not in TSA_DATA:
+    tsa_data = get_tsa_data()
+    if not tsa_data or "steps" not in tsa_data:
         return {"error": "TSA data not available"}
 
-    step = next((s for s in TSA_DATA["steps"] if s["step"] == step_number), None)
+    step = next((s for s in tsa_data["steps"] if s["step"] == step_number), None)
     if not step:
         return {"error": f"Step {step_number} not found"}
 
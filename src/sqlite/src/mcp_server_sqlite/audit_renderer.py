@@ -0,0 +1,504 @@
+# audit_renderer.py
+
+"""
+HTML rendering of VE audit reports from structured audit data.
+
+The reports in audits/completed/ used to be written out by the model as one
+large HTML document. render_audit_report instead takes compact JSON (case
+details, hypotheticals with their jobs, conflicts, obsolescence flags, the TSA
+outcome) and renders it with string.Template fragments compiled once at import.
+The page is produced as a stream of fragments, which write_audit_report writes
+straight to disk.
+
+Audit data (every key optional except "case"):
+    {
+        "case": {"claimant", "hearing_date", "alj", "ve", "attorney", "applicable_ssr"},
+        "summary": str, "recommendation": str,
+        "hypotheticals": [{"title", "text", "response",
+                           "jobs": [{"title", "dot_code", "exertion", "svp",
+                                     "skill", "ged_r", "jobs", "status"}]}],
+        "conflicts": [{"job", "dot_code", "area", "hypothetical_limit",
+                       "job_requirement", "description", "severity"}],
+        "obsolescence": [{"dot_code", "title", "status", "source", "comment"}],
+        "tsa": {"outcome", "rule", "skills": [str], "notes"},
+        "follow_up_questions": [str],
+        "conclusion": str,
+        "job_reports": [{"dot_code", "title", "report"}]
+    }
+Free text is escaped; blank lines separate paragraphs.
+"""
+
+import html
+import logging
+import os
+import uuid
+from pathlib import Path
+from string import Template
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from . import config
+from .job_obsolescence import check_job_obsolescence
+from .models import DotCode
+
+logger = logging.getLogger(__name__)
+
+REPORT_TITLE = "VOCATIONAL EXPERT TESTIMONY AUDIT"
+SEVERITY_CLASSES = {"conflict": "status-conflict", "caution": "status-caution", "compatible": "status-compatible"}
+JOB_COLUMNS = ("title", "dot_code", "exertion", "svp", "skill", "ged_r", "jobs", "status")
+JOB_HEADERS = ("Occupation", "DOT#", "Exertional Level", "SVP", "Skill Level", "GED-R", "# of Jobs", "Status")
+CONFLICT_COLUMNS = ("job", "dot_code", "area", "hypothetical_limit", "job_requirement", "description")
+CONFLICT_HEADERS = ("Job", "DOT#", "Area", "Hypothetical Limit", "Job Requirement", "Conflict")
+OBSOLESCENCE_COLUMNS = ("title", "dot_code", "status", "source", "comment")
+OBSOLESCENCE_HEADERS = ("Occupation", "DOT#", "Reference Status", "Source", "Comment")
+
+_STYLE = """
+:root { --primary: #1a73e8; --primary-light: #e8f0fe; --success: #34a853; --success-light: #e6f4ea; --warning: #fbbc04; --warning-light: #fef7e0; --danger: #ea4335; --danger-light: #fde9e8; --gray-100: #f8f9fa; --gray-200: #e9ecef; --gray-300: #dee2e6; --gray-400: #ced4da; --gray-500: #adb5bd; --gray-600: #6c757d; --gray-700: #495057; --gray-800: #343a40; --gray-900: #212529; --border-radius: 8px; --box-shadow: 0 2px 8px rgba(0, 0, 0, 0.1); }
+* { box-sizing: border-box; margin: 0; padding: 0; }
+body { font-family: 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif; line-height: 1.6; color: var(--gray-800); background-color: var(--gray-200); padding: 0; margin: 0; }
+.container { max-width: 1200px; margin: 2rem auto; padding: 2rem; background-color: white; box-shadow: 0 4px 12px rgba(0, 0, 0, 0.15); border-radius: var(--border-radius); }
+.header { position: relative; padding: 1.5rem 2rem; margin-bottom: 2rem; text-align: center; background-color: var(--gray-800); color: white; border-radius: var(--border-radius) var(--border-radius) 0 0; }
+.header-text { margin-top: 1rem; }
+.report-title { font-size: 2rem; font-weight: 700; margin-bottom: 0.5rem; color: white; }
+.case-info { display: flex; flex-wrap: wrap; gap: 2rem; padding: 1.5rem; margin-bottom: 2rem; background-color: var(--gray-100); border: 1px solid var(--gray-300); border-radius: var(--border-radius); }
+.info-group { flex: 1; min-width: 250px; }
+.info-item { margin-bottom: 0.5rem; }
+.info-label { font-weight: 600; color: var(--gray-700); }
+.executive-summary { padding: 1.5rem; margin-bottom: 2rem; background-color: var(--primary-light); border-left: 4px solid var(--primary); border-radius: var(--border-radius); }
+.summary-heading { font-weight: 700; color: var(--primary); margin-bottom: 0.5rem; }
+.recommendation { padding: 1.5rem; margin: 1.5rem 0; background-color: var(--warning-light); border-left: 4px solid var(--warning); border-radius: var(--border-radius); }
+.recommendation-heading { font-weight: 700; color: var(--warning); margin-bottom: 0.5rem; }
+.toc { display: flex; flex-wrap: wrap; gap: 0.5rem; margin-bottom: 2rem; padding: 1rem; background-color: var(--gray-100); border-radius: var(--border-radius); }
+.toc-item { background-color: white; padding: 0.5rem 1rem; border-radius: 50px; font-size: 0.9rem; font-weight: 500; text-decoration: none; color: var(--gray-700); box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1); transition: all 0.2s ease; }
+.toc-item:hover { background-color: var(--primary-light); color: var(--primary); transform: translateY(-2px); box-shadow: 0 3px 6px rgba(0, 0, 0, 0.1); }
+.section { margin-bottom: 3rem; }
+.section-title { font-size: 1.5rem; font-weight: 700; margin-bottom: 1rem; padding-bottom: 0.5rem; border-bottom: 2px solid var(--primary); color: var(--primary); }
+.section-content { padding: 0 0.5rem; }
+.card { background-color: white; border-radius: var(--border-radius); box-shadow: var(--box-shadow); margin-bottom: 1.5rem; overflow: hidden; }
+.card-header { padding: 1rem 1.5rem; background-color: var(--primary); color: white; font-weight: 600; }
+.card-body { padding: 1.5rem; }
+table { width: 100%; border-collapse: collapse; margin: 1rem 0; background-color: white; border-radius: var(--border-radius); overflow: hidden; box-shadow: var(--box-shadow); }
+th { background-color: var(--primary-light); color: var(--primary); font-weight: 600; text-align: left; padding: 1rem; border: 1px solid var(--gray-300); }
+td { padding: 1rem; border: 1px solid var(--gray-300); }
+tr:nth-child(even) { background-color: var(--gray-100); }
+.status-compatible { background-color: var(--success-light); color: var(--success); font-weight: 600; }
+.status-conflict { background-color: var(--danger-light); color: var(--danger); font-weight: 600; }
+.status-caution { background-color: var(--warning-light); color: var(--warning); font-weight: 600; }
+.expandable { margin-bottom: 1.5rem; }
+.expandable-header { background-color: var(--primary-light); color: var(--primary); padding: 1rem 1.5rem; border-radius: var(--border-radius); font-weight: 600; cursor: pointer; display: flex; justify-content: space-between; align-items: center; transition: all 0.2s ease; }
+.expandable-header:hover { background-color: #d4e6fc; }
+.expandable-header::after { content: "+"; font-size: 1.5rem; font-weight: 300; }
+.expandable-header.active::after { content: "−"; }
+.expandable-content { display: none; padding: 1.5rem; border: 1px solid var(--gray-300); border-top: none; border-radius: 0 0 var(--border-radius) var(--border-radius); background-color: white; }
+.expandable-content.active { display: block; }
+.alert { padding: 1.5rem; margin: 1.5rem 0; border-radius: var(--border-radius); }
+.alert-success { background-color: var(--success-light); border-left: 4px solid var(--success); }
+.alert-warning { background-color: var(--warning-light); border-left: 4px solid var(--warning); }
+.alert-danger { background-color: var(--danger-light); border-left: 4px solid var(--danger); }
+.alert-info { background-color: var(--primary-light); border-left: 4px solid var(--primary); }
+.findings-container { display: flex; flex-wrap: wrap; gap: 1.5rem; margin: 1.5rem 0; }
+.finding-card { flex: 1; min-width: 300px; border-radius: var(--border-radius); overflow: hidden; box-shadow: var(--box-shadow); }
+.finding-card.danger { border-top: 4px solid var(--danger); }
+.finding-card.warning { border-top: 4px solid var(--warning); }
+.finding-header { padding: 1rem; background-color: var(--danger); color: white; font-weight: 600; }
+.finding-body { padding: 1.5rem; background-color: var(--danger-light); }
+.columns { display: flex; flex-wrap: wrap; gap: 1.5rem; margin: 1.5rem 0; }
+.column { flex: 1; min-width: 300px; }
+ul, ol { padding-left: 1.5rem; margin: 1rem 0; }
+li { margin-bottom: 0.5rem; }
+pre { white-space: pre-wrap; font-size: 0.85rem; background-color: var(--gray-100); padding: 1rem; }
+blockquote { margin: 1.5rem 0; padding: 1rem 1.5rem; border-left: 4px solid var(--primary); background-color: var(--gray-100); font-style: italic; }
+.ai-disclaimer { margin-top: 3rem; padding: 1.5rem; border: 2px dashed var(--warning); border-radius: var(--border-radius); background-color: var(--warning-light); display: flex; align-items: flex-start; gap: 1rem; }
+.disclaimer-icon { font-size: 2rem; color: var(--warning); flex-shrink: 0; }
+.disclaimer-content h3 { color: var(--warning); margin-top: 0; margin-bottom: 0.5rem; font-size: 1.1rem; }
+.disclaimer-content p { margin-bottom: 0.5rem; font-size: 0.9rem; }
+.disclaimer-content ul { margin: 0.5rem 0; font-size: 0.9rem; }
+.footer { margin-top: 3rem; padding-top: 1.5rem; border-top: 1px solid var(--gray-300); text-align: center; color: var(--gray-600); font-size: 0.9rem; }
+@media print { body { background-color: white; color: black; } .container { max-width: 100%; box-shadow: none; } .expandable-content { display: block !important; } .no-print { display: none; } .ai-disclaimer { page-break-inside: avoid; border: 1px solid #888; background-color: #f8f8f8; } }
+@media (max-width: 768px) { .container { padding: 1rem; } .case-info { flex-direction: column; gap: 1rem; } .findings-container, .columns { flex-direction: column; } }
+.argument-table { width: 100%; margin-bottom: 1.5rem; border-collapse: collapse; box-shadow: var(--box-shadow); border-radius: var(--border-radius); overflow: hidden; }
+.argument-table th { background-color: var(--primary); color: white; font-size: 1.1rem; text-align: center; padding: 1rem; }
+.argument-table td { background-color: white; padding: 1.5rem; vertical-align: top; }
+.argument-table p { margin-top: 0; font-weight: 600; }
+.argument-table ul { margin-bottom: 0; }
+@media (max-width: 768px) { .argument-table { font-size: 0.9rem; } .argument-table th { padding: 0.75rem; } .argument-table td { padding: 1rem; } }
+"""
+
+_PAGE_START = Template(
+    """<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="UTF-8">
+  <meta name="viewport" content="width=device-width, initial-scale=1.0">
+  <title>VE Audit Report: $claimant</title>
+  <style>$style</style>
+</head>
+<body>
+  <div class="container">
+    <header class="header">
+      <div class="header-text">
+        <h1 class="report-title">$report_title</h1>
+        <p class="report-date">$hearing_date</p>
+      </div>
+    </header>
+    <div class="case-info">
+      <div class="info-group">$case_left</div>
+      <div class="info-group">$case_right</div>
+    </div>
+"""
+)
+_INFO_ITEM = Template('<div class="info-item"><span class="info-label">$label:</span> $value</div>')
+_TOC_ITEM = Template('<a class="toc-item" href="#$anchor">$title</a>')
+_SECTION = Template(
+    """    <section id="$anchor" class="section">
+      <h2 class="section-title">$number. $title</h2>
+      <div class="section-content">
+$body
+      </div>
+    </section>
+"""
+)
+_RECOMMENDATION = Template(
+    '<div class="recommendation"><h3 class="recommendation-heading">$heading</h3>$body</div>'
+)
+_EXPANDABLE = Template(
+    """<div class="expandable">
+  <div class="expandable-header">$title</div>
+  <div class="expandable-content">
+$body
+  </div>
+</div>"""
+)
+_TABLE = Template("<table><thead><tr>$headers</tr></thead><tbody>$rows</tbody></table>")
+_ROW = Template("<tr$row_class>$cells</tr>")
+_PAGE_END = Template(
+    """    <div class="ai-disclaimer">
+      <div class="disclaimer-icon">&#9888;&#65039;</div>
+      <div class="disclaimer-content">
+        <h3>AI-GENERATED CONTENT DISCLAIMER</h3>
+        <p>This report was prepared with automated analysis of the hearing record. All findings should be independently verified by a qualified attorney or vocational expert, and the report should be used as an analytical aid, not as definitive legal guidance.</p>
+      </div>
+    </div>
+    <footer class="footer"><p>$footer</p></footer>
+  </div>
+  <script>
+    document.querySelectorAll('.expandable-header').forEach(function (header) {
+      header.addEventListener('click', function () {
+        this.classList.toggle('active');
+        this.nextElementSibling.classList.toggle('active');
+      });
+    });
+  </script>
+</body>
+</html>
+"""
+)
+DEFAULT_FOOTER = "Not a substitute for professional legal advice"
+
+_ROMAN = ["I", "II", "III", "IV", "V", "VI", "VII", "VIII", "IX", "X", "XI", "XII"]
+
+
+def _text(value: Any) -> str:
+    """Escapes a value for HTML; None becomes an empty string."""
+    if value is None:
+        return ""
+    if isinstance(value, int) and not isinstance(value, bool) and abs(value) >= 1000:
+        return f"{value:,}"
+    return html.escape(str(value))
+
+
+def _paragraphs(text: Any) -> str:
+    """Escapes free text and wraps each blank-line separated paragraph in <p>."""
+    if not text:
+        return ""
+    return "".join(
+        f"<p>{_text(paragraph.strip())}</p>" for paragraph in str(text).split("\n\n") if paragraph.strip()
+    )
+
+
+def _list(items: Iterable[Any], ordered: bool = False) -> str:
+    tag = "ol" if ordered else "ul"
+    return f"<{tag}>" + "".join(f"<li>{_text(item)}</li>" for item in items) + f"</{tag}>"
+
+
+def _table(rows: List[Dict[str, Any]], columns: Iterable[str], headers: Iterable[str]) -> str:
+    """Renders dictionaries as a table row each; a row's "severity" selects its status class."""
+    header_html = "".join(f"<th>{_text(header)}</th>" for header in headers)
+    row_html = []
+    for row in rows:
+        css_class = SEVERITY_CLASSES.get(str(row.get("severity", "")).lower())
+        row_html.append(
+            _ROW.substitute(
+                row_class=f' class="{css_class}"' if css_class else "",
+                cells="".join(f"<td>{_text(row.get(column))}</td>" for column in columns),
+            )
+        )
+    return _TABLE.substitute(headers=header_html, rows="".join(row_html))
+
+
+def _require_list(audit: Dict[str, Any], key: str) -> List[Any]:
+    value = audit.get(key) or []
+    if not isinstance(value, list):
+        raise ValueError(f"'{key}' must be a list.")
+    return value
+
+
+def validate_audit(audit: Any) -> Dict[str, Any]:
+    """
+    Checks the shape of audit data before anything is rendered or written.
+
+    Raises:
+        ValueError: If the data is not an object, lacks "case", or a section or
+                    entry (e.g. a hypothetical's job) has the wrong type.
+    """
+    if not isinstance(audit, dict):
+        raise ValueError("Audit data must be a JSON object.")
+    if not isinstance(audit.get("case"), dict):
+        raise ValueError("Audit data requires a 'case' object (claimant, hearing_date, ...).")
+    for key in ("hypotheticals", "conflicts", "obsolescence", "follow_up_questions", "job_reports"):
+        for item in _require_list(audit, key):
+            if key != "follow_up_questions" and not isinstance(item, dict):
+                raise ValueError(f"Each entry of '{key}' must be an object.")
+    for hypothetical in audit.get("hypotheticals") or []:
+        jobs = hypothetical.get("jobs") or []
+        if not isinstance(jobs, list):
+            raise ValueError("'jobs' of a hypothetical must be a list.")
+        if not all(isinstance(job, dict) for job in jobs):
+            raise ValueError(
+                "Each job of a hypothetical must be an object, e.g. {\"dot_code\": \"209.587-010\"}."
+            )
+    tsa = audit.get("tsa")
+    if tsa is not None:
+        if not isinstance(tsa, dict):
+            raise ValueError("'tsa' must be an object.")
+        skills = tsa.get("skills") or []
+        if not isinstance(skills, list) or not all(isinstance(skill, str) for skill in skills):
+            raise ValueError("'skills' of 'tsa' must be a list of strings.")
+    return audit
+
+
+def _sections(audit: Dict[str, Any]) -> Iterator[tuple]:
+    """Yields (anchor, title, body) for each section with content, in report order."""
+    if audit.get("summary") or audit.get("recommendation"):
+        body = _paragraphs(audit.get("summary"))
+        if audit.get("recommendation"):
+            body += _RECOMMENDATION.substitute(
+                heading="RECOMMENDATION", body=_paragraphs(audit["recommendation"])
+            )
+        yield "summary", "EXECUTIVE SUMMARY", body
+
+    hypotheticals = audit.get("hypotheticals") or []
+    if hypotheticals:
+        parts = []
+        for number, hypothetical in enumerate(hypotheticals, start=1):
+            title = f"Hypothetical #{number}"
+            if hypothetical.get("title"):
+                title += f": {hypothetical['title']}"
+            body = ""
+            if hypothetical.get("text"):
+                body += f"<blockquote>{_text(hypothetical['text'])}</blockquote>"
+            jobs = hypothetical.get("jobs") or []
+            if jobs:
+                body += "<h4>VE's Identified Jobs:</h4>" + _table(jobs, JOB_COLUMNS, JOB_HEADERS)
+            if hypothetical.get("response"):
+                body += "<h4>VE's Response:</h4>" + _paragraphs(hypothetical["response"])
+            parts.append(_EXPANDABLE.substitute(title=_text(title), body=body))
+        yield "hypotheticals", "RFC HYPOTHETICALS & IDENTIFIED JOBS", "\n".join(parts)
+
+    conflicts = audit.get("conflicts") or []
+    if conflicts:
+        rows = [{"severity": "conflict", **conflict} for conflict in conflicts]
+        yield "conflicts", "DOT CONSISTENCY CONFLICTS", _table(rows, CONFLICT_COLUMNS, CONFLICT_HEADERS)
+
+    obsolescence = audit.get("obsolescence") or []
+    if obsolescence:
+        rows = [
+            {"severity": "caution" if row.get("status") == "Found in Reference" else "", **row}
+            for row in obsolescence
+        ]
+        yield "obsolescence", "OBSOLESCENCE REVIEW", _table(rows, OBSOLESCENCE_COLUMNS, OBSOLESCENCE_HEADERS)
+
+    tsa = audit.get("tsa")
+    if tsa:
+        body = ""
+        if tsa.get("outcome") or tsa.get("rule"):
+            outcome = " - ".join(_text(tsa[key]) for key in ("outcome", "rule") if tsa.get(key))
+            body += f'<div class="alert alert-info"><strong>Outcome:</strong> {outcome}</div>'
+        if tsa.get("skills"):
+            body += "<h4>Transferable Skills:</h4>" + _list(tsa["skills"])
+        body += _paragraphs(tsa.get("notes"))
+        yield "tsa", "TRANSFERABLE SKILLS ANALYSIS (TSA)", body
+
+    questions = audit.get("follow_up_questions") or []
+    if questions:
+        yield "follow-up", "RECOMMENDED FOLLOW-UP QUESTIONS", _list(questions, ordered=True)
+
+    if audit.get("conclusion"):
+        yield "conclusion", "CONCLUSION & RECOMMENDATIONS", _paragraphs(audit["conclusion"])
+
+    reports = [report for report in audit.get("job_reports") or [] if report.get("report")]
+    if reports:
+        yield "job-reports", "APPENDIX: DOT JOB REPORTS", "\n".join(
+            _EXPANDABLE.substitute(
+                title=_text(f"{report.get('dot_code') or ''} {report.get('title') or ''}".strip()),
+                body=f"<pre>{_text(report['report'])}</pre>",
+            )
+            for report in reports
+        )
+
+
+def iter_audit_report(audit: Dict[str, Any]) -> Iterator[str]:
+    """
+    Renders an audit report fragment by fragment.
+
+    Args:
+        audit: Audit data (see module docstring), checked with validate_audit.
+
+    Yields:
+        HTML fragments that concatenate to the full page.
+    """
+    validate_audit(audit)
+    case = audit["case"]
+    info = [
+        (label, case.get(key))
+        for label, key in (
+            ("CLAIMANT", "claimant"),
+            ("HEARING DATE", "hearing_date"),
+            ("APPLICABLE SSR", "applicable_ssr"),
+            ("ALJ", "alj"),
+            ("VE", "ve"),
+            ("ATTORNEY", "attorney"),
+        )
+        if case.get(key)
+    ]
+    items = [_INFO_ITEM.substitute(label=label, value=_text(value)) for label, value in info]
+    half = (len(items) + 1) // 2
+    yield _PAGE_START.substitute(
+        claimant=_text(case.get("claimant") or "Hearing"),
+        style=_STYLE,
+        report_title=REPORT_TITLE,
+        hearing_date=_text(case.get("hearing_date")),
+        case_left="".join(items[:half]),
+        case_right="".join(items[half:]),
+    )
+
+    sections = list(_sections(audit))
+    if len(sections) > 1:
+        yield '    <nav class="toc no-print">' + "".join(
+            _TOC_ITEM.substitute(anchor=anchor, title=_text(title.title()))
+            for anchor, title, _ in sections
+        ) + "</nav>\n"
+    for number, (anchor, title, body) in enumerate(sections):
+        yield _SECTION.substitute(
+            anchor=anchor,
+            number=_ROMAN[number] if number < len(_ROMAN) else number + 1,
+            title=_text(title),
+            body=body,
+        )
+    yield _PAGE_END.substitute(footer=_text(audit.get("footer") or DEFAULT_FOOTER))
+
+
+def render_audit_report(audit: Dict[str, Any]) -> str:
+    """Renders an audit report to a string."""
+    return "".join(iter_audit_report(audit))
+
+
+def write_audit_report(audit: Dict[str, Any], target_file: Path) -> int:
+    """
+    Streams a rendered audit report to a file.
+
+    The page is written to a temporary file next to the target and moved into
+    place when complete, so a failed render never leaves a partial report.
+
+    Returns:
+        Number of bytes written.
+
+    Raises:
+        ValueError: If the audit data is invalid (nothing is written).
+    """
+    validate_audit(audit)
+    target_file = Path(target_file)
+    target_file.parent.mkdir(parents=True, exist_ok=True)
+    temp_file = target_file.with_name(f".{target_file.name}.{uuid.uuid4().hex}.tmp")
+    size = 0
+    try:
+        with open(temp_file, "w", encoding="utf-8") as output:
+            for fragment in iter_audit_report(audit):
+                output.write(fragment)
+                size += len(fragment.encode("utf-8"))
+        os.replace(temp_file, target_file)
+    except BaseException:
+        temp_file.unlink(missing_ok=True)
+        raise
+    logger.info(f"Wrote audit report {target_file} ({size} bytes).")
+    return size
+
+
+def enrich_audit(audit: Dict[str, Any], db: Any) -> Dict[str, Any]:
+    """
+    Fills in job details the caller left out, so the model can send DOT codes only.
+
+    Jobs listed under the hypotheticals get title, exertion, SVP, skill level and
+    GED-R from the DOT (one batch query), and when no "obsolescence" section is
+    given one is built from the obsolescence reference data for every job cited.
+    Values supplied by the caller are kept.
+
+    Returns:
+        The enriched audit data; the caller's dictionary is left unchanged.
+    """
+    validate_audit(audit)
+    # Copy the parts that are filled in (the job entries) or added (obsolescence)
+    audit = dict(audit)
+    if audit.get("hypotheticals"):
+        audit["hypotheticals"] = [
+            {**hypothetical, "jobs": [dict(job) for job in hypothetical.get("jobs") or []]}
+            for hypothetical in audit["hypotheticals"]
+        ]
+    jobs = [
+        job
+        for hypothetical in audit.get("hypotheticals") or []
+        for job in hypothetical["jobs"]
+        if job.get("dot_code")
+    ]
+    codes = list(dict.fromkeys(str(job["dot_code"]) for job in jobs))
+    if not codes:
+        return audit
+    rows = db.batch_get_jobs_by_codes(codes, columns=["Ncode", "Title", "StrengthNum", "SVPNum", "GEDR"])
+    rows_by_ncode = {row["Ncode"]: row for row in rows}
+
+    formatted_codes: Dict[str, Optional[str]] = {}
+    for job in jobs:
+        ncode, formatted = DotCode.clean(str(job["dot_code"]))
+        row = rows_by_ncode.get(ncode)
+        if row is None:
+            continue
+        job["dot_code"] = formatted
+        formatted_codes[formatted] = row.get("Title")
+        svp = row.get("SVPNum")
+        defaults = {
+            "title": (row.get("Title") or "").title(),
+            "exertion": config.strength_code_to_name.get(
+                config.strength_num_to_code.get(row.get("StrengthNum"))
+            ),
+            "svp": svp,
+            "skill": config.svp_to_skill_level.get(svp),
+            "ged_r": row.get("GEDR"),
+        }
+        for key, value in defaults.items():
+            if job.get(key) in (None, ""):
+                job[key] = value
+
+    if "obsolescence" not in audit:
+        obsolescence = []
+        for dot_code, title in formatted_codes.items():
+            result = check_job_obsolescence(dot_code)
+            obsolescence.append(
+                {
+                    "title": (title or "").title(),
+                    "dot_code": dot_code,
+                    "status": result.get("reference_status"),
+                    "source": result.get("data_source"),
+                    "comment": result.get("reference_comment"),
+                }
+            )
+        audit["obsolescence"] = obsolescence
+    return audit
@@ -0,0 +1,578 @@
+# batch_audit.py
+
+"""
+Parallel batch audit of a directory of hearing transcripts.
+
+Runs the deterministic parts of a VE audit for every transcript, without a model:
+
+    1. DOT extraction and resolution (transcript_preprocessor), with obsolescence
+       reference data, the O*NET-SOC crosswalk and BLS employment and wages.
+    2. Hypotheticals found by transcript_index, parsed into structured limits
+       (exertional level, lifting, standing/walking, simple work) and checked
+       against each job cited after them with ve_logic.perform_consistency_check.
+    3. Requirements the VE stated for each job (exertion, SVP, skill) compared
+       with the DOT.
+    4. The full job report for each cited job.
+
+Transcripts are audited in a process pool. The parent copies the database once
+into a snapshot file that every worker reads, so the DOT pages are shared
+through the OS page cache and throughput scales with the number of cores.
+Each hearing gets <name>.json and <name>.html in the output directory (default
+audits/batch under the current directory), plus a batch_summary.json:
+    python -m mcp_server_sqlite.batch_audit transcripts/ --output audits/batch
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from . import config
+from .audit_renderer import write_audit_report
+from .models import DotCode
+from .transcript_index import chunk_transcript
+from .transcript_preprocessor import DOT_CODE_PATTERN, preprocess_transcript
+from .ve_logic import generate_formatted_job_report, perform_consistency_check
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = Path(__file__).parent / "DOT.db"
+DEFAULT_BLS_PATH = Path(__file__).parent / "DOTSOCBLS_Excel" / "bls_all_data_M_2024.xlsx"
+DEFAULT_OUTPUT_DIR = Path("audits") / "batch"  # Relative to the working directory
+DEFAULT_PATTERN = "*.txt"
+STATED_WINDOW_CHARS = 150  # Testimony after a citation searched for the stated requirements
+SUMMARY_FILE = "batch_summary.json"
+
+# Lifting and standing/walking implied by each exertional level (20 CFR 404.1567)
+LEVEL_LIMITS = {
+    "S": {"lift_carry_occ": 10, "stand_walk_hours": 2},
+    "L": {"lift_carry_occ": 20, "lift_carry_freq": 10, "stand_walk_hours": 6},
+    "M": {"lift_carry_occ": 50, "lift_carry_freq": 25, "stand_walk_hours": 6},
+    "H": {"lift_carry_occ": 100, "lift_carry_freq": 50, "stand_walk_hours": 6},
+    "V": {"lift_carry_occ": 101, "lift_carry_freq": 51, "stand_walk_hours": 6},
+}
+_LEVEL_CODES = {name.lower(): code for code, name in config.strength_code_to_name.items()}
+
+_STRENGTH = r"(very heavy|sedentary|light|medium|heavy)"
+_HYPO_LEVEL = re.compile(
+    _STRENGTH + r"\s+(?:work|exertion(?:al)?|level|range|jobs?)\b", re.IGNORECASE
+)
+_HYPO_LIFT_OCC = re.compile(
+    r"(\d{1,3})\s*(?:pounds|lbs?)\.?\s+occasionally|occasionally\D{0,30}?(\d{1,3})\s*(?:pounds|lbs?)",
+    re.IGNORECASE,
+)
+_HYPO_LIFT_FREQ = re.compile(
+    r"(\d{1,3})\s*(?:pounds|lbs?)\.?\s+frequently|frequently\D{0,30}?(\d{1,3})\s*(?:pounds|lbs?)",
+    re.IGNORECASE,
+)
+_HYPO_STAND_WALK = re.compile(
+    r"stand(?:ing)?(?:\s*(?:and|or|/)\s*walk(?:ing)?)?\D{0,40}?(\d)\s*hours", re.IGNORECASE
+)
+_HYPO_SIT = re.compile(r"\bsit(?:ting)?\D{0,30}?(\d)\s*hours", re.IGNORECASE)
+_HYPO_SIMPLE = re.compile(r"\b(?:simple|routine|unskilled)\b", re.IGNORECASE)
+
+_STATED_STRENGTH = re.compile(r"\b" + _STRENGTH + r"\b", re.IGNORECASE)
+_STATED_SVP = re.compile(r"\bSVP(?:\s+(?:of|is))?[\s:]*(\d)\b", re.IGNORECASE)
+_STATED_SKILL = re.compile(r"\b(unskilled|semi-?skilled|skilled)\b", re.IGNORECASE)
+
+
+def parse_hypothetical(text: str) -> Dict[str, Any]:
+    """
+    Parses the limitations stated in a hypothetical into perform_consistency_check form.
+
+    Only the limits that can be read reliably from plain text are parsed: the
+    exertional level (with its regulatory lifting and standing/walking),
+    explicit lifting, standing/walking and sitting hours, and simple, routine
+    or unskilled work (SVP 2, simple instructions).
+
+    Returns:
+        {"exertional": {...}, "mental": {...}}; empty sections when nothing was found.
+    """
+    exertional: Dict[str, Any] = {}
+    level_match = _HYPO_LEVEL.search(text)
+    if level_match:
+        code = _LEVEL_CODES[" ".join(level_match.group(1).lower().split())]
+        exertional["level"] = config.strength_code_to_name[code]
+        exertional.update(LEVEL_LIMITS[code])
+    for key, pattern in (("lift_carry_occ", _HYPO_LIFT_OCC), ("lift_carry_freq", _HYPO_LIFT_FREQ)):
+        match = pattern.search(text)
+        if match:
+            exertional[key] = int(match.group(1) or match.group(2))
+    for key, pattern in (("stand_walk_hours", _HYPO_STAND_WALK), ("sit_hours", _HYPO_SIT)):
+        match = pattern.search(text)
+        if match:
+            exertional[key] = int(match.group(1))
+
+    mental: Dict[str, Any] = {}
+    if _HYPO_SIMPLE.search(text):
+        mental["svp"] = 2
+        mental["instructions"] = "Simple"
+    return {"exertional": exertional, "mental": mental}
+
+
+def find_stated_requirements(transcript: str) -> Dict[int, Dict[str, Any]]:
+    """
+    Reads the exertion, SVP and skill level the witness gave for each cited DOT code.
+
+    Only the testimony right after a citation (up to the next citation) is read,
+    e.g. "addresser, 209.587-010, sedentary, SVP 2".
+
+    Returns:
+        Dictionary keyed by Ncode of {"strength", "svp", "skill"} (None when not stated),
+        for the first citation of each code that states anything.
+    """
+    matches = list(DOT_CODE_PATTERN.finditer(transcript))
+    stated: Dict[int, Dict[str, Any]] = {}
+    for position, match in enumerate(matches):
+        ncode, _ = DotCode.clean("".join(match.groups()))
+        if ncode is None or ncode in stated:
+            continue
+        end = match.end() + STATED_WINDOW_CHARS
+        if position + 1 < len(matches):
+            end = min(end, matches[position + 1].start())
+        window = transcript[match.end() : end]
+        strength = _STATED_STRENGTH.search(window)
+        svp = _STATED_SVP.search(window)
+        skill = _STATED_SKILL.search(window)
+        if strength or svp or skill:
+            stated[ncode] = {
+                "strength": _LEVEL_CODES[" ".join(strength.group(1).lower().split())]
+                if strength
+                else None,
+                "svp": int(svp.group(1)) if svp else None,
+                "skill": skill.group(1).lower().replace("semiskilled", "semi-skilled")
+                if skill
+                else None,
+            }
+    return stated
+
+
+def _stated_discrepancies(stated: Dict[str, Any], job: Dict[str, Any]) -> List[Dict[str, str]]:
+    """Compares the requirements the witness stated for a job with the DOT."""
+    discrepancies = []
+    if stated.get("strength") and job.get("strength") and stated["strength"] != job["strength"]:
+        discrepancies.append(
+            {
+                "area": "Exertional level",
+                "stated": config.strength_code_to_name.get(stated["strength"], stated["strength"]),
+                "dot": config.strength_code_to_name.get(job["strength"], job["strength"]),
+            }
+        )
+    if stated.get("svp") is not None and job.get("svp") is not None and stated["svp"] != job["svp"]:
+        discrepancies.append(
+            {"area": "SVP", "stated": f"SVP {stated['svp']}", "dot": f"SVP {job['svp']}"}
+        )
+    if stated.get("skill") and job.get("skill") and stated["skill"] != job["skill"].lower():
+        discrepancies.append(
+            {"area": "Skill level", "stated": stated["skill"].capitalize(), "dot": job["skill"]}
+        )
+    return discrepancies
+
+
+# --- Worker process ---
+
+_worker: Dict[str, Any] = {}  # Per-process handlers, set by _init_worker
+
+
+def _init_worker(snapshot_path: str, version: str, bls_path: Optional[str]) -> None:
+    """Process-pool initializer: opens the shared snapshot and loads the reference data."""
+    from .analysis_store import AnalysisStore
+    from .db_handler import DatabaseHandler
+    from .hot_reload import build_bls_handler, preload_reference_data
+    from .report_store import ReportStore
+
+    preload_reference_data()  # Already loaded when the pool forks from the parent
+    db = DatabaseHandler(Path(snapshot_path))
+    analysis_store = AnalysisStore(db, version=version)
+    bls_handler = None
+    if bls_path:
+        try:
+            bls_handler = build_bls_handler(Path(bls_path))
+        except Exception as e:
+            logger.error(f"Could not load BLS workbook {bls_path}: {e}")
+    _worker.update(
+        db=db,
+        analysis_store=analysis_store,
+        report_store=ReportStore(db, analysis_store),
+        bls_handler=bls_handler,
+    )
+
+
+def audit_transcript(path: str, hearing_date: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Audits one transcript with the worker's handlers.
+
+    Args:
+        path: Transcript file (UTF-8 text).
+        hearing_date: Hearing date ('YYYY-MM-DD') used to pick the applicable SSR.
+
+    Returns:
+        The audit: digest (preprocess_transcript output), hypotheticals and one
+        entry per cited job with its conflicts, stated-requirement discrepancies
+        and job report.
+    """
+    db = _worker["db"]
+    analysis_store = _worker["analysis_store"]
+    report_store = _worker["report_store"]
+    started = time.perf_counter()
+
+    transcript = Path(path).read_text(encoding="utf-8", errors="replace")
+    digest = preprocess_transcript(transcript, db, bls_handler=_worker["bls_handler"])
+
+    hypotheticals = []
+    for chunk in chunk_transcript(transcript):
+        if "hypothetical" not in chunk.tags or chunk.speaker in ("VE", "CLMT"):
+            continue
+        limits = parse_hypothetical(chunk.text)
+        if limits["exertional"] or limits["mental"]:
+            hypotheticals.append(
+                {
+                    "number": len(hypotheticals) + 1,
+                    "speaker": chunk.speaker,
+                    "page": chunk.page,
+                    "first_line": chunk.first_line,
+                    "limits": limits,
+                    "text": chunk.text,
+                }
+            )
+
+    stated = find_stated_requirements(transcript)
+    cited_codes = [job["dotCode"] for job in digest["cited_jobs"]]
+    rows = db.batch_get_jobs_by_codes(cited_codes) if cited_codes else []
+    rows_by_code = {DotCode.format(row["Ncode"]): row for row in rows}
+    analyses = analysis_store.get_many(
+        [row["Ncode"] for row in rows], hearing_date_str=hearing_date
+    )
+
+    jobs = []
+    conflict_count = 0
+    discrepancy_count = 0
+    for cited in digest["cited_jobs"]:
+        row = rows_by_code.get(cited["dotCode"], {})
+        ncode = row.get("Ncode")
+        analysis = analyses.get(ncode) or analysis_store.get_or_compute(row, hearing_date)
+
+        # The hypothetical a job answers is the last one posed before it was cited
+        first_line = cited["lines"][0] if cited["lines"] else 0
+        hypothetical = None
+        for candidate in hypotheticals:
+            if candidate["first_line"] <= first_line:
+                hypothetical = candidate
+        conflicts = []
+        if hypothetical is not None and "error" not in analysis:
+            conflicts = perform_consistency_check(hypothetical["limits"], analysis)
+
+        discrepancies = _stated_discrepancies(stated.get(ncode, {}), cited)
+        report_text = report_store.get(ncode)
+        if report_text is None and "error" not in analysis:
+            report_text = generate_formatted_job_report(analysis)
+        conflict_count += len(conflicts)
+        discrepancy_count += len(discrepancies)
+        jobs.append(
+            {
+                **cited,
+                "hypothetical": hypothetical["number"] if hypothetical else None,
+                "conflicts": conflicts,
+                "stated": stated.get(ncode),
+                "statedDiscrepancies": discrepancies,
+                "report": report_text,
+            }
+        )
+
+    return {
+        "transcript": str(path),
+        "hearing_date": hearing_date,
+        "summary": {
+            **digest["summary"],
+            "hypotheticals": len(hypotheticals),
+            "conflicts": conflict_count,
+            "stated_discrepancies": discrepancy_count,
+            "obsolescence_flagged": sum(
+                1 for job in jobs if job.get("obsolescence") == "Found in Reference"
+            ),
+            "duration_seconds": round(time.perf_counter() - started, 3),
+        },
+        "hypotheticals": hypotheticals,
+        "jobs": jobs,
+        "unresolved_codes": digest["unresolved_codes"],
+        "title_mentions": digest["title_mentions"],
+    }
+
+
+# --- Output ---
+
+
+def to_report_data(audit: Dict[str, Any]) -> Dict[str, Any]:
+    """Converts a batch audit into audit_renderer data for the HTML report."""
+    summary = audit["summary"]
+
+    def job_row(job: Dict[str, Any]) -> Dict[str, Any]:
+        flagged = job["conflicts"] or job["statedDiscrepancies"]
+        return {
+            "title": job["title"],
+            "dot_code": job["dotCode"],
+            "exertion": config.strength_code_to_name.get(job["strength"], job["strength"]),
+            "svp": job["svp"],
+            "skill": job["skill"],
+            "ged_r": job["ged"].split()[0] if job.get("ged") else None,
+            "status": "Conflict" if flagged else "Consistent",
+            "severity": "conflict" if flagged else "compatible",
+        }
+
+    hypotheticals = []
+    for hypothetical in audit["hypotheticals"]:
+        exertional = hypothetical["limits"]["exertional"]
+        labels = [exertional["level"]] if exertional.get("level") else []
+        if hypothetical["limits"]["mental"]:
+            labels.append("Simple Tasks")
+        hypotheticals.append(
+            {
+                "title": ", ".join(labels) + f" (line {hypothetical['first_line']})",
+                "text": hypothetical["text"],
+                "jobs": [
+                    job_row(job) for job in audit["jobs"] if job["hypothetical"] == hypothetical["number"]
+                ],
+            }
+        )
+    unanswered = [job_row(job) for job in audit["jobs"] if job["hypothetical"] is None]
+    if unanswered:
+        hypotheticals.append({"title": "Jobs cited before any hypothetical", "jobs": unanswered})
+
+    conflicts = []
+    for job in audit["jobs"]:
+        for conflict in job["conflicts"]:
+            conflicts.append(
+                {
+                    "job": job["title"],
+                    "dot_code": job["dotCode"],
+                    "area": conflict.get("area"),
+                    "hypothetical_limit": conflict.get("hypothetical_limit"),
+                    "job_requirement": conflict.get("job_requirement"),
+                    "description": conflict.get("conflict_description", conflict.get("error")),
+                }
+            )
+        for discrepancy in job["statedDiscrepancies"]:
+            conflicts.append(
+                {
+                    "job": job["title"],
+                    "dot_code": job["dotCode"],
+                    "area": f"Stated vs DOT ({discrepancy['area']})",
+                    "hypothetical_limit": f"VE stated {discrepancy['stated']}",
+                    "job_requirement": f"DOT {discrepancy['dot']}",
+                    "description": f"The VE described the job as {discrepancy['stated']}, but the DOT lists {discrepancy['dot']}.",
+                    "severity": "caution",
+                }
+            )
+
+    return {
+        "case": {"claimant": Path(audit["transcript"]).stem, "hearing_date": audit["hearing_date"]},
+        "summary": (
+            f"{summary['resolved']} cited jobs, {summary['unresolved']} unresolved codes, "
+            f"{summary['hypotheticals']} hypotheticals, {summary['conflicts']} conflicts and "
+            f"{summary['stated_discrepancies']} stated-requirement discrepancies."
+        ),
+        "hypotheticals": hypotheticals,
+        "conflicts": conflicts,
+        "obsolescence": [
+            {
+                "title": job["title"],
+                "dot_code": job["dotCode"],
+                "status": job["obsolescence"],
+                "source": job["obsolescenceSource"],
+            }
+            for job in audit["jobs"]
+        ],
+        "follow_up_questions": [
+            f"Clarify DOT code {code['dotCode']} (line {', '.join(map(str, code['lines']))}); it is not in the DOT."
+            for code in audit["unresolved_codes"]
+        ],
+        "job_reports": [
+            {"dot_code": job["dotCode"], "title": job["title"], "report": job["report"]}
+            for job in audit["jobs"]
+        ],
+    }
+
+
+def write_artifacts(audit: Dict[str, Any], output_dir: Path, formats: List[str]) -> List[str]:
+    """Writes <stem>.json and/or <stem>.html for an audit and returns their paths."""
+    stem = Path(audit["transcript"]).stem
+    written = []
+    if "json" in formats:
+        path = output_dir / f"{stem}.json"
+        path.write_text(json.dumps(audit, indent=2), encoding="utf-8")
+        written.append(str(path))
+    if "html" in formats:
+        path = output_dir / f"{stem}.html"
+        write_audit_report(to_report_data(audit), path)
+        written.append(str(path))
+    return written
+
+
+def snapshot_database(db_path: Path, target: Path) -> None:
+    """Copies a consistent snapshot of the database (SQLite backup API) to target."""
+    with closing(sqlite3.connect(db_path, timeout=10)) as source:
+        with closing(sqlite3.connect(target)) as destination:
+            source.backup(destination)
+
+
+def run_batch(
+    transcripts_dir: Path,
+    db_path: Path = DEFAULT_DB_PATH,
+    output_dir: Path = DEFAULT_OUTPUT_DIR,
+    workers: Optional[int] = None,
+    formats: Optional[List[str]] = None,
+    pattern: str = DEFAULT_PATTERN,
+    bls_path: Optional[Path] = DEFAULT_BLS_PATH,
+    hearing_date: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Audits every transcript in a directory in a process pool.
+
+    Args:
+        transcripts_dir: Directory of transcripts.
+        db_path: DOT SQLite database (snapshotted once for all workers).
+        output_dir: Directory for the per-hearing artifacts and batch_summary.json.
+        workers: Number of worker processes (defaults to the CPU count).
+        formats: Artifacts to write, "json" and/or "html" (default both).
+        pattern: Glob pattern of the transcript files.
+        bls_path: BLS workbook loaded by each worker, or None to skip BLS data.
+        hearing_date: Hearing date ('YYYY-MM-DD') applied to every transcript.
+
+    Returns:
+        Summary of the batch, also written to batch_summary.json.
+
+    Raises:
+        ValueError: If the directory holds no matching transcripts.
+    """
+    from .analysis_store import AnalysisStore
+    from .db_handler import DatabaseHandler
+    from .hot_reload import preload_reference_data
+
+    formats = formats or ["json", "html"]
+    transcripts_dir = Path(transcripts_dir)
+    paths = sorted(path for path in transcripts_dir.glob(pattern) if path.is_file())
+    if not paths:
+        raise ValueError(f"No transcripts matching '{pattern}' in {transcripts_dir}.")
+    workers = max(1, min(workers or os.cpu_count() or 1, len(paths)))
+    if bls_path is not None and not Path(bls_path).is_file():
+        logger.warning(f"BLS workbook not found at {bls_path}; auditing without BLS data.")
+        bls_path = None
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    start_time = time.monotonic()
+
+    # Indices and the analysis version are settled once, against the source database
+    db = DatabaseHandler(Path(db_path))
+    version = AnalysisStore(db).current_version()
+    preload_reference_data()  # Inherited by forked workers instead of loaded once per worker
+
+    results: List[Dict[str, Any]] = []
+    errors: List[Dict[str, str]] = []
+    with tempfile.TemporaryDirectory(prefix="ve_batch_") as snapshot_dir:
+        snapshot_path = Path(snapshot_dir) / "DOT.db"
+        snapshot_database(db.db_path, snapshot_path)
+        logger.info(f"Auditing {len(paths)} transcripts with {workers} workers.")
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(str(snapshot_path), version, str(bls_path) if bls_path else None),
+        ) as executor:
+            futures = {
+                executor.submit(audit_transcript, str(path), hearing_date): path for path in paths
+            }
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    audit = future.result()
+                except Exception as e:
+                    logger.error(f"Audit of {path} failed: {e}")
+                    errors.append({"transcript": str(path), "error": str(e)})
+                    continue
+                artifacts = write_artifacts(audit, output_dir, formats)
+                results.append(
+                    {"transcript": str(path), "artifacts": artifacts, **audit["summary"]}
+                )
+                logger.info(
+                    f"Audited {path.name}: {audit['summary']['resolved']} jobs, "
+                    f"{audit['summary']['conflicts']} conflicts."
+                )
+
+    duration = time.monotonic() - start_time
+    summary = {
+        "status": "completed" if not errors else "completed_with_errors",
+        "transcripts": len(paths),
+        "audited": len(results),
+        "failed": len(errors),
+        "workers": workers,
+        "bls_data": bls_path is not None,
+        "duration_seconds": round(duration, 2),
+        "transcripts_per_second": round(len(results) / duration, 2) if duration else None,
+        "output": str(output_dir),
+        "results": sorted(results, key=lambda result: result["transcript"]),
+        "errors": errors,
+    }
+    (output_dir / SUMMARY_FILE).write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    logger.info(f"Audited {len(results)} of {len(paths)} transcripts in {duration:.2f}s.")
+    return summary
+
+
+def main():
+    """Command-line entry point for auditing a directory of transcripts."""
+    parser = argparse.ArgumentParser(
+        description="Run the deterministic VE audit over a directory of hearing transcripts"
+    )
+    parser.add_argument("transcripts", help="Directory of transcript text files")
+    parser.add_argument(
+        "--db-path", default=str(DEFAULT_DB_PATH), help="Path to the DOT SQLite database file"
+    )
+    parser.add_argument(
+        "--output", default=str(DEFAULT_OUTPUT_DIR), help="Directory for the audit artifacts"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Number of worker processes (default: CPU count)"
+    )
+    parser.add_argument(
+        "--format", choices=["json", "html", "both"], default="both", help="Artifacts to write"
+    )
+    parser.add_argument(
+        "--pattern", default=DEFAULT_PATTERN, help="Glob pattern of transcript files"
+    )
+    parser.add_argument(
+        "--bls-path", default=str(DEFAULT_BLS_PATH), help="BLS OEWS workbook for employment data"
+    )
+    parser.add_argument("--no-bls", action="store_true", help="Skip BLS employment data")
+    parser.add_argument(
+        "--hearing-date", default=None, help="Hearing date (YYYY-MM-DD) for the applicable SSR"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    try:
+        summary = run_batch(
+            Path(args.transcripts),
+            db_path=Path(args.db_path),
+            output_dir=Path(args.output),
+            workers=args.workers,
+            formats=["json", "html"] if args.format == "both" else [args.format],
+            pattern=args.pattern,
+            bls_path=None if args.no_bls else Path(args.bls_path),
+            hearing_date=args.hearing_date,
+        )
+    except (ValueError, FileNotFoundError, sqlite3.Error, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(json.dumps({key: value for key, value in summary.items() if key != "results"}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+# bitmap_index.py
+
+"""
+Bitmap index over the DOT demand columns.
+
+For every indexed column (strength, SVP, GED, physical demands, environmental
+conditions and temperaments) and every value it takes, the index keeps a
+bitset with one bit per DOT job (numpy packbits, ~1.6 KB for the full DOT).
+Constraint sets are answered by AND/OR/NOT over those bitsets and a popcount,
+in microseconds and without touching SQLite.
+
+Filter expressions are the filter_dsl trees used by filter_jobs and give the
+same results as the compiled SQL, including NULL handling: a condition on a
+NULL value is unknown, so neither it nor its negation matches. Each node
+evaluates to a (true, false) pair of bitsets; NOT swaps them, AND/OR combine
+them with SQL's three-valued logic.
+
+The index is built once per DatabaseHandler and is the substrate of the
+occupational base calculator and of RFC screening of cited jobs.
+"""
+
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from . import config, filter_dsl
+from .filter_dsl import Condition, FilterNode, Group, Not
+from .hot_reload import PerHandlerCache
+
+logger = logging.getLogger(__name__)
+
+TEMPERAMENT_COLUMNS = ("Temp1", "Temp2", "Temp3", "Temp4", "Temp5")
+INDEXED_COLUMNS = (
+    ("StrengthNum", "SVPNum", "GEDR", "GEDM", "GEDL")
+    + tuple(config.physical_demand_api_keys_to_labels)
+    + tuple(config.environmental_condition_api_keys_to_labels)
+    + TEMPERAMENT_COLUMNS
+)
+
+_POPCOUNT_TABLE = None
+
+
+def _popcount_table() -> Any:
+    global _POPCOUNT_TABLE
+    if _POPCOUNT_TABLE is None:
+        import numpy as np
+
+        _POPCOUNT_TABLE = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.uint8)
+    return _POPCOUNT_TABLE
+
+
+def popcount(bits: Any) -> int:
+    """Returns the number of set bits in a packed bitset."""
+    import numpy as np
+
+    if hasattr(np, "bitwise_count"):  # numpy 2.0+
+        return int(np.bitwise_count(bits).sum())
+    return int(_popcount_table()[bits].sum(dtype=np.int64))
+
+
+def _kind(value: Any) -> Optional[str]:
+    """Comparison class of a value: 'number', 'text' or None (not indexable)."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return "number"
+    if isinstance(value, str):
+        return "text"
+    return None
+
+
+def _matches(level: Any, op: str, value: Any) -> bool:
+    """Applies a filter_dsl operator to one indexed value."""
+    if op == "eq":
+        return level == value
+    if op == "ne":
+        return level != value
+    if op == "lt":
+        return level < value
+    if op == "lte":
+        return level <= value
+    if op == "gt":
+        return level > value
+    if op == "gte":
+        return level >= value
+    if op == "in":
+        return level in value
+    if op == "not_in":
+        return level not in value
+    low, high = value  # between
+    return low <= level <= high
+
+
+class _Column:
+    """Distinct values of one column and one packed bitset per value."""
+
+    __slots__ = ("levels", "kind", "mixed", "equal", "at_most", "present", "codes")
+
+    def __init__(self, values: List[Any]):
+        import numpy as np
+
+        present = [value for value in values if value is not None]
+        kinds = {_kind(value) for value in present}
+        self.mixed = len(kinds) > 1 or None in kinds  # Mixed or unknown types are not indexed
+        self.kind = None if self.mixed or not kinds else kinds.pop()
+        self.levels: Tuple[Any, ...] = tuple(sorted(set(present))) if self.kind else ()
+        positions = {level: position for position, level in enumerate(self.levels)}
+        self.codes = np.array(
+            [positions.get(value, -1) if value is not None else -1 for value in values], dtype=np.int16
+        )
+        size = len(values)
+        if self.levels:
+            self.equal = np.stack([np.packbits(self.codes == position) for position in range(len(self.levels))])
+            # Row i: jobs with a value at or below levels[i]
+            self.at_most = np.bitwise_or.accumulate(self.equal, axis=0)
+            self.present = self.at_most[-1]
+        else:
+            self.equal = self.at_most = np.zeros((0, (size + 7) // 8), dtype=np.uint8)
+            self.present = np.zeros((size + 7) // 8, dtype=np.uint8)
+
+
+class BitmapIndex:
+    """One bitset per (column, value) over the DOT, with a filter_dsl evaluator."""
+
+    def __init__(self, rows: Iterable[Dict[str, Any]], columns: Iterable[str] = INDEXED_COLUMNS):
+        """
+        Builds the bitsets.
+
+        Args:
+            rows: DOT rows with Ncode, Title and the indexed columns.
+            columns: Columns to index.
+        """
+        import numpy as np
+
+        rows = [row for row in rows if row.get("Ncode") is not None]
+        self.size = len(rows)
+        self.ncodes: List[int] = [int(row["Ncode"]) for row in rows]
+        self.titles: List[str] = [row.get("Title") or "" for row in rows]
+        self.positions: Dict[int, int] = {ncode: position for position, ncode in enumerate(self.ncodes)}
+        self._columns: Dict[str, _Column] = {column: _Column([row.get(column) for row in rows]) for column in columns}
+        self.all = np.packbits(np.ones(self.size, dtype=bool))
+        self.none = np.zeros_like(self.all)
+
+    @classmethod
+    def from_database(cls, db: Any) -> "BitmapIndex":
+        """Builds the index from a DatabaseHandler's DOT table."""
+        started = time.perf_counter()
+        rows = db.execute_select_query(
+            f"SELECT Ncode, Title, {', '.join(INDEXED_COLUMNS)} FROM DOT"
+        )
+        index = cls(rows)
+        bitsets = sum(len(column.levels) for column in index._columns.values())
+        logger.info(
+            f"Built bitmap index: {bitsets} bitsets over {len(index._columns)} columns for {index.size} jobs "
+            f"in {time.perf_counter() - started:.2f}s."
+        )
+        return index
+
+    @property
+    def columns(self) -> Tuple[str, ...]:
+        return tuple(self._columns)
+
+    def levels(self, column: str) -> Tuple[Any, ...]:
+        """Returns the distinct non-NULL values of an indexed column."""
+        return self._columns[column].levels
+
+    def value(self, column: str, position: int) -> Any:
+        """Returns a job's value of an indexed column (None for NULL)."""
+        info = self._columns[column]
+        code = int(info.codes[position])
+        return info.levels[code] if code >= 0 else None
+
+    def missing(self, column: str) -> Any:
+        """Returns the bitset of jobs with no value for a column."""
+        import numpy as np
+
+        return np.bitwise_and(self.all, np.bitwise_not(self._columns[column].present))
+
+    def at_most(self, column: str, level: Any, include_missing: bool = False) -> Any:
+        """
+        Returns the bitset of jobs whose value of a column is at or below a level.
+
+        Args:
+            column: Indexed column.
+            level: Highest allowed value.
+            include_missing: Also include jobs with no value (e.g. a missing
+                             frequency meaning "not present").
+        """
+        import numpy as np
+
+        info = self._columns[column]
+        count = sum(1 for value in info.levels if value <= level)
+        bits = info.at_most[count - 1] if count else self.none
+        return np.bitwise_or(bits, self.missing(column)) if include_missing else bits
+
+    def supports(self, node: FilterNode) -> bool:
+        """True if every condition of a parsed filter expression can be answered from the bitsets."""
+        if isinstance(node, Not):
+            return self.supports(node.child)
+        if isinstance(node, Group):
+            return all(self.supports(child) for child in node.children)
+        info = self._columns.get(node.column)
+        if info is None or info.mixed:
+            return False
+        if node.op in filter_dsl.NULL_OPERATORS or not info.levels:
+            return True
+        operands = node.value if isinstance(node.value, tuple) else (node.value,)
+        return all(_kind(operand) == info.kind for operand in operands)
+
+    def evaluate(self, node: FilterNode) -> Tuple[Any, Any]:
+        """
+        Evaluates a parsed filter expression.
+
+        Returns:
+            (jobs where the expression is true, jobs where it is false); jobs in
+            neither are unknown because of NULL values, as in SQL.
+
+        Raises:
+            ValueError: If the expression uses a column or value the index cannot answer.
+        """
+        import numpy as np
+
+        if isinstance(node, Not):
+            true, false = self.evaluate(node.child)
+            return false, true
+        if isinstance(node, Group):
+            results = [self.evaluate(child) for child in node.children]
+            trues = np.stack([true for true, _ in results])
+            falses = np.stack([false for _, false in results])
+            if node.op == "and":
+                return np.bitwise_and.reduce(trues), np.bitwise_or.reduce(falses)
+            return np.bitwise_or.reduce(trues), np.bitwise_and.reduce(falses)
+
+        if not self.supports(node):
+            raise ValueError(f"The bitmap index cannot answer '{node.column} {node.op} {node.value!r}'.")
+        info = self._columns[node.column]
+        if node.op == "is_null":
+            return self.missing(node.column), info.present
+        if node.op == "not_null":
+            return info.present, self.missing(node.column)
+        selected = [position for position, level in enumerate(info.levels) if _matches(level, node.op, node.value)]
+        true = np.bitwise_or.reduce(info.equal[selected]) if selected else self.none
+        return true, np.bitwise_and(info.present, np.bitwise_not(true))
+
+    def select(self, expression: Any) -> Any:
+        """
+        Returns the bitset of jobs matching a filter expression (JSON form or parsed node).
+
+        Raises:
+            ValueError: If the expression is invalid or not answerable from the index.
+        """
+        node = expression
+        if not isinstance(expression, (Condition, Group, Not)):
+            node = filter_dsl.parse_filter_expression(expression, self._columns)
+        return self.evaluate(node)[0]
+
+    def count(self, expression: Any) -> int:
+        """Returns the number of jobs matching a filter expression."""
+        return popcount(self.select(expression))
+
+    def job_positions(self, bits: Any) -> Any:
+        """Returns the row positions of the jobs in a bitset, in DOT order."""
+        import numpy as np
+
+        return np.flatnonzero(np.unpackbits(bits, count=self.size))
+
+    def contains(self, bits: Any, position: int) -> bool:
+        """True if the job at a row position is in a bitset."""
+        return bool((int(bits[position >> 3]) >> (7 - (position & 7))) & 1)
+
+
+_indexes = PerHandlerCache(BitmapIndex.from_database)
+
+
+def get_bitmap_index(db: Any) -> BitmapIndex:
+    """Returns the bitmap index for a database handler, building it on first use."""
+    return _indexes.get(db)
+
+
+def count_matches(db: Any, expression: Any) -> Optional[int]:
+    """
+    Counts the jobs matching a filter expression that has already been validated
+    against the DOT schema (e.g. by DatabaseHandler.filter_jobs).
+
+    Returns:
+        The count, or None if the expression uses columns or values the index
+        does not cover.
+    """
+    if not expression:
+        return None
+    index = get_bitmap_index(db)
+    try:
+        node = filter_dsl.parse_filter_expression(expression, index.columns)
+    except ValueError:  # A DOT column outside the index
+        return None
+    if not index.supports(node):
+        return None
+    return popcount(index.evaluate(node)[0])
@@ -1,13 +1,18 @@
 import sqlite3
 import logging
+import itertools
+import threading
 import time  # For profiling
-from contextlib import closing
+from contextlib import closing, contextmanager
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union, Callable  # Added Callable
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union, Callable  # Added Callable
 import re
 
 # Import analysis utils for validation
 from . import analysis_utils
+from . import config
+from . import filter_dsl
+from .dispatch import current_call_cancelled, interrupt_on_cancel
 
 # Import the moved clean_dot_code utility
 
@@ -25,16 +30,54 @@ _REPORT_QUERY_SQL_PATH = Path(__file__).parent / "report_query.sql"
 # Remove the circular import
 # from .db_handler import DatabaseHandler # Import the handler class
 
+# --- Column Projection Sets ---
+# Named column sets for projecting DOT queries, so bulk paths (TSA screening,
+# consistency checks) avoid pulling the long text columns such as Definitions.
+_IDENTITY_COLUMNS = ("Ncode", "Code", "Title")
+_NUMERIC_DEMAND_COLUMNS = (
+    ("StrengthNum", "SVPNum", "GEDR", "GEDM", "GEDL", "WFData", "WFPeople", "WFThings")
+    + tuple(config.physical_demand_api_keys_to_labels)
+    + tuple(config.environmental_condition_api_keys_to_labels)
+    + tuple(
+        f"Apt{details['api_suffix']}"
+        for details in config.aptitude_code_to_details_map.values()
+    )
+)
+_SKILLS_PROFILE_COLUMNS = (
+    tuple(f"Temp{i}" for i in range(1, 6))
+    + tuple(f"WField{i}Short" for i in range(1, 4))
+    + tuple(f"MPSMS{i}Short" for i in range(1, 4))
+)
+
+# None means every column (SELECT *)
+COLUMN_SETS: Dict[str, Optional[Tuple[str, ...]]] = {
+    "numeric_demands": _IDENTITY_COLUMNS + _NUMERIC_DEMAND_COLUMNS,
+    "skills_profile": _IDENTITY_COLUMNS
+    + _NUMERIC_DEMAND_COLUMNS
+    + _SKILLS_PROFILE_COLUMNS,
+    "report_full": None,
+}
+
+# A projection is either a named set, an explicit list of columns, or None (all columns)
+ColumnSpec = Union[str, List[str], Tuple[str, ...], None]
+
+# In-memory snapshot mode: minimum seconds between checks of the file's mtime
+SNAPSHOT_CHECK_INTERVAL = 5.0
+_snapshot_counter = itertools.count(1)  # Unique names for shared-cache memory DBs
+
 
 class DatabaseHandler:
     """Manages connection and queries to the DOT SQLite database."""
 
-    def __init__(self, db_path: Path):
+    def __init__(self, db_path: Path, in_memory: bool = False):
         """
         Initializes the DatabaseHandler.
 
         Args:
             db_path: A pathlib.Path object pointing to the SQLite database file.
+            in_memory: If True, copy the database into a shared-cache in-memory
+                       snapshot and serve all reads from it. Writes still go to
+                       the file, and the snapshot is refreshed when the file changes.
         """
         if not isinstance(db_path, Path):
             db_path = Path(db_path)
@@ -47,13 +90,30 @@ class DatabaseHandler:
             None  # Cache for filter_jobs validation
         )
 
+        # In-memory snapshot state (see _load_snapshot)
+        self.in_memory = in_memory
+        self._snapshot_lock = threading.Lock()
+        self._snapshot_uri: Optional[str] = None
+        self._snapshot_anchor: Optional[sqlite3.Connection] = None  # Keeps the memory DB alive
+        self._snapshot_file_state: Optional[Tuple[int, int]] = None  # (mtime_ns, size)
+        self._snapshot_checked_at = 0.0
+
+        # (state before, state after) of this process's latest run of file writes
+        self._own_writes: Optional[Tuple[Optional[Tuple[int, int]], Optional[Tuple[int, int]]]] = None
+        self._own_writes_lock = threading.Lock()
+
         try:
             if not self.db_path.is_file():
                 raise FileNotFoundError(
                     f"Database file not found on init: {self.db_path}"
                 )
             self._ensure_indices()  # Attempt to ensure indices exist
-            logger.info(f"DatabaseHandler initialized for database: {self.db_path}")
+            if self.in_memory:
+                self._load_snapshot()
+            logger.info(
+                f"DatabaseHandler initialized for database: {self.db_path}"
+                + (" (in-memory snapshot)" if self.in_memory else "")
+            )
         except (FileNotFoundError, sqlite3.Error) as e:
             logger.critical(
                 f"Failed to initialize DatabaseHandler for {self.db_path}: {e}",
@@ -110,6 +170,158 @@ class DatabaseHandler:
         except sqlite3.Error as e:
             logger.error(f"Failed to ensure database indices: {e}", exc_info=True)
 
+    # --- In-Memory Snapshot Helpers ---
+
+    def _file_state(self) -> Tuple[int, int]:
+        """Returns (mtime_ns, size) of the database file."""
+        stat = self.db_path.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load_snapshot(self) -> None:
+        """
+        Copies the database file into a new shared-cache in-memory database.
+
+        The copy is made with the SQLite backup API into a freshly named memory
+        database, then swapped in, so queries already running on the previous
+        snapshot are not disturbed.
+        """
+        start_time = time.monotonic()
+        file_state = self._file_state()
+        uri = f"file:dot_snapshot_{next(_snapshot_counter)}?mode=memory&cache=shared"
+        anchor = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        try:
+            with closing(sqlite3.connect(self.db_path, timeout=10)) as source:
+                source.backup(anchor)
+        except sqlite3.Error:
+            anchor.close()
+            raise
+
+        previous_anchor = self._snapshot_anchor
+        self._snapshot_uri = uri
+        self._snapshot_anchor = anchor
+        self._snapshot_file_state = file_state
+        self._snapshot_checked_at = time.monotonic()
+        if previous_anchor is not None:
+            previous_anchor.close()  # Freed once its last open connection closes
+        logger.info(
+            f"Loaded in-memory snapshot of {self.db_path} in {time.monotonic() - start_time:.3f}s"
+        )
+
+    def _refresh_snapshot_if_changed(self, force: bool = False) -> None:
+        """Re-snapshots the database if the file changed (checked at most every SNAPSHOT_CHECK_INTERVAL)."""
+        now = time.monotonic()
+        if not force and now - self._snapshot_checked_at < SNAPSHOT_CHECK_INTERVAL:
+            return
+        with self._snapshot_lock:
+            if not force and now - self._snapshot_checked_at < SNAPSHOT_CHECK_INTERVAL:
+                return  # Another thread just checked
+            self._snapshot_checked_at = now
+            try:
+                file_state = self._file_state()
+            except OSError as e:
+                # Keep serving the last snapshot if the file is temporarily unavailable
+                logger.warning(f"Could not stat {self.db_path}; serving existing snapshot: {e}")
+                return
+            if force or file_state != self._snapshot_file_state:
+                logger.info(
+                    "Refreshing in-memory snapshot."
+                    if force
+                    else "Database file changed; refreshing in-memory snapshot."
+                )
+                try:
+                    self._load_snapshot()
+                except sqlite3.Error as e:
+                    logger.error(
+                        f"Failed to refresh in-memory snapshot, serving previous snapshot: {e}",
+                        exc_info=True,
+                    )
+
+    def _apply_to_snapshot(self, write: Callable[[sqlite3.Connection], Any]) -> None:
+        """
+        Repeats a write this process just committed to the file on the in-memory
+        snapshot, and records the file state it left, so the snapshot is not
+        re-copied for the process's own writes (report and analysis caching).
+        """
+        with self._snapshot_lock:
+            try:
+                with closing(sqlite3.connect(self._snapshot_uri, uri=True, timeout=10)) as conn:
+                    with conn:
+                        write(conn)
+                self._snapshot_file_state = self._file_state()
+            except (sqlite3.Error, OSError) as e:
+                logger.warning(f"Could not apply write to the in-memory snapshot; it will be reloaded: {e}")
+                self._snapshot_file_state = None  # Forces a reload on the next check
+                self._snapshot_checked_at = 0.0
+
+    def _file_state_or_none(self) -> Optional[Tuple[int, int]]:
+        try:
+            return self._file_state()
+        except OSError:
+            return None
+
+    @contextmanager
+    def own_write(self) -> Iterator[None]:
+        """
+        Marks the file writes made inside the block as this process's own
+        (report and analysis caching, builds), so SourceWatcher can skip
+        fingerprinting the DOT table for them. Back-to-back own writes extend
+        one run; any other change in between makes the run not match.
+        """
+        before = self._file_state_or_none()
+        yield
+        after = self._file_state_or_none()
+        with self._own_writes_lock:
+            if self._own_writes is not None and self._own_writes[1] == before:
+                self._own_writes = (self._own_writes[0], after)
+            else:
+                self._own_writes = (before, after)
+
+    def changed_only_by_own_writes(
+        self, previous: Optional[Tuple[int, int]], current: Optional[Tuple[int, int]]
+    ) -> bool:
+        """Returns True if the file went from previous to current (mtime_ns, size) through own writes only."""
+        return previous != current and self._own_writes == (previous, current)
+
+    def connect(self) -> sqlite3.Connection:
+        """
+        Opens a read connection for side-table readers (AnalysisStore, ReportStore):
+        the in-memory snapshot when enabled, else the file. The caller closes it.
+        """
+        return self._connect()
+
+    def write_through(self, write: Callable[[sqlite3.Connection], Any]) -> None:
+        """
+        Runs a write in one transaction on the database file and, in snapshot mode,
+        on the snapshot too, so reads see it without re-copying the database.
+
+        Args:
+            write: Called with an open connection; must only execute statements.
+        """
+        with self.own_write(), closing(self._connect(write=True)) as conn:
+            with conn:
+                write(conn)
+        if self.in_memory:
+            self._apply_to_snapshot(write)
+
+    def reload_snapshot(self) -> None:
+        """Re-copies the database into the in-memory snapshot (after bulk writes); no-op otherwise."""
+        if self.in_memory:
+            self._refresh_snapshot_if_changed(force=True)
+
+    def _connect(self, write: bool = False) -> sqlite3.Connection:
+        """Opens a connection for a query: the in-memory snapshot for reads when enabled, else the file."""
+        if self.in_memory and not write:
+            self._refresh_snapshot_if_changed()
+            conn = sqlite3.connect(self._snapshot_uri, uri=True, timeout=10)
+        else:
+            if not self.db_path.is_file():
+                logger.error(f"Database file check failed in _execute_query: {self.db_path}")
+                raise FileNotFoundError(f"Database file not found: {self.db_path}")
+            conn = sqlite3.connect(self.db_path, timeout=10)
+        # Abort the statement if the tool call running this query is cancelled or times out
+        interrupt_on_cancel(conn)
+        return conn
+
     def _execute_query(
         self, query: str, params: Union[Dict[str, Any], List[Any], None] = None
     ) -> List[Dict[str, Any]]:
@@ -120,15 +332,17 @@ class DatabaseHandler:
         # Profiling is applied to the public methods calling this,
         # or could be applied directly here if desired. Let's keep it on public methods.
         logger.debug(f"Executing query (params: {params}): {query[:300]}...")
-        if not self.db_path.is_file():
-            logger.error(
-                f"Database file check failed in _execute_query: {self.db_path}"
+        is_write_operation = (
+            query.strip()
+            .upper()
+            .startswith(
+                ("INSERT", "UPDATE", "DELETE", "CREATE", "DROP", "ALTER", "REPLACE")
             )
-            raise FileNotFoundError(f"Database file not found: {self.db_path}")
+        )
 
         conn = None
         try:
-            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn = self._connect(write=is_write_operation)
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             if params:
@@ -136,14 +350,6 @@ class DatabaseHandler:
             else:
                 cursor.execute(query)
 
-            is_write_operation = (
-                query.strip()
-                .upper()
-                .startswith(
-                    ("INSERT", "UPDATE", "DELETE", "CREATE", "DROP", "ALTER", "REPLACE")
-                )
-            )
-
             if is_write_operation:
                 conn.commit()
                 affected = cursor.rowcount
@@ -154,12 +360,20 @@ class DatabaseHandler:
             cursor.close()
             conn.close()
             conn = None  # Signal connection was closed successfully
+            if is_write_operation and self.in_memory:
+                # Make the write visible to reads without re-copying the database
+                self._apply_to_snapshot(
+                    lambda snapshot: snapshot.execute(query, params) if params else snapshot.execute(query)
+                )
             logger.debug(
                 f"Query executed successfully, {len(results) if not is_write_operation else 'write op'} result(s)."
             )
             return results
 
         except sqlite3.Error as db_err:
+            if current_call_cancelled():
+                logger.info(f"Query interrupted because the tool call was cancelled: {query[:100]}")
+                raise
             logger.error(
                 f"Database error: {db_err}\nQuery: {query}\nParams: {params}",
                 exc_info=True,
@@ -261,24 +475,29 @@ class DatabaseHandler:
         query = f"PRAGMA table_info({table_name});"
         return self._execute_query(query)
 
-    def get_job_by_code(self, dot_code: str) -> Optional[Dict[str, Any]]:
+    def get_job_by_code(
+        self, dot_code: str, columns: ColumnSpec = None
+    ) -> Optional[Dict[str, Any]]:
         """Gets job by DOT code (Ncode or CAST Text). (Profiled if DEBUG)"""
         if logger.isEnabledFor(logging.DEBUG):
             return self._profile_query(
-                "get_job_by_code", self._get_job_by_code_impl, dot_code
+                "get_job_by_code", self._get_job_by_code_impl, dot_code, columns
             )
         else:
-            return self._get_job_by_code_impl(dot_code)
+            return self._get_job_by_code_impl(dot_code, columns)
 
-    def _get_job_by_code_impl(self, dot_code: str) -> Optional[Dict[str, Any]]:
+    def _get_job_by_code_impl(
+        self, dot_code: str, columns: ColumnSpec = None
+    ) -> Optional[Dict[str, Any]]:
         """Implementation for get_job_by_code. Prioritizes formatted code match."""
         if not dot_code:
             return None
         term = dot_code.strip()
+        select_list = self._resolve_columns(columns)
 
         # 1. Check if the search term is a valid DOT code format
         validation_result = analysis_utils.validate_dot_code(term)
-        is_valid_dot_format = validation_result.get("is_valid_format", False)
+        is_valid_dot_format = validation_result.get("valid", False)
 
         try:
             # 2a. If valid format, try querying by the formatted string first
@@ -287,7 +506,8 @@ class DatabaseHandler:
                     f"get_job_by_code: Term '{term}' matches format. Querying by CAST TEXT."
                 )
                 results = self._execute_query(
-                    "SELECT * FROM DOT WHERE CAST(Code AS TEXT) = ? LIMIT 1;", [term]
+                    f"SELECT {select_list} FROM DOT WHERE CAST(Code AS TEXT) = ? LIMIT 1;",
+                    [validation_result.get("formatted") or term],
                 )
                 if results:
                     return results[0]
@@ -305,7 +525,8 @@ class DatabaseHandler:
                     ncode_value = int(cleaned_numeric_code)
                     logger.debug(f"get_job_by_code: Querying by Ncode {ncode_value}.")
                     results = self._execute_query(
-                        "SELECT * FROM DOT WHERE Ncode = ? LIMIT 1;", [ncode_value]
+                        f"SELECT {select_list} FROM DOT WHERE Ncode = ? LIMIT 1;",
+                        [ncode_value],
                     )
                     if results:
                         return results[0]
@@ -556,20 +777,77 @@ class DatabaseHandler:
                 self._valid_dot_columns = []  # Prevent repeated attempts on error
         return self._valid_dot_columns
 
+    def _resolve_columns(self, columns: ColumnSpec) -> str:
+        """
+        Resolves a projection spec into a quoted SELECT list.
+
+        Args:
+            columns: A COLUMN_SETS name, an explicit list of DOT columns, or None for all columns.
+                     Columns of a named set that are missing from the schema are skipped.
+
+        Returns:
+            The SQL select list ("*" for all columns).
+
+        Raises:
+            ValueError: If the set name is unknown or explicit columns are invalid.
+        """
+        if columns is None:
+            return "*"
+
+        if isinstance(columns, str):
+            if columns not in COLUMN_SETS:
+                raise ValueError(
+                    f"Unknown column set '{columns}'. Available: {', '.join(COLUMN_SETS)}"
+                )
+            set_columns = COLUMN_SETS[columns]
+            if set_columns is None:
+                return "*"
+            valid_columns = self._get_valid_dot_columns()
+            if not valid_columns:
+                logger.warning(
+                    f"Cannot resolve column set '{columns}' without the DOT schema; selecting all columns."
+                )
+                return "*"
+            selected = [col for col in set_columns if col in valid_columns]
+            if len(selected) < len(set_columns):
+                logger.debug(
+                    f"Column set '{columns}': skipping columns missing from DOT schema: "
+                    f"{[col for col in set_columns if col not in valid_columns]}"
+                )
+        else:
+            valid_columns = self._get_valid_dot_columns()
+            if not valid_columns:
+                raise ValueError("Could not validate requested columns.")
+            invalid_columns = [col for col in columns if col not in valid_columns]
+            if invalid_columns:
+                raise ValueError(f"Invalid columns requested: {invalid_columns}")
+            selected = list(columns)
+
+        if not selected:
+            raise ValueError("Column projection resolved to no columns.")
+        return ", ".join(f'"{col}"' for col in dict.fromkeys(selected))
+
     def filter_jobs(
         self,
         filters: Dict[str, Any],
         sort_by: str = "Title",
         sort_dir: str = "ASC",
         limit: int = 100,
+        columns: ColumnSpec = None,
     ) -> List[Dict[str, Any]]:
-        """Filters jobs by various criteria with sorting. (Profiled if DEBUG)"""
+        """Filters jobs by a structured filter expression with sorting. (Profiled if DEBUG)"""
         if logger.isEnabledFor(logging.DEBUG):
             return self._profile_query(
-                "filter_jobs", self._filter_jobs_impl, filters, sort_by, sort_dir, limit
+                "filter_jobs",
+                self._filter_jobs_impl,
+                filters,
+                sort_by,
+                sort_dir,
+                limit,
+                columns,
             )
         else:
-            return self._filter_jobs_impl(filters, sort_by, sort_dir, limit)
+            return self._filter_jobs_impl(filters, sort_by, sort_dir, limit, columns)
 
     def _filter_jobs_impl(
         self,
@@ -577,8 +855,22 @@ class DatabaseHandler:
         sort_by: str = "Title",
         sort_dir: str = "ASC",
         limit: int = 100,
+        columns: ColumnSpec = None,
     ) -> List[Dict[str, Any]]:
-        """Implementation for filter_jobs."""
+        """
+        Implementation for filter_jobs.
+
+        Args:
+            filters: Filter expression (see filter_dsl). A flat {column: value} mapping
+                     is still accepted and means equality on every column.
+            sort_by: Column to sort by (validated, defaults to 'Title').
+            sort_dir: 'ASC' or 'DESC'.
+            limit: Maximum number of rows to return.
+            columns: Optional COLUMN_SETS name or list of columns to return instead of all columns.
+
+        Raises:
+            ValueError: If the filter expression or requested columns are invalid.
+        """
         valid_columns = self._get_valid_dot_columns()
         if not valid_columns:
             # Handle case where we couldn't get schema - maybe raise error or return empty?
@@ -600,28 +892,21 @@ class DatabaseHandler:
         else:
             sort_by_validated = sort_by  # Use original if valid
 
-        # Build WHERE clause dynamically and safely based on filters
-        where_clauses = []
-        params = []
-        invalid_filters = []
-
-        for key, value in filters.items():
-            if key in valid_columns:
-                # Use placeholder for value to prevent SQL injection
-                where_clauses.append(
-                    f'"{key}" = ?'
-                )  # Quote column name for safety if needed
-                params.append(value)
-            else:
-                invalid_filters.append(key)
+        if not isinstance(limit, int) or limit < 1:
+            raise ValueError(f"Limit must be a positive integer, got {limit!r}.")
+
+        # Validate projection (prevent injection via column names)
+        select_list = self._resolve_columns(columns or None)
 
-        if invalid_filters:
-            logger.warning(f"Ignoring invalid filter keys: {invalid_filters}")
+        # Compile the filter expression into one parameterized WHERE clause
+        where_sql, params = filter_dsl.compile_filter_expression(
+            filters, valid_columns
+        )
 
         # Build the final query
-        query = "SELECT * FROM DOT"  # Select all columns for now
-        if where_clauses:
-            query += f" WHERE {' AND '.join(where_clauses)}"
+        query = f"SELECT {select_list} FROM DOT"
+        if where_sql:
+            query += f" WHERE {where_sql}"
 
         # Add ORDER BY and LIMIT clauses - ensure validated column name and direction are used
         # Use placeholder for LIMIT value
@@ -631,28 +916,51 @@ class DatabaseHandler:
         # Execute the constructed query
         return self._execute_query(query, params)
 
-    def batch_get_jobs_by_codes(self, dot_codes: List[str]) -> List[Dict[str, Any]]:
-        """Get multiple jobs by their DOT codes (formatted XXX.XXX-XXX) in a single query."""
+    def batch_get_jobs_by_codes(
+        self, dot_codes: List[str], columns: ColumnSpec = None
+    ) -> List[Dict[str, Any]]:
+        """Get multiple jobs by their DOT codes in a single query. (Profiled if DEBUG)"""
+        if logger.isEnabledFor(logging.DEBUG):
+            return self._profile_query(
+                "batch_get_jobs_by_codes",
+                self._batch_get_jobs_by_codes_impl,
+                dot_codes,
+                columns,
+            )
+        else:
+            return self._batch_get_jobs_by_codes_impl(dot_codes, columns)
+
+    def _batch_get_jobs_by_codes_impl(
+        self, dot_codes: List[str], columns: ColumnSpec = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Implementation for batch_get_jobs_by_codes.
+
+        Codes may be formatted (XXX.XXX-XXX) or numeric; they are matched on the
+        Ncode key so the lookup uses the primary key/index rather than a text cast.
+        Rows are returned in database order; callers should key them by Ncode.
+        """
         if not dot_codes:
             return []
 
         # Filter out any potentially invalid/empty codes before creating placeholders
-        valid_formatted_codes = [
-            code
-            for code in dot_codes
-            if analysis_utils.validate_dot_code(code).get("is_valid_format")
-        ]
+        ncodes = []
+        for code in dot_codes:
+            validation_result = analysis_utils.validate_dot_code(code)
+            if validation_result.get("valid") and validation_result.get("ncode") is not None:
+                ncodes.append(validation_result["ncode"])
+            else:
+                logger.debug(f"batch_get_jobs_by_codes: Skipping invalid DOT code '{code}'.")
 
-        if not valid_formatted_codes:
+        if not ncodes:
             logger.warning(
-                "batch_get_jobs_by_codes: No valid formatted DOT codes provided in the list."
+                "batch_get_jobs_by_codes: No valid DOT codes provided in the list."
             )
             return []
 
-        placeholders = ",".join("?" * len(valid_formatted_codes))
-        # Correctly compare against the text representation of the Code column
-        query = f"SELECT * FROM DOT WHERE CAST(Code AS TEXT) IN ({placeholders})"
-        logger.debug(
-            f"Executing batch_get_jobs_by_codes with {len(valid_formatted_codes)} codes."
-        )
-        return self._execute_query(query, valid_formatted_codes)
+        select_list = self._resolve_columns(columns)
+        ncodes = list(dict.fromkeys(ncodes))
+        placeholders = ",".join("?" * len(ncodes))
+        query = f"SELECT {select_list} FROM DOT WHERE Ncode IN ({placeholders})"
+        logger.debug(f"Executing batch_get_jobs_by_codes with {len(ncodes)} codes.")
+        return self._execute_query(query, ncodes)
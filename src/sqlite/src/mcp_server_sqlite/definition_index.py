@@ -0,0 +1,325 @@
+# definition_index.py
+
+"""
+TF-IDF search over the DOT Definitions column ("sorts mail", "monitors screens").
+
+VEs often describe what a job involves rather than naming it. DefinitionIndex
+ranks jobs by the cosine similarity between a task description and each DOT
+definition:
+
+    - Definitions and queries are tokenized the same way: lowercase words,
+      stop words dropped, and a light suffix stemmer so "sorts", "sorting" and
+      "sorted" all match "sort".
+    - Each definition is a sublinear TF-IDF vector (1 + log tf, smoothed idf),
+      L2-normalized. The vectors are stored as a sparse term-major matrix
+      (CSR arrays indptr / indices / data, one row of postings per term), so a
+      query only touches the postings of its own terms.
+    - A query adds each term's postings, scaled by the query weight, into one
+      score vector. Strength and SVP limits mask that vector before
+      argpartition picks the k best jobs.
+
+The matrix is built once per DatabaseHandler during startup warm-up and saved
+next to the database (definition_index.npz). Later runs load it when the
+fingerprint of the indexed columns still matches, skipping tokenization.
+
+numpy is imported when an index is built, keeping it out of server startup.
+"""
+
+import hashlib
+import logging
+import math
+import os
+import re
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from . import config
+from .hot_reload import PerHandlerCache
+from .models import DotCode
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_K = 10
+MAX_K = 50
+EXCERPT_CHARS = 200  # Definition text returned per match
+CACHE_FILE_NAME = "definition_index.npz"
+TOKENIZER_VERSION = "1"  # Bump when tokenization or weighting changes, to invalidate saved indexes
+
+COLUMNS = ["Ncode", "Title", "Definitions", "StrengthNum", "SVPNum"]
+
+_WORD = re.compile(r"[a-z]+")
+STOP_WORDS = frozenset(
+    """
+    a an and any are as at be by for from has have in into is it its of on or other
+    such that the their them this to using which with within
+    """.split()
+)
+
+
+def _stem(word: str) -> str:
+    """Strips common inflections ("sorts", "sorting", "sorted" -> "sort"; "operates", "operating" -> "operat")."""
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith("ing") and len(word) > 5:
+        word = word[:-3]
+    elif word.endswith("ed") and len(word) > 4:
+        word = word[:-2]
+    elif word.endswith("s") and not word.endswith("ss") and len(word) > 3:
+        word = word[:-1]
+    if word.endswith("e") and len(word) > 4:
+        word = word[:-1]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Returns the stemmed, stop-word-free terms of a text."""
+    return [
+        _stem(word)
+        for word in _WORD.findall(text.lower())
+        if len(word) > 1 and word not in STOP_WORDS
+    ]
+
+
+def fingerprint_rows(rows: Sequence[Dict[str, Any]]) -> str:
+    """Returns a hex digest of the indexed columns, used to validate a saved index."""
+    digest = hashlib.sha256(TOKENIZER_VERSION.encode())
+    for row in rows:
+        digest.update(repr(tuple(row.get(column) for column in COLUMNS)).encode())
+    return digest.hexdigest()
+
+
+def default_cache_path(db_path: Path) -> Path:
+    """Returns the saved index path for a database (stored next to it)."""
+    return Path(db_path).with_name(CACHE_FILE_NAME)
+
+
+class DefinitionIndex:
+    """Sparse TF-IDF matrix over the DOT definitions with top-k cosine queries."""
+
+    def __init__(self, rows: Sequence[Dict[str, Any]], arrays: Optional[Dict[str, Any]] = None):
+        """
+        Builds the index, or restores it from saved arrays.
+
+        Args:
+            rows: DOT rows with the COLUMNS, in the order the index was built.
+            arrays: Saved vocabulary, indptr, indices and data (see save()) for
+                    these rows; the matrix is computed from the rows when omitted.
+        """
+        import numpy as np
+
+        rows = [row for row in rows if row.get("Ncode") is not None]
+        self.ncodes = np.array([int(row["Ncode"]) for row in rows], dtype=np.int64)
+        self.titles = [row.get("Title") or "" for row in rows]
+        self.definitions = [row.get("Definitions") or "" for row in rows]
+        self.strength = np.array([row.get("StrengthNum") or 0 for row in rows], dtype=np.int8)
+        self.svp = np.array([row.get("SVPNum") or 0 for row in rows], dtype=np.int8)
+
+        if arrays is not None:
+            vocabulary = [str(term) for term in arrays["vocabulary"]]
+            self.indptr = arrays["indptr"]
+            self.indices = arrays["indices"]
+            self.data = arrays["data"]
+        else:
+            vocabulary, self.indptr, self.indices, self.data = self._build(self.definitions)
+        self.vocabulary = {term: i for i, term in enumerate(vocabulary)}
+        document_frequency = np.diff(self.indptr)
+        self.idf = np.log((1.0 + len(rows)) / (1.0 + document_frequency)) + 1.0
+
+    @staticmethod
+    def _build(definitions: Sequence[str]):
+        import numpy as np
+
+        # One (document, term, tf) triple per distinct term of each definition
+        term_ids: Dict[str, int] = {}
+        documents: List[int] = []
+        terms: List[int] = []
+        counts: List[int] = []
+        for document, definition in enumerate(definitions):
+            for term, tf in Counter(tokenize(definition)).items():
+                documents.append(document)
+                terms.append(term_ids.setdefault(term, len(term_ids)))
+                counts.append(tf)
+        documents_array = np.array(documents, dtype=np.int32)
+        terms_array = np.array(terms, dtype=np.int64)
+        document_frequency = np.bincount(terms_array, minlength=len(term_ids))
+        idf = np.log((1.0 + len(definitions)) / (1.0 + document_frequency)) + 1.0
+
+        weights = (1.0 + np.log(np.array(counts, dtype=np.float64))) * idf[terms_array]
+        norms = np.sqrt(np.bincount(documents_array, weights * weights, minlength=len(definitions)))
+        weights /= np.where(norms > 0, norms, 1.0)[documents_array]
+
+        # Group postings by term; the stable sort keeps documents ascending within a term
+        order = np.argsort(terms_array, kind="stable")
+        indptr = np.zeros(len(term_ids) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum(document_frequency)
+        vocabulary = sorted(term_ids, key=term_ids.__getitem__)
+        return vocabulary, indptr, documents_array[order], weights[order].astype(np.float32)
+
+    @classmethod
+    def from_database(cls, db: Any, cache_path: Optional[Path] = None) -> "DefinitionIndex":
+        """
+        Builds the index from a DatabaseHandler's DOT table, or loads it from
+        cache_path when the saved fingerprint matches the current rows.
+        """
+        import numpy as np
+
+        started = time.perf_counter()
+        rows = db.execute_select_query(f"SELECT {', '.join(COLUMNS)} FROM DOT ORDER BY Ncode")
+        fingerprint = fingerprint_rows(rows)
+        if cache_path is None:
+            cache_path = default_cache_path(db.db_path)
+
+        index = None
+        try:
+            with np.load(cache_path, allow_pickle=False) as saved:
+                if str(saved["fingerprint"]) == fingerprint:
+                    index = cls(rows, arrays={key: saved[key] for key in ("vocabulary", "indptr", "indices", "data")})
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable definition index {cache_path}: {e}")
+
+        if index is not None:
+            source = f"loaded from {cache_path}"
+        else:
+            index = cls(rows)
+            source = "built"
+            index.save(cache_path, fingerprint)
+        logger.info(
+            f"Definition index {source}: {len(index)} jobs, {len(index.vocabulary)} terms, "
+            f"{len(index.data)} postings in {time.perf_counter() - started:.2f}s."
+        )
+        return index
+
+    def save(self, path: Path, fingerprint: str) -> None:
+        """Writes the matrix to path atomically; failures are logged, not raised."""
+        import numpy as np
+
+        path = Path(path)
+        temp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            with open(temp_path, "wb") as file:
+                np.savez(
+                    file,
+                    fingerprint=np.array(fingerprint),
+                    vocabulary=np.array(sorted(self.vocabulary, key=self.vocabulary.__getitem__)),
+                    indptr=self.indptr,
+                    indices=self.indices,
+                    data=self.data,
+                )
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not save definition index to {path}: {e}")
+            temp_path.unlink(missing_ok=True)
+
+    def __len__(self) -> int:
+        return len(self.ncodes)
+
+    def search(
+        self,
+        query: str,
+        k: int = DEFAULT_K,
+        max_strength: Optional[int] = None,
+        max_svp: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Returns the k jobs whose definitions best match a task description.
+
+        Args:
+            query: Task description, e.g. "sorts incoming mail".
+            k: Number of jobs returned.
+            max_strength: Only return jobs with StrengthNum at or below this (1-5).
+            max_svp: Only return jobs with SVP at or below this.
+
+        Returns:
+            Dictionary with the query terms used, terms not in any definition,
+            the number of candidate jobs and the matches, best first, each with
+            its cosine score (0-1) and matched terms.
+
+        Raises:
+            ValueError: If the query has no searchable words.
+        """
+        import numpy as np
+
+        query_counts = Counter(tokenize(query))
+        if not query_counts:
+            raise ValueError("Query must contain at least one searchable word.")
+        terms = [term for term in query_counts if term in self.vocabulary]
+        unknown = [term for term in query_counts if term not in self.vocabulary]
+
+        scores = np.zeros(len(self), dtype=np.float32)
+        if terms:
+            term_ids = [self.vocabulary[term] for term in terms]
+            weights = np.array(
+                [(1.0 + math.log(query_counts[term])) * self.idf[i] for term, i in zip(terms, term_ids)]
+            )
+            weights /= np.sqrt(np.dot(weights, weights))
+            for term_id, weight in zip(term_ids, weights):
+                start, end = self.indptr[term_id], self.indptr[term_id + 1]
+                scores[self.indices[start:end]] += np.float32(weight) * self.data[start:end]
+
+        eligible = scores > 0
+        if max_strength is not None:
+            eligible &= (self.strength <= max_strength) & (self.strength > 0)
+        if max_svp is not None:
+            eligible &= (self.svp <= max_svp) & (self.svp > 0)
+        scores[~eligible] = -1.0
+
+        candidates = int(np.count_nonzero(eligible))
+        k = min(k, candidates)
+        if k <= 0:
+            best_rows = np.array([], dtype=np.int64)
+        else:
+            best_rows = np.argpartition(-scores, k - 1)[:k]
+            best_rows = best_rows[np.argsort(-scores[best_rows], kind="stable")]
+
+        return {
+            "query": query,
+            "terms": terms,
+            "unknown_terms": unknown,
+            "candidates": candidates,
+            "matches": [
+                {
+                    **self._describe(int(i)),
+                    "score": round(float(scores[i]), 4),
+                    "matchedTerms": self._terms_in(int(i), terms),
+                }
+                for i in best_rows
+            ],
+        }
+
+    def _terms_in(self, row: int, terms: Sequence[str]) -> List[str]:
+        """Returns the query terms that occur in a row's definition."""
+        import numpy as np
+
+        matched = []
+        for term in terms:
+            term_id = self.vocabulary[term]
+            postings = self.indices[self.indptr[term_id] : self.indptr[term_id + 1]]
+            position = int(np.searchsorted(postings, row))
+            if position < len(postings) and postings[position] == row:
+                matched.append(term)
+        return matched
+
+    def _describe(self, i: int) -> Dict[str, Any]:
+        definition = " ".join(self.definitions[i].split())
+        if len(definition) > EXCERPT_CHARS:
+            definition = definition[:EXCERPT_CHARS].rsplit(" ", 1)[0] + " ..."
+        return {
+            "dotCode": DotCode.format(int(self.ncodes[i])),
+            "jobTitle": self.titles[i],
+            "strength": config.strength_num_to_code.get(int(self.strength[i])),
+            "svp": int(self.svp[i]) or None,
+            "definition": definition,
+        }
+
+
+_indexes = PerHandlerCache(DefinitionIndex.from_database)
+
+
+def get_definition_index(db: Any) -> DefinitionIndex:
+    """Returns the definition index for a database handler, building or loading it on first use."""
+    return _indexes.get(db)
@@ -0,0 +1,340 @@
+# dispatch.py
+
+"""
+Tool call dispatch with per-tool concurrency limits, deadlines and cancellation.
+
+Each tool gets its own semaphore, so a burst of expensive calls (read_query,
+TSA sweeps) queues behind its own budget instead of starving cheap lookups such
+as check_job_obsolescence. Each call also gets a deadline.
+
+Cancellation reaches the database. Every call runs with a CancelToken in a
+context variable. run_in_thread copies the context into the worker thread,
+so DatabaseHandler connections opened there install a SQLite progress handler
+that aborts the running statement once the token is cancelled. The token is
+cancelled when the client cancels the request or when the deadline passes.
+
+A worker thread cannot be stopped, only asked to stop, and Python code between
+SQLite statements does not check the token. A call's slot is therefore held
+until the call and every worker thread it started through run_in_thread have
+finished. Repeated timeouts of a heavy tool then queue behind its own budget
+instead of piling up threads on the shared executor.
+
+Queueing delay (time waiting for the semaphore) and run time are recorded per
+tool and reported by the server_metrics tool.
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import sqlite3
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+PROGRESS_HANDLER_OPS = 1000  # SQLite VM instructions between cancellation checks
+LATENCY_SAMPLES = 500  # Recent samples kept per tool for percentiles
+
+
+class ToolTimeoutError(Exception):
+    """Raised when a tool call exceeds its deadline."""
+
+
+class CancelToken:
+    """Thread-safe flag set when a tool call is cancelled or times out."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def _progress_handler(self) -> int:
+        # A non-zero return makes SQLite abort the statement ("interrupted")
+        return 1 if self._event.is_set() else 0
+
+
+_current_token: contextvars.ContextVar[Optional[CancelToken]] = contextvars.ContextVar(
+    "tool_cancel_token", default=None
+)
+
+
+def current_call_cancelled() -> bool:
+    """Returns True if the tool call running in this context has been cancelled."""
+    token = _current_token.get()
+    return token is not None and token.cancelled
+
+
+def interrupt_on_cancel(conn: sqlite3.Connection) -> None:
+    """Makes statements on this connection abort when the current tool call is cancelled."""
+    token = _current_token.get()
+    if token is not None:
+        conn.set_progress_handler(token._progress_handler, PROGRESS_HANDLER_OPS)
+
+
+class _SlotHold:
+    """
+    A tool call's concurrency slot. It is released once the call has returned
+    and every worker thread it started has finished. Used on the event loop only.
+    """
+
+    def __init__(self, release: Callable[[], None]):
+        self._release = release
+        self._workers = 0
+        self._call_done = False
+        self._released = False
+
+    @property
+    def released(self) -> bool:
+        return self._released
+
+    def add_worker(self) -> None:
+        self._workers += 1
+
+    def worker_done(self) -> None:
+        self._workers -= 1
+        self._release_if_idle()
+
+    def call_done(self) -> None:
+        self._call_done = True
+        self._release_if_idle()
+
+    def _release_if_idle(self) -> None:
+        if self._call_done and self._workers == 0 and not self._released:
+            self._released = True
+            self._release()
+
+
+_current_hold: contextvars.ContextVar[Optional[_SlotHold]] = contextvars.ContextVar(
+    "tool_slot_hold", default=None
+)
+
+
+async def run_in_thread(function: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+    """
+    Runs a function in a worker thread like asyncio.to_thread (the context,
+    including the cancellation token, is copied). Inside a dispatched tool call
+    the call's slot stays held until the thread finishes, even if the call
+    times out or is cancelled first.
+    """
+    loop = asyncio.get_running_loop()
+    call = functools.partial(contextvars.copy_context().run, function, *args, **kwargs)
+    hold = _current_hold.get()
+    if hold is None:
+        return await loop.run_in_executor(None, call)
+
+    lock = threading.Lock()
+    state = {"started": False, "skipped": False}
+
+    def worker() -> Any:
+        with lock:
+            if state["skipped"]:
+                return None
+            state["started"] = True
+        try:
+            return call()
+        finally:
+            try:
+                loop.call_soon_threadsafe(hold.worker_done)
+            except RuntimeError:
+                pass  # Event loop already closed
+
+    def on_done(future: "asyncio.Future[Any]") -> None:
+        # A future cancelled before its thread started never runs worker()
+        if future.cancelled():
+            with lock:
+                if not state["started"]:
+                    state["skipped"] = True
+                    hold.worker_done()
+
+    hold.add_worker()
+    future = loop.run_in_executor(None, worker)
+    future.add_done_callback(on_done)
+    return await future
+
+
+@dataclass(frozen=True)
+class ToolLimits:
+    """Concurrency budget and deadline for one tool."""
+
+    max_concurrency: int = 8
+    timeout: Optional[float] = 60.0  # Seconds; None for no deadline
+
+
+DEFAULT_LIMITS = ToolLimits()
+
+# Cheap lookups get wide budgets and short deadlines; heavy queries get narrow budgets
+TOOL_LIMITS: Dict[str, ToolLimits] = {
+    "list_tables": ToolLimits(16, 10.0),
+    "describe_table": ToolLimits(16, 10.0),
+    "check_job_obsolescence": ToolLimits(16, 10.0),
+    "preprocess_transcript": ToolLimits(4, 60.0),
+    "transcript_search": ToolLimits(8, 30.0),
+    "suggest_jobs": ToolLimits(16, 10.0),
+    "similar_jobs": ToolLimits(8, 30.0),
+    "search_job_definitions": ToolLimits(8, 30.0),
+    "browse_job_groups": ToolLimits(16, 10.0),
+    "aggregate_job_groups": ToolLimits(16, 10.0),
+    "occupational_base": ToolLimits(8, 60.0),
+    "generate_job_report": ToolLimits(8, 60.0),
+    "compare_jobs": ToolLimits(4, 60.0),
+    "read_query": ToolLimits(2, 30.0),
+    "filter_jobs": ToolLimits(4, 30.0),
+    "analyze_transferable_skills": ToolLimits(2, 120.0),
+    "analyze_bls_excel": ToolLimits(4, 30.0),
+    "query_bls_by_soc": ToolLimits(4, 30.0),
+    "query_bls_by_title": ToolLimits(4, 30.0),
+    "render_audit_report": ToolLimits(4, 30.0),
+    "write_file": ToolLimits(2, 30.0),
+    # Store builds process the whole DOT table; one at a time, no deadline
+    "job_analysis_cache": ToolLimits(1, None),
+    "job_report_cache": ToolLimits(1, None),
+    "server_metrics": ToolLimits(16, 10.0),
+}
+
+
+def _percentile(samples: Deque[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class ToolStats:
+    """Counters and recent latency samples for one tool."""
+
+    def __init__(self):
+        self.calls = 0
+        self.queued = 0
+        self.in_flight = 0
+        self.draining = 0  # Calls that returned but still hold a slot for running threads
+        self.timeouts = 0
+        self.cancelled = 0
+        self.errors = 0
+        self.queue_delays: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self.run_times: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    def to_dict(self) -> Dict[str, Any]:
+        def milliseconds(samples: Deque[float]) -> Dict[str, float]:
+            return {
+                "avg": round(1000 * sum(samples) / len(samples), 2) if samples else 0.0,
+                "p50": round(1000 * _percentile(samples, 0.5), 2),
+                "p95": round(1000 * _percentile(samples, 0.95), 2),
+                "max": round(1000 * max(samples), 2) if samples else 0.0,
+            }
+
+        return {
+            "calls": self.calls,
+            "queued": self.queued,
+            "in_flight": self.in_flight,
+            "draining": self.draining,
+            "timeouts": self.timeouts,
+            "cancelled": self.cancelled,
+            "errors": self.errors,
+            "queue_delay_ms": milliseconds(self.queue_delays),
+            "run_time_ms": milliseconds(self.run_times),
+        }
+
+
+class ToolDispatcher:
+    """Runs tool calls within their tool's concurrency budget and deadline."""
+
+    def __init__(self, limits: Optional[Dict[str, ToolLimits]] = None):
+        self.limits = dict(TOOL_LIMITS if limits is None else limits)
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._stats: Dict[str, ToolStats] = {}
+
+    def limits_for(self, name: str) -> ToolLimits:
+        return self.limits.get(name, DEFAULT_LIMITS)
+
+    def _semaphore(self, name: str) -> asyncio.Semaphore:
+        if name not in self._semaphores:
+            self._semaphores[name] = asyncio.Semaphore(self.limits_for(name).max_concurrency)
+        return self._semaphores[name]
+
+    async def run(self, name: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Runs call() for a tool once a slot is free, within the tool's deadline.
+
+        Raises:
+            ToolTimeoutError: If the call exceeds its deadline (its DB work is interrupted).
+            asyncio.CancelledError: If the request is cancelled (its DB work is interrupted).
+        """
+        limits = self.limits_for(name)
+        stats = self._stats.setdefault(name, ToolStats())
+        semaphore = self._semaphore(name)
+        stats.calls += 1
+
+        queued_at = time.perf_counter()
+        stats.queued += 1
+        try:
+            await semaphore.acquire()
+        except asyncio.CancelledError:
+            stats.cancelled += 1
+            raise
+        finally:
+            stats.queued -= 1
+        started_at = time.perf_counter()
+        stats.queue_delays.append(started_at - queued_at)
+
+        drained = []  # Non-empty if the call returned before its worker threads finished
+
+        def release_slot() -> None:
+            if drained:
+                stats.draining -= 1
+            stats.in_flight -= 1
+            semaphore.release()
+
+        token = CancelToken()
+        hold = _SlotHold(release_slot)
+        context_token = _current_token.set(token)
+        hold_token = _current_hold.set(hold)
+        stats.in_flight += 1
+        try:
+            # The call's task copies this context, so its worker threads see the token
+            return await asyncio.wait_for(call(), limits.timeout)
+        except asyncio.TimeoutError:
+            token.cancel()
+            stats.timeouts += 1
+            logger.warning(f"Tool '{name}' exceeded its {limits.timeout}s deadline; cancelled.")
+            raise ToolTimeoutError(
+                f"Tool '{name}' did not finish within {limits.timeout} seconds."
+            )
+        except asyncio.CancelledError:
+            token.cancel()
+            stats.cancelled += 1
+            logger.info(f"Tool '{name}' was cancelled by the client.")
+            raise
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            _current_hold.reset(hold_token)
+            _current_token.reset(context_token)
+            stats.run_times.append(time.perf_counter() - started_at)
+            hold.call_done()
+            if not hold.released:
+                drained.append(True)
+                stats.draining += 1
+                logger.info(f"Tool '{name}' keeps its slot until its worker threads finish.")
+
+    def metrics(self) -> Dict[str, Any]:
+        """Returns limits and queueing/run-time statistics for every tool called so far."""
+        return {
+            name: {
+                "max_concurrency": self.limits_for(name).max_concurrency,
+                "timeout_seconds": self.limits_for(name).timeout,
+                **stats.to_dict(),
+            }
+            for name, stats in sorted(self._stats.items())
+        }
@@ -1,7 +1,10 @@
 import logging
-import pandas as pd
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Union
+from typing import TYPE_CHECKING, Dict, List, Any, Optional, Union
+
+# pandas is imported when a workbook is loaded, keeping it out of server startup
+if TYPE_CHECKING:
+    import pandas as pd
 
 # Setup logger for this module
 logger = logging.getLogger(__name__)
@@ -109,7 +112,7 @@ class BLSExcelHandler:
             BLSExcelHandlerError: If the file cannot be loaded.
         """
         self.file_path = Path(file_path)
-        self.dataframe = None
+        self.dataframe: Optional["pd.DataFrame"] = None
         try:
             self.load_workbook()
             logger.info(f"BLSExcelHandler initialized with file: {self.file_path}")
@@ -141,6 +144,13 @@ class BLSExcelHandler:
         """
         cls._instance = None
 
+    @classmethod
+    def replace_instance(cls, instance: Optional["BLSExcelHandler"]) -> None:
+        """
+        Replace the singleton instance with an already loaded handler (hot reload).
+        """
+        cls._instance = instance
+
     def load_workbook(self) -> None:
         """
         Load the Excel workbook into a pandas DataFrame.
@@ -154,6 +164,8 @@ class BLSExcelHandler:
             )
 
         try:
+            import pandas as pd
+
             # Read the Excel file
             self.dataframe = pd.read_excel(self.file_path)
 
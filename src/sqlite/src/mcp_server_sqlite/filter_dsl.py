@@ -0,0 +1,274 @@
+# filter_dsl.py
+
+"""
+Structured filter expressions for querying the DOT table.
+
+A filter expression is a JSON-compatible tree that is parsed into a small
+node structure and compiled into a single parameterized SQL WHERE clause.
+Column names are validated against the DOT schema before compilation, and
+values are always bound as parameters.
+
+Supported forms:
+    - Column mapping (implicit AND):
+        {"StrengthNum": {"in": [1, 2]}, "SVPNum": {"between": [1, 2]},
+         "GEDR": {"lte": 2}, "ClimbingNum": 1}
+      A scalar value means equality; a dict maps operators to operands.
+    - Explicit condition:
+        {"column": "SVPNum", "op": "between", "value": [1, 2]}
+    - Groups:
+        {"and": [expr, ...]}, {"or": [expr, ...]}, {"not": expr}
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Operators that take a single scalar operand, mapped to their SQL form
+COMPARISON_OPERATORS = {
+    "eq": "=",
+    "ne": "<>",
+    "lt": "<",
+    "lte": "<=",
+    "gt": ">",
+    "gte": ">=",
+}
+LIST_OPERATORS = ("in", "not_in")
+NULL_OPERATORS = ("is_null", "not_null")
+RANGE_OPERATOR = "between"
+SUPPORTED_OPERATORS = (
+    tuple(COMPARISON_OPERATORS) + LIST_OPERATORS + NULL_OPERATORS + (RANGE_OPERATOR,)
+)
+GROUP_KEYS = ("and", "or", "not")
+
+# Guard against pathological expressions coming from tool input
+MAX_EXPRESSION_DEPTH = 8
+MAX_LIST_OPERAND_SIZE = 500
+
+
+@dataclass(frozen=True)
+class Condition:
+    """A single column predicate, e.g. SVPNum BETWEEN 1 AND 2."""
+
+    column: str
+    op: str
+    value: Any = None
+
+
+@dataclass(frozen=True)
+class Group:
+    """A boolean combination ('and'/'or') of child expressions."""
+
+    op: str
+    children: Tuple["FilterNode", ...]
+
+
+@dataclass(frozen=True)
+class Not:
+    """Negation of a child expression."""
+
+    child: "FilterNode"
+
+
+FilterNode = Union[Condition, Group, Not]
+
+
+def _validate_scalar(column: str, op: str, value: Any) -> None:
+    """Ensures an operand is a bindable scalar (not a list or dict)."""
+    if isinstance(value, (list, tuple, dict, set)):
+        raise ValueError(
+            f"Operator '{op}' on column '{column}' expects a single value, got {type(value).__name__}."
+        )
+
+
+def _parse_condition(column: str, op: str, value: Any, valid_columns: Iterable[str]) -> Condition:
+    """Validates and builds a Condition node."""
+    if column not in valid_columns:
+        raise ValueError(f"Invalid filter column: '{column}'")
+    if not isinstance(op, str):
+        raise ValueError(f"Filter operator for column '{column}' must be a string.")
+    op = op.lower()
+    if op not in SUPPORTED_OPERATORS:
+        raise ValueError(
+            f"Unsupported filter operator '{op}' for column '{column}'. "
+            f"Supported: {', '.join(SUPPORTED_OPERATORS)}"
+        )
+
+    if op in COMPARISON_OPERATORS:
+        _validate_scalar(column, op, value)
+        if value is None:
+            raise ValueError(
+                f"Operator '{op}' on column '{column}' requires a value; use 'is_null' to match NULL."
+            )
+        return Condition(column, op, value)
+
+    if op in LIST_OPERATORS:
+        if not isinstance(value, (list, tuple)) or not value:
+            raise ValueError(
+                f"Operator '{op}' on column '{column}' expects a non-empty list."
+            )
+        if len(value) > MAX_LIST_OPERAND_SIZE:
+            raise ValueError(
+                f"Operator '{op}' on column '{column}' accepts at most {MAX_LIST_OPERAND_SIZE} values."
+            )
+        for item in value:
+            _validate_scalar(column, op, item)
+        return Condition(column, op, tuple(value))
+
+    if op == RANGE_OPERATOR:
+        if not isinstance(value, (list, tuple)) or len(value) != 2:
+            raise ValueError(
+                f"Operator 'between' on column '{column}' expects [low, high]."
+            )
+        low, high = value
+        _validate_scalar(column, op, low)
+        _validate_scalar(column, op, high)
+        return Condition(column, op, (low, high))
+
+    # is_null / not_null take no operand; accept true/None for convenience
+    if value not in (None, True):
+        raise ValueError(f"Operator '{op}' on column '{column}' takes no value.")
+    return Condition(column, op, None)
+
+
+def _parse_column_mapping(
+    mapping: Dict[str, Any], valid_columns: Iterable[str]
+) -> FilterNode:
+    """Parses the {column: value_or_ops} shorthand into an AND group."""
+    conditions: List[FilterNode] = []
+    for column, spec in mapping.items():
+        if isinstance(spec, dict):
+            if not spec:
+                raise ValueError(f"Empty operator mapping for column '{column}'.")
+            for op, operand in spec.items():
+                conditions.append(_parse_condition(column, op, operand, valid_columns))
+        elif spec is None:
+            conditions.append(_parse_condition(column, "is_null", None, valid_columns))
+        else:
+            conditions.append(_parse_condition(column, "eq", spec, valid_columns))
+    if len(conditions) == 1:
+        return conditions[0]
+    return Group("and", tuple(conditions))
+
+
+def parse_filter_expression(
+    expression: Any, valid_columns: Iterable[str], _depth: int = 0
+) -> FilterNode:
+    """
+    Parses and validates a filter expression into a node tree.
+
+    Args:
+        expression: The JSON-compatible filter expression (see module docstring).
+        valid_columns: Column names that may be referenced.
+        _depth: Internal recursion depth counter.
+
+    Returns:
+        The root FilterNode.
+
+    Raises:
+        ValueError: If the expression is malformed or references invalid columns.
+    """
+    if _depth > MAX_EXPRESSION_DEPTH:
+        raise ValueError(
+            f"Filter expression is nested too deeply (max depth {MAX_EXPRESSION_DEPTH})."
+        )
+    if not isinstance(valid_columns, (set, frozenset)):
+        valid_columns = frozenset(valid_columns)
+    if not isinstance(expression, dict) or not expression:
+        raise ValueError("Filter expression must be a non-empty object.")
+
+    if "column" in expression:
+        unexpected = set(expression) - {"column", "op", "value"}
+        if unexpected:
+            raise ValueError(f"Unexpected keys in filter condition: {sorted(unexpected)}")
+        return _parse_condition(
+            expression["column"],
+            expression.get("op", "eq"),
+            expression.get("value"),
+            valid_columns,
+        )
+
+    group_keys = [key for key in expression if key in GROUP_KEYS]
+    if group_keys:
+        if len(expression) != 1:
+            raise ValueError(
+                "A filter group must contain exactly one of 'and', 'or' or 'not'."
+            )
+        key = group_keys[0]
+        operand = expression[key]
+        if key == "not":
+            return Not(parse_filter_expression(operand, valid_columns, _depth + 1))
+        if not isinstance(operand, list) or not operand:
+            raise ValueError(f"Filter group '{key}' expects a non-empty list.")
+        children = tuple(
+            parse_filter_expression(child, valid_columns, _depth + 1)
+            for child in operand
+        )
+        if len(children) == 1:
+            return children[0]
+        return Group(key, children)
+
+    return _parse_column_mapping(expression, valid_columns)
+
+
+def compile_filter_node(node: FilterNode) -> Tuple[str, List[Any]]:
+    """
+    Compiles a parsed filter node into a SQL boolean expression and its parameters.
+
+    Predicates keep the bare column on the left-hand side (no functions or casts)
+    so SQLite can use indices on the filtered columns.
+
+    Args:
+        node: A node returned by parse_filter_expression().
+
+    Returns:
+        Tuple of (sql_fragment, params).
+    """
+    if isinstance(node, Condition):
+        column_sql = f'"{node.column}"'
+        if node.op in COMPARISON_OPERATORS:
+            return f"{column_sql} {COMPARISON_OPERATORS[node.op]} ?", [node.value]
+        if node.op in LIST_OPERATORS:
+            placeholders = ",".join("?" * len(node.value))
+            keyword = "IN" if node.op == "in" else "NOT IN"
+            return f"{column_sql} {keyword} ({placeholders})", list(node.value)
+        if node.op == RANGE_OPERATOR:
+            return f"{column_sql} BETWEEN ? AND ?", list(node.value)
+        if node.op == "is_null":
+            return f"{column_sql} IS NULL", []
+        return f"{column_sql} IS NOT NULL", []
+
+    if isinstance(node, Not):
+        child_sql, child_params = compile_filter_node(node.child)
+        return f"NOT ({child_sql})", child_params
+
+    fragments = []
+    params: List[Any] = []
+    for child in node.children:
+        child_sql, child_params = compile_filter_node(child)
+        fragments.append(f"({child_sql})" if isinstance(child, Group) else child_sql)
+        params.extend(child_params)
+    joiner = " AND " if node.op == "and" else " OR "
+    return joiner.join(fragments), params
+
+
+def compile_filter_expression(
+    expression: Any, valid_columns: Iterable[str]
+) -> Tuple[str, List[Any]]:
+    """
+    Parses, validates and compiles a filter expression in one step.
+
+    Args:
+        expression: The JSON-compatible filter expression.
+        valid_columns: Column names that may be referenced.
+
+    Returns:
+        Tuple of (where_sql, params). where_sql is empty if expression is empty.
+    """
+    if not expression:
+        return "", []
+    node = parse_filter_expression(expression, valid_columns)
+    where_sql, params = compile_filter_node(node)
+    logger.debug(f"Compiled filter expression to: {where_sql} (params: {params})")
+    return where_sql, params
@@ -1,19 +1,345 @@
-from typing import Dict, List, Optional, Union, Any
+# format_report.py
+
+"""
+Structured DOT job report formatter.
+
+A report is built once as a ReportDocument (a list of headings, paragraphs,
+tables, bullet lists and rules) and rendered from that representation to any
+of RENDER_TARGETS:
+
+    - "text": plain text with fixed-width columns
+    - "markdown": Markdown tables
+    - "json": compact JSON, one entry per section
+    - "html": an HTML fragment
+
+Table layouts are compiled once at import (column widths, header lines and row
+templates), each renderer writes into a single io.StringIO, and a document
+keeps its rendered output per target, so a job requested by several clients
+in different formats is built once and rendered once per format.
+"""
+
+import html
+import io
+import textwrap
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
 from .config import (
     svp_map,
     worker_functions_map,
     ged_map,
     strength_map,
+    strength_num_to_code,
     freq_map,
     noise_map,
     aptitude_level_map,
     temperament_map
 )
+from .hot_reload import PerHandlerCache
+from .response_encoding import dumps
 
 SECTION_SEPARATOR = "-" * 80
 TABLE_PADDING = 2
 MIN_COLUMN_WIDTH = 10
 MAX_SVP_LEVEL = 9
+TEXT_WIDTH = 80  # Paragraph wrap width of the text target
+RENDER_TARGETS = ("text", "markdown", "json", "html")
+DOCUMENT_CACHE_SIZE = 512  # Report documents kept per database handler
+
+_MARKDOWN_STYLES = {None: "{}", "bold": "**{}**", "code": "`{}`", "bold_code": "**`{}`**"}
+
+
+class TableLayout:
+    """Column layout of a report table, compiled once for every render target."""
+
+    def __init__(self, columns: Sequence[Tuple[str, int, Optional[str]]]):
+        """
+        Compiles the layout.
+
+        Args:
+            columns: (header, text width, Markdown style) per column. The style is
+                     None, "bold", "code" or "bold_code".
+        """
+        self.headers = tuple(header for header, _, _ in columns)
+        self.widths = tuple(max(width, len(header), MIN_COLUMN_WIDTH) for header, width, _ in columns)
+        self.styles = tuple(_MARKDOWN_STYLES[style] for _, _, style in columns)
+
+        padding = " " * TABLE_PADDING
+        # Every column but the last is padded to its width
+        self.text_row = padding.join([f"{{:<{width}}}" for width in self.widths[:-1]] + ["{}"])
+        self.text_header = (
+            self.text_row.format(*self.headers)
+            + "\n"
+            + padding.join("-" * width for width in self.widths)
+            + "\n"
+        )
+        self.markdown_header = (
+            "| " + " | ".join(h.ljust(w) for h, w in zip(self.headers, self.widths)) + " |\n"
+            "| " + " | ".join(":" + "-" * (w - 1) for w in self.widths) + " |\n"
+        )
+        self.html_header = (
+            "<table>\n<thead><tr>"
+            + "".join(f"<th>{html.escape(header)}</th>" for header in self.headers)
+            + "</tr></thead>\n<tbody>\n"
+        )
+        self.html_row = "<tr>" + "<td>{}</td>" * len(self.headers) + "</tr>\n"
+
+    def markdown_row(self, row: Sequence[str]) -> str:
+        """Formats one row as a Markdown table line (empty cells are left unstyled)."""
+        cells = (
+            style.format(cell.replace("|", "\\|")) if cell else ""
+            for style, cell in zip(self.styles, row)
+        )
+        return "| " + " | ".join(cells) + " |\n"
+
+
+@dataclass(frozen=True)
+class Heading:
+    text: str
+
+
+@dataclass(frozen=True)
+class Paragraph:
+    text: str
+    style: Optional[str] = None  # None, "italic" or "code"
+
+
+@dataclass(frozen=True)
+class Table:
+    layout: TableLayout
+    rows: Tuple[Tuple[str, ...], ...]
+
+
+@dataclass(frozen=True)
+class BulletList:
+    title: str
+    items: Tuple[Tuple[str, str], ...]  # (label, text)
+
+
+@dataclass(frozen=True)
+class Rule:
+    pass
+
+
+Block = Union[Heading, Paragraph, Table, BulletList, Rule]
+
+
+class ReportDocument:
+    """Intermediate representation of a report, rendered to any of RENDER_TARGETS."""
+
+    def __init__(self, title: str, subtitle: Optional[str] = None):
+        self.title = title
+        self.subtitle = subtitle
+        self.blocks: List[Block] = []
+        self._rendered: Dict[str, str] = {}
+
+    def add(self, block: Block) -> "ReportDocument":
+        """Appends a block and drops any rendered output."""
+        self.blocks.append(block)
+        self._rendered.clear()
+        return self
+
+    def heading(self, text: str) -> "ReportDocument":
+        return self.add(Heading(text))
+
+    def paragraph(self, text: str, style: Optional[str] = None) -> "ReportDocument":
+        return self.add(Paragraph(text, style))
+
+    def table(self, layout: TableLayout, rows: Sequence[Sequence[Any]]) -> "ReportDocument":
+        return self.add(Table(layout, tuple(tuple(_cell(value) for value in row) for row in rows)))
+
+    def bullets(self, title: str, items: Sequence[Tuple[str, str]]) -> "ReportDocument":
+        return self.add(BulletList(title, tuple(items)))
+
+    def rule(self) -> "ReportDocument":
+        return self.add(Rule())
+
+    def render(self, target: str = "markdown") -> str:
+        """
+        Renders the document, reusing an earlier rendering to the same target.
+
+        Raises:
+            ValueError: If the target is not one of RENDER_TARGETS.
+        """
+        rendered = self._rendered.get(target)
+        if rendered is None:
+            renderer = _RENDERERS.get(target)
+            if renderer is None:
+                raise ValueError(
+                    f"Unknown report format '{target}'. Expected one of: {', '.join(RENDER_TARGETS)}."
+                )
+            buffer = io.StringIO()
+            renderer(self, buffer.write)
+            rendered = self._rendered[target] = buffer.getvalue()
+        return rendered
+
+
+def _cell(value: Any) -> str:
+    return "" if value is None else str(value)
+
+
+def _render_text(document: ReportDocument, write: Callable[[str], Any]) -> None:
+    write(f"{document.title}\n{'=' * len(document.title)}\n")
+    if document.subtitle:
+        write(f"{document.subtitle}\n")
+    for block in document.blocks:
+        if isinstance(block, Heading):
+            write(f"\n{block.text}\n{'-' * len(block.text)}\n")
+        elif isinstance(block, Paragraph):
+            write(textwrap.fill(block.text, TEXT_WIDTH) + "\n\n")
+        elif isinstance(block, Table):
+            layout = block.layout
+            write(layout.text_header)
+            for row in block.rows:
+                write(layout.text_row.format(*row).rstrip() + "\n")
+            write("\n")
+        elif isinstance(block, BulletList):
+            write(f"{block.title}:\n")
+            for label, text in block.items:
+                write(f"  - {label}: {text}\n")
+            write("\n")
+        elif isinstance(block, Rule):
+            write(SECTION_SEPARATOR + "\n")
+
+
+def _render_markdown(document: ReportDocument, write: Callable[[str], Any]) -> None:
+    write(f"# {document.title}\n")
+    if document.subtitle:
+        write(f"## {document.subtitle}\n")
+    write("\n")
+    for block in document.blocks:
+        if isinstance(block, Heading):
+            write(f"## {block.text}\n\n")
+        elif isinstance(block, Paragraph):
+            if block.style == "italic":
+                write(f"*{block.text}*\n\n")
+            elif block.style == "code":
+                write(f"`{block.text}`\n\n")
+            else:
+                write(f"{block.text}\n\n")
+        elif isinstance(block, Table):
+            layout = block.layout
+            write(layout.markdown_header)
+            for row in block.rows:
+                write(layout.markdown_row(row))
+            write("\n")
+        elif isinstance(block, BulletList):
+            write(f"**{block.title}:**\n")
+            for label, text in block.items:
+                write(f"- **{label}:** {text}\n")
+            write("\n")
+        elif isinstance(block, Rule):
+            write("---\n\n")
+
+
+def _render_html(document: ReportDocument, write: Callable[[str], Any]) -> None:
+    escape = html.escape
+    write(f'<article class="job-report">\n<h1>{escape(document.title)}</h1>\n')
+    if document.subtitle:
+        write(f'<p class="dot-code">{escape(document.subtitle)}</p>\n')
+    for block in document.blocks:
+        if isinstance(block, Heading):
+            write(f"<h2>{escape(block.text)}</h2>\n")
+        elif isinstance(block, Paragraph):
+            if block.style == "italic":
+                write(f"<p><em>{escape(block.text)}</em></p>\n")
+            else:
+                write(f"<p>{escape(block.text)}</p>\n")
+        elif isinstance(block, Table):
+            layout = block.layout
+            write(layout.html_header)
+            for row in block.rows:
+                write(layout.html_row.format(*map(escape, row)))
+            write("</tbody>\n</table>\n")
+        elif isinstance(block, BulletList):
+            write(f"<p><strong>{escape(block.title)}:</strong></p>\n<ul>\n")
+            for label, text in block.items:
+                write(f"<li><strong>{escape(label)}:</strong> {escape(text)}</li>\n")
+            write("</ul>\n")
+        elif isinstance(block, Rule):
+            write("<hr>\n")
+    write("</article>\n")
+
+
+def _render_json(document: ReportDocument, write: Callable[[str], Any]) -> None:
+    # Blocks are grouped under the heading before them; rules carry no data
+    sections: Dict[str, List[Any]] = {}
+    content = sections.setdefault("", [])
+    for block in document.blocks:
+        if isinstance(block, Heading):
+            content = sections.setdefault(block.text, [])
+        elif isinstance(block, Paragraph):
+            content.append(block.text)
+        elif isinstance(block, Table):
+            content.append({"columns": list(block.layout.headers), "rows": [list(row) for row in block.rows]})
+        elif isinstance(block, BulletList):
+            content.append({"title": block.title, "items": dict(block.items)})
+    if not sections[""]:
+        del sections[""]
+    write(dumps({"title": document.title, "dotCode": document.subtitle, "sections": sections}))
+
+
+_RENDERERS: Dict[str, Callable[[ReportDocument, Callable[[str], Any]], None]] = {
+    "text": _render_text,
+    "markdown": _render_markdown,
+    "json": _render_json,
+    "html": _render_html,
+}
+
+# Compiled table layouts of the job report
+DETAILS_LAYOUT = TableLayout([("Detail", 22, "bold"), ("Value", 60, "code")])
+CHARACTERISTICS_LAYOUT = TableLayout(
+    [("Category", 15, "bold"), ("Activity / Condition", 20, None), ("Frequency / Level", 40, "code")]
+)
+GED_LAYOUT = TableLayout([("Area", 10, None), ("Level", 5, "code"), ("Description", 47, "code")])
+WORKER_FUNCTIONS_LAYOUT = TableLayout(
+    [("Function", 8, None), ("Level / Significance", 20, "code"), ("Description", 47, "code")]
+)
+CODES_LAYOUT = TableLayout([("Code", 4, "code"), ("Description", 40, None)])
+APTITUDES_LAYOUT = TableLayout([("Aptitude", 28, None), ("Level", 5, "code"), ("Description", 20, "code")])
+TEMPERAMENTS_LAYOUT = TableLayout([("Code", 4, "bold_code"), ("Description", 60, "code")])
+
+# (category, ((activity, column), ...)) rows of the Characteristics table
+CHARACTERISTICS = (
+    ("Postural", (("Climbing", "ClimbingNum"), ("Balancing", "BalancingNum"), ("Stooping", "StoopingNum"),
+                  ("Kneeling", "KneelingNum"), ("Crouching", "CrouchingNum"), ("Crawling", "CrawlingNum"))),
+    ("Manipulative", (("Reaching", "ReachingNum"), ("Handling", "HandlingNum"), ("Fingering", "FingeringNum"))),
+    ("Sensory", (("Feeling", "FeelingNum"), ("Talking", "TalkingNum"), ("Hearing", "HearingNum"),
+                 ("Taste/Smell", "TastingNum"))),
+    ("Visual", (("Near Acuity", "NearAcuityNum"), ("Far Acuity", "FarAcuityNum"), ("Depth Perc.", "DepthNum"),
+                ("Accom.", "AccommodationNum"), ("Color Vis.", "ColorVisionNum"),
+                ("Field of Vis.", "FieldVisionNum"))),
+    ("Environmental", (("Weather", "WeatherNum"), ("Extreme Cold", "ColdNum"), ("Extreme Heat", "HeatNum"),
+                       ("Wet", "WetNum"), ("Noise", "NoiseNum"), ("Vibration", "VibrationNum"),
+                       ("Atmos. Cond.", "AtmosphereNum"), ("Moving Mech.", "MovingNum"),
+                       ("Elec. Shock", "ElectricityNum"), ("Height", "HeightNum"),
+                       ("Radiation", "RadiationNum"), ("Explosion", "ExplosionNum"),
+                       ("Toxic Chem.", "ToxicNum"), ("Other", "OtherNum"))),
+)
+
+APTITUDES = (
+    ("General Learning Ability", 'AptGenLearn'),
+    ("Verbal Aptitude", 'AptVerbal'),
+    ("Numerical Aptitude", 'AptNumerical'),
+    ("Spatial Aptitude", 'AptSpacial'),
+    ("Form Perception", 'AptFormPer'),
+    ("Clerical Perception", 'AptClericalPer'),
+    ("Motor Coordination", 'AptMotor'),
+    ("Finger Dexterity", 'AptFingerDext'),
+    ("Manual Dexterity", 'AptManualDext'),
+    ("Eye-Hand-Foot Coordination", 'AptEyeHandCoord'),
+    ("Color Discrimination", 'AptColorDisc')
+)
+
+FREQUENCY_LEGEND = (
+    ("Not Present", "Activity or condition does not exist."),
+    ("Occasionally", "Activity or condition exists up to 1/3 of the time."),
+    ("Frequently", "Activity or condition exists from 1/3 to 2/3 of the time."),
+    ("Constantly", "Activity or condition exists 2/3 or more of the time."),
+)
+
 
 def validate_job_data(job_data: Dict[str, Any]) -> bool:
     """Validate required fields in job data.
@@ -24,114 +350,142 @@ def validate_job_data(job_data: Dict[str, Any]) -> bool:
     required_fields = ['jobTitle', 'NCode', 'industryDesignation']
     return all(job_data.get(field) for field in required_fields)
 
-def format_job_report(job_data: Dict[str, Any]) -> str:
-    """Format job data into a markdown report."""
-    
-    # Start building the markdown report
-    report = [
-        f"# {job_data.get('jobTitle', 'N/A')}",
-        f"## {job_data.get('dotCode', 'N/A')}",
-        "\n---\n",
-        "| Detail                 | Value                                                                 |",
-        "| :--------------------- | :-------------------------------------------------------------------- |",
-        f"| **Industry Designation** | `{job_data.get('industryDesignation', 'N/A')}` |",
-        f"| **GOE Code**           | `{job_data.get('goeCode', 'N/A')}` |",
-        "| **GOE Titles**         | " + f"`- {job_data.get('goe_title', 'N/A')}`<br>`- {job_data.get('GOE2', 'N/A')}`<br>`- {job_data.get('GOE3', 'N/A')}`" + " |",
-        f"| **Alternate Titles**   | `{job_data.get('alternateTitles', 'N/A')}` |",
-        f"| **SVP**                | **Level `{job_data.get('SVPNum', 'N/A')}`:** `{svp_map.get(job_data.get('SVPNum'), 'N/A')}` |",
-        f"| **Strength**           | **`{job_data.get('Strength', 'S')}`:** `{strength_map.get(job_data.get('Strength', 'S'), 'N/A')}` |",
-        "\n---\n",
-        "## Definition\n",
-        f"`{job_data.get('definition', 'N/A')}`\n",
-        "\n---\n",
-        "## Characteristics\n",
-        "| Category        | Activity / Condition   | Frequency / Level                       |",
-        "| :-------------- | :--------------------- | :-------------------------------------- |",
-        "| **Postural**    | Climbing               | `" + format_frequency_level(job_data.get('ClimbingNum')) + "` |",
-        "|                 | Balancing              | `" + format_frequency_level(job_data.get('BalancingNum')) + "` |",
-        "|                 | Stooping               | `" + format_frequency_level(job_data.get('StoopingNum')) + "` |",
-        "|                 | Kneeling               | `" + format_frequency_level(job_data.get('KneelingNum')) + "` |",
-        "|                 | Crouching              | `" + format_frequency_level(job_data.get('CrouchingNum')) + "` |",
-        "|                 | Crawling               | `" + format_frequency_level(job_data.get('CrawlingNum')) + "` |",
-        "| **Manipulative**| Reaching               | `" + format_frequency_level(job_data.get('ReachingNum')) + "` |",
-        "|                 | Handling               | `" + format_frequency_level(job_data.get('HandlingNum')) + "` |",
-        "|                 | Fingering              | `" + format_frequency_level(job_data.get('FingeringNum')) + "` |",
-        "| **Sensory**     | Feeling                | `" + format_frequency_level(job_data.get('FeelingNum')) + "` |",
-        "|                 | Talking                | `" + format_frequency_level(job_data.get('TalkingNum')) + "` |",
-        "|                 | Hearing                | `" + format_frequency_level(job_data.get('HearingNum')) + "` |",
-        "|                 | Taste/Smell            | `" + format_frequency_level(job_data.get('TastingNum')) + "` |",
-        "| **Visual**      | Near Acuity            | `" + format_frequency_level(job_data.get('NearAcuityNum')) + "` |",
-        "|                 | Far Acuity             | `" + format_frequency_level(job_data.get('FarAcuityNum')) + "` |",
-        "|                 | Depth Perc.            | `" + format_frequency_level(job_data.get('DepthNum')) + "` |",
-        "|                 | Accom.                 | `" + format_frequency_level(job_data.get('AccommodationNum')) + "` |",
-        "|                 | Color Vis.             | `" + format_frequency_level(job_data.get('ColorVisionNum')) + "` |",
-        "|                 | Field of Vis.          | `" + format_frequency_level(job_data.get('FieldVisionNum')) + "` |",
-        "| **Environmental** | Weather              | `" + format_frequency_level(job_data.get('WeatherNum')) + "` |",
-        "|                 | Extreme Cold           | `" + format_frequency_level(job_data.get('ColdNum')) + "` |",
-        "|                 | Extreme Heat           | `" + format_frequency_level(job_data.get('HeatNum')) + "` |",
-        "|                 | Wet                    | `" + format_frequency_level(job_data.get('WetNum')) + "` |",
-        f"|                 | Noise                  | `{job_data.get('NoiseNum', 1)}` - `{noise_map.get(job_data.get('NoiseNum', 1), 'N/A')}` |",
-        "|                 | Vibration              | `" + format_frequency_level(job_data.get('VibrationNum')) + "` |",
-        "|                 | Atmos. Cond.           | `" + format_frequency_level(job_data.get('AtmosphereNum')) + "` |",
-        "|                 | Moving Mech.           | `" + format_frequency_level(job_data.get('MovingNum')) + "` |",
-        "|                 | Elec. Shock            | `" + format_frequency_level(job_data.get('ElectricityNum')) + "` |",
-        "|                 | Height                 | `" + format_frequency_level(job_data.get('HeightNum')) + "` |",
-        "|                 | Radiation              | `" + format_frequency_level(job_data.get('RadiationNum')) + "` |",
-        "|                 | Explosion              | `" + format_frequency_level(job_data.get('ExplosionNum')) + "` |",
-        "|                 | Toxic Chem.            | `" + format_frequency_level(job_data.get('ToxicNum')) + "` |",
-        "|                 | Other                  | `" + format_frequency_level(job_data.get('OtherNum')) + "` |",
-        "\n---\n",
-        "## General Educational Development",
-        "*(Range: Lowest (1) to Highest (6))*\n",
-        "| Area       | Level | Description                                     |",
-        "| :--------- | :---- | :---------------------------------------------- |",
-        f"| Reasoning  | `{job_data.get('GEDR', 'N/A')}` | `{format_ged_reasoning(job_data.get('GEDR'))}` |",
-        f"| Math       | `{job_data.get('GEDM', 'N/A')}` | `{format_ged_math(job_data.get('GEDM'))}` |",
-        f"| Language   | `{job_data.get('GEDL', 'N/A')}` | `{format_ged_language(job_data.get('GEDL'))}` |",
-        "\n---\n",
-        "## Worker Functions",
-        "*(Range: Lowest (6-8) to Highest (0))*\n",
-        "| Function | Level / Significance        | Description                                     |",
-        "| :------- | :-------------------------- | :---------------------------------------------- |",
-        f"| Data     | `{job_data.get('WFData', 'N/A')}` | `{format_worker_function_data(job_data.get('WFData'))}` |",
-        f"| People   | `{job_data.get('WFPeople', 'N/A')}` | `{format_worker_function_people(job_data.get('WFPeople'))}` |",
-        f"| Things   | `{job_data.get('WFThings', 'N/A')}` | `{format_worker_function_things(job_data.get('WFThings'))}` |",
-        "\n---\n",
-        "## Work Fields\n",
-        "| Code | Description                            |",
-        "| :--- | :------------------------------------- |",
-        format_work_fields_description(job_data),
-        "\n---\n",
-        "## MPSMS Code\n",
-        "| Code | Description                                     |",
-        "| :--- | :---------------------------------------------- |",
-        format_mpsms_description(job_data),
-        "\n---\n",
-        "## Aptitudes\n",
-        "| Aptitude                      | Level | Description                                     |",
-        "| :---------------------------- | :---- | :---------------------------------------------- |",
-        format_aptitudes_table(job_data),
-        "\n---\n",
-        "## Temperaments\n",
-        "| Code / Title                                     | Description                                     |",
-        "| :----------------------------------------------- | :---------------------------------------------- |",
-        format_temperaments_table(job_data),
-        "\n---\n",
-        "## Legend\n",
-        "**Frequency:**",
-        "- **Not Present:** Activity or condition does not exist.",
-        "- **Occasionally:** Activity or condition exists up to 1/3 of the time.",
-        "- **Frequently:** Activity or condition exists from 1/3 to 2/3 of the time.",
-        "- **Constantly:** Activity or condition exists 2/3 or more of the time. *(Note: The OCR'd legend incorrectly says \"Not Present\" for Constant)*\n",
-        "**Noise:**",
-        "- **1:** Very Quiet",
-        "- **2:** Quiet",
-        "- **3:** Moderate",
-        "- **4:** Loud",
-        "- **5:** Very Loud"
-    ]
-    
-    return "\n".join(report)
+def _first(job_data: Dict[str, Any], *keys: str, default: Any = "N/A") -> Any:
+    """Returns the first non-empty value among keys (report aliases first, DOT columns after)."""
+    for key in keys:
+        value = job_data.get(key)
+        if value not in (None, ""):
+            return value
+    return default
+
+def _aptitude_rows(job_data: Dict[str, Any]) -> List[Tuple[str, str, str]]:
+    rows = []
+    for name, key in APTITUDES:
+        level = job_data.get(key, 3)
+        rows.append((name, str(level), format_aptitude_level(level)))
+    return rows
+
+def _temperament_rows(job_data: Dict[str, Any]) -> List[Tuple[str, str]]:
+    rows = []
+    for i in range(1, 6):
+        temp_code = job_data.get(f'Temp{i}')
+        if temp_code and temp_code in temperament_map:
+            rows.append((temp_code, temperament_map[temp_code]))
+    return rows
+
+def _coded_rows(job_data: Dict[str, Any], prefix: str) -> List[Tuple[str, str]]:
+    """Primary to tertiary work field or MPSMS rows: (code, description)."""
+    rows = []
+    for i in range(1, 4):
+        code = job_data.get(f'{prefix}{i}')
+        description = job_data.get(f'{prefix}{i}Short')
+        if code or description:
+            rows.append((_cell(code), _cell(description)))
+    return rows
+
+def build_job_document(job_data: Dict[str, Any]) -> ReportDocument:
+    """
+    Builds the report document of a job.
+
+    Args:
+        job_data: DOT row from get_job_data, or a row using the report aliases
+                  of report_query.sql (jobTitle, dotCode, industryDesignation, ...).
+    """
+    strength = _first(job_data, 'Strength', default=None)
+    if strength is None and job_data.get('StrengthNum') is not None:
+        strength = strength_num_to_code.get(job_data['StrengthNum'])
+    svp = job_data.get('SVPNum')
+    svp_description = svp_map.get(svp, 'N/A') if svp is not None else 'N/A'
+    strength_description = strength_map.get(strength, 'N/A') if strength else 'N/A'
+    goe_codes = [_cell(job_data.get(f'GOE{i}')) for i in range(1, 4)]
+    document = ReportDocument(
+        str(_first(job_data, 'jobTitle', 'Title')), str(_first(job_data, 'dotCode', 'Code', 'dot_code'))
+    )
+
+    document.rule().heading("Details").table(DETAILS_LAYOUT, [
+        ("Industry Designation", _first(job_data, 'industryDesignation', 'Industry')),
+        ("GOE Code", _first(job_data, 'goeCode', 'GOE', default="; ".join(filter(None, goe_codes)) or "N/A")),
+        ("GOE Title", _first(job_data, 'goe_title')),
+        ("Alternate Titles", _first(job_data, 'alternateTitles', 'AltTitles')),
+        ("SVP", f"Level {svp if svp is not None else 'N/A'}: {svp_description}"),
+        ("Strength", f"{strength or 'N/A'}: {strength_description}"),
+    ])
+
+    document.rule().heading("Definition").paragraph(str(_first(job_data, 'definition', 'Definitions')), "code")
+
+    characteristics = []
+    for category, activities in CHARACTERISTICS:
+        for position, (activity, key) in enumerate(activities):
+            if key == 'NoiseNum':
+                noise = job_data.get(key, 1)
+                level = f"{noise} - {noise_map.get(noise, 'N/A')}"
+            else:
+                level = format_frequency_level(job_data.get(key))
+            characteristics.append((category if position == 0 else "", activity, level))
+    document.rule().heading("Characteristics").table(CHARACTERISTICS_LAYOUT, characteristics)
+
+    document.rule().heading("General Educational Development")
+    document.paragraph("(Range: Lowest (1) to Highest (6))", "italic").table(GED_LAYOUT, [
+        ("Reasoning", job_data.get('GEDR', 'N/A'), format_ged_reasoning(job_data.get('GEDR'))),
+        ("Math", job_data.get('GEDM', 'N/A'), format_ged_math(job_data.get('GEDM'))),
+        ("Language", job_data.get('GEDL', 'N/A'), format_ged_language(job_data.get('GEDL'))),
+    ])
+
+    document.rule().heading("Worker Functions")
+    document.paragraph("(Range: Lowest (6-8) to Highest (0))", "italic").table(WORKER_FUNCTIONS_LAYOUT, [
+        ("Data", job_data.get('WFData', 'N/A'), format_worker_function_data(job_data.get('WFData'))),
+        ("People", job_data.get('WFPeople', 'N/A'), format_worker_function_people(job_data.get('WFPeople'))),
+        ("Things", job_data.get('WFThings', 'N/A'), format_worker_function_things(job_data.get('WFThings'))),
+    ])
+
+    document.rule().heading("Work Fields")
+    document.table(CODES_LAYOUT, _coded_rows(job_data, 'WField') or [("", "No work fields specified")])
+    document.rule().heading("MPSMS Code")
+    document.table(CODES_LAYOUT, _coded_rows(job_data, 'MPSMS') or [("", "No MPSMS codes specified")])
+
+    document.rule().heading("Aptitudes").table(APTITUDES_LAYOUT, _aptitude_rows(job_data))
+    document.rule().heading("Temperaments")
+    document.table(TEMPERAMENTS_LAYOUT, _temperament_rows(job_data) or [("", "No specific temperaments listed")])
+
+    document.rule().heading("Legend")
+    document.bullets("Frequency", FREQUENCY_LEGEND)
+    document.bullets("Noise", [(str(level), description) for level, description in sorted(noise_map.items())])
+    return document
+
+def format_job_report(job_data: Dict[str, Any], target: str = "markdown") -> str:
+    """Format job data into a report (Markdown by default, or any of RENDER_TARGETS)."""
+    return build_job_document(job_data).render(target)
+
+# Documents per DatabaseHandler, so a hot-reloaded database starts empty
+_documents = PerHandlerCache(lambda db: OrderedDict())
+_documents_lock = threading.Lock()
+
+def get_job_document(db: Any, job_data: Dict[str, Any]) -> ReportDocument:
+    """
+    Returns the report document of a job, built once per database handler.
+
+    The most recently used DOCUMENT_CACHE_SIZE documents are kept; each keeps its
+    renderings, so repeated requests in any format are served without re-rendering.
+    """
+    ncode = job_data.get("Ncode")
+    if ncode is None:
+        return build_job_document(job_data)
+    documents = _documents.get(db)
+    with _documents_lock:
+        document = documents.get(ncode)
+        if document is not None:
+            documents.move_to_end(ncode)
+            return document
+    document = build_job_document(job_data)
+    with _documents_lock:
+        documents[ncode] = document
+        while len(documents) > DOCUMENT_CACHE_SIZE:
+            documents.popitem(last=False)
+    return document
+
+def render_job_report(db: Any, job_data: Dict[str, Any], target: str) -> str:
+    """Renders a job's cached report document to target."""
+    return get_job_document(db, job_data).render(target)
 
 def format_frequency_level(value: Optional[int]) -> str:
     """Convert numeric frequency to descriptive text."""
@@ -403,36 +757,12 @@ def format_mpsms_description(job_data: Dict[str, Any]) -> str:
     return "\n".join(codes) if codes else "No MPSMS codes specified"
 
 def format_aptitudes_table(job_data: Dict[str, Any]) -> str:
-    """Format aptitudes in table format."""
-    aptitudes = [
-        ("General Learning Ability", 'AptGenLearn'),
-        ("Verbal Aptitude", 'AptVerbal'),
-        ("Numerical Aptitude", 'AptNumerical'),
-        ("Spatial Aptitude", 'AptSpacial'),
-        ("Form Perception", 'AptFormPer'),
-        ("Clerical Perception", 'AptClericalPer'),
-        ("Motor Coordination", 'AptMotor'),
-        ("Finger Dexterity", 'AptFingerDext'),
-        ("Manual Dexterity", 'AptManualDext'),
-        ("Eye-Hand-Foot Coordination", 'AptEyeHandCoord'),
-        ("Color Discrimination", 'AptColorDisc')
-    ]
-    
-    rows = []
-    for name, key in aptitudes:
-        level = job_data.get(key, 3)
-        desc = format_aptitude_level(level)
-        rows.append(f"| {name:<28} | `{level}` | `{desc}` |")
-    
-    return "\n".join(rows)
+    """Format aptitudes as Markdown table rows."""
+    return "".join(APTITUDES_LAYOUT.markdown_row(row) for row in _aptitude_rows(job_data)).rstrip("\n")
 
 def format_temperaments_table(job_data: Dict[str, Any]) -> str:
-    """Format temperaments in table format."""
-    rows = []
-    for i in range(1, 6):
-        temp_code = job_data.get(f'Temp{i}')
-        if temp_code and temp_code in temperament_map:
-            desc = temperament_map[temp_code]
-            rows.append(f"| **`{temp_code}`** | `{desc}` |")
-    
-    return "\n".join(rows) if rows else "| N/A | No specific temperaments listed |" 
\ No newline at end of file
+    """Format temperaments as Markdown table rows."""
+    rows = _temperament_rows(job_data)
+    if not rows:
+        return "| N/A | No specific temperaments listed |"
+    return "".join(TEMPERAMENTS_LAYOUT.markdown_row(row) for row in rows).rstrip("\n")
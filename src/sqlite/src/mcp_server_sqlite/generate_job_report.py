@@ -1,23 +1,31 @@
+import argparse
+import json
 import sys
 import logging
-from typing import Dict, Any, Optional, Callable, List
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple
 from pathlib import Path
-from functools import lru_cache  # Import for caching
 
 # Import the original formatting function name from ve_logic
-from .ve_logic import generate_formatted_job_report
+from .ve_logic import generate_formatted_job_report, get_job_analysis
+from .format_report import format_job_report
 # Removed DatabaseHandler import to break circular dependency
 # from .db_handler import DatabaseHandler
 # Import the moved clean_dot_code utility
 
 # Import from models package
 from .models import DotJob, DotCode
+from .hot_reload import PerHandlerCache
+from .title_index import get_title_index
 
 # Setup logger for this module
 logger = logging.getLogger(__name__)
 
-# Create a QueryFunction type alias for better type hinting
-QueryFunction = Callable[[int, str], Optional[Dict[str, Any]]]
+BATCH_CHUNK_SIZE = 250  # Codes per bulk query and per batch render task
+ROW_CACHE_SIZE = 100  # Job rows kept per database handler
+
 
 
 # LRU cache with statistics for monitoring performance
@@ -54,13 +62,15 @@ def get_job_data(db: Any, search_term: str) -> Optional[Dict[str, Any]]:
     - A DOT code in ######### format
     - A DOT code in ###.###-### format
     - A job title or partial title
+    - A misspelled title, resolved to the closest fuzzy title match
 
     Args:
         db: The database handler instance
         search_term: The search term to use (DOT code or job title)
 
     Returns:
-        A dictionary containing the job data if found, None otherwise
+        A dictionary containing the job data if found, None otherwise.
+        Fuzzy matches carry a "fuzzyMatch" entry describing the match.
     """
     if not search_term or not search_term.strip():
         logger.error("Empty search term provided")
@@ -72,16 +82,8 @@ def get_job_data(db: Any, search_term: str) -> Optional[Dict[str, Any]]:
         if ncode is not None:
             logger.debug(f"Searching DOT code: ncode={ncode}, code_text={code_text}")
 
-            # Create a query function to pass to the cache function
-            def query_function(ncode: int, code_text: str) -> Optional[Dict[str, Any]]:
-                results = db._execute_query(
-                    "SELECT * FROM DOT WHERE Ncode = ? OR CAST(Code AS TEXT) = ? LIMIT 1;",
-                    [ncode, code_text],
-                )
-                return results[0] if results else None
-
-            # Use the cached lookup with the query function
-            job_data = cached_get_job_by_code(ncode, code_text, query_function)
+            # Use the cached lookup (keyed by handler, so a reloaded database gets fresh entries)
+            job_data = cached_get_job_by_code(ncode, code_text, db)
 
             # Log cache statistics periodically
             if CacheStats.calls % 50 == 0:
@@ -138,6 +140,18 @@ def get_job_data(db: Any, search_term: str) -> Optional[Dict[str, Any]]:
                 )
                 return job_data_from_list
 
+        # Finally, try the closest fuzzy title match (misspelled or spoken titles)
+        if ncode is None:
+            match = get_title_index(db).best_match(search_term)
+            if match is not None:
+                logger.info(
+                    f"Using fuzzy title match for '{search_term}': "
+                    f"{match['jobTitle']} ({match['dotCode']}, score {match['score']})"
+                )
+                job_data = get_job_data(db, match["dotCode"])
+                if job_data:
+                    return {**job_data, "fuzzyMatch": match}
+
         logger.info(f"No job data found for search term: {search_term}")
         return None
     except Exception as e:
@@ -145,40 +159,45 @@ def get_job_data(db: Any, search_term: str) -> Optional[Dict[str, Any]]:
         return None
 
 
-# LRU cache decorator for job data lookups
-# This improves performance significantly for repeated queries
-@lru_cache(maxsize=100)
+# Recently used job rows per DatabaseHandler. The cache goes away with its handler,
+# so a hot reload neither serves rows from the old database nor keeps it alive.
+_row_caches = PerHandlerCache(lambda db: OrderedDict())
+_row_caches_lock = threading.Lock()
+
+
 def cached_get_job_by_code(
-    ncode: int, code_text: str, query_function: QueryFunction
+    ncode: int, code_text: Optional[str], db: Any
 ) -> Optional[Dict[str, Any]]:
     """
     Cached version of job lookup by DOT code.
-    Uses an LRU cache to avoid repeated database queries for the same codes.
+    Keeps the ROW_CACHE_SIZE most recently used rows of each database handler
+    to avoid repeated database queries for the same codes.
 
     Args:
         ncode: Numeric code integer
         code_text: Formatted DOT code text
-        query_function: Function that accepts ncode and code_text and returns job data
+        db: The database handler to query on a cache miss
 
     Returns:
         Job data dictionary if found, None otherwise
     """
-    # Update call statistics
-    CacheStats.calls += 1
-
-    # Check if in cache (handled by lru_cache decorator)
-    # We just need to execute the query and let lru_cache handle the caching
-    result = query_function(ncode, code_text)
-
-    # Update hit/miss statistics
-    if result is None:
+    rows = _row_caches.get(db)
+    key = (ncode, code_text)
+    with _row_caches_lock:
+        CacheStats.calls += 1
+        if key in rows:
+            CacheStats.hits += 1
+            rows.move_to_end(key)
+            return rows[key]
         CacheStats.misses += 1
-        logger.debug(f"Cache MISS for DOT code {code_text}")
-    else:
-        CacheStats.hits += 1
-        logger.debug(f"Cache HIT for DOT code {code_text}")
 
-    return result
+    logger.debug(f"Cache MISS for DOT code {code_text}")
+    job_data = db.get_job_by_code(code_text or str(ncode), columns="report_full")
+    with _row_caches_lock:
+        rows[key] = job_data
+        while len(rows) > ROW_CACHE_SIZE:
+            rows.popitem(last=False)
+    return job_data
 
 
 def warm_up_cache(db: Any, common_dot_codes: List[str]) -> None:
@@ -200,46 +219,272 @@ def warm_up_cache(db: Any, common_dot_codes: List[str]) -> None:
     logger.info(f"Cache warm-up complete. Stats: {CacheStats.get_stats()}")
 
 
-def main():
+def read_search_terms(source: str) -> List[str]:
     """
-    Main function that processes command line arguments and generates a job report.
+    Reads one search term per line from a file, or from stdin when source is '-'.
+
+    Blank lines and lines starting with '#' are skipped.
     """
-    if len(sys.argv) != 2:
-        print(
-            "Usage: python -m src.sqlite.src.mcp_server_sqlite.generate_job_report <search_term>"
-        )
-        print("  search_term can be:")
-        print("  - A DOT code (e.g., 001.061-010 or 001061010)")
-        print("  - A job title (e.g., 'Architect')")
-        sys.exit(1)
+    if source == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        lines = Path(source).read_text(encoding="utf-8").splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.lstrip().startswith("#")]
+
+
+def resolve_search_terms(db: Any, terms: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Resolves many search terms to DOT rows with as few queries as possible.
 
-    search_term = sys.argv[1]
+    DOT codes are looked up together with one Ncode query per BATCH_CHUNK_SIZE
+    codes, and titles matching a DOT title exactly are resolved in memory by the
+    title index. Only the remaining titles fall back to get_job_data (substring
+    search, then the closest fuzzy match), one term at a time.
 
+    Returns:
+        Dictionary keyed by term of {"Ncode", "dotCode", "title"} (plus "fuzzyMatch"
+        for fuzzy title matches), or None for terms that matched no job.
+    """
+    unique_terms = list(dict.fromkeys(terms))
+    codes: Dict[str, int] = {}
+    titles: List[str] = []
+    for term in unique_terms:
+        ncode, _ = DotCode.clean(term)
+        if ncode is not None:
+            codes[term] = ncode
+        else:
+            titles.append(term)
+
+    found: Dict[int, Dict[str, Any]] = {}
+    ncodes = list(dict.fromkeys(codes.values()))
+    for start in range(0, len(ncodes), BATCH_CHUNK_SIZE):
+        chunk = [DotCode.format(ncode) for ncode in ncodes[start : start + BATCH_CHUNK_SIZE]]
+        for row in db.batch_get_jobs_by_codes(chunk, columns=["Ncode", "Title"]):
+            found[row["Ncode"]] = {
+                "Ncode": row["Ncode"],
+                "dotCode": DotCode.format(row["Ncode"]),
+                "title": row["Title"],
+            }
+
+    resolved: Dict[str, Optional[Dict[str, Any]]] = {
+        term: found.get(ncode) for term, ncode in codes.items()
+    }
+    if titles:
+        index = get_title_index(db)
+        for term in titles:
+            match = index.best_match(term, min_score=100.0)
+            if match is not None:
+                resolved[term] = {
+                    "Ncode": match["Ncode"],
+                    "dotCode": match["dotCode"],
+                    "title": match["jobTitle"],
+                }
+                continue
+            job_data = get_job_data(db, term)
+            if job_data and job_data.get("Ncode") is not None:
+                job = {
+                    "Ncode": job_data["Ncode"],
+                    "dotCode": DotCode.format(job_data["Ncode"]),
+                    # Title searches return aliased columns; DotJob adds "title" to both kinds of rows
+                    "title": job_data.get("Title") or job_data.get("title"),
+                }
+                if job_data.get("fuzzyMatch"):
+                    job["fuzzyMatch"] = job_data["fuzzyMatch"]
+                resolved[term] = job
+            else:
+                resolved[term] = None
+    return resolved
+
+
+def run_batch(
+    db: Any,
+    terms: List[str],
+    output: Optional[Path] = None,
+    workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Resolves many search terms and writes their reports.
+
+    Args:
+        db: The database handler instance.
+        terms: Search terms (DOT codes or titles), in output order.
+        output: '.ndjson'/'.jsonl' file for one JSON record per term, a directory
+                for one '<DOT code>.txt' report per job, or None for NDJSON on stdout.
+        workers: Worker processes for rendering (defaults to the CPU count).
+
+    Returns:
+        Summary of the batch with counts and throughput.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    from .analysis_store import AnalysisStore
+    from .report_store import render_report_chunk
+
+    start_time = time.monotonic()
+    resolved = resolve_search_terms(db, terms)
+    resolve_seconds = time.monotonic() - start_time
+    ncodes = sorted({job["Ncode"] for job in resolved.values() if job is not None})
+    logger.info(
+        f"Resolved {len(ncodes)} jobs for {len(terms)} search terms in {resolve_seconds:.2f}s."
+    )
+
+    version = AnalysisStore(db).current_version()
+    chunks = [
+        ncodes[i : i + BATCH_CHUNK_SIZE] for i in range(0, len(ncodes), BATCH_CHUNK_SIZE)
+    ]
+    reports: Dict[int, Tuple[str, str]] = {}
+    rendered = 0
+    if len(chunks) <= 1 or workers == 1:
+        # Not worth starting a pool for one chunk
+        results = (render_report_chunk(str(db.db_path), chunk, version) for chunk in chunks)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        futures = [
+            executor.submit(render_report_chunk, str(db.db_path), chunk, version)
+            for chunk in chunks
+        ]
+        results = (future.result() for future in futures)
+    try:
+        for chunk_results in results:
+            for ncode, filename, report_text in chunk_results:
+                reports[ncode] = (filename, report_text)
+            rendered += len(chunk_results)
+            elapsed = time.monotonic() - start_time
+            logger.info(
+                f"Rendered {rendered}/{len(ncodes)} reports ({rendered / elapsed:.0f} reports/s)."
+            )
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    written = 0
+    missing: List[str] = []
+    if output is not None and output.suffix.lower() not in (".ndjson", ".jsonl"):
+        output.mkdir(parents=True, exist_ok=True)
+        for ncode, (filename, report_text) in reports.items():
+            (output / filename).write_text(report_text, encoding="utf-8")
+            written += 1
+        missing = [
+            term for term, job in resolved.items() if job is None or job["Ncode"] not in reports
+        ]
+    else:
+        stream = open(output, "w", encoding="utf-8") if output is not None else sys.stdout
+        try:
+            for term in terms:
+                job = resolved.get(term)
+                report = reports.get(job["Ncode"]) if job is not None else None
+                if job is None or report is None:
+                    record = {"term": term, "error": "No job data found"}
+                    missing.append(term)
+                else:
+                    record = {
+                        "term": term,
+                        "dotCode": job["dotCode"],
+                        "title": job["title"],
+                        **({"fuzzyMatch": job["fuzzyMatch"]} if "fuzzyMatch" in job else {}),
+                        "report": report[1],
+                    }
+                    written += 1
+                stream.write(json.dumps(record) + "\n")
+        finally:
+            if output is not None:
+                stream.close()
+
+    duration = time.monotonic() - start_time
+    return {
+        "terms": len(terms),
+        "jobs": len(ncodes),
+        "reports_rendered": len(reports),
+        "written": written,
+        "not_found": list(dict.fromkeys(missing)),
+        "output": str(output) if output is not None else "stdout",
+        "resolve_seconds": round(resolve_seconds, 2),
+        "duration_seconds": round(duration, 2),
+        "reports_per_second": round(len(reports) / duration, 1) if duration else None,
+    }
+
+
+def main():
+    """
+    Command-line entry point: prints one job report, or writes reports for a batch
+    of search terms read from a file or stdin (--batch).
+    """
+    parser = argparse.ArgumentParser(
+        description="Generate DOT job reports by DOT code (e.g. 001.061-010 or 001061010) or job title"
+    )
+    parser.add_argument("search_term", nargs="?", help="DOT code or job title (e.g. 'Architect')")
+    parser.add_argument(
+        "--batch", metavar="FILE", help="File of search terms, one per line ('-' for stdin)"
+    )
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="Batch output: .ndjson/.jsonl file or a directory of .txt reports (default: NDJSON on stdout)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Batch worker processes (default: CPU count)"
+    )
+    parser.add_argument(
+        "--format",
+        choices=["text", "markdown", "json", "html"],
+        default="text",
+        help="Single report format: analyzed text report (default), or the DOT record as markdown, json or html",
+    )
     # Assumes DOT.db is in the same directory as this script
-    db_file_path = Path(__file__).parent / "DOT.db"
+    parser.add_argument(
+        "--db-path", default=str(Path(__file__).parent / "DOT.db"), help="Path to the DOT SQLite database file"
+    )
+    args = parser.parse_args()
+    if (args.search_term is None) == (args.batch is None):
+        parser.error("Give either a search term or --batch FILE.")
+
+    db_file_path = Path(args.db_path)
 
     if not db_file_path.exists():
-        print(f"Error: Database file not found at {db_file_path}")
-        print("Please ensure the DOT.db file is in the correct location.")
+        print(f"Error: Database file not found at {db_file_path}", file=sys.stderr)
+        print("Please ensure the DOT.db file is in the correct location.", file=sys.stderr)
         sys.exit(1)
 
     try:
-        # Configure logging
+        # Configure logging (stderr, so NDJSON on stdout stays clean)
         logging.basicConfig(level=logging.INFO)
 
         # Import DatabaseHandler here for standalone use
         from .db_handler import DatabaseHandler
 
         db = DatabaseHandler(db_file_path)
-        print(f"Connected to database: {db_file_path}")
+
+        if args.batch is not None:
+            terms = read_search_terms(args.batch)
+            if not terms:
+                print("Error: No search terms to process.", file=sys.stderr)
+                sys.exit(1)
+            summary = run_batch(
+                db,
+                terms,
+                output=Path(args.output) if args.output else None,
+                workers=args.workers,
+            )
+            print(json.dumps(summary, indent=2), file=sys.stderr)
+            return
+
+        search_term = args.search_term
+        if args.format == "text":
+            print(f"Connected to database: {db_file_path}")
 
         # Use the local get_job_data function
         job_data = get_job_data(db, search_term)
 
-        if job_data:
-            # Pass the potentially re-mapped job_data to the formatting function
+        if job_data and args.format != "text":
+            print(format_job_report(job_data, args.format))
+        elif job_data:
+            # Analyze the row and format the report, as the generate_job_report tool does
             try:
-                report = generate_formatted_job_report(job_data)
+                analysis = get_job_analysis(job_data)
+                if "error" in analysis:
+                    raise ValueError(analysis["error"])
+                report = generate_formatted_job_report(analysis)
                 print(report)
 
                 # Print cache stats
@@ -251,11 +496,11 @@ def main():
         else:
             print(f"No job data found for search term: {search_term}")
             sys.exit(1)
-    except FileNotFoundError:
-        print(f"Error: Database file not found at {db_file_path}")
+    except FileNotFoundError as e:
+        print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
     except Exception as e:
-        print(f"An unexpected error occurred: {e}")
+        print(f"An unexpected error occurred: {e}", file=sys.stderr)
         sys.exit(1)
 
 
@@ -0,0 +1,419 @@
+# group_index.py
+
+"""
+GOE and occupational-group hierarchies over the DOT with per-node statistics.
+
+Two hierarchies are built from the DOT table:
+
+    - "goe": Guide for Occupational Exploration codes from each job's primary
+      GOE code (GOE1, else GOE): interest area ("05"), work group ("05.02")
+      and subgroup ("05.02.01"). Interest area titles come from
+      config.goe_interest_area_map, other titles from the goedb table when it
+      is populated.
+    - "occupation": the DOT code's occupational classification: category
+      (first digit; 0 and 1 share "0-1"), division (two digits, "20") and
+      group (three digits, "209"). Division titles come from the OccGroup column.
+
+Every node stores a strength x SVP histogram of its jobs (6 x 10 counts,
+index 0 for missing values). Any count by exertion and skill ("unskilled
+sedentary jobs in GOE 05") is then the sum of a slice of one small array, for
+the node and each of its children, without touching the DOT rows.
+
+The index is built once per DatabaseHandler (milliseconds for the full DOT).
+"""
+
+import logging
+import re
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from . import config
+from .hot_reload import PerHandlerCache
+from .models import DotCode
+
+logger = logging.getLogger(__name__)
+
+HIERARCHIES = ("goe", "occupation")
+LEVELS = {
+    "goe": ("interest_area", "work_group", "subgroup"),
+    "occupation": ("category", "division", "group"),
+}
+MAX_JOBS_LISTED = 200  # Jobs returned by browse_job_groups with include_jobs
+
+# DOT occupational categories (first digit of the code)
+DOT_CATEGORIES = {
+    "0-1": "Professional, technical, and managerial occupations",
+    "2": "Clerical and sales occupations",
+    "3": "Service occupations",
+    "4": "Agricultural, fishery, forestry, and related occupations",
+    "5": "Processing occupations",
+    "6": "Machine trades occupations",
+    "7": "Benchwork occupations",
+    "8": "Structural work occupations",
+    "9": "Miscellaneous occupations",
+}
+
+# SVP levels per skill level ("unskilled": (1, 2), ...)
+SKILL_LEVEL_SVPS: Dict[str, Tuple[int, ...]] = {
+    level.lower(): tuple(svp for svp, name in sorted(config.svp_to_skill_level.items()) if name == level)
+    for level in config.svp_to_skill_level.values()
+}
+SEDENTARY = next(num for num, code in config.strength_num_to_code.items() if code == "S")
+
+_NON_DIGIT = re.compile(r"\D")
+_OCC_GROUP = re.compile(r"^\s*(\d{2})\s+(.+?)\s*$")
+
+
+def normalize_goe_code(value: Any) -> Optional[str]:
+    """
+    Normalizes a GOE code or prefix to dotted pairs ("5" -> "05", "050201" -> "05.02.01").
+
+    Returns None for values without digits or with more than six.
+    """
+    if value is None:
+        return None
+    if isinstance(value, float):
+        whole, fraction = f"{value:.4f}".split(".")
+        digits = whole.zfill(2) + fraction.rstrip("0")
+        if len(digits) % 2:
+            digits += "0"
+    else:
+        digits = _NON_DIGIT.sub("", str(value))
+        if len(digits) % 2:
+            digits = digits.zfill(len(digits) + 1)
+    if not digits or len(digits) > 6:
+        return None
+    return ".".join(digits[i : i + 2] for i in range(0, len(digits), 2))
+
+
+def occupation_path(ncode: int) -> Tuple[str, str, str]:
+    """Returns the (category, division, group) codes of an Ncode."""
+    digits = f"{int(ncode):09d}"
+    category = "0-1" if digits[0] in "01" else digits[0]
+    return category, digits[:2], digits[:3]
+
+
+def normalize_occupation_code(value: Any) -> str:
+    """
+    Normalizes an occupational classification code: a category ("0-1", "2"),
+    division ("20") or group ("209").
+
+    Raises:
+        ValueError: If the code is not one of those forms.
+    """
+    text = str(value).strip()
+    if text in DOT_CATEGORIES:
+        return text
+    digits = _NON_DIGIT.sub("", text)
+    if len(digits) == 1:
+        return "0-1" if digits in "01" else digits
+    if len(digits) in (2, 3):
+        return digits
+    raise ValueError(
+        f"Invalid occupation code '{value}'. Use a category (e.g. '2' or '0-1'), "
+        f"division (e.g. '20') or group (e.g. '209')."
+    )
+
+
+def svp_levels(max_svp: Optional[int] = None, skill_level: Optional[str] = None) -> Optional[Tuple[int, ...]]:
+    """
+    Returns the SVP levels allowed by an SVP limit and a skill level, or None for no limit.
+
+    Raises:
+        ValueError: If the skill level is unknown.
+    """
+    if max_svp is None and not skill_level:
+        return None
+    levels = set(range(1, 10 if max_svp is None else max_svp + 1))
+    if skill_level:
+        key = str(skill_level).strip().lower().replace("_", "-").replace(" ", "-")
+        if key not in SKILL_LEVEL_SVPS:
+            raise ValueError(
+                f"Invalid skill_level '{skill_level}'. Use one of: {', '.join(SKILL_LEVEL_SVPS)}."
+            )
+        levels &= set(SKILL_LEVEL_SVPS[key])
+    return tuple(sorted(levels))
+
+
+@dataclass
+class _Node:
+    code: Optional[str]
+    title: Optional[str]
+    level: str
+    parent: Optional[str] = None
+    children: List[str] = field(default_factory=list)
+    counts: Any = None  # numpy int32 array, strength (0-5) x SVP (0-9)
+    ncodes: List[int] = field(default_factory=list)
+
+
+class GroupIndex:
+    """GOE and occupational hierarchies with a strength x SVP histogram per node."""
+
+    def __init__(self, rows: Iterable[Dict[str, Any]], goe_titles: Optional[Dict[str, str]] = None):
+        """
+        Builds both hierarchies.
+
+        Args:
+            rows: DOT rows with Ncode, Title, StrengthNum, SVPNum, GOE, GOE1 and OccGroup.
+            goe_titles: Titles by GOE code or prefix (e.g. the goedb table).
+        """
+        import numpy as np
+
+        goe_titles = {
+            normalized: title
+            for code, title in (goe_titles or {}).items()
+            if (normalized := normalize_goe_code(code)) and title
+        }
+        for area, title in config.goe_interest_area_map.items():
+            goe_titles.setdefault(area, title)
+
+        self._nodes: Dict[str, Dict[Optional[str], _Node]] = {
+            "goe": {None: _Node(None, "All GOE interest areas", "root")},
+            "occupation": {None: _Node(None, "All DOT occupational categories", "root")},
+        }
+        self.titles: Dict[int, str] = {}
+        self.job_traits: Dict[int, Tuple[int, int]] = {}
+        division_names: Dict[str, Counter] = defaultdict(Counter)
+        paths: Dict[str, List[Tuple[int, int, int, Tuple[str, ...]]]] = {"goe": [], "occupation": []}
+
+        for row in rows:
+            ncode = row.get("Ncode")
+            if ncode is None:
+                continue
+            ncode = int(ncode)
+            strength = row.get("StrengthNum") or 0
+            svp = row.get("SVPNum") or 0
+            strength = strength if 0 < strength <= 5 else 0
+            svp = svp if 0 < svp <= 9 else 0
+            self.titles[ncode] = row.get("Title") or ""
+            self.job_traits[ncode] = (strength, svp)
+
+            paths["occupation"].append((ncode, strength, svp, occupation_path(ncode)))
+            match = _OCC_GROUP.match(row.get("OccGroup") or "")
+            if match:
+                division_names[match.group(1)][match.group(2)] += 1
+
+            goe = normalize_goe_code(row.get("GOE1") or row.get("GOE"))
+            if goe is not None:
+                parts = goe.split(".")
+                paths["goe"].append(
+                    (ncode, strength, svp, tuple(".".join(parts[: i + 1]) for i in range(len(parts))))
+                )
+
+        titles = {
+            "goe": goe_titles,
+            "occupation": {
+                **DOT_CATEGORIES,
+                **{code: names.most_common(1)[0][0] for code, names in division_names.items()},
+            },
+        }
+        for hierarchy, hierarchy_paths in paths.items():
+            nodes = self._nodes[hierarchy]
+            nodes[None].counts = np.zeros((6, 10), dtype=np.int32)
+            for ncode, strength, svp, path in hierarchy_paths:
+                nodes[None].counts[strength, svp] += 1
+                parent = None
+                for depth, code in enumerate(path):
+                    node = nodes.get(code)
+                    if node is None:
+                        node = nodes[code] = _Node(
+                            code, titles[hierarchy].get(code), LEVELS[hierarchy][depth], parent,
+                            counts=np.zeros((6, 10), dtype=np.int32),
+                        )
+                        nodes[parent].children.append(code)
+                    node.counts[strength, svp] += 1
+                    node.ncodes.append(ncode)
+                    parent = code
+            for node in nodes.values():
+                node.children.sort()
+
+    @classmethod
+    def from_database(cls, db: Any) -> "GroupIndex":
+        """Builds the index from a DatabaseHandler's DOT and goedb tables."""
+        started = time.perf_counter()
+        rows = db.execute_select_query(
+            "SELECT Ncode, Title, StrengthNum, SVPNum, GOE, GOE1, OccGroup FROM DOT"
+        )
+        try:
+            goe_rows = db.execute_select_query("SELECT GOE, Title FROM goedb")
+        except Exception as e:  # The goedb table is optional
+            logger.warning(f"Could not read GOE titles from goedb: {e}")
+            goe_rows = []
+        index = cls(rows, {row["GOE"]: row["Title"] for row in goe_rows})
+        logger.info(
+            f"Built group index: {len(index._nodes['goe']) - 1} GOE and "
+            f"{len(index._nodes['occupation']) - 1} occupational groups for {len(index.titles)} jobs "
+            f"in {time.perf_counter() - started:.2f}s."
+        )
+        return index
+
+    def _node(self, hierarchy: str, code: Optional[str]) -> _Node:
+        """
+        Looks up a node by hierarchy and code (None for the root).
+
+        Raises:
+            ValueError: If the hierarchy or code is unknown.
+        """
+        if hierarchy not in self._nodes:
+            raise ValueError(f"Unknown hierarchy '{hierarchy}'. Use one of: {', '.join(HIERARCHIES)}.")
+        if code is not None and str(code).strip():
+            if hierarchy == "goe":
+                normalized = normalize_goe_code(code)
+                if normalized is None:
+                    raise ValueError(f"Invalid GOE code '{code}'. Use e.g. '05', '05.02' or '05.02.01'.")
+            else:
+                normalized = normalize_occupation_code(code)
+        else:
+            normalized = None
+        node = self._nodes[hierarchy].get(normalized)
+        if node is None:
+            raise ValueError(f"No DOT jobs are in {hierarchy} group '{normalized}'.")
+        return node
+
+    @staticmethod
+    def _slice(max_strength: Optional[int], svps: Optional[Iterable[int]]) -> Tuple[Any, Any]:
+        """Histogram rows and columns selected by the filters (missing values excluded when filtered)."""
+        rows = slice(1, max_strength + 1) if max_strength is not None else slice(None)
+        columns = sorted(svps) if svps is not None else slice(None)
+        return rows, columns
+
+    def _stats(self, node: _Node) -> Dict[str, Any]:
+        counts = node.counts
+        by_strength = counts.sum(axis=1)
+        by_svp = counts.sum(axis=0)
+        unskilled = list(SKILL_LEVEL_SVPS.get("unskilled", ()))
+        return {
+            "jobs": int(counts.sum()),
+            "byStrength": {
+                code: int(by_strength[num]) for num, code in config.strength_num_to_code.items() if by_strength[num]
+            },
+            "bySvp": {str(svp): int(by_svp[svp]) for svp in range(1, 10) if by_svp[svp]},
+            "unskilled": int(counts[:, unskilled].sum()),
+            "sedentaryUnskilled": int(counts[SEDENTARY, unskilled].sum()),
+        }
+
+    def _path(self, hierarchy: str, node: _Node) -> List[Dict[str, Any]]:
+        path = []
+        while node.parent is not None:
+            node = self._nodes[hierarchy][node.parent]
+            path.append({"code": node.code, "title": node.title, "level": node.level})
+        return path[::-1]
+
+    def browse(
+        self,
+        hierarchy: str,
+        code: Optional[str] = None,
+        include_jobs: bool = False,
+        max_strength: Optional[int] = None,
+        svps: Optional[Iterable[int]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Returns a node's statistics, its ancestors and its children's statistics.
+
+        Args:
+            hierarchy: "goe" or "occupation".
+            code: Group code; None for the top level.
+            include_jobs: Also list the node's jobs (up to MAX_JOBS_LISTED),
+                          filtered by max_strength and svps.
+            max_strength: StrengthNum limit for the listed jobs.
+            svps: SVP levels of the listed jobs.
+
+        Raises:
+            ValueError: If the hierarchy or code is unknown.
+        """
+        node = self._node(hierarchy, code)
+        nodes = self._nodes[hierarchy]
+        result: Dict[str, Any] = {
+            "hierarchy": hierarchy,
+            "node": {"code": node.code, "title": node.title, "level": node.level, **self._stats(node)},
+            "path": self._path(hierarchy, node),
+            "children": [],
+        }
+        for child in (nodes[child_code] for child_code in node.children):
+            stats = self._stats(child)
+            result["children"].append(
+                {
+                    "code": child.code,
+                    "title": child.title,
+                    "level": child.level,
+                    "jobs": stats["jobs"],
+                    "unskilled": stats["unskilled"],
+                    "sedentaryUnskilled": stats["sedentaryUnskilled"],
+                }
+            )
+        if include_jobs:
+            if node.code is None:
+                raise ValueError("Choose a group code to list its jobs.")
+            svp_set = set(svps) if svps is not None else None
+            jobs = []
+            for ncode in sorted(node.ncodes):
+                strength, svp = self.job_traits[ncode]
+                if max_strength is not None and not 0 < strength <= max_strength:
+                    continue
+                if svp_set is not None and svp not in svp_set:
+                    continue
+                jobs.append(
+                    {
+                        "dotCode": DotCode.format(ncode),
+                        "jobTitle": self.titles[ncode],
+                        "strength": config.strength_num_to_code.get(strength),
+                        "svp": svp or None,
+                    }
+                )
+            result["matchingJobs"] = len(jobs)
+            result["jobs"] = jobs[:MAX_JOBS_LISTED]
+        return result
+
+    def aggregate(
+        self,
+        hierarchy: str,
+        code: Optional[str] = None,
+        max_strength: Optional[int] = None,
+        svps: Optional[Iterable[int]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Counts the jobs of a node and of each child that meet exertion and SVP limits.
+
+        Args:
+            hierarchy: "goe" or "occupation".
+            code: Group code; None for the top level.
+            max_strength: Only count jobs with StrengthNum at or below this (1-5).
+            svps: Only count jobs with one of these SVP levels.
+
+        Returns:
+            Dictionary with the node, its matching and total job counts, and its
+            children with matching jobs, most matches first.
+
+        Raises:
+            ValueError: If the hierarchy or code is unknown.
+        """
+        node = self._node(hierarchy, code)
+        rows, columns = self._slice(max_strength, svps)
+        nodes = self._nodes[hierarchy]
+        children = []
+        for child in (nodes[child_code] for child_code in node.children):
+            count = int(child.counts[rows, columns].sum())
+            if count:
+                children.append(
+                    {"code": child.code, "title": child.title, "count": count, "jobs": int(child.counts.sum())}
+                )
+        children.sort(key=lambda child: (-child["count"], child["code"]))
+        return {
+            "hierarchy": hierarchy,
+            "code": node.code,
+            "title": node.title,
+            "level": node.level,
+            "count": int(node.counts[rows, columns].sum()),
+            "jobs": int(node.counts.sum()),
+            "children": children,
+        }
+
+
+_indexes = PerHandlerCache(GroupIndex.from_database)
+
+
+def get_group_index(db: Any) -> GroupIndex:
+    """Returns the group index for a database handler, building it on first use."""
+    return _indexes.get(db)
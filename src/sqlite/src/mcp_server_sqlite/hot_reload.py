@@ -0,0 +1,304 @@
+# hot_reload.py
+
+"""
+Hot reload of the DOT database, the BLS workbook and reference JSON files.
+
+The server keeps its data handlers in a HandlerRegistry. Each tool call reads
+one consistent Handlers snapshot from the registry when it starts. SourceWatcher
+polls the watched files. When one changes, it builds the replacement handlers
+in a worker thread (loading, snapshotting and cache warm-up included) and swaps
+them into the registry in one assignment. In-flight requests finish on the old
+handlers and new requests see the new ones.
+
+Only caches tied to the changed source are invalidated:
+    - DOT.db: new DatabaseHandler, AnalysisStore and ReportStore. Row caches
+      and indexes are kept per handler and dropped with the old one. A file change
+      made only by this process's own writes (report caching, builds) is
+      ignored without rereading the file, and one that leaves the DOT table
+      identical (e.g. another process's side-table writes) is ignored too.
+    - BLS workbook: new BLSExcelHandler.
+    - reference_json: the module that loads the changed file reloads it. If the
+      file feeds job analyses, the analysis version is recomputed.
+
+Indexes and other values derived from a DatabaseHandler live in a
+PerHandlerCache, so they are dropped together with the handler they were
+built from.
+"""
+
+import asyncio
+import dataclasses
+import logging
+import threading
+import weakref
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import analysis_utils, job_obsolescence, soc_crosswalk, tsa_logic
+from .analysis_store import AnalysisStore, compute_dot_table_fingerprint
+from .db_handler import DatabaseHandler
+from .excel_handler import BLSExcelHandler
+from .report_store import ReportStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = 2.0  # Seconds between file checks
+
+FileState = Optional[Tuple[int, int, int]]  # (mtime_ns, size, inode), None if missing
+WarmUpFunction = Callable[[Dict[str, Any]], None]
+
+
+@dataclass(frozen=True)
+class Handlers:
+    """The set of data handlers used to serve one request."""
+
+    db: DatabaseHandler
+    analysis_store: AnalysisStore
+    report_store: ReportStore
+    bls_handler: Optional[BLSExcelHandler] = None
+
+
+class HandlerRegistry:
+    """Holds the current Handlers; replacements are swapped in atomically."""
+
+    def __init__(self, handlers: Handlers):
+        self._current = handlers
+        self._lock = threading.Lock()
+
+    @property
+    def current(self) -> Handlers:
+        return self._current
+
+    def swap(self, **changes: Any) -> Handlers:
+        """Replaces some handlers, keeping the others, and returns the new set."""
+        with self._lock:
+            self._current = dataclasses.replace(self._current, **changes)
+            return self._current
+
+
+class PerHandlerCache:
+    """
+    One value per handler (e.g. an index per DatabaseHandler), built on first use.
+
+    Values are weakly keyed by the handler, so a hot-reloaded database gets fresh
+    values and the old ones are freed with the old handler.
+    """
+
+    def __init__(self, build: Callable[[Any], Any]):
+        """
+        Args:
+            build: Called with a handler to build its value (e.g. Index.from_database).
+        """
+        self._build = build
+        self._values: "weakref.WeakKeyDictionary[Any, Any]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def get(self, handler: Any) -> Any:
+        """Returns the value for a handler, building it once even under concurrent calls."""
+        value = self._values.get(handler)
+        if value is not None:
+            return value
+        with self._lock:
+            value = self._values.get(handler)
+            if value is None:
+                value = self._build(handler)
+                self._values[handler] = value
+            return value
+
+
+def build_database_handlers(
+    db_path: Path, in_memory: bool = False, warm_up: Optional[WarmUpFunction] = None
+) -> Dict[str, Any]:
+    """
+    Builds a DatabaseHandler and its stores, ready to serve requests.
+
+    The analysis version check and cache warm-up run here, so the first
+    requests after a swap are not slower than before it.
+
+    Args:
+        db_path: Path to the DOT database file.
+        in_memory: Whether the DatabaseHandler uses the in-memory snapshot mode.
+        warm_up: Called with the new handlers (as swap() keyword arguments) to warm their caches.
+
+    Returns:
+        Keyword arguments for HandlerRegistry.swap().
+    """
+    db = DatabaseHandler(db_path, in_memory=in_memory)
+    analysis_store = AnalysisStore(db)
+    analysis_store.is_available()
+    handlers = {
+        "db": db,
+        "analysis_store": analysis_store,
+        "report_store": ReportStore(db, analysis_store),
+    }
+    if warm_up is not None:
+        warm_up(handlers)
+    return handlers
+
+
+def build_bls_handler(excel_path: Path) -> Optional[BLSExcelHandler]:
+    """Loads a new BLSExcelHandler (not the singleton), or None if the file is missing."""
+    if not excel_path.is_file():
+        logger.warning(f"BLS Excel file not found: {excel_path}. BLS tools will be unavailable.")
+        return None
+    return BLSExcelHandler(excel_path)
+
+
+# Reference JSON file name -> (reload function, whether it feeds job analyses)
+REFERENCE_RELOADERS: Dict[str, Tuple[Callable[[], None], bool]] = {
+    job_obsolescence.JSON_FILE_PATH.name: (
+        job_obsolescence.reload_obsolescence_data,
+        True,
+    ),
+    tsa_logic.GRID_RULES_PATH.name: (tsa_logic.reload_reference_data, False),
+    tsa_logic.SSR_82_41_PATH.name: (tsa_logic.reload_reference_data, False),
+    "tsa_analysis.json": (analysis_utils.reload_tsa_data, False),
+}
+
+
+def preload_reference_data() -> None:
+    """Loads the reference data that modules otherwise load on first use (run after startup)."""
+    job_obsolescence.get_obsolescence_data()
+    tsa_logic.ensure_reference_data()
+    analysis_utils.get_tsa_data()
+    soc_crosswalk.get_crosswalk()
+
+
+def _file_state(path: Path) -> FileState:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+class SourceWatcher:
+    """Polls the data sources and reloads the affected handlers when they change."""
+
+    def __init__(
+        self,
+        registry: HandlerRegistry,
+        db_path: Path,
+        excel_path: Path,
+        reference_dir: Path,
+        in_memory: bool = False,
+        warm_up: Optional[WarmUpFunction] = None,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+    ):
+        """
+        Initializes the SourceWatcher.
+
+        Args:
+            registry: The registry whose handlers are replaced on reload.
+            db_path: Path to the DOT database file.
+            excel_path: Path to the BLS workbook.
+            reference_dir: Directory containing the reference JSON files.
+            in_memory: Whether new DatabaseHandlers use the in-memory snapshot mode.
+            warm_up: Warms the caches of newly built database handlers.
+            poll_interval: Seconds between checks.
+        """
+        self.registry = registry
+        self.db_path = Path(db_path)
+        self.excel_path = Path(excel_path)
+        self.reference_dir = Path(reference_dir)
+        self.in_memory = in_memory
+        self.warm_up = warm_up
+        self.poll_interval = poll_interval
+        self._states = self._collect_states()
+
+    def _reference_files(self) -> List[Path]:
+        return sorted(self.reference_dir.glob("*.json"))
+
+    def _collect_states(self) -> Dict[Path, FileState]:
+        paths = [self.db_path, self.excel_path, *self._reference_files()]
+        return {path: _file_state(path) for path in paths}
+
+    def check_once(self) -> List[str]:
+        """
+        Checks all sources once and reloads the ones that changed.
+
+        Returns:
+            Names of the sources that were reloaded.
+        """
+        previous_states, new_states = self._states, self._collect_states()
+        changed = [
+            path
+            for path in set(self._states) | set(new_states)
+            if self._states.get(path) != new_states.get(path)
+        ]
+        self._states = new_states
+        reloaded: List[str] = []
+
+        for path in sorted(changed):
+            try:
+                if path == self.db_path:
+                    if self._reload_database(previous_states.get(path)):
+                        reloaded.append(path.name)
+                elif path == self.excel_path:
+                    self._reload_bls()
+                    reloaded.append(path.name)
+                elif path.parent == self.reference_dir:
+                    if self._reload_reference(path):
+                        reloaded.append(path.name)
+            except Exception as e:
+                # Keep serving the previous handlers; retry on the next change
+                logger.error(f"Hot reload of {path} failed: {e}", exc_info=True)
+        return reloaded
+
+    def _reload_database(self, previous_state: FileState) -> bool:
+        new_state = self._states.get(self.db_path)
+        if new_state is None:
+            logger.warning(f"Database file {self.db_path} is missing; keeping current handlers.")
+            return False
+
+        # Report caching writes to the file on ordinary requests; skip hashing the DOT table for those
+        if previous_state is not None and self.registry.current.db.changed_only_by_own_writes(
+            previous_state[:2], new_state[:2]
+        ):
+            logger.debug("Database file changed only by this process's own writes; not reloading.")
+            return False
+
+        current_fingerprint = self.registry.current.analysis_store.dot_fingerprint()
+        if compute_dot_table_fingerprint(self.db_path) == current_fingerprint:
+            logger.debug("Database file changed but the DOT table is unchanged; not reloading.")
+            return False
+
+        logger.info(f"DOT table in {self.db_path} changed; building new database handlers.")
+        self.registry.swap(
+            **build_database_handlers(self.db_path, self.in_memory, self.warm_up)
+        )
+        logger.info("Swapped in new database handlers.")
+        return True
+
+    def _reload_bls(self) -> None:
+        logger.info(f"BLS workbook {self.excel_path} changed; loading new handler.")
+        bls_handler = build_bls_handler(self.excel_path)
+        BLSExcelHandler.replace_instance(bls_handler)
+        self.registry.swap(bls_handler=bls_handler)
+        logger.info("Swapped in new BLS handler.")
+
+    def _reload_reference(self, path: Path) -> bool:
+        reloader = REFERENCE_RELOADERS.get(path.name)
+        if reloader is None:
+            logger.debug(f"Reference file {path.name} changed; it is not loaded by the server.")
+            return False
+        reload_function, feeds_analyses = reloader
+        logger.info(f"Reference file {path.name} changed; reloading.")
+        reload_function()
+        if feeds_analyses:
+            # Stored analyses/reports embed this data; recompute the version so they go stale
+            self.registry.current.analysis_store.invalidate(dot_changed=False)
+        return True
+
+    async def run(self) -> None:
+        """Polls until cancelled, doing the file checks and reloads off the event loop."""
+        logger.info(
+            f"Watching {self.db_path.name}, {self.excel_path.name} and {self.reference_dir} for changes."
+        )
+        # Fingerprint the DOT table now, so a later change can be told apart from side-table writes
+        await asyncio.to_thread(self.registry.current.analysis_store.dot_fingerprint)
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            reloaded = await asyncio.to_thread(self.check_once)
+            if reloaded:
+                logger.info(f"Hot reload complete: {', '.join(reloaded)}")
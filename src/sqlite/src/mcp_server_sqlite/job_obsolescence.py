@@ -1,7 +1,7 @@
 import json
 import logging
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 # Setup logger
 logger = logging.getLogger(__name__)
@@ -9,36 +9,74 @@ logger = logging.getLogger(__name__)
 # Define the path to the JSON file relative to this script
 JSON_FILE_PATH = Path(__file__).parent / "reference_json" / "obsolete_out_dated.json"
 
-# Load the obsolescence data once when the module is imported
-OBSOLETE_JOBS_DATA: Optional[List[Dict[str, Any]]] = None
-OBSOLETE_JOBS_DICT: Dict[str, Dict[str, Any]] = {}
-
-try:
-    with open(JSON_FILE_PATH, "r") as f:
-        OBSOLETE_JOBS_DATA = json.load(f)
-        # Create a dictionary for faster lookups by DOT code
-        if OBSOLETE_JOBS_DATA is not None:  # Check if data was loaded
-            for job in OBSOLETE_JOBS_DATA:
-                if "DOT Code" in job and isinstance(job, dict):
-                    OBSOLETE_JOBS_DICT[job["DOT Code"]] = job
-        else:
-            logger.warning(
-                f"JSON data from {JSON_FILE_PATH} was loaded as None. Obsolescence dictionary will be empty."
-            )
-    logger.info(f"Successfully loaded obsolescence data from {JSON_FILE_PATH}")
-except FileNotFoundError:
-    logger.error(
-        f"Obsolescence JSON file not found at {JSON_FILE_PATH}. Obsolescence check will not work."
-    )
-    OBSOLETE_JOBS_DATA = None  # Ensure it's None if loading fails
-except json.JSONDecodeError:
-    logger.error(
-        f"Error decoding JSON from {JSON_FILE_PATH}. Obsolescence check will not work."
-    )
-    OBSOLETE_JOBS_DATA = None
-except Exception as e:
-    logger.error(f"An unexpected error occurred loading {JSON_FILE_PATH}: {e}")
-    OBSOLETE_JOBS_DATA = None
+
+def load_obsolescence_data() -> Tuple[Optional[List[Dict[str, Any]]], Dict[str, Dict[str, Any]]]:
+    """
+    Loads the obsolescence reference data.
+
+    Returns:
+        Tuple of (raw job list or None on failure, lookup dict keyed by DOT code).
+    """
+    jobs_data: Optional[List[Dict[str, Any]]] = None
+    jobs_dict: Dict[str, Dict[str, Any]] = {}
+    try:
+        with open(JSON_FILE_PATH, "r") as f:
+            jobs_data = json.load(f)
+            # Create a dictionary for faster lookups by DOT code
+            if jobs_data is not None:  # Check if data was loaded
+                for job in jobs_data:
+                    if "DOT Code" in job and isinstance(job, dict):
+                        jobs_dict[job["DOT Code"]] = job
+            else:
+                logger.warning(
+                    f"JSON data from {JSON_FILE_PATH} was loaded as None. Obsolescence dictionary will be empty."
+                )
+        logger.info(f"Successfully loaded obsolescence data from {JSON_FILE_PATH}")
+    except FileNotFoundError:
+        logger.error(
+            f"Obsolescence JSON file not found at {JSON_FILE_PATH}. Obsolescence check will not work."
+        )
+        jobs_data = None  # Ensure it's None if loading fails
+    except json.JSONDecodeError:
+        logger.error(
+            f"Error decoding JSON from {JSON_FILE_PATH}. Obsolescence check will not work."
+        )
+        jobs_data = None
+    except Exception as e:
+        logger.error(f"An unexpected error occurred loading {JSON_FILE_PATH}: {e}")
+        jobs_data = None
+    return jobs_data, jobs_dict
+
+
+# Loaded on first use (not at import) so server startup does not parse it
+_OBSOLESCENCE_DATA: Optional[
+    Tuple[Optional[List[Dict[str, Any]]], Dict[str, Dict[str, Any]]]
+] = None
+
+
+def get_obsolescence_data() -> Tuple[
+    Optional[List[Dict[str, Any]]], Dict[str, Dict[str, Any]]
+]:
+    """Returns (jobs_data, jobs_dict), loading them on first use."""
+    global _OBSOLESCENCE_DATA
+    if _OBSOLESCENCE_DATA is None:
+        _OBSOLESCENCE_DATA = load_obsolescence_data()
+    return _OBSOLESCENCE_DATA
+
+
+def reload_obsolescence_data() -> None:
+    """Reloads the obsolescence reference data, swapping in the new lookup in one step."""
+    global _OBSOLESCENCE_DATA
+    _OBSOLESCENCE_DATA = load_obsolescence_data()
+
+
+def __getattr__(name: str) -> Any:
+    # Keep OBSOLETE_JOBS_DATA / OBSOLETE_JOBS_DICT available as module attributes
+    if name == "OBSOLETE_JOBS_DATA":
+        return get_obsolescence_data()[0]
+    if name == "OBSOLETE_JOBS_DICT":
+        return get_obsolescence_data()[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def check_job_obsolescence(dot_code: str) -> Dict[str, Any]:
@@ -58,7 +96,8 @@ def check_job_obsolescence(dot_code: str) -> Dict[str, Any]:
     """
     logger.debug(f"Checking obsolescence references for DOT code: {dot_code}")
 
-    if OBSOLETE_JOBS_DATA is None:
+    jobs_data, jobs_dict = get_obsolescence_data()
+    if jobs_data is None:
         return {
             "dot_code": dot_code,
             "reference_status": "Error",
@@ -69,7 +108,7 @@ def check_job_obsolescence(dot_code: str) -> Dict[str, Any]:
     # A more robust function could handle variations if needed.
     normalized_dot_code = dot_code.strip()
 
-    obsolete_info = OBSOLETE_JOBS_DICT.get(normalized_dot_code)
+    obsolete_info = jobs_dict.get(normalized_dot_code)
 
     if obsolete_info:
         logger.info(
@@ -0,0 +1,518 @@
+# occupational_base.py
+
+"""
+Remaining occupational base for an RFC over the whole DOT.
+
+An RFC (same structure as the hypothetical limits of
+ve_logic.perform_consistency_check) selects a base of jobs by exertion and SVP
+(unskilled, SVP 1-2, unless mental.svp says otherwise). Each further limitation
+(postural, manipulative, visual, sensory, environmental and mental GED limits)
+removes the jobs that need more than it allows. The result gives the base, what
+remains after all limitations, and for each limitation the jobs it excludes,
+as a share of the base and on its own (excluded by no other limitation).
+
+Every limit is a bitset of the jobs needing at most that level, taken from the
+database's bitmap index (bitmap_index.py), so a whole RFC is a handful of ANDs
+and popcounts over ~1.6 KB arrays. The same bitsets screen cited jobs against
+the RFC with one bit test per limitation.
+
+Job numbers are approximate: each SOC's BLS employment is shared equally among
+the DOT codes the crosswalk maps to it, and each job's estimate is the sum of
+its shares. The DOT does not say how workers split between the DOT occupations
+of one SOC.
+"""
+
+import logging
+import math
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import config
+from .analysis_utils import validate_dot_code
+from .bitmap_index import BitmapIndex, get_bitmap_index, popcount
+from .excel_handler import BLSExcelHandlerError
+from .hot_reload import PerHandlerCache
+from .models import DotCode
+from .soc_crosswalk import get_crosswalk
+from .ve_logic import INSTRUCTION_MAX_GEDR
+
+logger = logging.getLogger(__name__)
+
+MAX_JOBS_LISTED = 200  # Remaining jobs returned with include_jobs
+DEFAULT_MAX_SVP = max(svp for svp, level in config.svp_to_skill_level.items() if level == "Unskilled")
+
+RFC_DEMAND_SECTIONS = ("postural", "manipulative", "visual", "sensory", "environmental")
+FREQUENCY_COLUMNS = tuple(config.physical_demand_api_keys_to_labels) + tuple(
+    column for column in config.environmental_condition_api_keys_to_labels if column != "NoiseNum"
+)
+MENTAL_COLUMNS = {"svp": "SVPNum", "reasoning": "GEDR", "math": "GEDM", "language": "GEDL"}
+
+# Highest RFC limit per column
+COLUMN_LEVELS: Dict[str, int] = {
+    "StrengthNum": 5,
+    "SVPNum": 9,
+    "GEDR": 6,
+    "GEDM": 6,
+    "GEDL": 6,
+    "NoiseNum": 5,
+    **{column: 4 for column in FREQUENCY_COLUMNS},
+}
+# Columns where a missing value means "not present" rather than "unknown"
+NULL_IS_LOWEST = frozenset(FREQUENCY_COLUMNS) | {"NoiseNum"}
+
+FREQUENCY_VALUES = {
+    **{details["code"].lower(): level for level, details in config.freq_map_detailed.items()},
+    **{details["short"].lower(): level for level, details in config.freq_map_detailed.items()},
+    "never": 1,
+    "none": 1,
+    "occasional": 2,
+    "frequent": 3,
+    "constant": 4,
+}
+
+# RFC wording that names DOT columns without matching a report label
+DEMAND_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "fumes": ("AtmosphereNum",),
+    "pulmonary irritants": ("AtmosphereNum",),
+    "heights": ("HeightNum",),
+    "unprotected heights": ("HeightNum",),
+    "moving machinery": ("MovingNum",),
+    "hazards": ("MovingNum", "HeightNum"),
+    "wetness": ("WetNum",),
+    "humidity": ("WetNum",),
+    "cold": ("ColdNum",),
+    "heat": ("HeatNum",),
+    "taste": ("TastingNum",),
+    "smell": ("TastingNum",),
+}
+
+
+def _demand_key(name: str) -> str:
+    return str(name).strip().lower().replace("_", " ")
+
+
+DEMAND_KEYS: Dict[str, Tuple[str, ...]] = {
+    **{
+        _demand_key(key): (column,)
+        for labels in (config.physical_demand_api_keys_to_labels, config.environmental_condition_api_keys_to_labels)
+        for column, label in labels.items()
+        for key in (column, label)
+    },
+    **DEMAND_ALIASES,
+}
+
+
+def _level(column: str, value: Any, name: str) -> int:
+    """
+    Parses an RFC limit for a column: a frequency (N/O/F/C, a word or 1-4) or a level number.
+
+    Raises:
+        ValueError: If the value is not a valid limit for the column.
+    """
+    if column in FREQUENCY_COLUMNS and isinstance(value, str) and not value.strip().isdigit():
+        level = FREQUENCY_VALUES.get(value.strip().lower())
+        if level is None:
+            raise ValueError(f"Invalid limit for '{name}': '{value}'. Use N, O, F, C or 1-4.")
+        return level
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f"Invalid limit for '{name}': {value!r}.")
+    try:
+        level = int(value)
+    except ValueError:
+        raise ValueError(f"Invalid limit for '{name}': '{value}'.") from None
+    if not 1 <= level <= COLUMN_LEVELS[column]:
+        raise ValueError(f"Limit for '{name}' must be between 1 and {COLUMN_LEVELS[column]}.")
+    return level
+
+
+def _instruction_level(value: Any) -> int:
+    """
+    Parses an 'instructions' limit (Simple, Detailed or Complex, any case) into a maximum GED-R level.
+
+    Raises:
+        ValueError: If the value is not one of those words.
+    """
+    level = INSTRUCTION_MAX_GEDR.get(value.strip().capitalize()) if isinstance(value, str) else None
+    if level is None:
+        raise ValueError(
+            f"Invalid limit for 'instructions': {value!r}. Use {', '.join(INSTRUCTION_MAX_GEDR)}."
+        )
+    return level
+
+
+def _level_name(column: str, level: int) -> str:
+    if column in FREQUENCY_COLUMNS:
+        details = config.freq_map_detailed[level]
+        return f"{details['code']} ({details['short']})"
+    if column == "NoiseNum":
+        return f"Level {level} ({config.noise_map.get(level, '?')})"
+    return f"Level {level}"
+
+
+def parse_exertional_level(exertional: Dict[str, Any]) -> Tuple[str, int]:
+    """
+    Returns the RFC exertional level name and the highest StrengthNum it allows.
+
+    Raises:
+        ValueError: If the level is missing or unknown.
+    """
+    level = str(exertional.get("level") or "").strip().upper().replace("_", " ")
+    if level in config.strength_code_to_name:
+        level = config.strength_code_to_name[level].upper()
+    codes = config.rfc_to_strength_levels.get(level)
+    if not codes:
+        raise ValueError(
+            f"Invalid exertional level '{exertional.get('level')}'. "
+            f"Use one of: {', '.join(config.rfc_to_strength_levels)}."
+        )
+    strength_nums = {code: num for num, code in config.strength_num_to_code.items()}
+    return level, max(strength_nums[code] for code in codes)
+
+
+def estimate_employment(ncodes: List[int], bls_handler: Any) -> Any:
+    """
+    Estimates employment per job from BLS data through the DOT-SOC crosswalk.
+
+    Each SOC's employment is divided equally among the DOT codes mapped to it,
+    and a job's estimate is the sum of its shares.
+
+    Returns:
+        numpy float64 array aligned with ncodes.
+
+    Raises:
+        BLSExcelHandlerError: If the BLS workbook cannot be queried.
+    """
+    import numpy as np
+
+    crosswalk = get_crosswalk()
+    dots_per_soc: Counter = Counter()
+    for entries in crosswalk.values():
+        dots_per_soc.update({entry["blsOccCode"] for entry in entries if entry.get("blsOccCode")})
+
+    soc_employment: Dict[str, float] = {}
+    employment = np.zeros(len(ncodes), dtype=np.float64)
+    for position, ncode in enumerate(ncodes):
+        socs = {entry["blsOccCode"] for entry in crosswalk.get(DotCode.format(ncode), []) if entry.get("blsOccCode")}
+        for soc in socs:
+            if soc not in soc_employment:
+                rows = bls_handler.query_by_soc_code(soc)
+                total = rows[0].get("employmentTotal") if rows else None
+                soc_employment[soc] = total if isinstance(total, (int, float)) and math.isfinite(total) else 0.0
+            employment[position] += soc_employment[soc] / dots_per_soc[soc]
+    return employment
+
+
+class OccupationalBaseIndex:
+    """RFC limits as bitsets over a BitmapIndex, with employment estimates per BLS workbook."""
+
+    def __init__(self, bitmaps: BitmapIndex):
+        self.bitmaps = bitmaps
+        self.size = bitmaps.size
+        self._employment = PerHandlerCache(self._estimate_employment)
+
+    @classmethod
+    def from_database(cls, db: Any) -> "OccupationalBaseIndex":
+        """Builds the index on the database handler's bitmap index."""
+        return cls(get_bitmap_index(db))
+
+    def at_most(self, column: str, level: int) -> Any:
+        """Returns the packed bitset of jobs needing at most a level of a column."""
+        return self.bitmaps.at_most(column, level, include_missing=column in NULL_IS_LOWEST)
+
+    def employment(self, bls_handler: Any) -> Any:
+        """Returns the per-job employment estimates for a BLS handler, computing them on first use."""
+        return self._employment.get(bls_handler)
+
+    def _estimate_employment(self, bls_handler: Any) -> Any:
+        started = time.perf_counter()
+        estimates = estimate_employment(self.bitmaps.ncodes, bls_handler)
+        logger.info(f"Estimated employment for {self.size} jobs in {time.perf_counter() - started:.2f}s.")
+        return estimates
+
+    def _base(self, rfc: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Parses the RFC's exertional level and SVP limit.
+
+        Returns:
+            (RFC summary, the exertional and SVP limitations defining the base)
+
+        Raises:
+            ValueError: If the RFC is invalid.
+        """
+        if not isinstance(rfc, dict):
+            raise ValueError("rfc must be an object.")
+        exertional = rfc.get("exertional")
+        if not isinstance(exertional, dict):
+            raise ValueError("The RFC needs an 'exertional' section with a 'level'.")
+        level_name, max_strength = parse_exertional_level(exertional)
+        mental = rfc.get("mental") or {}
+        if not isinstance(mental, dict):
+            raise ValueError("RFC section 'mental' must be an object.")
+        max_svp = _level("SVPNum", mental["svp"], "svp") if mental.get("svp") is not None else DEFAULT_MAX_SVP
+        summary = {
+            "exertionalLevel": level_name,
+            "maxStrength": config.strength_num_to_code[max_strength],
+            "maxSvp": max_svp,
+        }
+        base_limits = [
+            {
+                "area": "exertional",
+                "limit": "level",
+                "columns": ["StrengthNum"],
+                "level": config.strength_code_to_name[summary["maxStrength"]],
+                "bits": self.at_most("StrengthNum", max_strength),
+            },
+            {
+                "area": "mental",
+                "limit": "svp",
+                "columns": ["SVPNum"],
+                "level": _level_name("SVPNum", max_svp),
+                "bits": self.at_most("SVPNum", max_svp),
+            },
+        ]
+        return summary, base_limits
+
+    def _limits(self, rfc: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], List[Dict[str, str]]]:
+        """
+        Turns the RFC's demand and mental limits into bitset limitations.
+
+        Returns:
+            (limitations with area, limit, columns, level and bits; limits not applied with the reason)
+
+        Raises:
+            ValueError: If a limit names an unknown demand or has an invalid value.
+        """
+        import numpy as np
+
+        limitations: List[Dict[str, Any]] = []
+        not_applied: List[Dict[str, str]] = []
+        for area in RFC_DEMAND_SECTIONS:
+            section = rfc.get(area) or {}
+            if not isinstance(section, dict):
+                raise ValueError(f"RFC section '{area}' must be an object.")
+            for name, value in section.items():
+                columns = DEMAND_KEYS.get(_demand_key(name))
+                if columns is None:
+                    raise ValueError(f"Unknown {area} limitation '{name}'.")
+                if value is None:
+                    continue
+                level = _level(columns[0], value, name)
+                bits = self.at_most(columns[0], level)
+                for column in columns[1:]:
+                    bits = np.bitwise_and(bits, self.at_most(column, _level(column, value, name)))
+                limitations.append(
+                    {
+                        "area": area,
+                        "limit": name,
+                        "columns": list(columns),
+                        "level": _level_name(columns[0], level),
+                        "bits": bits,
+                    }
+                )
+
+        mental = rfc.get("mental") or {}
+        if not isinstance(mental, dict):
+            raise ValueError("RFC section 'mental' must be an object.")
+        for name, value in mental.items():
+            if value is None or name == "svp":
+                continue
+            if name in MENTAL_COLUMNS:
+                column, level = MENTAL_COLUMNS[name], _level(MENTAL_COLUMNS[name], value, name)
+            elif name == "instructions":
+                column, level = "GEDR", _instruction_level(value)
+            else:
+                not_applied.append({"area": "mental", "limit": name, "reason": "Not coded as a DOT level."})
+                continue
+            limitations.append(
+                {
+                    "area": "mental",
+                    "limit": name,
+                    "columns": [column],
+                    "level": _level_name(column, level),
+                    "bits": self.at_most(column, level),
+                }
+            )
+
+        for name in (rfc.get("exertional") or {}):
+            if name != "level":
+                not_applied.append(
+                    {"area": "exertional", "limit": name, "reason": "The DOT codes exertion only as a strength level."}
+                )
+        return limitations, not_applied
+
+    def _job(self, position: int, employment: Any = None) -> Dict[str, Any]:
+        strength = self.bitmaps.value("StrengthNum", position)
+        job = {
+            "dotCode": DotCode.format(self.bitmaps.ncodes[position]),
+            "jobTitle": self.bitmaps.titles[position],
+            "strength": config.strength_num_to_code.get(strength),
+            "svp": self.bitmaps.value("SVPNum", position),
+        }
+        if employment is not None:
+            job["employment"] = int(round(float(employment[position])))
+        return job
+
+    def compute(
+        self, rfc: Dict[str, Any], include_jobs: bool = False, employment: Any = None
+    ) -> Dict[str, Any]:
+        """
+        Computes the occupational base and remaining base for an RFC.
+
+        Args:
+            rfc: RFC with an 'exertional' level and optional 'postural', 'manipulative',
+                 'visual', 'sensory', 'environmental' and 'mental' limits.
+            include_jobs: Also list the remaining jobs (up to MAX_JOBS_LISTED).
+            employment: Per-job employment estimates (see employment()), or None.
+
+        Returns:
+            Dictionary with the base, the remaining base and the erosion per limitation.
+
+        Raises:
+            ValueError: If the RFC is invalid.
+        """
+        import numpy as np
+
+        summary, base_limits = self._base(rfc)
+        base = np.bitwise_and(base_limits[0]["bits"], base_limits[1]["bits"])
+        limitations, not_applied = self._limits(rfc)
+        remaining = base
+        for limitation in limitations:
+            remaining = np.bitwise_and(remaining, limitation["bits"])
+
+        base_jobs = popcount(base)
+        remaining_jobs = popcount(remaining)
+
+        def share(count: int) -> Optional[float]:
+            return round(100.0 * count / base_jobs, 1) if base_jobs else None
+
+        def employment_in(bits: Any) -> Optional[int]:
+            return int(round(float(employment[self.bitmaps.job_positions(bits)].sum())))
+
+        erosion = []
+        for position, limitation in enumerate(limitations):
+            others = base
+            for other_position, other in enumerate(limitations):
+                if other_position != position:
+                    others = np.bitwise_and(others, other["bits"])
+            excluded_bits = np.bitwise_and(base, np.bitwise_not(limitation["bits"]))
+            excluded = popcount(excluded_bits)
+            entry = {
+                "area": limitation["area"],
+                "limit": limitation["limit"],
+                "columns": limitation["columns"],
+                "maxLevel": limitation["level"],
+                "excluded": excluded,
+                "percentOfBase": share(excluded),
+                "uniquelyExcluded": popcount(np.bitwise_and(others, np.bitwise_not(limitation["bits"]))),
+            }
+            if employment is not None:
+                entry["employmentExcluded"] = employment_in(excluded_bits)
+            erosion.append(entry)
+        erosion.sort(key=lambda entry: (-entry["excluded"], entry["area"], entry["limit"]))
+
+        result: Dict[str, Any] = {
+            "rfc": summary,
+            "totalJobs": self.size,
+            "base": {"jobs": base_jobs},
+            "remaining": {
+                "jobs": remaining_jobs,
+                "percentOfBase": share(remaining_jobs),
+                "eroded": base_jobs - remaining_jobs,
+            },
+            "limitations": erosion,
+        }
+        if employment is not None:
+            result["base"]["employment"] = employment_in(base)
+            result["remaining"]["employment"] = employment_in(remaining)
+        if not_applied:
+            result["notApplied"] = not_applied
+        if include_jobs:
+            result["jobs"] = [
+                self._job(position, employment)
+                for position in self.bitmaps.job_positions(remaining)[:MAX_JOBS_LISTED]
+            ]
+        return result
+
+    def screen(self, rfc: Dict[str, Any], dot_codes: List[str]) -> Dict[str, Any]:
+        """
+        Screens jobs (e.g. the jobs a VE cited) against an RFC with one bit test per limitation.
+
+        Args:
+            rfc: RFC as for compute().
+            dot_codes: DOT codes (XXX.XXX-XXX) to screen.
+
+        Returns:
+            Dictionary with each job, whether it fits the RFC and the limitations
+            it exceeds (with the job's level), and the codes not found.
+
+        Raises:
+            ValueError: If the RFC is invalid.
+        """
+        _, base_limits = self._base(rfc)
+        limitations, _ = self._limits(rfc)
+        jobs = []
+        not_found = []
+        for code in dot_codes:
+            validation = validate_dot_code(code)
+            position = self.bitmaps.positions.get(validation.get("ncode")) if validation.get("valid") else None
+            if position is None:
+                not_found.append(code)
+                continue
+            exceeds = [
+                {
+                    "area": limitation["area"],
+                    "limit": limitation["limit"],
+                    "maxLevel": limitation["level"],
+                    "jobLevels": {column: self.bitmaps.value(column, position) for column in limitation["columns"]},
+                }
+                for limitation in base_limits + limitations
+                if not self.bitmaps.contains(limitation["bits"], position)
+            ]
+            jobs.append({**self._job(position), "withinRfc": not exceeds, "exceeds": exceeds})
+        return {"jobs": jobs, "notFound": not_found}
+
+
+_indexes = PerHandlerCache(OccupationalBaseIndex.from_database)
+
+
+def get_occupational_base_index(db: Any) -> OccupationalBaseIndex:
+    """Returns the occupational base index for a database handler, building it on first use."""
+    return _indexes.get(db)
+
+
+def occupational_base(
+    db: Any,
+    rfc: Dict[str, Any],
+    include_jobs: bool = False,
+    bls_handler: Any = None,
+    dot_codes: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Computes the occupational base for an RFC, with job numbers when BLS data is
+    available, and screens the given DOT codes against it.
+
+    Raises:
+        ValueError: If the RFC is invalid.
+    """
+    index = get_occupational_base_index(db)
+    employment = None
+    note = None
+    if bls_handler is not None:
+        try:
+            employment = index.employment(bls_handler)
+        except BLSExcelHandlerError as e:
+            logger.warning(f"Could not estimate employment for the occupational base: {e}")
+            note = f"Job numbers unavailable: {e}"
+    else:
+        note = "Job numbers unavailable: the BLS workbook is not loaded."
+    result = index.compute(rfc, include_jobs=include_jobs, employment=employment)
+    if employment is not None:
+        result["employmentMethod"] = (
+            "BLS employment per SOC shared equally among the DOT codes the crosswalk maps to it; approximate."
+        )
+    if dot_codes:
+        result["screening"] = index.screen(rfc, dot_codes)
+    if note:
+        result["note"] = note
+    return result
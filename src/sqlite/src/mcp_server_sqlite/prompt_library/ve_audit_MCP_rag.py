@@ -47,6 +47,14 @@ The identified applicable SSR MUST be consistently applied throughout all subseq
         - POMS sections: **DI 25001.001, DI 25005.001, DI 25015.005, DI 25020.010, DI 25025.001, DI 25025.022**.
         - Emergency Messages: **EM-24027 REV, EM-24026, EM-21065 REV**.
 2. **MCP Server Tools (Callable Functions):**
+    - `preprocess_transcript(transcript, [include_titles])`:
+        - Input: The full hearing transcript text.
+        - Output: **JSON string** digest of every DOT code cited in the transcript (any format), resolved in one pass: DOT title, exertion, SVP/skill, GED, obsolescence reference status, O*NET-SOC crosswalk with BLS data, and whether the spoken title matches the cited code. Also lists codes not found in the DOT and DOT titles mentioned without a code.
+        - Usage: Call this ONCE at the start of the audit to build your job inventory. Then call `generate_job_report` only for the jobs whose full requirements (physical demands, environmental conditions) you need to compare with the hypotheticals.
+    - `transcript_search(transcript_id, [query], [tags], [speaker], [chunk_ids], [limit])`:
+        - Input: The transcript_id given in the transcript digest (or `transcript` text to index it), plus a free-text query, tags (hypothetical, ve_testimony, cited_job, job_numbers), a speaker (VE, ALJ, ATTY, CLMT) or passage ids.
+        - Output: **JSON string** of matching transcript passages with speaker, page and line numbers.
+        - Usage: When the transcript below is a digest rather than the full text, retrieve every passage you quote or summarize with this tool, and cite its page or lines.
     - `generate_job_report(search_term)`:
         - Input: Input: DOT code or job title.
         - PRIMARY DOT CODE FORMAT: ALWAYS try the 9-digit continuous format FIRST (e.g., "249587018").
@@ -58,6 +66,15 @@ The identified applicable SSR MUST be consistently applied throughout all subseq
     - `analyze_transferable_skills(source_dot, residual_capacity, age, education, [target_dots])`:
         - Input: PRW DOT code, claimant's residual capacity details, age, education, and optionally target DOT codes.
         - Output: **JSON string**. You **MUST PARSE this JSON string** for a preliminary TSA. Note this tool currently uses placeholder logic; report its findings accordingly.
+    - `search_job_definitions(query, [k], [max_strength], [max_svp])`:
+        - Input: A task description (e.g., "sorts mail") and optional exertion/SVP limits.
+        - Output: **JSON string** of the DOT jobs whose definitions best match the description. Use it when the VE describes duties instead of naming a job or DOT code.
+    - `aggregate_job_groups([hierarchy], [code], [max_strength], [max_svp], [skill_level])` and `browse_job_groups(...)`:
+        - Input: A GOE or DOT occupational group code and optional exertion/skill limits.
+        - Output: **JSON string** of job counts for the group and its subgroups (e.g., unskilled sedentary jobs in GOE 05), or the group's jobs.
+    - `occupational_base(rfc, [include_jobs], [dot_codes])`:
+        - Input: The RFC from the hypothetical (exertional level; postural, manipulative, visual, sensory, environmental and mental limits), and optionally the DOT codes the VE cited.
+        - Output: **JSON string** of the unskilled occupational base, the jobs remaining after all limitations, the erosion per limitation and approximate job numbers. With `dot_codes`, each cited job is screened against the RFC and comes back with the limitations it exceeds. Use it to judge how much each limitation erodes the base, whether the VE's job numbers are plausible, and which cited jobs need a full consistency check.
     - `read_query(query)`:
         - Input: A specific read-only `SELECT` SQL query (string).
         - Output: **JSON string** of query results. Use with caution, primarily as a fallback if `generate_job_report` is insufficient.
@@ -69,6 +86,9 @@ The identified applicable SSR MUST be consistently applied throughout all subseq
     - `write_file(path, filename, content)`:
         - Input: `path` (string), `filename` (string), `content` (string).
         - Action: Allows creating and saving finalized report content.
+    - `render_audit_report(audit, filename, [path])`:
+        - Input: Structured audit data (case details, hypotheticals with the VE's jobs by DOT code, conflicts, obsolescence flags, TSA outcome, follow-up questions, conclusion) and an `.html` filename.
+        - Action: Renders and saves an HTML version of the audit on the server. Job details and obsolescence flags missing from the data are filled from the DOT.
 3. **Tool Output Processing and Error Handling:**
     - **Parsing `generate_job_report` (Text Output):** Carefully scan the text report for section headers (e.g., "Exertional Level:", "Skill Level (SVP):") and extract key-value pairs. Be prepared for variations in format based on available data for a given job.
     - **Parsing JSON Responses (from other tools):** Always check for error messages or null fields before attempting to access nested properties. Use fallback values or note missing data if specific properties aren't available. Look for "message" fields that might provide context.
@@ -381,5 +401,14 @@ When analyzing job requirements against RFC limitations:
 - The report structure MUST strictly follow the sections, headers, sub-headers, and table formats detailed in **Instructions: C. Detailed Analysis Steps**. This includes conditional omission of PRW-related sections (C.5, C.6) if no PRW is identified.
 - The very last action you perform, after generating the complete Markdown report, is to call the `write_file` tool as specified in **Instructions: D. File Handling** to save the report. If the file write operation is successful, confirm this. If it fails, report the error from the tool.
 </OutputFormat>
+
+<HearingInput>
+Hearing date: {hearing_date}
+Claimant: {claimant_name}
+
+<Transcript>
+{transcript}
+</Transcript>
+</HearingInput>
 '''
 
@@ -0,0 +1,406 @@
+# report_store.py
+
+"""
+Pre-rendered job reports stored compressed in a side table of the DOT database.
+
+Reports produced by ve_logic.generate_formatted_job_report() are rendered either
+ahead of time (build) or lazily on the first request, compressed with zlib and
+stored keyed by Ncode, so repeated generate_job_report calls become cache reads.
+Each stored report carries the analysis version (see analysis_store), and
+reports from an older version are ignored and re-rendered.
+
+The bulk export mode writes a report for every DOT row to a directory or a
+.zip archive, rendering in a process pool:
+    python -m mcp_server_sqlite.report_store --db-path DOT.db export --output reports.zip
+"""
+
+import argparse
+import json
+import logging
+import sqlite3
+import sys
+import time
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from .analysis_store import AnalysisStore, get_analyses_for_rows
+from .ve_logic import generate_formatted_job_report, get_job_analysis
+
+# For type checking only to avoid circular imports
+if TYPE_CHECKING:
+    from .db_handler import DatabaseHandler
+else:
+    DatabaseHandler = Any
+
+logger = logging.getLogger(__name__)
+
+REPORT_TABLE = "job_report_cache"
+CREATE_REPORT_TABLE = (
+    f"CREATE TABLE IF NOT EXISTS {REPORT_TABLE} ("
+    "Ncode INTEGER PRIMARY KEY, version TEXT NOT NULL, report BLOB NOT NULL);"
+)
+COMPRESSION_LEVEL = 6
+BUILD_BATCH_SIZE = 500
+EXPORT_CHUNK_SIZE = 250
+
+
+def compress_report(report_text: str) -> bytes:
+    """Compresses a rendered report for storage."""
+    return zlib.compress(report_text.encode("utf-8"), COMPRESSION_LEVEL)
+
+
+def decompress_report(report_blob: bytes) -> str:
+    """Decompresses a stored report."""
+    return zlib.decompress(report_blob).decode("utf-8")
+
+
+def render_report(job_data: Dict[str, Any]) -> Optional[str]:
+    """Renders the text report for a DOT row, or None if the analysis fails."""
+    analysis = get_job_analysis(job_data)
+    if "error" in analysis:
+        return None
+    return generate_formatted_job_report(analysis)
+
+
+def report_filename(job_data: Dict[str, Any]) -> str:
+    """File name used for a report in bulk exports (e.g. '001.061-010.txt')."""
+    code = job_data.get("Code") or job_data.get("Ncode")
+    return f"{code}.txt"
+
+
+class ReportStore:
+    """Serves, renders and stores compressed job reports by Ncode."""
+
+    def __init__(self, db: DatabaseHandler, analysis_store: AnalysisStore):
+        """
+        Initializes the ReportStore.
+
+        Args:
+            db: The DatabaseHandler whose database holds the DOT table.
+            analysis_store: AnalysisStore used for analyses and the version hash.
+        """
+        self.db = db
+        self.analysis_store = analysis_store
+        self._table_ready = False
+
+    @property
+    def db_path(self) -> Path:
+        return self.db.db_path
+
+    def _connect(self) -> sqlite3.Connection:
+        """Opens a read connection (the handler's in-memory snapshot when enabled)."""
+        return self.db.connect()
+
+    def _connect_for_write(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def _ensure_table(self, conn: sqlite3.Connection) -> None:
+        if not self._table_ready:
+            conn.execute(CREATE_REPORT_TABLE)
+            self._table_ready = True
+
+    def get(self, ncode: Optional[int]) -> Optional[str]:
+        """Returns the stored report for an Ncode if it matches the current version."""
+        if ncode is None:
+            return None
+        try:
+            with closing(self._connect()) as conn:
+                row = conn.execute(
+                    f"SELECT report FROM {REPORT_TABLE} WHERE Ncode = ? AND version = ?;",
+                    [ncode, self.analysis_store.current_version()],
+                ).fetchone()
+        except sqlite3.OperationalError:
+            return None  # Table not created yet
+        return decompress_report(row[0]) if row else None
+
+    def put(self, ncode: int, report_text: str) -> None:
+        """Stores a rendered report for an Ncode under the current version."""
+        values = [ncode, self.analysis_store.current_version(), compress_report(report_text)]
+
+        def write(conn: sqlite3.Connection) -> None:
+            # Not _ensure_table: the in-memory snapshot may predate the table
+            conn.execute(CREATE_REPORT_TABLE)
+            conn.execute(
+                f"INSERT OR REPLACE INTO {REPORT_TABLE} (Ncode, version, report) VALUES (?, ?, ?);",
+                values,
+            )
+
+        try:
+            # Also applied to the in-memory snapshot, so caching a report does not re-copy the database
+            self.db.write_through(write)
+        except sqlite3.Error as e:
+            # Caching is best effort; the rendered report is still returned
+            logger.warning(f"Could not store rendered report for Ncode {ncode}: {e}")
+
+    def get_or_render(self, job_data: Dict[str, Any]) -> Optional[str]:
+        """
+        Returns the report for a DOT row, rendering and storing it on first request.
+
+        Returns:
+            The report text, or None if the job could not be analyzed.
+        """
+        ncode = job_data.get("Ncode", job_data.get("NCode"))
+        report_text = self.get(ncode)
+        if report_text is not None:
+            return report_text
+        analysis = self.analysis_store.get_or_compute(job_data)
+        if "error" in analysis:
+            return None
+        report_text = generate_formatted_job_report(analysis)
+        if ncode is not None:
+            self.put(ncode, report_text)
+        return report_text
+
+    def status(self) -> Dict[str, Any]:
+        """Returns counts of current and stale stored reports."""
+        version = self.analysis_store.current_version()
+        try:
+            with closing(self._connect()) as conn:
+                current, total = conn.execute(
+                    f"SELECT SUM(version = ?), COUNT(*) FROM {REPORT_TABLE};", [version]
+                ).fetchone()
+                dot_rows = conn.execute("SELECT COUNT(*) FROM DOT;").fetchone()[0]
+        except sqlite3.OperationalError:
+            current, total, dot_rows = 0, 0, None
+        return {
+            "table": REPORT_TABLE,
+            "version": version,
+            "current_reports": current or 0,
+            "stale_reports": (total or 0) - (current or 0),
+            "dot_rows": dot_rows,
+        }
+
+    def build(self, force: bool = False) -> Dict[str, Any]:
+        """
+        Renders and stores reports for every DOT row missing a current report.
+
+        Args:
+            force: Re-render every report, even those already current.
+
+        Returns:
+            Dictionary describing the build.
+        """
+        version = self.analysis_store.current_version()
+        start_time = time.monotonic()
+        rendered = 0
+        errors = 0
+
+        # Reports are rendered outside any transaction and committed in short
+        # batches, so lazy put() calls from requests are not blocked by a build.
+        with self.db.own_write(), closing(self._connect_for_write()) as conn:
+            conn.row_factory = sqlite3.Row
+            with conn:
+                self._ensure_table(conn)
+                conn.execute(f"DELETE FROM {REPORT_TABLE} WHERE version != ?;", [version])
+            if force:
+                pending_ncodes = [row[0] for row in conn.execute("SELECT Ncode FROM DOT;")]
+            else:
+                pending_ncodes = [
+                    row[0]
+                    for row in conn.execute(
+                        f"SELECT Ncode FROM DOT WHERE Ncode NOT IN (SELECT Ncode FROM {REPORT_TABLE});"
+                    )
+                ]
+            for i in range(0, len(pending_ncodes), BUILD_BATCH_SIZE):
+                chunk = pending_ncodes[i : i + BUILD_BATCH_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                rows = [
+                    dict(row)
+                    for row in conn.execute(
+                        f"SELECT * FROM DOT WHERE Ncode IN ({placeholders});", chunk
+                    )
+                ]
+                analyses = get_analyses_for_rows(rows, self.analysis_store)
+                batch = []
+                for row in rows:
+                    analysis = analyses[row["Ncode"]]
+                    if "error" in analysis:
+                        errors += 1
+                        continue
+                    batch.append(
+                        (
+                            row["Ncode"],
+                            version,
+                            compress_report(generate_formatted_job_report(analysis)),
+                        )
+                    )
+                with conn:
+                    conn.executemany(
+                        f"INSERT OR REPLACE INTO {REPORT_TABLE} (Ncode, version, report) VALUES (?, ?, ?);",
+                        batch,
+                    )
+                rendered += len(batch)
+        self.db.reload_snapshot()  # One copy for the whole build
+
+        duration = time.monotonic() - start_time
+        logger.info(
+            f"Rendered {rendered} job reports in {duration:.2f}s ({errors} errors)."
+        )
+        return {
+            "status": "built",
+            "version": version,
+            "reports_rendered": rendered,
+            "errors": errors,
+            "duration_seconds": round(duration, 2),
+        }
+
+
+def render_report_chunk(
+    db_path: str, ncodes: List[int], version: str
+) -> List[Tuple[int, str, str]]:
+    """
+    Process-pool worker: returns (Ncode, filename, report_text) for a chunk of Ncodes.
+
+    Reads the rows itself (read-only), uses stored reports of the current version
+    and renders the rest. Ncodes that are missing or cannot be analyzed are left out.
+    """
+    placeholders = ",".join("?" * len(ncodes))
+    uri = f"{Path(db_path).as_uri()}?mode=ro"
+    with closing(sqlite3.connect(uri, uri=True, timeout=10)) as conn:
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute(
+            f"SELECT * FROM DOT WHERE Ncode IN ({placeholders}) ORDER BY Ncode;", ncodes
+        ).fetchall()
+        try:
+            stored = dict(
+                conn.execute(
+                    f"SELECT Ncode, report FROM {REPORT_TABLE} WHERE version = ? AND Ncode IN ({placeholders});",
+                    [version, *ncodes],
+                ).fetchall()
+            )
+        except sqlite3.OperationalError:
+            stored = {}
+
+    results = []
+    for row in rows:
+        job_data = dict(row)
+        if job_data["Ncode"] in stored:
+            report_text = decompress_report(stored[job_data["Ncode"]])
+        else:
+            report_text = render_report(job_data)
+        if report_text is not None:
+            results.append((job_data["Ncode"], report_filename(job_data), report_text))
+    return results
+
+
+def export_reports(
+    db_path: Path,
+    output: Path,
+    workers: Optional[int] = None,
+    version: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Writes a report for every DOT row to a directory or a .zip archive.
+
+    Args:
+        db_path: Path to the DOT SQLite database.
+        output: Target directory, or a path ending in '.zip' for an archive.
+        workers: Number of worker processes (defaults to the CPU count).
+        version: Analysis version of stored reports to reuse (computed if omitted).
+
+    Returns:
+        Dictionary describing the export.
+    """
+    from .analysis_store import compute_analysis_version
+
+    db_path = Path(db_path).resolve()
+    output = Path(output)
+    version = version or compute_analysis_version(db_path)
+    start_time = time.monotonic()
+
+    with closing(sqlite3.connect(db_path, timeout=10)) as conn:
+        ncodes = [row[0] for row in conn.execute("SELECT Ncode FROM DOT ORDER BY Ncode;")]
+    chunks = [
+        ncodes[i : i + EXPORT_CHUNK_SIZE] for i in range(0, len(ncodes), EXPORT_CHUNK_SIZE)
+    ]
+
+    is_archive = output.suffix.lower() == ".zip"
+    if is_archive:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        archive = zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED)
+    else:
+        output.mkdir(parents=True, exist_ok=True)
+        archive = None
+
+    written = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(render_report_chunk, str(db_path), chunk, version)
+                for chunk in chunks
+            ]
+            for future in futures:
+                for _, filename, report_text in future.result():
+                    if archive is not None:
+                        archive.writestr(filename, report_text)
+                    else:
+                        (output / filename).write_text(report_text, encoding="utf-8")
+                    written += 1
+    finally:
+        if archive is not None:
+            archive.close()
+
+    duration = time.monotonic() - start_time
+    logger.info(f"Exported {written} job reports to {output} in {duration:.2f}s.")
+    return {
+        "status": "exported",
+        "output": str(output),
+        "reports_written": written,
+        "duration_seconds": round(duration, 2),
+    }
+
+
+def main():
+    """Command-line entry point for building and exporting pre-rendered reports."""
+    parser = argparse.ArgumentParser(
+        description="Build or export pre-rendered DOT job reports"
+    )
+    parser.add_argument(
+        "--db-path", required=True, help="Path to the DOT SQLite database file"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="Render reports into the database")
+    build_parser.add_argument(
+        "--force", action="store_true", help="Re-render reports that are already current"
+    )
+    subparsers.add_parser("status", help="Show stored report counts")
+    export_parser = subparsers.add_parser(
+        "export", help="Write all reports to a directory or .zip archive"
+    )
+    export_parser.add_argument(
+        "--output", required=True, help="Output directory or .zip file"
+    )
+    export_parser.add_argument(
+        "--workers", type=int, default=None, help="Number of worker processes"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    from .db_handler import DatabaseHandler
+
+    try:
+        db = DatabaseHandler(Path(args.db_path))
+        analysis_store = AnalysisStore(db)
+        if args.command == "export":
+            result = export_reports(
+                db.db_path,
+                Path(args.output),
+                workers=args.workers,
+                version=analysis_store.current_version(),
+            )
+        else:
+            store = ReportStore(db, analysis_store)
+            result = store.status() if args.command == "status" else store.build(args.force)
+    except (FileNotFoundError, sqlite3.Error, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+# response_encoding.py
+
+"""
+Shared encoder for JSON tool responses.
+
+    - Compact JSON (no indentation or spaces). orjson is used when it is
+      installed (pip install "mcp-server-sqlite[fast-json]"), the stdlib encoder otherwise.
+    - Lists of dictionaries (query results, BLS matches, TSA target evaluations)
+      are encoded column-wise: {"columns": [...], "rows": [[...], ...]}. Keys
+      are then written once instead of once per row.
+    - Each tool has a byte budget (TOOL_BYTE_BUDGETS). When a response exceeds
+      it, rows are dropped from the end of its tables and a "truncated" marker
+      records how many were kept. Anything else too large is returned as a
+      marked partial string.
+"""
+
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # Optional dependency
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BYTE_BUDGET = 256 * 1024
+TOOL_BYTE_BUDGETS: Dict[str, int] = {
+    "read_query": 512 * 1024,
+    "filter_jobs": 512 * 1024,
+    "query_bls_by_title": 128 * 1024,
+    "analyze_bls_excel": 64 * 1024,
+    "analyze_transferable_skills": 256 * 1024,
+}
+MIN_COLUMNAR_ROWS = 2  # Smaller lists are left as records
+
+
+def dumps(obj: Any) -> str:
+    """Encodes obj as compact JSON, using orjson when available."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        except TypeError:
+            pass  # e.g. integers beyond 64 bits; fall back to the stdlib encoder
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _is_table(value: Any) -> bool:
+    return (
+        isinstance(value, list)
+        and len(value) >= MIN_COLUMNAR_ROWS
+        and all(isinstance(item, dict) for item in value)
+    )
+
+
+def to_columnar(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Converts a list of dictionaries to {"columns": [...], "rows": [[...], ...]}.
+
+    Columns are the union of the keys in first-seen order; missing values are None.
+    """
+    columns: Dict[str, None] = {}
+    for record in records:
+        for key in record:
+            columns.setdefault(key, None)
+    column_names = list(columns)
+    return {
+        "columns": column_names,
+        "rows": [[record.get(name) for name in column_names] for record in records],
+    }
+
+
+def columnarize(result: Any) -> Any:
+    """Encodes lists of dictionaries column-wise, at the top level or nested in dictionaries."""
+    if _is_table(result):
+        return to_columnar(result)
+    if isinstance(result, dict):
+        return {key: columnarize(value) for key, value in result.items()}
+    return result
+
+
+def _tables(result: Any) -> List[Tuple[Optional[str], Dict[str, Any]]]:
+    """Returns (key, table) for the columnar tables in a columnarized result (key None at top level)."""
+    if isinstance(result, dict) and set(result) == {"columns", "rows"}:
+        return [(None, result)]
+    if isinstance(result, dict):
+        return [
+            (key, value)
+            for key, value in result.items()
+            if isinstance(value, dict) and set(value) == {"columns", "rows"}
+        ]
+    return []
+
+
+def _truncate_rows(result: Any, budget: int) -> Optional[str]:
+    """Drops rows from the end of the result's tables until it fits, or returns None."""
+    tables = _tables(result)
+    if not tables:
+        return None
+    totals = {key: len(table["rows"]) for key, table in tables}
+
+    def encode_with_fraction(fraction: float) -> str:
+        kept = {key: int(total * fraction) for key, total in totals.items()}
+        marker = {
+            (key or "rows"): {"rows_returned": kept[key], "rows_total": totals[key]}
+            for key in totals
+        }
+        if list(totals) == [None]:
+            trimmed: Any = {**result, "rows": result["rows"][: kept[None]]}
+        else:
+            trimmed = {
+                key: ({**value, "rows": value["rows"][: kept[key]]} if key in totals else value)
+                for key, value in result.items()
+            }
+        trimmed["truncated"] = marker
+        return dumps(trimmed)
+
+    # Binary search for the largest fraction of rows that fits
+    low, high = 0.0, 1.0
+    best = encode_with_fraction(0.0)
+    if len(best.encode("utf-8")) > budget:
+        return None
+    for _ in range(20):
+        middle = (low + high) / 2
+        text = encode_with_fraction(middle)
+        if len(text.encode("utf-8")) <= budget:
+            best, low = text, middle
+        else:
+            high = middle
+    return best
+
+
+def encode_response(result: Any, tool_name: Optional[str] = None, columnar: bool = True) -> str:
+    """
+    Encodes a tool result as compact JSON within the tool's byte budget.
+
+    Args:
+        result: JSON-serializable tool result.
+        tool_name: Tool name, used to look up its byte budget.
+        columnar: Encode lists of dictionaries column-wise.
+
+    Returns:
+        The JSON text, with a "truncated" marker if rows were dropped.
+    """
+    if columnar:
+        result = columnarize(result)
+    text = dumps(result)
+    budget = TOOL_BYTE_BUDGETS.get(tool_name, DEFAULT_BYTE_BUDGET)
+    size = len(text.encode("utf-8"))
+    if size <= budget:
+        return text
+
+    logger.warning(f"Response from '{tool_name}' is {size} bytes; truncating to {budget}.")
+    truncated = _truncate_rows(result, budget)
+    if truncated is not None:
+        return truncated
+    # No tables to trim: return the start of the text, still as valid JSON
+    keep = budget
+    while True:
+        cut = text.encode("utf-8")[:keep].decode("utf-8", errors="ignore")
+        partial = dumps(
+            {"truncated": {"bytes_returned": len(cut.encode("utf-8")), "bytes_total": size}, "partial": cut}
+        )
+        # Escaping the partial text adds bytes; shrink until the whole response fits
+        if len(partial.encode("utf-8")) <= budget or keep == 0:
+            return partial
+        keep = max(0, keep - (len(partial.encode("utf-8")) - budget) - 16)
@@ -1,20 +1,52 @@
+import time
+
+_IMPORT_STARTED = time.perf_counter()  # Start of the startup timing breakdown
+
+import asyncio
 import logging
 from pathlib import Path
-import json  # For structured JSON output from tools where appropriate
 import sqlite3
-from typing import Any, Optional
+from typing import Any, Coroutine, Dict, List, Optional, Set, Tuple
 
 # MCP SDK Imports
 from mcp.server.models import InitializationOptions
 import mcp.types as types
 from mcp.server import NotificationOptions, Server
-import mcp.server.stdio
 
 # Pydantic and Typing
 
 # Local module imports for refactored logic
 from .db_handler import DatabaseHandler  # Import the handler class
-from . import tsa_logic  # Import the modules with core logic/formatting
+from .analysis_store import AnalysisStore
+from .report_store import ReportStore
+from .hot_reload import (
+    Handlers,
+    HandlerRegistry,
+    SourceWatcher,
+    build_bls_handler,
+    preload_reference_data,
+)
+from .usage_stats import UsageTracker, default_state_path, warm_up_from_usage
+from .singleflight import SingleFlight
+from .transports import DEFAULT_HOST, DEFAULT_PORT, run_transport
+from .dispatch import ToolDispatcher, ToolTimeoutError, run_in_thread
+from .response_encoding import encode_response
+from .models.dot_code import DotCode
+from . import (  # Import the modules with core logic/formatting
+    audit_renderer,
+    bitmap_index,
+    config,
+    definition_index,
+    format_report,
+    group_index,
+    occupational_base,
+    similarity_index,
+    title_index,
+    transcript_index,
+    transcript_preprocessor,
+    tsa_logic,
+)
+from .transcript_index import LONG_TRANSCRIPT_CHARS, TranscriptStore
 
 # Import the specific prompt module needed
 from .prompt_library import ve_audit_MCP_rag  # Changed import
@@ -25,6 +57,36 @@ from .job_obsolescence import check_job_obsolescence  # Import the new function
 logger = logging.getLogger(__name__)
 # Note: Logging level is configured in __init__.py/run()
 
+# Background tasks started by main(). The event loop only keeps weak references
+# to tasks, so they are held here until done and cancelled at shutdown.
+_background_tasks: Set["asyncio.Task[Any]"] = set()
+
+
+def _on_background_task_done(task: "asyncio.Task[Any]") -> None:
+    """Forgets a finished background task and logs its failure, if any."""
+    _background_tasks.discard(task)
+    if task.cancelled():
+        return
+    error = task.exception()
+    if error is not None:
+        logger.error(f"Background task {task.get_name()} failed: {error}", exc_info=error)
+
+
+def start_background_task(coro: Coroutine[Any, Any, Any], name: str) -> "asyncio.Task[Any]":
+    """Runs a coroutine as a background task that is kept alive, logged on failure and cancelled at shutdown."""
+    task = asyncio.create_task(coro, name=name)
+    _background_tasks.add(task)
+    task.add_done_callback(_on_background_task_done)
+    return task
+
+
+async def cancel_background_tasks() -> None:
+    """Cancels the running background tasks and waits for them to finish."""
+    tasks = list(_background_tasks)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
 # Define tool configurations (place this perhaps before the server initialization)
 TOOL_DEFINITIONS = [
     # Core VE Analysis Tools
@@ -37,11 +99,261 @@ TOOL_DEFINITIONS = [
                 "search_term": {
                     "type": "string",
                     "description": "DOT code (format: XXX.XXX-XXX, e.g., '209.587-034') or job title (e.g., 'Marker') to search for.",
-                }
+                },
+                "format": {
+                    "type": "string",
+                    "enum": ["text", "markdown", "json", "html"],
+                    "description": "Optional: 'text' (analyzed VE report, default), or the DOT record as 'markdown', 'json' (compact) or 'html'.",
+                },
             },
             "required": ["search_term"],
         },
     },
+    {
+        "name": "compare_jobs",
+        "description": "Compare 2-10 DOT jobs side by side in one compact table: exertion, SVP, GED, DPT worker functions, physical and environmental demands present in any of the jobs, and obsolescence risk.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "dot_codes": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "minItems": 2,
+                    "maxItems": 10,
+                    "description": "DOT codes to compare (e.g., ['209.587-034', '211.462-010', '920.687-014']).",
+                },
+                "format": {
+                    "type": "string",
+                    "enum": ["table", "json"],
+                    "description": "Optional: 'table' (markdown, default) or 'json' (compact rows).",
+                },
+            },
+            "required": ["dot_codes"],
+        },
+    },
+    {
+        "name": "preprocess_transcript",
+        "description": "Extract every DOT code (any format) and DOT title (fuzzy-matched, any word order) cited in a hearing transcript and resolve them in one pass: DOT title, exertion, SVP/skill, GED, obsolescence reference status, O*NET-SOC crosswalk with BLS employment and median wage, and whether the spoken title matches the cited code. Returns a compact JSON digest; call it once before per-job tools.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "transcript": {
+                    "type": "string",
+                    "description": "Full hearing transcript text.",
+                },
+                "include_titles": {
+                    "type": "boolean",
+                    "description": "Optional: Also list DOT titles mentioned without a code (default true).",
+                },
+            },
+            "required": ["transcript"],
+        },
+    },
+    {
+        "name": "transcript_search",
+        "description": "Index a hearing transcript into speaker-aware passages (with page and line numbers) and retrieve only the relevant ones: by free-text query (BM25 ranked), by tag (hypothetical, ve_testimony, cited_job, job_numbers), by speaker, or by passage id. Pass the transcript once; later calls use the returned transcript_id. Without a query, tags, speaker or chunk_ids, returns an outline of the transcript. Returns JSON.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "transcript": {
+                    "type": "string",
+                    "description": "Optional: Full transcript text to index (indexing the same text again is free).",
+                },
+                "transcript_id": {
+                    "type": "string",
+                    "description": "Optional: Id of an already indexed transcript (from an earlier call or a digest prompt).",
+                },
+                "query": {
+                    "type": "string",
+                    "description": "Optional: Free-text query (e.g., 'sedentary hypothetical off task').",
+                },
+                "tags": {
+                    "type": "array",
+                    "items": {
+                        "type": "string",
+                        "enum": ["hypothetical", "ve_testimony", "cited_job", "job_numbers"],
+                    },
+                    "description": "Optional: Only passages with all of these tags.",
+                },
+                "speaker": {
+                    "type": "string",
+                    "description": "Optional: Only passages by this speaker (e.g., 'VE', 'ALJ', 'ATTY', 'CLMT').",
+                },
+                "chunk_ids": {
+                    "type": "array",
+                    "items": {"type": "integer"},
+                    "description": "Optional: Fetch these passages by id (e.g., the answer after a hypothetical).",
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Optional: Maximum passages returned (default 5, max 20).",
+                },
+            },
+        },
+    },
+    {
+        "name": "suggest_jobs",
+        "description": "Suggest DOT jobs for a job title that may be misspelled or phrased differently from the DOT (e.g., 'dish washer', 'surveillance system monitor'). Fuzzy-matches titles, complete titles and alternate titles; returns the best matches with scores (0-100) as JSON.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "title": {
+                    "type": "string",
+                    "description": "Job title as spoken or written (e.g., 'adresser').",
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Optional: Maximum number of jobs returned (default 10, max 50).",
+                },
+                "min_score": {
+                    "type": "number",
+                    "description": "Optional: Minimum match score, 0-100 (default 72).",
+                },
+            },
+            "required": ["title"],
+        },
+    },
+    {
+        "name": "similar_jobs",
+        "description": "Find the DOT jobs most similar to a given job by their trait profiles (GED, SVP, strength, worker functions, aptitudes, temperaments, physical demands, environmental conditions, work fields and MPSMS codes). Returns the k closest jobs with overall and per-group distances (0 = identical, 1 = maximally different) as JSON.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "dot_code": {
+                    "type": "string",
+                    "description": "DOT code (format: XXX.XXX-XXX) of the source job.",
+                },
+                "k": {
+                    "type": "integer",
+                    "description": "Optional: Number of jobs returned (default 10, max 50).",
+                },
+                "max_strength": {
+                    "type": "string",
+                    "description": "Optional: Only return jobs at or below this exertion level (S, L, M, H, V or e.g. LIGHT).",
+                },
+                "max_svp": {
+                    "type": "integer",
+                    "description": "Optional: Only return jobs with an SVP at or below this (1-9).",
+                },
+            },
+            "required": ["dot_code"],
+        },
+    },
+    {
+        "name": "search_job_definitions",
+        "description": "Find DOT jobs by what the work involves (e.g., 'sorts mail', 'monitors security screens') rather than by title. Ranks every DOT definition by TF-IDF cosine similarity to the description and returns the top k jobs with score (0-1), matched terms, exertion, SVP and a definition excerpt as JSON.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "Task description to match against DOT definitions.",
+                },
+                "k": {
+                    "type": "integer",
+                    "description": "Optional: Number of jobs returned (default 10, max 50).",
+                },
+                "max_strength": {
+                    "type": "string",
+                    "description": "Optional: Only return jobs at or below this exertion level (S, L, M, H, V or e.g. LIGHT).",
+                },
+                "max_svp": {
+                    "type": "integer",
+                    "description": "Optional: Only return jobs with an SVP at or below this (1-9).",
+                },
+            },
+            "required": ["query"],
+        },
+    },
+    {
+        "name": "browse_job_groups",
+        "description": "Browse the GOE or DOT occupational group hierarchy. Returns a group's job counts by strength and SVP, unskilled and sedentary unskilled counts, its parent groups and its subgroups with their counts, and optionally its jobs (filtered by exertion and skill) as JSON.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "hierarchy": {
+                    "type": "string",
+                    "enum": ["goe", "occupation"],
+                    "description": "Optional: 'goe' (interest area > work group > subgroup, default) or 'occupation' (DOT code category > division > group).",
+                },
+                "code": {
+                    "type": "string",
+                    "description": "Optional: Group code, e.g. GOE '05' or '05.02.01', occupation '2', '20' or '209'. Omit for the top level.",
+                },
+                "include_jobs": {
+                    "type": "boolean",
+                    "description": "Optional: Also list the group's jobs (up to 200), filtered by the limits below.",
+                },
+                "max_strength": {
+                    "type": "string",
+                    "description": "Optional: Only count jobs at or below this exertion level (S, L, M, H, V or e.g. SEDENTARY).",
+                },
+                "max_svp": {
+                    "type": "integer",
+                    "description": "Optional: Only count jobs with an SVP at or below this (1-9).",
+                },
+                "skill_level": {
+                    "type": "string",
+                    "enum": ["unskilled", "semi-skilled", "skilled"],
+                    "description": "Optional: Only count jobs at this skill level (unskilled = SVP 1-2).",
+                },
+            },
+        },
+    },
+    {
+        "name": "aggregate_job_groups",
+        "description": "Count the jobs in a GOE or DOT occupational group, and in each of its subgroups, that meet exertion and skill limits (e.g. unskilled sedentary jobs in GOE 05). Answers from precomputed per-group counts; returns JSON.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "hierarchy": {
+                    "type": "string",
+                    "enum": ["goe", "occupation"],
+                    "description": "Optional: 'goe' (interest area > work group > subgroup, default) or 'occupation' (DOT code category > division > group).",
+                },
+                "code": {
+                    "type": "string",
+                    "description": "Optional: Group code, e.g. GOE '05' or '05.02.01', occupation '2', '20' or '209'. Omit for the top level.",
+                },
+                "max_strength": {
+                    "type": "string",
+                    "description": "Optional: Only count jobs at or below this exertion level (S, L, M, H, V or e.g. SEDENTARY).",
+                },
+                "max_svp": {
+                    "type": "integer",
+                    "description": "Optional: Only count jobs with an SVP at or below this (1-9).",
+                },
+                "skill_level": {
+                    "type": "string",
+                    "enum": ["unskilled", "semi-skilled", "skilled"],
+                    "description": "Optional: Only count jobs at this skill level (unskilled = SVP 1-2).",
+                },
+            },
+        },
+    },
+    {
+        "name": "occupational_base",
+        "description": "Compute the remaining occupational base for an RFC over the whole DOT: the jobs within its exertional level and SVP (unskilled by default), the jobs left after its postural, manipulative, visual, sensory, environmental and mental limits, and how many jobs each limitation erodes. Includes approximate job numbers from BLS employment through the DOT-SOC crosswalk when the BLS workbook is loaded. Returns JSON.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "rfc": {
+                    "type": "object",
+                    "description": "RFC in the structure used for hypotheticals: 'exertional' (with 'level', e.g. 'Sedentary' or 'LIGHT'), and optional 'postural', 'manipulative', 'visual', 'sensory' and 'environmental' limits by demand name (e.g. {'Climbing': 'N', 'Reaching': 'O', 'Noise': 3, 'Hazards': 'N'}), and 'mental' limits ('svp', 'reasoning', 'math', 'language', 'instructions').",
+                },
+                "include_jobs": {
+                    "type": "boolean",
+                    "description": "Optional: Also list the remaining jobs (up to 200).",
+                },
+                "dot_codes": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Optional: DOT codes (e.g. the jobs the VE cited) to screen against the RFC; each comes back with the limitations it exceeds.",
+                },
+            },
+            "required": ["rfc"],
+        },
+    },
     {
         "name": "check_job_obsolescence",
         "description": "Check if a specific DOT job is potentially obsolete based on available indicators and SSA guidance (e.g., EM-24027 REV). Returns JSON.",
@@ -118,6 +430,43 @@ TOOL_DEFINITIONS = [
             "required": ["table_name"],
         },
     },
+    {
+        "name": "filter_jobs",
+        "description": "Filter DOT occupations with a structured expression supporting ranges, IN lists, NOT and OR groups, compiled into a single parameterized query. Returns JSON; when the rows reach the limit, total_matches gives the full match count from the bitmap index.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "filters": {
+                    "type": "object",
+                    "description": "Filter expression. Column mapping form: {\"StrengthNum\": {\"in\": [1, 2]}, \"SVPNum\": {\"between\": [1, 2]}, \"GEDR\": {\"lte\": 2}, \"ClimbingNum\": 1}. Groups: {\"and\": [...]}, {\"or\": [...]}, {\"not\": {...}}. Operators: eq, ne, lt, lte, gt, gte, between, in, not_in, is_null, not_null.",
+                },
+                "columns": {
+                    "anyOf": [
+                        {
+                            "type": "string",
+                            "enum": ["numeric_demands", "skills_profile", "report_full"],
+                        },
+                        {"type": "array", "items": {"type": "string"}},
+                    ],
+                    "description": "Optional: Named column set ('numeric_demands', 'skills_profile', 'report_full') or list of DOT columns to return (e.g., ['Code', 'Title', 'StrengthNum', 'SVPNum']). Defaults to all columns.",
+                },
+                "sort_by": {
+                    "type": "string",
+                    "description": "Optional: Column to sort by (default 'Title').",
+                },
+                "sort_dir": {
+                    "type": "string",
+                    "enum": ["ASC", "DESC"],
+                    "description": "Optional: Sort direction (default 'ASC').",
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Optional: Maximum rows to return (default 100, max 1000).",
+                },
+            },
+            "required": ["filters"],
+        },
+    },
     # BLS Excel Tools
     {
         "name": "analyze_bls_excel",
@@ -152,7 +501,75 @@ TOOL_DEFINITIONS = [
             "required": ["title"],
         },
     },
-    # File writing tool
+    # Admin Tools
+    {
+        "name": "job_analysis_cache",
+        "description": "Inspect or build the precomputed job analysis table used by report generation and TSA. Building runs the job analysis for every DOT row.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "action": {
+                    "type": "string",
+                    "enum": ["status", "build"],
+                    "description": "Optional: 'status' (default) or 'build'.",
+                },
+                "force": {
+                    "type": "boolean",
+                    "description": "Optional: Rebuild even if the stored analyses are current (default false).",
+                },
+            },
+        },
+    },
+    {
+        "name": "job_report_cache",
+        "description": "Inspect or build the pre-rendered job report store used by generate_job_report. Building renders a compressed report for every DOT row.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "action": {
+                    "type": "string",
+                    "enum": ["status", "build"],
+                    "description": "Optional: 'status' (default) or 'build'.",
+                },
+                "force": {
+                    "type": "boolean",
+                    "description": "Optional: Re-render reports that are already current (default false).",
+                },
+            },
+        },
+    },
+    {
+        "name": "server_metrics",
+        "description": "Report per-tool dispatch metrics (concurrency limit, deadline, calls, timeouts, cancellations, queueing delay and run time percentiles) plus lookup coalescing and row cache statistics. Returns JSON.",
+        "inputSchema": {"type": "object", "properties": {}},
+    },
+    # File writing tools
+    {
+        "name": "render_audit_report",
+        "description": "Render a VE audit report as HTML from compact structured data (case details, hypotheticals with their jobs, conflicts, obsolescence flags, TSA outcome, follow-up questions) and write it to disk on the server. Jobs may be given by DOT code only ({dot_code} objects); title, exertion, SVP, skill and GED-R are filled from the DOT, and obsolescence flags from the reference data. Returns the written path and size, not the HTML.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "audit": {
+                    "type": "object",
+                    "description": "Audit data: case {claimant, hearing_date, alj, ve, attorney, applicable_ssr}, summary, recommendation, hypotheticals [{title, text, response, jobs [{dot_code, title, exertion, svp, skill, ged_r, jobs, status}]}], conflicts [{job, dot_code, area, hypothetical_limit, job_requirement, description, severity}], obsolescence [{dot_code, title, status, source, comment}], tsa {outcome, rule, skills [string], notes}, follow_up_questions [string], conclusion. Only case is required.",
+                },
+                "filename": {
+                    "type": "string",
+                    "description": "Name of the HTML file (e.g., '2024-01-15_ve_audit_Smith.html').",
+                },
+                "path": {
+                    "type": "string",
+                    "description": "Directory relative to the project root (default: the server's audits/completed directory).",
+                },
+                "fill_from_dot": {
+                    "type": "boolean",
+                    "description": "Fill missing job details and obsolescence flags from the DOT (default true).",
+                },
+            },
+            "required": ["audit", "filename"],
+        },
+    },
     {
         "name": "write_file",
         "description": "Write provided content to a specified file within the allowed project directory structure. Creates directories if needed.",
@@ -183,42 +600,185 @@ db: Optional[DatabaseHandler] = None
 bls_handler: Optional[BLSExcelHandler] = None
 
 
-async def main(db_path: Path):
+SERVER_VERSION = "0.2.0"
+BLS_WARM_UP_WAIT = 5.0  # Seconds a BLS tool waits for the workbook still loading at startup
+MAX_SUGGESTIONS = 50  # Upper bound for suggest_jobs limit
+MAX_SCREENED_CODES = 50  # Upper bound for occupational_base dot_codes
+AUDIT_REPORT_DIR = "src/mcp_server_sqlite/audits/completed"  # Relative to the workspace root
+
+
+class StartupTimer:
+    """Collects the durations of startup phases for one log line."""
+
+    def __init__(self, started: float):
+        self._last = started
+        self._started = started
+        self.phases: List[Tuple[str, float]] = []
+
+    def mark(self, phase: str) -> None:
+        """Records the time since the previous mark as the duration of phase."""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def summary(self) -> str:
+        parts = [f"{phase} {seconds * 1000:.1f} ms" for phase, seconds in self.phases]
+        total = (self._last - self._started) * 1000
+        return f"{', '.join(parts)}; total {total:.1f} ms"
+
+def resolve_workspace_file(relative_path_str: str, filename: str) -> Tuple[Path, Path]:
+    """
+    Resolves a file path for the file writing tools, relative to the workspace root.
+
+    Returns:
+        (workspace_root, target_file)
+
+    Raises:
+        ValueError: If the path or filename is empty, contains '..', or leaves the workspace.
+    """
+    # Basic sanitization/validation (can be enhanced)
+    if ".." in relative_path_str or ".." in filename:
+        logger.error("Attempted file write with invalid path traversal ('..').")
+        raise ValueError("Invalid path or filename containing '..'.")
+    if not filename:
+        raise ValueError("Filename cannot be empty.")
+
+    # Assume workspace_root is the directory containing the 'src' folder
+    # For this project structure, it seems to be /Users/COLEMAN/Documents/GitHub/servers
+    # A more robust solution might get this from an environment variable or config
+    workspace_root = Path(__file__).parent.parent.parent  # Go up three levels from server.py
+
+    # Resolve the target path relative to the workspace root
+    target_file = workspace_root / Path(relative_path_str) / filename
+
+    # Security Check (Example): Ensure we are writing within the workspace
+    # This prevents writing to arbitrary locations like /etc/passwd
+    # You might want more specific allowed directories.
+    if not target_file.resolve().is_relative_to(workspace_root.resolve()):
+        logger.error(f"Attempted to write file outside workspace: {target_file}")
+        raise ValueError("Target path is outside the allowed workspace.")
+    return workspace_root, target_file
+
+
+def parse_job_filters(args: Dict[str, Any]) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Parses the optional max_strength and max_svp arguments of the job search tools.
+
+    Returns:
+        (max StrengthNum 1-5 or None, max SVP 1-9 or None)
+
+    Raises:
+        ValueError: If either limit is invalid.
+    """
+    max_strength = None
+    if args.get("max_strength"):
+        level = str(args["max_strength"]).strip().upper()
+        names = {name.upper(): code for code, name in config.strength_code_to_name.items()}
+        code = names.get(level, level)
+        strength_nums = {code: num for num, code in config.strength_num_to_code.items()}
+        if code not in strength_nums:
+            raise ValueError(
+                f"Invalid max_strength '{args['max_strength']}'. Use S, L, M, H or V."
+            )
+        max_strength = strength_nums[code]
+    max_svp = args.get("max_svp")
+    if max_svp is not None and (not isinstance(max_svp, int) or not 1 <= max_svp <= 9):
+        raise ValueError("max_svp must be an integer between 1 and 9.")
+    return max_strength, max_svp
+
+
+def parse_group_filters(args: Dict[str, Any]) -> Tuple[Optional[int], Optional[Tuple[int, ...]]]:
+    """
+    Parses max_strength, max_svp and skill_level for the job group tools.
+
+    Returns:
+        (max StrengthNum or None, allowed SVP levels or None)
+    """
+    max_strength, max_svp = parse_job_filters(args)
+    return max_strength, group_index.svp_levels(max_svp, args.get("skill_level"))
+
+
+# DOT codes warmed at startup when there is no usage history yet
+COMMON_DOT_CODES = [
+    "211.462-010",  # Cashier
+    "211.462-014",  # Cashier-Checker
+    "299.367-014",  # Teacher Aide
+    "209.587-034",  # Marker
+    "920.687-014",  # Cleaner, Commercial or Institutional
+    "290.477-014",  # Sales Clerk
+    "311.677-014",  # Waiter/Waitress
+    "920.687-134",  # Janitor
+    "222.487-014",  # Order Clerk
+    "361.684-014",  # Dishwasher
+]
+
+
+async def main(
+    db_path: Path,
+    in_memory: bool = False,
+    hot_reload: bool = True,
+    transport: str = "stdio",
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+):
     """
     Main asynchronous function to initialize and run the MCP server.
 
     Args:
         db_path: A pathlib.Path object pointing to the validated SQLite database file.
+        in_memory: Serve reads from an in-memory snapshot of the database.
+        hot_reload: Watch the database, BLS workbook and reference JSON files and
+                    swap in reloaded handlers when they change.
+        transport: 'stdio' (one client), or 'streamable-http' / 'sse' to serve
+                   many clients from this process with shared handlers and caches.
+        host: Interface the HTTP transports bind to.
+        port: Port the HTTP transports listen on.
     """
+    startup = StartupTimer(_IMPORT_STARTED)
+    startup.mark("imports")
     logger.info(f"Initializing MCP Server with DB path: {db_path}")
 
     try:
         # Instantiate the database handler (ensure it's ready)
-        db = DatabaseHandler(db_path)
+        db = DatabaseHandler(db_path, in_memory=in_memory)
         logger.info("DatabaseHandler initialized successfully.")
 
-        # Warm up the cache with frequently accessed DOT codes
-        from .generate_job_report import warm_up_cache
-
-        # List of common DOT codes to pre-cache (most frequently accessed)
-        common_dot_codes = [
-            "211.462-010",  # Cashier
-            "211.462-014",  # Cashier-Checker
-            "299.367-014",  # Teacher Aide
-            "209.587-034",  # Marker
-            "920.687-014",  # Cleaner, Commercial or Institutional
-            "290.477-014",  # Sales Clerk
-            "311.677-014",  # Waiter/Waitress
-            "920.687-134",  # Janitor
-            "222.487-014",  # Order Clerk
-            "361.684-014",  # Dishwasher
-        ]
-
-        # Warm up the cache (non-blocking way)
         import asyncio
 
-        asyncio.create_task(asyncio.to_thread(warm_up_cache, db, common_dot_codes))
-        logger.info("DOT code cache warm-up initiated.")
+        # Precomputed job analyses and reports
+        analysis_store = AnalysisStore(db)
+        report_store = ReportStore(db, analysis_store)
+
+        # Lookup counts from previous runs decide which jobs are warmed
+        usage_tracker = UsageTracker(default_state_path(db.db_path))
+
+        def warm_up_handlers(handlers: dict) -> None:
+            title_index.get_title_index(handlers["db"])
+            similarity_index.get_similarity_index(handlers["db"])
+            definition_index.get_definition_index(handlers["db"])
+            group_index.get_group_index(handlers["db"])
+            bitmap_index.get_bitmap_index(handlers["db"])
+            warm_up_from_usage(
+                handlers["db"], handlers["report_store"], usage_tracker, COMMON_DOT_CODES
+            )
+
+        # Version check (hashes the DOT table) and warm-up run off the loop
+        start_background_task(
+            asyncio.to_thread(
+                warm_up_handlers,
+                {"db": db, "analysis_store": analysis_store, "report_store": report_store},
+            ),
+            "cache warm-up",
+        )
+        logger.info("Cache warm-up initiated.")
+
+        # Concurrent identical lookups share one computation
+        flights = SingleFlight()
+        # Per-tool concurrency budgets, deadlines and cancellation
+        dispatcher = ToolDispatcher()
+        # Indexed transcripts for transcript_search and digest prompts
+        transcripts = TranscriptStore()
+        startup.mark("database handlers")
     except FileNotFoundError as e:
         logger.critical(
             f"Database file not found during DatabaseHandler init: {e}", exc_info=True
@@ -236,22 +796,82 @@ async def main(db_path: Path):
     excel_file_path = (
         Path(__file__).parent / "DOTSOCBLS_Excel" / "bls_all_data_M_2024.xlsx"
     )
-    try:
-        bls_handler = BLSExcelHandler.get_instance(
-            excel_file_path
-        )  # Use get_instance for singleton
-        logger.info("BLSExcelHandler initialized successfully.")
-    except FileNotFoundError as e:
-        logger.warning(f"BLS Excel file not found: {e}. BLS tools will be unavailable.")
-        bls_handler = None  # Server will still run, but BLS tools won't work
-    except Exception as e:
-        logger.error(
-            f"Error initializing BLSExcelHandler: {e}. BLS tools will be unavailable."
+    # Handlers are read from the registry per request so hot reloads can swap them.
+    # The BLS handler is added once the workbook has loaded in the background.
+    registry = HandlerRegistry(
+        Handlers(
+            db=db,
+            analysis_store=analysis_store,
+            report_store=report_store,
+        )
+    )
+    bls_loaded = asyncio.Event()  # Set once loading finished, successfully or not
+
+    def load_bls_handler() -> None:
+        load_started = time.perf_counter()
+        try:
+            bls_handler = build_bls_handler(excel_file_path)
+        except Exception as e:
+            logger.error(
+                f"Error initializing BLSExcelHandler: {e}. BLS tools will be unavailable."
+            )
+            return  # Server will still run, but BLS tools won't work
+        if bls_handler is not None:
+            BLSExcelHandler.replace_instance(bls_handler)  # Keep the singleton in step
+            registry.swap(bls_handler=bls_handler)
+            logger.info(
+                f"BLSExcelHandler initialized in the background in "
+                f"{(time.perf_counter() - load_started) * 1000:.1f} ms."
+            )
+
+    async def load_bls_in_background() -> None:
+        try:
+            await asyncio.to_thread(load_bls_handler)
+        finally:
+            bls_loaded.set()
+
+    start_background_task(load_bls_in_background(), "BLS workbook load")
+
+    async def wait_for_bls(bls_handler: Optional[BLSExcelHandler]) -> Optional[BLSExcelHandler]:
+        """Returns the BLS handler, waiting briefly if the workbook is still loading."""
+        if bls_handler is not None or bls_loaded.is_set():
+            return bls_handler
+        try:
+            await asyncio.wait_for(bls_loaded.wait(), BLS_WARM_UP_WAIT)
+        except asyncio.TimeoutError:
+            return None
+        return registry.current.bls_handler
+
+    def bls_warming_up(tool_name: str) -> list[types.TextContent]:
+        return [
+            types.TextContent(
+                type="text",
+                text=encode_response(
+                    {
+                        "status": "warming_up",
+                        "message": "The BLS workbook is still loading. Retry in a few seconds.",
+                    },
+                    tool_name,
+                ),
+            )
+        ]
+    # Reference JSON is otherwise parsed by the first request that needs it
+    start_background_task(asyncio.to_thread(preload_reference_data), "reference data preload")
+    if hot_reload:
+        watcher = SourceWatcher(
+            registry,
+            db_path=db.db_path,
+            excel_path=excel_file_path,
+            reference_dir=Path(__file__).parent / "reference_json",
+            in_memory=in_memory,
+            warm_up=warm_up_handlers,
         )
-        bls_handler = None  # Server will still run, but BLS tools won't work
+        start_background_task(watcher.run(), "source watcher")
+    start_background_task(usage_tracker.autosave(), "usage autosave")
 
     # Create the MCP Server instance
-    server = Server("ve-audit-dot-server")  # Specific server name
+    # Specific server name; the version is also reported by the HTTP session manager
+    server = Server("ve-audit-dot-server", version=SERVER_VERSION)
 
     # --- Register MCP Handlers ---
     logger.debug("Registering MCP handlers...")
@@ -286,6 +906,15 @@ async def main(db_path: Path):
                         required=False,
                         default="Claimant",
                     ),
+                    types.PromptArgument(
+                        name="transcript_mode",
+                        description=(
+                            "'full' pastes the transcript into the prompt; 'digest' indexes it and "
+                            "includes an outline for retrieval with transcript_search. "
+                            f"Default 'auto': digest above {LONG_TRANSCRIPT_CHARS} characters."
+                        ),
+                        required=False,
+                    ),
                 ],
             )
         ]
@@ -306,6 +935,19 @@ async def main(db_path: Path):
                 logger.error(f"Missing required arguments for VE_MCP_Audit: {missing}")
                 raise ValueError(f"Missing required arguments: {missing}")
 
+            # Long transcripts are indexed and replaced by a digest plus retrieval instructions
+            transcript_mode = args.get("transcript_mode") or "auto"
+            if transcript_mode not in ("auto", "full", "digest"):
+                raise ValueError(
+                    f"Invalid transcript_mode '{transcript_mode}'. Use 'auto', 'full' or 'digest'."
+                )
+            transcript_text = args["transcript"]
+            if transcript_mode == "digest" or (
+                transcript_mode == "auto" and len(transcript_text) > LONG_TRANSCRIPT_CHARS
+            ):
+                index = await asyncio.to_thread(transcripts.add, transcript_text)
+                transcript_text = index.outline_text()
+
             # Load template from the specific imported module
             try:
                 prompt_text = ve_audit_MCP_rag.PROMPT_TEMPLATE.format(
@@ -313,7 +955,7 @@ async def main(db_path: Path):
                     # Assuming the template handles this logic internally or via LLM instruction
                     applicable_ssr="To be determined based on hearing date",
                     claimant_name=args.get("claimant_name", "Claimant"),
-                    transcript=args["transcript"],
+                    transcript=transcript_text,
                 )
             except AttributeError:
                 # This would mean PROMPT_TEMPLATE isn't defined in ve_audit_MCP_rag.py
@@ -364,14 +1006,22 @@ async def main(db_path: Path):
 
     # --- Tool Dispatch Handlers ---
     async def tool_list_tables(args, db, **kwargs):
-        results = db.list_all_tables()
-        return [types.TextContent(type="text", text=json.dumps(results, indent=2))]
+        results = await run_in_thread(db.list_all_tables)
+        return [
+            types.TextContent(
+                type="text", text=encode_response(results, "list_tables")
+            )
+        ]
 
     async def tool_describe_table(args, db, **kwargs):
         if "table_name" not in args:
             raise ValueError("Missing required argument: table_name")
-        results = db.describe_table_schema(args["table_name"])
-        return [types.TextContent(type="text", text=json.dumps(results, indent=2))]
+        results = await run_in_thread(db.describe_table_schema, args["table_name"])
+        return [
+            types.TextContent(
+                type="text", text=encode_response(results, "describe_table")
+            )
+        ]
 
     async def tool_read_query(args, db, **kwargs):
         if "query" not in args:
@@ -379,20 +1029,249 @@ async def main(db_path: Path):
         query_text = args["query"].strip()
         if not query_text.upper().startswith("SELECT"):
             raise ValueError("Only SELECT queries are allowed for read_query")
-        results = db.execute_select_query(query_text)
-        return [types.TextContent(type="text", text=json.dumps(results, indent=2))]
+        # Off the event loop, so the deadline and client cancellation can interrupt it
+        results = await run_in_thread(db.execute_select_query, query_text)
+        return [
+            types.TextContent(
+                type="text", text=encode_response(results, "read_query")
+            )
+        ]
+
+    async def tool_filter_jobs(args, db, **kwargs):
+        if "filters" not in args:
+            raise ValueError("Missing required argument: filters")
+        limit = args.get("limit", 100)
+        if not isinstance(limit, int) or not 1 <= limit <= 1000:
+            raise ValueError("limit must be an integer between 1 and 1000")
+        results = await run_in_thread(
+            db.filter_jobs,
+            args["filters"],
+            sort_by=args.get("sort_by", "Title"),
+            sort_dir=args.get("sort_dir", "ASC"),
+            limit=limit,
+            columns=args.get("columns"),
+        )
+        response = {"count": len(results), "results": results}
+        if len(results) == limit:
+            # Total beyond the limit, when the bitmap index covers every filtered column
+            total = await run_in_thread(bitmap_index.count_matches, db, args["filters"])
+            if total is not None:
+                response["total_matches"] = total
+        return [
+            types.TextContent(
+                type="text",
+                text=encode_response(response, "filter_jobs"),
+            )
+        ]
+
+    async def tool_compare_jobs(args, db, analysis_store, **kwargs):
+        from .analysis_store import get_analyses_for_rows
+        from .ve_logic import build_job_comparison, format_job_comparison_table
+
+        dot_codes = args.get("dot_codes")
+        if not isinstance(dot_codes, list) or not 2 <= len(dot_codes) <= 10:
+            raise ValueError("dot_codes must be a list of 2 to 10 DOT codes.")
+        output_format = args.get("format", "table")
+        if output_format not in ("table", "json"):
+            raise ValueError("format must be 'table' or 'json'.")
+        for code in dot_codes:
+            usage_tracker.record_search(str(code))
+
+        # One query for all jobs; analyses come from the precomputed store when current
+        rows = await run_in_thread(
+            db.batch_get_jobs_by_codes, dot_codes, columns="skills_profile"
+        )
+        analyses_by_ncode = await run_in_thread(
+            get_analyses_for_rows, rows, analysis_store
+        )
+        analyses = []
+        not_found = []
+        for code in dot_codes:
+            ncode, _ = DotCode.clean(str(code))
+            if ncode in analyses_by_ncode and "error" not in analyses_by_ncode[ncode]:
+                analyses.append(analyses_by_ncode[ncode])
+            else:
+                not_found.append(code)
+        if not analyses:
+            raise ValueError(f"None of the DOT codes were found: {not_found}")
+
+        comparison = build_job_comparison(analyses)
+        if output_format == "json":
+            comparison["not_found"] = not_found
+            # Already row-oriented; keep the shape documented for this tool
+            text = encode_response(comparison, "compare_jobs", columnar=False)
+        else:
+            text = format_job_comparison_table(comparison)
+            if not_found:
+                text += f"\nNot found: {', '.join(map(str, not_found))}"
+        return [types.TextContent(type="text", text=text)]
+
+    async def tool_preprocess_transcript(args, db, bls_handler, **kwargs):
+        if "transcript" not in args:
+            raise ValueError("Missing required argument: transcript")
+        bls_handler = await wait_for_bls(bls_handler)
+        result = await run_in_thread(
+            transcript_preprocessor.preprocess_transcript,
+            args["transcript"],
+            db,
+            bls_handler,
+            bool(args.get("include_titles", True)),
+        )
+        for job in result["cited_jobs"]:
+            usage_tracker.record_search(job["dotCode"])
+        return [
+            types.TextContent(
+                type="text", text=encode_response(result, "preprocess_transcript")
+            )
+        ]
+
+    async def tool_transcript_search(args, **kwargs):
+        if args.get("transcript"):
+            index = await run_in_thread(transcripts.add, args["transcript"])
+        elif args.get("transcript_id"):
+            index = transcripts.get(args["transcript_id"])
+            if index is None:
+                raise ValueError(
+                    f"Unknown transcript_id '{args['transcript_id']}'. Pass the transcript text to index it."
+                )
+        else:
+            raise ValueError("Provide either transcript or transcript_id.")
+        limit = args.get("limit", transcript_index.DEFAULT_SEARCH_LIMIT)
+        if not isinstance(limit, int) or not 1 <= limit <= transcript_index.MAX_SEARCH_LIMIT:
+            raise ValueError(
+                f"limit must be an integer between 1 and {transcript_index.MAX_SEARCH_LIMIT}."
+            )
+
+        result: dict = {"transcript_id": index.transcript_id}
+        if args.get("chunk_ids"):
+            chunk_ids = args["chunk_ids"]
+            if not all(isinstance(chunk_id, int) for chunk_id in chunk_ids):
+                raise ValueError("chunk_ids must be a list of integers.")
+            result["passages"] = index.get_chunks(chunk_ids[: transcript_index.MAX_SEARCH_LIMIT])
+        elif args.get("query") or args.get("tags") or args.get("speaker"):
+            result["passages"] = index.search(
+                args.get("query"), args.get("tags") or (), args.get("speaker"), limit
+            )
+        else:
+            result["outline"] = index.outline()
+        return [
+            types.TextContent(type="text", text=encode_response(result, "transcript_search"))
+        ]
+
+    async def tool_suggest_jobs(args, db, **kwargs):
+        if "title" not in args:
+            raise ValueError("Missing required argument: title")
+        limit = args.get("limit", title_index.DEFAULT_LIMIT)
+        min_score = args.get("min_score", title_index.DEFAULT_MIN_SCORE)
+        if not isinstance(limit, int) or not 1 <= limit <= MAX_SUGGESTIONS:
+            raise ValueError(f"limit must be an integer between 1 and {MAX_SUGGESTIONS}.")
+        if not isinstance(min_score, (int, float)) or not 0 <= min_score <= 100:
+            raise ValueError("min_score must be a number between 0 and 100.")
+        index = await run_in_thread(title_index.get_title_index, db)
+        matches = index.search(args["title"], limit=limit, min_score=min_score)
+        result = {"query": args["title"], "count": len(matches), "matches": matches}
+        return [
+            types.TextContent(type="text", text=encode_response(result, "suggest_jobs"))
+        ]
+
+    async def tool_similar_jobs(args, db, **kwargs):
+        if "dot_code" not in args:
+            raise ValueError("Missing required argument: dot_code")
+        ncode, _ = DotCode.clean(args["dot_code"])
+        if ncode is None:
+            raise ValueError(f"Invalid DOT code: '{args['dot_code']}'")
+        k = args.get("k", similarity_index.DEFAULT_K)
+        if not isinstance(k, int) or not 1 <= k <= similarity_index.MAX_K:
+            raise ValueError(f"k must be an integer between 1 and {similarity_index.MAX_K}.")
+        max_strength, max_svp = parse_job_filters(args)
+        usage_tracker.record_code(ncode)
+
+        index = await run_in_thread(similarity_index.get_similarity_index, db)
+        result = index.nearest(ncode, k=k, max_strength=max_strength, max_svp=max_svp)
+        return [
+            types.TextContent(type="text", text=encode_response(result, "similar_jobs"))
+        ]
+
+    async def tool_search_job_definitions(args, db, **kwargs):
+        query = args.get("query")
+        if not isinstance(query, str) or not query.strip():
+            raise ValueError("Missing required argument: query")
+        k = args.get("k", definition_index.DEFAULT_K)
+        if not isinstance(k, int) or not 1 <= k <= definition_index.MAX_K:
+            raise ValueError(f"k must be an integer between 1 and {definition_index.MAX_K}.")
+        max_strength, max_svp = parse_job_filters(args)
+
+        index = await run_in_thread(definition_index.get_definition_index, db)
+        result = index.search(query.strip(), k=k, max_strength=max_strength, max_svp=max_svp)
+        return [
+            types.TextContent(type="text", text=encode_response(result, "search_job_definitions"))
+        ]
+
+    async def tool_browse_job_groups(args, db, **kwargs):
+        max_strength, svps = parse_group_filters(args)
+        index = await run_in_thread(group_index.get_group_index, db)
+        result = index.browse(
+            args.get("hierarchy", "goe"),
+            args.get("code"),
+            include_jobs=bool(args.get("include_jobs", False)),
+            max_strength=max_strength,
+            svps=svps,
+        )
+        return [
+            types.TextContent(type="text", text=encode_response(result, "browse_job_groups"))
+        ]
+
+    async def tool_aggregate_job_groups(args, db, **kwargs):
+        max_strength, svps = parse_group_filters(args)
+        index = await run_in_thread(group_index.get_group_index, db)
+        result = index.aggregate(
+            args.get("hierarchy", "goe"), args.get("code"), max_strength=max_strength, svps=svps
+        )
+        result["filters"] = {
+            "maxStrength": config.strength_num_to_code.get(max_strength),
+            "svp": list(svps) if svps is not None else None,
+        }
+        return [
+            types.TextContent(type="text", text=encode_response(result, "aggregate_job_groups"))
+        ]
+
+    async def tool_occupational_base(args, db, bls_handler, **kwargs):
+        rfc = args.get("rfc")
+        if not isinstance(rfc, dict):
+            raise ValueError("Missing required argument: rfc")
+        dot_codes = args.get("dot_codes") or []
+        if not isinstance(dot_codes, list) or len(dot_codes) > MAX_SCREENED_CODES:
+            raise ValueError(f"dot_codes must be a list of at most {MAX_SCREENED_CODES} DOT codes.")
+        bls_handler = await wait_for_bls(bls_handler)
+        result = await run_in_thread(
+            occupational_base.occupational_base,
+            db,
+            rfc,
+            bool(args.get("include_jobs", False)),
+            bls_handler,
+            [str(code) for code in dot_codes],
+        )
+        return [
+            types.TextContent(type="text", text=encode_response(result, "occupational_base"))
+        ]
 
     async def tool_check_job_obsolescence(args, **kwargs):
         if "dot_code" not in args:
             raise ValueError("Missing required argument: dot_code")
+        usage_tracker.record_search(args["dot_code"])
         results_dict = check_job_obsolescence(args["dot_code"])
-        return [types.TextContent(type="text", text=json.dumps(results_dict, indent=2))]
+        return [
+            types.TextContent(
+                type="text", text=encode_response(results_dict, "check_job_obsolescence")
+            )
+        ]
 
-    async def tool_analyze_transferable_skills(args, db, **kwargs):
+    async def tool_analyze_transferable_skills(args, db, analysis_store, **kwargs):
         required_tsa_args = ["source_dot", "residual_capacity", "age", "education"]
         missing = [arg for arg in required_tsa_args if arg not in args]
         if missing:
             raise ValueError(f"Missing required arguments for TSA: {missing}")
+        usage_tracker.record_search(args["source_dot"])
         results_dict = await tsa_logic.perform_tsa_analysis(
             db_handler=db,
             source_dot_code=args["source_dot"],
@@ -400,41 +1279,92 @@ async def main(db_path: Path):
             age_category=args["age"],
             education_level=args["education"],
             target_dot_codes=args.get("target_dots"),
+            analysis_store=analysis_store,
+            flights=flights,
         )
-        return [types.TextContent(type="text", text=json.dumps(results_dict, indent=2))]
+        return [
+            types.TextContent(
+                type="text",
+                text=encode_response(results_dict, "analyze_transferable_skills"),
+            )
+        ]
 
-    async def tool_generate_job_report(args, db, **kwargs):
+    async def tool_generate_job_report(args, db, analysis_store, report_store, **kwargs):
         if "search_term" not in args:
             raise ValueError("Missing required argument: search_term")
         search_term = args["search_term"].strip()
+        output_format = args.get("format", "text")
+        if output_format != "text" and output_format not in format_report.RENDER_TARGETS:
+            raise ValueError("format must be 'text', 'markdown', 'json' or 'html'.")
+        usage_tracker.record_search(search_term)
 
         logger.debug(f"generate_job_report searching for: '{search_term}'")
 
         # Import necessary functions from other modules
         from .generate_job_report import get_job_data  # Data retrieval
-        from .ve_logic import (
-            get_job_analysis,
-            generate_formatted_job_report,
-        )  # Analysis and Formatting
+        from .ve_logic import generate_formatted_job_report  # Formatting
 
         try:
-            # Step 1: Get Raw Job Data
-            raw_job_data = get_job_data(db, search_term)
+            # Step 0: Serve a stored report directly when the term is a DOT code
+            ncode, _ = DotCode.clean(search_term)
+            # report_store.get hashes the sources and DOT table on first use; keep it off the event loop
+            stored_report = (
+                await run_in_thread(report_store.get, ncode) if output_format == "text" else None
+            )
+            if stored_report is not None:
+                logger.debug(f"Serving stored report for '{search_term}'")
+                return [types.TextContent(type="text", text=stored_report)]
+
+            # Step 1: Get Raw Job Data (coalesced with concurrent lookups of the same job)
+            lookup_key = ncode if ncode is not None else " ".join(search_term.lower().split())
+            raw_job_data = await flights.do(
+                ("job_data", db, lookup_key), get_job_data, db, search_term
+            )
 
             if not raw_job_data:
                 logger.info(f"No job data found for search term: '{search_term}'")
-                return [
-                    types.TextContent(
-                        type="text",
-                        text=f"No matching jobs found for search term: '{search_term}'.",
-                    )
-                ]
+                text = f"No matching jobs found for search term: '{search_term}'."
+                if ncode is None:
+                    index = await run_in_thread(title_index.get_title_index, db)
+                    suggestions = index.search(search_term, limit=5)
+                    if suggestions:
+                        text += " Did you mean: " + "; ".join(
+                            f"{match['jobTitle']} ({match['dotCode']})" for match in suggestions
+                        ) + "?"
+                return [types.TextContent(type="text", text=text)]
 
             logger.debug(f"Found raw job data for '{search_term}'")
 
-            # Step 2: Perform Analysis on Raw Data
+            # Say which job a misspelled title was resolved to
+            match_note = ""
+            fuzzy_match = raw_job_data.get("fuzzyMatch")
+            if fuzzy_match:
+                match_note = (
+                    f"Note: No exact title match for '{search_term}'; showing the closest match, "
+                    f"{fuzzy_match['jobTitle']} ({fuzzy_match['dotCode']}, "
+                    f"match score {fuzzy_match['score']}).\n\n"
+                )
+
+            if output_format != "text":
+                # Structured renderings of the DOT record, cached per job and format
+                report_text = await run_in_thread(
+                    format_report.render_job_report, db, raw_job_data, output_format
+                )
+                contents = [types.TextContent(type="text", text=match_note.strip())] if match_note else []
+                return contents + [types.TextContent(type="text", text=report_text)]
+
+            stored_report = await run_in_thread(report_store.get, raw_job_data.get("Ncode"))
+            if stored_report is not None:
+                return [types.TextContent(type="text", text=match_note + stored_report)]
+
+            # Step 2: Perform Analysis on Raw Data (precomputed when available)
             # Pass None for hearing_date as it's not available in this tool's context
-            analysis_data = get_job_analysis(raw_job_data, hearing_date_str=None)
+            analysis_data = await flights.do(
+                ("job_analysis", analysis_store, raw_job_data.get("Ncode", lookup_key)),
+                analysis_store.get_or_compute,
+                raw_job_data,
+                hearing_date_str=None,
+            )
 
             if "error" in analysis_data:
                 logger.error(
@@ -453,7 +1383,10 @@ async def main(db_path: Path):
             # Step 3: Format the Analysis Data
             try:
                 report_text = generate_formatted_job_report(analysis_data)
-                return [types.TextContent(type="text", text=report_text)]
+                if raw_job_data.get("Ncode") is not None:
+                    # Store for later requests (lazy pre-rendering)
+                    await run_in_thread(report_store.put, raw_job_data["Ncode"], report_text)
+                return [types.TextContent(type="text", text=match_note + report_text)]
             except Exception as format_err:
                 logger.error(
                     f"Error formatting job report for '{search_term}': {format_err}",
@@ -497,16 +1430,19 @@ async def main(db_path: Path):
             ]
 
     async def tool_analyze_bls_excel(args, bls_handler, **kwargs):
+        bls_handler = await wait_for_bls(bls_handler)
+        if bls_handler is None and not bls_loaded.is_set():
+            return bls_warming_up("analyze_bls_excel")
         if bls_handler is None:
             return [
                 types.TextContent(
                     type="text",
-                    text=json.dumps(
+                    text=encode_response(
                         {
                             "status": "Error",
                             "message": "BLS Excel handler failed to initialize. Check server logs.",
                         },
-                        indent=2,
+                        "analyze_bls_excel",
                     ),
                 )
             ]
@@ -525,18 +1461,20 @@ async def main(db_path: Path):
                     "sample_rows": head_rows,
                 }
                 return [
-                    types.TextContent(type="text", text=json.dumps(result, indent=2))
+                    types.TextContent(
+                        type="text", text=encode_response(result, "analyze_bls_excel")
+                    )
                 ]
             else:
                 return [
                     types.TextContent(
                         type="text",
-                        text=json.dumps(
+                        text=encode_response(
                             {
                                 "status": "Error",
                                 "message": "BLS DataFrame is not loaded within the handler.",
                             },
-                            indent=2,
+                            "analyze_bls_excel",
                         ),
                     )
                 ]
@@ -545,26 +1483,29 @@ async def main(db_path: Path):
             return [
                 types.TextContent(
                     type="text",
-                    text=json.dumps(
+                    text=encode_response(
                         {
                             "status": "Error",
                             "message": f"Failed to retrieve info from BLS handler: {str(e)}",
                         },
-                        indent=2,
+                        "analyze_bls_excel",
                     ),
                 )
             ]
 
     async def tool_query_bls_by_soc(args, bls_handler, **kwargs):
+        bls_handler = await wait_for_bls(bls_handler)
+        if bls_handler is None and not bls_loaded.is_set():
+            return bls_warming_up("query_bls_by_soc")
         if bls_handler is None:
             return [
                 types.TextContent(
                     type="text",
-                    text=json.dumps(
+                    text=encode_response(
                         {
                             "error": "BLS Excel handler is not available. Check server logs."
                         },
-                        indent=2,
+                        "query_bls_by_soc",
                     ),
                 )
             ]
@@ -572,18 +1513,26 @@ async def main(db_path: Path):
             raise ValueError("Missing required argument: soc_code")
         soc_code = args["soc_code"]
         try:
-            result = bls_handler.query_by_soc_code(soc_code)
+            result = await flights.do(
+                ("bls_soc", bls_handler, str(soc_code)),
+                bls_handler.query_by_soc_code,
+                soc_code,
+            )
             if result is None:
                 return [
                     types.TextContent(
                         type="text",
-                        text=json.dumps(
+                        text=encode_response(
                             {"message": f"No BLS data found for SOC code: {soc_code}"},
-                            indent=2,
+                            "query_bls_by_soc",
                         ),
                     )
                 ]
-            return [types.TextContent(type="text", text=json.dumps(result, indent=2))]
+            return [
+                types.TextContent(
+                    type="text", text=encode_response(result, "query_bls_by_soc")
+                )
+            ]
         except Exception as e:
             logger.error(
                 f"Error querying BLS data by SOC code '{soc_code}': {e}", exc_info=True
@@ -591,23 +1540,26 @@ async def main(db_path: Path):
             return [
                 types.TextContent(
                     type="text",
-                    text=json.dumps(
+                    text=encode_response(
                         {"error": f"Failed to query BLS data by SOC: {str(e)}"},
-                        indent=2,
+                        "query_bls_by_soc",
                     ),
                 )
             ]
 
     async def tool_query_bls_by_title(args, bls_handler, **kwargs):
+        bls_handler = await wait_for_bls(bls_handler)
+        if bls_handler is None and not bls_loaded.is_set():
+            return bls_warming_up("query_bls_by_title")
         if bls_handler is None:
             return [
                 types.TextContent(
                     type="text",
-                    text=json.dumps(
+                    text=encode_response(
                         {
                             "error": "BLS Excel handler is not available. Check server logs."
                         },
-                        indent=2,
+                        "query_bls_by_title",
                     ),
                 )
             ]
@@ -615,13 +1567,17 @@ async def main(db_path: Path):
             raise ValueError("Missing required argument: title")
         title = args["title"]
         try:
-            results = bls_handler.query_by_occupation_title(title)
+            results = await flights.do(
+                ("bls_title", bls_handler, str(title).lower()),
+                bls_handler.query_by_occupation_title,
+                title,
+            )
             return [
                 types.TextContent(
                     type="text",
-                    text=json.dumps(
+                    text=encode_response(
                         {"query": title, "count": len(results), "results": results},
-                        indent=2,
+                        "query_bls_by_title",
                     ),
                 )
             ]
@@ -632,9 +1588,9 @@ async def main(db_path: Path):
             return [
                 types.TextContent(
                     type="text",
-                    text=json.dumps(
+                    text=encode_response(
                         {"error": f"Failed to query BLS data by title: {str(e)}"},
-                        indent=2,
+                        "query_bls_by_title",
                     ),
                 )
             ]
@@ -646,40 +1602,12 @@ async def main(db_path: Path):
         if missing:
             raise ValueError(f"Missing required arguments for write_file: {missing}")
 
-        relative_path_str = args["path"]
-        filename = args["filename"]
+        workspace_root, target_file = resolve_workspace_file(args["path"], args["filename"])
         content = args["content"]
 
-        # Basic sanitization/validation (can be enhanced)
-        if ".." in relative_path_str or ".." in filename:
-            logger.error("Attempted file write with invalid path traversal ('..').")
-            raise ValueError("Invalid path or filename containing '..'.")
-        if not filename:
-            raise ValueError("Filename cannot be empty.")
-
         try:
-            # Assume workspace_root is the directory containing the 'src' folder
-            # For this project structure, it seems to be /Users/COLEMAN/Documents/GitHub/servers
-            # A more robust solution might get this from an environment variable or config
-            workspace_root = Path(
-                __file__
-            ).parent.parent.parent  # Go up three levels from server.py
-
-            # Resolve the target path relative to the workspace root
-            target_dir = workspace_root / Path(relative_path_str)
-            target_file = target_dir / filename
-
-            # Security Check (Example): Ensure we are writing within the workspace
-            # This prevents writing to arbitrary locations like /etc/passwd
-            # You might want more specific allowed directories.
-            if not target_file.resolve().is_relative_to(workspace_root.resolve()):
-                logger.error(
-                    f"Attempted to write file outside workspace: {target_file}"
-                )
-                raise ValueError("Target path is outside the allowed workspace.")
-
             # Create parent directories if they don't exist
-            target_dir.mkdir(parents=True, exist_ok=True)
+            target_file.parent.mkdir(parents=True, exist_ok=True)
 
             # Write the file
             target_file.write_text(content, encoding="utf-8")
@@ -688,12 +1616,12 @@ async def main(db_path: Path):
             return [
                 types.TextContent(
                     type="text",
-                    text=json.dumps(
+                    text=encode_response(
                         {
                             "status": "Success",
                             "message": f"File written successfully to {target_file.relative_to(workspace_root)}",
                         },
-                        indent=2,
+                        "write_file",
                     ),
                 )
             ]
@@ -709,17 +1637,114 @@ async def main(db_path: Path):
                 f"An unexpected error occurred while writing the file: {str(e)}"
             )
 
+    async def tool_render_audit_report(args, db, **kwargs):
+        """Renders structured audit data to an HTML report on disk."""
+        audit = args.get("audit")
+        filename = args.get("filename") or ""
+        if not filename.lower().endswith((".html", ".htm")):
+            raise ValueError("filename must end with '.html'.")
+        audit_renderer.validate_audit(audit)
+        workspace_root, target_file = resolve_workspace_file(
+            args.get("path") or AUDIT_REPORT_DIR, filename
+        )
+
+        def render() -> Dict[str, Any]:
+            started = time.perf_counter()
+            report = (
+                audit_renderer.enrich_audit(audit, db) if args.get("fill_from_dot", True) else audit
+            )
+            size = audit_renderer.write_audit_report(report, target_file)
+            return {
+                "status": "Success",
+                "path": str(target_file.relative_to(workspace_root)),
+                "bytes": size,
+                "hypotheticals": len(report.get("hypotheticals") or []),
+                "conflicts": len(report.get("conflicts") or []),
+                "render_ms": round((time.perf_counter() - started) * 1000, 1),
+            }
+
+        try:
+            result = await run_in_thread(render)
+        except OSError as e:
+            logger.error(f"OS error writing audit report {target_file}: {e}", exc_info=True)
+            raise ValueError(f"Failed to write audit report due to OS error: {e.strerror}")
+        return [
+            types.TextContent(
+                type="text", text=encode_response(result, "render_audit_report")
+            )
+        ]
+
+    async def tool_job_analysis_cache(args, analysis_store, **kwargs):
+        action = args.get("action", "status")
+        if action == "status":
+            result = await run_in_thread(analysis_store.status)
+        elif action == "build":
+            result = await run_in_thread(
+                analysis_store.build, bool(args.get("force", False))
+            )
+        else:
+            raise ValueError(f"Invalid action '{action}'. Use 'status' or 'build'.")
+        return [
+            types.TextContent(
+                type="text", text=encode_response(result, "job_analysis_cache")
+            )
+        ]
+
+    async def tool_job_report_cache(args, report_store, **kwargs):
+        action = args.get("action", "status")
+        if action == "status":
+            result = await run_in_thread(report_store.status)
+        elif action == "build":
+            result = await run_in_thread(
+                report_store.build, bool(args.get("force", False))
+            )
+        else:
+            raise ValueError(f"Invalid action '{action}'. Use 'status' or 'build'.")
+        return [
+            types.TextContent(
+                type="text", text=encode_response(result, "job_report_cache")
+            )
+        ]
+
+    async def tool_server_metrics(args, **kwargs):
+        from .generate_job_report import CacheStats
+
+        result = {
+            "tools": dispatcher.metrics(),
+            "coalescing": flights.stats(),
+            "row_cache": CacheStats.get_stats(),
+        }
+        return [
+            types.TextContent(
+                type="text", text=encode_response(result, "server_metrics")
+            )
+        ]
+
     TOOL_DISPATCH = {
         "list_tables": tool_list_tables,
         "describe_table": tool_describe_table,
         "read_query": tool_read_query,
+        "filter_jobs": tool_filter_jobs,
+        "compare_jobs": tool_compare_jobs,
+        "preprocess_transcript": tool_preprocess_transcript,
+        "transcript_search": tool_transcript_search,
+        "suggest_jobs": tool_suggest_jobs,
+        "similar_jobs": tool_similar_jobs,
+        "search_job_definitions": tool_search_job_definitions,
+        "browse_job_groups": tool_browse_job_groups,
+        "aggregate_job_groups": tool_aggregate_job_groups,
+        "occupational_base": tool_occupational_base,
         "check_job_obsolescence": tool_check_job_obsolescence,
         "analyze_transferable_skills": tool_analyze_transferable_skills,
         "generate_job_report": tool_generate_job_report,
         "analyze_bls_excel": tool_analyze_bls_excel,
         "query_bls_by_soc": tool_query_bls_by_soc,
         "query_bls_by_title": tool_query_bls_by_title,
+        "render_audit_report": tool_render_audit_report,
         "write_file": tool_write_file,
+        "job_analysis_cache": tool_job_analysis_cache,
+        "job_report_cache": tool_job_report_cache,
+        "server_metrics": tool_server_metrics,
     }
 
     @server.call_tool()
@@ -736,13 +1761,21 @@ async def main(db_path: Path):
             if not handler:
                 logger.error(f"Unknown tool called: {name}")
                 raise ValueError(f"Unknown tool: {name}")
-            # Pass only the handlers that are needed
+            # Pass only the handlers that are needed, all from one registry snapshot
+            handlers = registry.current
             handler_kwargs = {}
             if "db" in handler.__code__.co_varnames:
-                handler_kwargs["db"] = db
+                handler_kwargs["db"] = handlers.db
             if "bls_handler" in handler.__code__.co_varnames:
-                handler_kwargs["bls_handler"] = bls_handler
-            return await handler(args, **handler_kwargs)
+                handler_kwargs["bls_handler"] = handlers.bls_handler
+            if "analysis_store" in handler.__code__.co_varnames:
+                handler_kwargs["analysis_store"] = handlers.analysis_store
+            if "report_store" in handler.__code__.co_varnames:
+                handler_kwargs["report_store"] = handlers.report_store
+            # Runs within the tool's concurrency budget and deadline
+            return await dispatcher.run(name, lambda: handler(args, **handler_kwargs))
+        except ToolTimeoutError as e:
+            return [types.TextContent(type="text", text=f"Tool Timeout ({name}): {str(e)}")]
         except ValueError as e:
             logger.error(f"ValueError calling tool '{name}': {e}", exc_info=True)
             return [
@@ -793,27 +1826,35 @@ async def main(db_path: Path):
                 )
             ]
 
-    # --- Run the Server using Stdio ---
-    logger.info("Attempting to start server with stdio transport...")
+    startup.mark("server setup")
+    logger.info(f"Startup timing: {startup.summary()} (BLS workbook and warm-up continue in the background)")
+
+    # --- Run the Server over the selected transport ---
+    logger.info(f"Attempting to start server with {transport} transport...")
     try:
-        async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-            logger.info("stdio transport acquired, running server run loop...")
-            await server.run(
-                read_stream,
-                write_stream,
-                InitializationOptions(
-                    server_name="ve-audit-dot-server",  # Specific name
-                    server_version="0.2.0",  # Updated version
-                    capabilities=server.get_capabilities(
-                        notification_options=NotificationOptions(),
-                        experimental_capabilities={},
-                    ),
+        await run_transport(
+            transport,
+            server,
+            InitializationOptions(
+                server_name="ve-audit-dot-server",  # Specific name
+                server_version=SERVER_VERSION,
+                capabilities=server.get_capabilities(
+                    notification_options=NotificationOptions(),
+                    experimental_capabilities={},
                 ),
-            )
+            ),
+            host=host,
+            port=port,
+            on_shutdown=usage_tracker.save,
+        )
         logger.info("Server run loop finished normally.")
     except Exception as e:
         # Catch errors during server startup/run itself
-        logger.critical(f"Failed to start or run stdio server: {e}", exc_info=True)
+        logger.critical(f"Failed to start or run {transport} server: {e}", exc_info=True)
+    finally:
+        await cancel_background_tasks()
+        # Persist lookup counts for the next start's cache warm-up
+        usage_tracker.save()
 
 
 # No `if __name__ == "__main__":` block needed here.
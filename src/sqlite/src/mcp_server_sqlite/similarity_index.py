@@ -0,0 +1,239 @@
+# similarity_index.py
+
+"""
+Nearest-neighbour search over DOT trait vectors ("jobs most like this one").
+
+Every job is encoded once as a row of a float32 matrix, built from trait groups:
+
+    - Numeric traits (GED, SVP, strength, worker functions, aptitudes,
+      physical demand and environmental condition frequencies) are scaled to
+      0-1 by the column's range in the DOT. Missing values take the column mean.
+    - Coded traits (temperaments, work fields, MPSMS codes) are one-hot sets,
+      compared by cosine distance.
+
+Each group's columns are scaled so that the distance between two jobs within a
+group lies in 0-1 (root mean square difference for numeric groups), and groups
+are weighted equally by default. The overall distance is then the Euclidean
+distance between rows, also 0-1. A query is one matrix-vector product against
+precomputed row norms, followed by argpartition for the k closest rows.
+Per-group distances are computed only for the returned jobs.
+
+numpy is imported when an index is built, keeping it out of server startup.
+"""
+
+import logging
+import time
+import warnings
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from . import config
+from .hot_reload import PerHandlerCache
+from .models import DotCode
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_K = 10
+MAX_K = 50
+
+NUMERIC_GROUPS: Dict[str, Tuple[str, ...]] = {
+    "ged": ("GEDR", "GEDM", "GEDL"),
+    "svp": ("SVPNum",),
+    "strength": ("StrengthNum",),
+    "worker_functions": ("WFData", "WFPeople", "WFThings"),
+    "aptitudes": tuple(
+        f"Apt{details['api_suffix']}" for details in config.aptitude_code_to_details_map.values()
+    ),
+    "physical": tuple(config.physical_demand_api_keys_to_labels),
+    "environmental": tuple(config.environmental_condition_api_keys_to_labels),
+}
+CODED_GROUPS: Dict[str, Tuple[str, ...]] = {
+    "temperaments": tuple(f"Temp{i}" for i in range(1, 6)),
+    "work_fields": tuple(f"WField{i}" for i in range(1, 4)),
+    "mpsms": tuple(f"MPSMS{i}" for i in range(1, 4)),
+}
+GROUPS = (*NUMERIC_GROUPS, *CODED_GROUPS)
+
+
+def _codes(row: Dict[str, Any], columns: Sequence[str]) -> List[str]:
+    """Returns the distinct non-empty codes in a row's coded columns."""
+    values = (str(row.get(column) or "").strip() for column in columns)
+    return sorted({value for value in values if value})
+
+
+class SimilarityIndex:
+    """Matrix of normalized DOT trait vectors with k-nearest-neighbour queries."""
+
+    def __init__(self, rows: Sequence[Dict[str, Any]], weights: Optional[Dict[str, float]] = None):
+        """
+        Builds the index.
+
+        Args:
+            rows: DOT rows with Ncode, Title and the trait columns in NUMERIC_GROUPS and CODED_GROUPS.
+            weights: Relative weight per trait group (default 1.0 each).
+
+        Raises:
+            ValueError: If a weight names an unknown group or is negative.
+        """
+        import numpy as np
+
+        weights = {**{group: 1.0 for group in GROUPS}, **(weights or {})}
+        unknown = set(weights) - set(GROUPS)
+        if unknown or any(weight < 0 for weight in weights.values()):
+            raise ValueError(
+                f"Weights must be non-negative, for the groups: {', '.join(GROUPS)}"
+            )
+        total_weight = sum(weights.values()) or 1.0
+
+        rows = [row for row in rows if row.get("Ncode") is not None]
+        self.ncodes = np.array([int(row["Ncode"]) for row in rows], dtype=np.int64)
+        self.titles = [row.get("Title") or "" for row in rows]
+        self.strength = np.array(
+            [row.get("StrengthNum") or 0 for row in rows], dtype=np.int8
+        )
+        self.svp = np.array([row.get("SVPNum") or 0 for row in rows], dtype=np.int8)
+        self._row_of = {int(ncode): i for i, ncode in enumerate(self.ncodes)}
+
+        blocks = []
+        self._slices: Dict[str, slice] = {}
+        self._group_scale: Dict[str, float] = {}
+        offset = 0
+        for group, columns in NUMERIC_GROUPS.items():
+            values = np.array(
+                [[row.get(column) for column in columns] for row in rows], dtype=np.float64
+            ).reshape(len(rows), len(columns))
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)  # All-NULL columns
+                low, high = np.nanmin(values, axis=0), np.nanmax(values, axis=0)
+                span = np.where(high > low, high - low, 1.0)
+                scaled = (values - low) / span
+                means = np.nanmean(scaled, axis=0)
+            scaled = np.where(np.isnan(scaled), np.nan_to_num(means), scaled)
+            # Squared distance within the group is the mean squared difference
+            blocks.append(scaled / np.sqrt(len(columns)))
+            self._slices[group] = slice(offset, offset + len(columns))
+            offset += len(columns)
+        for group, columns in CODED_GROUPS.items():
+            row_codes = [_codes(row, columns) for row in rows]
+            vocabulary = {code: i for i, code in enumerate(sorted({c for codes in row_codes for c in codes}))}
+            one_hot = np.zeros((len(rows), max(1, len(vocabulary))), dtype=np.float64)
+            for i, codes in enumerate(row_codes):
+                for code in codes:
+                    # Unit-length halves: squared distance is 1 - cosine similarity of the sets
+                    one_hot[i, vocabulary[code]] = 1.0 / np.sqrt(2 * len(codes))
+            blocks.append(one_hot)
+            self._slices[group] = slice(offset, offset + one_hot.shape[1])
+            offset += one_hot.shape[1]
+
+        # Group weights go into the matrix, so the overall distance is a plain Euclidean one
+        matrix = np.hstack(blocks)
+        for group, group_slice in self._slices.items():
+            scale = np.sqrt(weights[group] / total_weight)
+            self._group_scale[group] = scale
+            matrix[:, group_slice] *= scale
+        self.matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        self.squared_norms = np.einsum("ij,ij->i", self.matrix, self.matrix)
+
+    @classmethod
+    def from_database(cls, db: Any) -> "SimilarityIndex":
+        """Builds the index from a DatabaseHandler's DOT table."""
+        started = time.perf_counter()
+        columns = ["Ncode", "Title"]
+        for group_columns in (*NUMERIC_GROUPS.values(), *CODED_GROUPS.values()):
+            columns.extend(group_columns)
+        rows = db.execute_select_query(f"SELECT {', '.join(columns)} FROM DOT")
+        index = cls(rows)
+        logger.info(
+            f"Built similarity index: {index.matrix.shape[0]} jobs x {index.matrix.shape[1]} "
+            f"dimensions in {time.perf_counter() - started:.2f}s."
+        )
+        return index
+
+    def __len__(self) -> int:
+        return len(self.ncodes)
+
+    def group_distances(self, i: int, j: int) -> Dict[str, float]:
+        """Returns the unweighted distance (0-1) between two rows in each trait group."""
+        import numpy as np
+
+        distances = {}
+        for group, group_slice in self._slices.items():
+            scale = self._group_scale[group]
+            difference = self.matrix[i, group_slice] - self.matrix[j, group_slice]
+            distance = float(np.sqrt(np.dot(difference, difference))) / scale if scale else 0.0
+            distances[group] = round(distance, 3)
+        return distances
+
+    def nearest(
+        self,
+        ncode: int,
+        k: int = DEFAULT_K,
+        max_strength: Optional[int] = None,
+        max_svp: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Returns the k jobs closest to a job, closest first.
+
+        Args:
+            ncode: Ncode of the source job.
+            k: Number of jobs returned.
+            max_strength: Only return jobs with StrengthNum at or below this (1-5).
+            max_svp: Only return jobs with SVP at or below this.
+
+        Returns:
+            Dictionary with the source job and its matches, each with the overall
+            distance (0-1) and per-group distances.
+
+        Raises:
+            ValueError: If the job is not in the index.
+        """
+        import numpy as np
+
+        i = self._row_of.get(ncode)
+        if i is None:
+            raise ValueError(f"DOT code {DotCode.format(ncode)} was not found in the DOT table.")
+
+        query = self.matrix[i]
+        squared = self.squared_norms + self.squared_norms[i] - 2.0 * (self.matrix @ query)
+        distances = np.sqrt(np.maximum(squared, 0.0))
+        distances[i] = np.inf  # Exclude the source job itself
+        if max_strength is not None:
+            distances[(self.strength > max_strength) | (self.strength == 0)] = np.inf
+        if max_svp is not None:
+            distances[(self.svp > max_svp) | (self.svp == 0)] = np.inf
+
+        candidates = int(np.count_nonzero(np.isfinite(distances)))
+        k = min(k, candidates)
+        if k <= 0:
+            nearest_rows = np.array([], dtype=np.int64)
+        else:
+            nearest_rows = np.argpartition(distances, k - 1)[:k]
+            nearest_rows = nearest_rows[np.argsort(distances[nearest_rows], kind="stable")]
+
+        return {
+            "source": self._describe(i),
+            "candidates": candidates,
+            "matches": [
+                {
+                    **self._describe(j),
+                    "distance": round(float(distances[j]), 4),
+                    "group_distances": self.group_distances(i, j),
+                }
+                for j in nearest_rows
+            ],
+        }
+
+    def _describe(self, i: int) -> Dict[str, Any]:
+        return {
+            "dotCode": DotCode.format(int(self.ncodes[i])),
+            "jobTitle": self.titles[i],
+            "strength": config.strength_num_to_code.get(int(self.strength[i])),
+            "svp": int(self.svp[i]) or None,
+        }
+
+
+_indexes = PerHandlerCache(SimilarityIndex.from_database)
+
+
+def get_similarity_index(db: Any) -> SimilarityIndex:
+    """Returns the similarity index for a database handler, building it on first use."""
+    return _indexes.get(db)
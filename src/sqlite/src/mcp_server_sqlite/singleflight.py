@@ -0,0 +1,80 @@
+# singleflight.py
+
+"""
+Coalescing of concurrent identical lookups ("single flight").
+
+When several tool calls ask for the same thing at the same time, e.g. parallel
+tool calls for one DOT report, only the first runs the lookup. The others await
+the same in-flight result. Once the lookup finishes its key is released, so
+later calls run normally (and hit whatever caches the lookup filled).
+
+Synchronous functions run in a worker thread, so they do not block the event
+loop and concurrent calls can actually overlap. Results are shared, not copied,
+so callers must treat them as read-only.
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from .dispatch import run_in_thread
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Runs at most one computation per key at a time; concurrent callers share it."""
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self.executed = 0  # Computations started
+        self.shared = 0  # Calls answered by another call's computation
+
+    async def do(self, key: Hashable, function: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Returns function(*args, **kwargs), sharing the result with concurrent calls for the same key.
+
+        Args:
+            key: Identifies the computation. Include the handler the function
+                 reads from, so results from a replaced database are not shared.
+            function: Synchronous function (run in a worker thread) or coroutine function.
+
+        Raises:
+            Whatever the function raises; every waiting caller receives the exception.
+        """
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.shared += 1
+            logger.debug(f"Joining in-flight computation for {key!r}")
+        else:
+            self.executed += 1
+            future = asyncio.ensure_future(self._run(function, *args, **kwargs))
+            self._in_flight[key] = future
+            future.add_done_callback(functools.partial(self._release, key))
+        # Shield so one caller being cancelled does not cancel the others' result
+        return await asyncio.shield(future)
+
+    def _release(self, key: Hashable, future: "asyncio.Future[Any]") -> None:
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+        if not future.cancelled():
+            future.exception()  # Mark retrieved even if every caller was cancelled
+
+    @staticmethod
+    def _run(function: Callable[..., Any], *args: Any, **kwargs: Any) -> Awaitable[Any]:
+        if asyncio.iscoroutinefunction(function):
+            return function(*args, **kwargs)
+        # Run in an empty context: the shared work must not inherit the first
+        # caller's cancellation token, or one caller cancelling would abort the others.
+        # The first caller's tool slot is still held until the thread finishes.
+        return run_in_thread(contextvars.Context().run, function, *args, **kwargs)
+
+    def stats(self) -> Dict[str, int]:
+        """Returns counts of computations run, calls that shared one, and keys in flight."""
+        return {
+            "executed": self.executed,
+            "shared": self.shared,
+            "in_flight": len(self._in_flight),
+        }
@@ -0,0 +1,78 @@
+# soc_crosswalk.py
+
+"""
+DOT to O*NET-SOC crosswalk (DOTSOCBLS_Excel/DOT_to_ONET_SOC.xlsx).
+
+Maps a DOT code to its O*NET-SOC 2019 occupations, which in turn key the BLS
+OEWS workbook (OCC_CODE is the O*NET-SOC code without its ".00" suffix).
+The workbook is read on first use, like the reference JSON, and pandas is
+imported only then.
+"""
+
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CROSSWALK_PATH = Path(__file__).parent / "DOTSOCBLS_Excel" / "DOT_to_ONET_SOC.xlsx"
+HEADER_ROW = 3  # Title rows above the column headers
+
+Crosswalk = Dict[str, List[Dict[str, str]]]  # Formatted DOT code -> O*NET-SOC occupations
+
+
+def load_crosswalk(path: Path = CROSSWALK_PATH) -> Crosswalk:
+    """
+    Reads the crosswalk workbook.
+
+    Returns:
+        Dictionary keyed by DOT code (XXX.XXX-XXX) of {"onetSocCode", "onetSocTitle",
+        "blsOccCode"} entries. Empty if the workbook is missing or unreadable.
+    """
+    if not path.is_file():
+        logger.warning(f"DOT to O*NET-SOC crosswalk not found at {path}. SOC lookups unavailable.")
+        return {}
+    try:
+        import pandas as pd
+
+        frame = pd.read_excel(path, header=HEADER_ROW, dtype=str)
+    except Exception as e:
+        logger.error(f"Error reading DOT to O*NET-SOC crosswalk {path}: {e}")
+        return {}
+
+    crosswalk: Crosswalk = {}
+    for dot_code, soc_code, soc_title in zip(
+        frame["DOT Code"], frame["O*NET-SOC 2019 Code"], frame["O*NET-SOC 2019 Title"]
+    ):
+        if not isinstance(dot_code, str) or not isinstance(soc_code, str):
+            continue
+        soc_code = soc_code.strip()
+        crosswalk.setdefault(dot_code.strip(), []).append(
+            {
+                "onetSocCode": soc_code,
+                "onetSocTitle": soc_title.strip() if isinstance(soc_title, str) else "",
+                "blsOccCode": soc_code.split(".")[0],
+            }
+        )
+    logger.info(f"Loaded DOT to O*NET-SOC crosswalk: {len(crosswalk)} DOT codes.")
+    return crosswalk
+
+
+_CROSSWALK: Optional[Crosswalk] = None
+_crosswalk_lock = threading.Lock()
+
+
+def get_crosswalk() -> Crosswalk:
+    """Returns the crosswalk, loading it on first use."""
+    global _CROSSWALK
+    if _CROSSWALK is None:
+        with _crosswalk_lock:
+            if _CROSSWALK is None:
+                _CROSSWALK = load_crosswalk()
+    return _CROSSWALK
+
+
+def soc_codes_for(dot_code: str) -> List[Dict[str, str]]:
+    """Returns the O*NET-SOC occupations for a DOT code (XXX.XXX-XXX), or an empty list."""
+    return get_crosswalk().get(dot_code, [])
@@ -0,0 +1,308 @@
+# title_index.py
+
+"""
+Fuzzy job title matching over the DOT table.
+
+Titles spoken in hearings rarely match DOT titles exactly ("dish washer",
+"surveillance system monitor", "addresser"), and the substring LIKE used by
+find_job_data then finds nothing. TitleIndex is an in-memory trigram index
+over Title, CompleteTitle and each alternate title in AltTitles:
+
+    - Titles are normalized (lowercase, industry designations and punctuation
+      removed) and split into character trigrams with spaces removed.
+    - DOT titles put qualifiers after a comma ("TOUCH-UP SCREENER, PRINTED
+      CIRCUIT BOARD ASSEMBLY"). The head before the comma is indexed too, and
+      its scores are scaled by HEAD_WEIGHT so a full-title match ranks first.
+    - A query looks up its trigrams in the posting lists and ranks titles by
+      trigram overlap (Dice coefficient). The best candidates are then re-scored
+      with thefuzz: token_sort_ratio, which ignores word order ("monitor,
+      surveillance system"), and ratio on the space-stripped forms, which
+      ignores word splits ("dish washer" / "dishwasher").
+    - Results are collapsed to one per DOT code and scored 0-100.
+
+The thresholds were tuned on misspelled and split hearing titles against the
+DOT titles VEs cite most. The intended job scored 84 or more, and unrelated
+words (occupations not in the DOT, exertional terms) scored at most 78, so a
+fuzzy match replaces an exact one only from FALLBACK_MIN_SCORE. Suggestions
+start lower and may include look-alikes ("sedentary" -> SECRETARY, 78).
+
+The index is built once per DatabaseHandler (a few hundred milliseconds for the
+full DOT) and queries take milliseconds.
+"""
+
+import logging
+import re
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+try:
+    from thefuzz import fuzz
+except ImportError:  # Declared dependency; fall back to difflib if it is missing
+    fuzz = None
+    from difflib import SequenceMatcher
+
+from .hot_reload import PerHandlerCache
+from .models import DotCode
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIMIT = 10
+DEFAULT_MIN_SCORE = 72.0  # suggest_jobs and "did you mean" suggestions
+FALLBACK_MIN_SCORE = 82.0  # Fuzzy match used in place of an exact one by generate_job_report
+HEAD_WEIGHT = 0.95  # Scale of scores against a title's head (the part before the first comma)
+MENTION_MIN_SCORE = FALLBACK_MIN_SCORE  # Spoken phrase accepted as a title mention by find_mentions
+MAX_MENTION_WORDS = 5  # Longest spoken phrase find_mentions scores
+MAX_MENTION_CANDIDATES = 10  # Jobs compared per spoken phrase
+
+# Words that do not start a title mention ("a cashier", "as dishwasher")
+_LEADING_STOPWORDS = frozenset(
+    "a an and as at be by for from he her his i in is it of on or she that the their them they "
+    "this to was were with would you".split()
+)
+_ROMAN_NUMERALS = frozenset({"i", "ii", "iii", "iv", "v", "vi"})
+CANDIDATES_PER_RESULT = 10  # Trigram candidates re-scored per requested result
+
+_PARENTHETICAL = re.compile(r"\([^)]*\)")
+_NON_ALPHANUMERIC = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_title(title: str) -> str:
+    """Lowercases a title and removes industry designations and punctuation."""
+    title = _PARENTHETICAL.sub(" ", title.lower())
+    return " ".join(_NON_ALPHANUMERIC.sub(" ", title).split())
+
+
+def trigrams(normalized: str) -> List[str]:
+    """Returns the distinct character trigrams of a normalized title (spaces removed, padded)."""
+    compact = "$" + normalized.replace(" ", "") + "$"
+    return list({compact[i : i + 3] for i in range(len(compact) - 2)})
+
+
+def _token_sort_ratio(a: str, b: str) -> float:
+    if fuzz is not None:
+        return float(fuzz.token_sort_ratio(a, b))
+    return 100.0 * SequenceMatcher(None, " ".join(sorted(a.split())), " ".join(sorted(b.split()))).ratio()
+
+
+def _compact_ratio(a: str, b: str) -> float:
+    """Similarity of two normalized titles with spaces removed ("dish washer" / "dishwasher")."""
+    a, b = a.replace(" ", ""), b.replace(" ", "")
+    if fuzz is not None:
+        return float(fuzz.ratio(a, b))
+    return 100.0 * SequenceMatcher(None, a, b).ratio()
+
+
+@dataclass(frozen=True)
+class _Entry:
+    ncode: int
+    title: str  # DOT title of the job
+    matched: str  # Title, complete title or alternate title that was indexed
+    source: str  # "title", "complete_title" or "alt_title"
+    normalized: str  # Normalized matched title, or its head
+    trigram_count: int
+    weight: float  # 1.0, or HEAD_WEIGHT for a head entry
+
+
+class TitleIndex:
+    """Trigram index over the DOT titles, complete titles and alternate titles."""
+
+    def __init__(self, rows: Iterable[Dict[str, Any]]):
+        """
+        Builds the index.
+
+        Args:
+            rows: DOT rows with Ncode, Title, CompleteTitle and AltTitles.
+        """
+        self._entries: List[_Entry] = []
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        self._phrases: Dict[str, Set[int]] = defaultdict(set)  # Normalized title -> Ncodes
+        job_count = 0
+        for row in rows:
+            ncode = row.get("Ncode")
+            title = (row.get("Title") or "").strip()
+            if ncode is None or not title:
+                continue
+            job_count += 1
+            names = [(title, "title"), ((row.get("CompleteTitle") or "").strip(), "complete_title")]
+            # Alternate titles are separated by semicolons
+            names += [(alt.strip(), "alt_title") for alt in (row.get("AltTitles") or "").split(";")]
+            # Full names first, so a head equal to another name does not replace it
+            keys = [(name, source, normalize_title(name), 1.0) for name, source in names]
+            keys += [
+                (name, source, normalize_title(name.split(",", 1)[0]), HEAD_WEIGHT)
+                for name, source in names
+                if "," in name
+            ]
+            seen = set()
+            for name, source, normalized, weight in keys:
+                if not normalized or normalized in seen:
+                    continue
+                seen.add(normalized)
+                grams = trigrams(normalized)
+                entry_id = len(self._entries)
+                self._entries.append(
+                    _Entry(int(ncode), title, name, source, normalized, len(grams), weight)
+                )
+                for gram in grams:
+                    self._postings[gram].append(entry_id)
+                if weight == 1.0:
+                    self._phrases[normalized].add(int(ncode))
+        self.job_count = job_count
+        self._max_phrase_words = max((len(p.split()) for p in self._phrases), default=0)
+        # Head nouns ("washer", "monitor") end spoken titles; find_mentions only scores phrases ending in one
+        self._head_words: Set[str] = set()
+        for entry in self._entries:
+            words = [word for word in entry.normalized.split() if word not in _ROMAN_NUMERALS]
+            if words and (entry.weight != 1.0 or "," not in entry.matched):
+                self._head_words.add(words[-1])
+
+    @classmethod
+    def from_database(cls, db: Any) -> "TitleIndex":
+        """Builds the index from a DatabaseHandler's DOT table."""
+        started = time.perf_counter()
+        rows = db.execute_select_query("SELECT Ncode, Title, CompleteTitle, AltTitles FROM DOT")
+        index = cls(rows)
+        logger.info(
+            f"Built title index: {len(index._entries)} titles for {index.job_count} jobs, "
+            f"{len(index._postings)} trigrams in {time.perf_counter() - started:.2f}s."
+        )
+        return index
+
+    def search(
+        self, query: str, limit: int = DEFAULT_LIMIT, min_score: float = DEFAULT_MIN_SCORE
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns the jobs whose titles best match the query, best first.
+
+        Args:
+            query: Job title as spoken or written, possibly misspelled.
+            limit: Maximum number of jobs returned.
+            min_score: Minimum score (0-100) for a job to be returned.
+
+        Returns:
+            One dictionary per job: dotCode, Ncode, jobTitle, matchedTitle,
+            matchedField and score.
+        """
+        normalized = normalize_title(query)
+        if not normalized or limit <= 0:
+            return []
+        query_grams = trigrams(normalized)
+
+        # Count shared trigrams per indexed title
+        shared: Counter = Counter()
+        for gram in query_grams:
+            shared.update(self._postings.get(gram, ()))
+        dice = {
+            entry_id: 2.0 * count / (len(query_grams) + self._entries[entry_id].trigram_count)
+            for entry_id, count in shared.items()
+        }
+        candidates = sorted(dice, key=dice.__getitem__, reverse=True)[: limit * CANDIDATES_PER_RESULT]
+
+        best: Dict[int, Dict[str, Any]] = {}
+        for entry_id in candidates:
+            entry = self._entries[entry_id]
+            score = max(
+                100.0 * dice[entry_id],
+                _token_sort_ratio(normalized, entry.normalized),
+                _compact_ratio(normalized, entry.normalized),
+            )
+            score = round(score * entry.weight, 1)
+            if score < min_score:
+                continue
+            current = best.get(entry.ncode)
+            if current is None or score > current["score"]:
+                best[entry.ncode] = {
+                    "dotCode": DotCode.format(entry.ncode),
+                    "Ncode": entry.ncode,
+                    "jobTitle": entry.title,
+                    "matchedTitle": entry.matched,
+                    "matchedField": entry.source,
+                    "score": score,
+                }
+        return sorted(best.values(), key=lambda match: (-match["score"], match["Ncode"]))[:limit]
+
+    def find_mentions(
+        self, text: str, min_words: int = 2, min_score: float = MENTION_MIN_SCORE
+    ) -> List[Dict[str, Any]]:
+        """
+        Finds title mentions in free text, including reordered and split titles
+        and misspelled qualifiers ("machine dishwasher", "dish washer",
+        "survelance system monitor").
+
+        Only phrases that end or start with a title head word (or a head word
+        split in two) are scored, with the same scorer as search(), so a
+        transcript is scanned in one pass. Overlapping phrases keep the best
+        score, then the longest.
+
+        Args:
+            text: Text to scan, e.g. a hearing transcript.
+            min_words: Fewest words in a spoken phrase. Single words ("marker",
+                       "cashier") are ordinary words in testimony, so the default skips them.
+            min_score: Lowest score (0-100) accepted as a mention.
+
+        Returns:
+            One dictionary per distinct title: title (DOT title), spoken (first
+            phrase matched), Ncodes (every job with that best score), score and count.
+        """
+        tokens = normalize_title(text).split()
+        longest = min(max(self._max_phrase_words, min_words), MAX_MENTION_WORDS)
+
+        def is_head(position: int) -> bool:
+            return tokens[position] in self._head_words or (
+                position > 0 and tokens[position - 1] + tokens[position] in self._head_words
+            )
+
+        heads = [is_head(position) for position in range(len(tokens))]
+        scored: Dict[str, Optional[Dict[str, Any]]] = {}  # Phrases repeat across a transcript
+        candidates = []
+        for start in range(len(tokens)):
+            if tokens[start] in _LEADING_STOPWORDS:
+                continue
+            for end in range(start + min_words, min(start + longest, len(tokens)) + 1):
+                if tokens[end - 1] in _LEADING_STOPWORDS or not (heads[end - 1] or heads[start]):
+                    continue
+                phrase = " ".join(tokens[start:end])
+                if phrase not in scored:
+                    scored[phrase] = self._score_mention(phrase, min_score)
+                if scored[phrase] is not None:
+                    candidates.append((start, end, scored[phrase]))
+
+        taken = [False] * len(tokens)
+        selected = []
+        for start, end, match in sorted(candidates, key=lambda c: (-c[2]["score"], c[0] - c[1], c[0])):
+            if not any(taken[start:end]):
+                taken[start:end] = [True] * (end - start)
+                selected.append((start, end, match))
+
+        mentions: Dict[str, Dict[str, Any]] = {}  # In order of first mention
+        for start, end, match in sorted(selected, key=lambda c: c[0]):
+            mention = mentions.setdefault(
+                match["title"], {**match, "spoken": " ".join(tokens[start:end]), "count": 0}
+            )
+            mention["count"] += 1
+        return list(mentions.values())
+
+    def _score_mention(self, phrase: str, min_score: float) -> Optional[Dict[str, Any]]:
+        """Scores one spoken phrase: its best title and every job sharing that title's score."""
+        matches = self.search(phrase, limit=MAX_MENTION_CANDIDATES, min_score=min_score)
+        if not matches:
+            return None
+        top = [match for match in matches if match["score"] == matches[0]["score"]]
+        # An exact title can belong to more jobs than search() returns
+        ncodes = {match["Ncode"] for match in top} | self._phrases.get(phrase, set())
+        return {"title": top[0]["jobTitle"], "Ncodes": sorted(ncodes), "score": top[0]["score"]}
+
+    def best_match(self, query: str, min_score: float = FALLBACK_MIN_SCORE) -> Optional[Dict[str, Any]]:
+        """Returns the single best match scoring at least min_score, or None."""
+        matches = self.search(query, limit=1, min_score=min_score)
+        return matches[0] if matches else None
+
+
+_indexes = PerHandlerCache(TitleIndex.from_database)
+
+
+def get_title_index(db: Any) -> TitleIndex:
+    """Returns the title index for a database handler, building it on first use."""
+    return _indexes.get(db)
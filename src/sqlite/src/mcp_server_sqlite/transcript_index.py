@@ -0,0 +1,363 @@
+# transcript_index.py
+
+"""
+Chunked, searchable hearing transcripts.
+
+Long transcripts (hundreds of pages) are split into speaker-aware chunks and
+indexed in memory, so the model can retrieve the passages it needs (the
+hypotheticals, the VE's answers, the cited jobs) instead of reading the whole
+record in the prompt.
+
+    - Chunking: one chunk per speaker turn ("ALJ:", "VE:", "Q.", "A.", "MR. SMITH:"),
+      longer turns split at line boundaries. Page breaks (form feeds or
+      "Page N" lines) set each chunk's page. Answers ("A.") are attributed
+      to the witness under examination when the transcript names one.
+    - Tags: hypothetical, ve_testimony, cited_job and job_numbers, detected
+      with compiled patterns.
+    - Search: an inverted index (token -> chunk postings) ranked with BM25.
+
+Indexes live in a TranscriptStore keyed by a content hash (transcript_id), so
+the same transcript is indexed once and can be searched across calls.
+"""
+
+import hashlib
+import logging
+import math
+import re
+import threading
+from collections import Counter, OrderedDict, defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .transcript_preprocessor import DOT_CODE_PATTERN, find_dot_codes
+
+logger = logging.getLogger(__name__)
+
+MAX_CHUNK_CHARS = 1500  # Longer speaker turns are split at line boundaries
+DEFAULT_SEARCH_LIMIT = 5
+MAX_SEARCH_LIMIT = 20
+MAX_TRANSCRIPTS = 32  # Indexed transcripts kept in a store (least recently used dropped)
+LONG_TRANSCRIPT_CHARS = 50_000  # Prompts replace longer transcripts with a digest
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+TAGS = ("hypothetical", "ve_testimony", "cited_job", "job_numbers")
+
+_PAGE_BREAK = re.compile(r"^\s*-?\s*Page\s+(\d{1,4})(?:\s+of\s+\d+)?\s*-?\s*$", re.IGNORECASE)
+_SPEAKER = re.compile(r"^\s*(?:(Q|A)[.:]|([A-Z][A-Z .'-]{0,40}?)\s*:)\s")
+_WITNESS = re.compile(
+    r"(?:examination|testimony) of (?:the )?(vocational expert|medical expert|claimant)",
+    re.IGNORECASE,
+)
+_SPEAKER_ALIASES = {
+    "ALJ": "ALJ",
+    "JUDGE": "ALJ",
+    "ADMINISTRATIVE LAW JUDGE": "ALJ",
+    "VE": "VE",
+    "VOCATIONAL EXPERT": "VE",
+    "ME": "ME",
+    "MEDICAL EXPERT": "ME",
+    "ATTY": "ATTY",
+    "ATTORNEY": "ATTY",
+    "REP": "ATTY",
+    "REPRESENTATIVE": "ATTY",
+    "COUNSEL": "ATTY",
+    "CLMT": "CLMT",
+    "CLAIMANT": "CLMT",
+}
+_WITNESS_SPEAKERS = {"vocational expert": "VE", "medical expert": "ME", "claimant": "CLMT"}
+_TAG_PATTERNS = {
+    "hypothetical": re.compile(
+        r"\bhypothetical|\bassume\b|\bindividual (?:of|with|who|limited)\b"
+        r"|\bsuch an? (?:individual|person)\b|\bsame age, education\b",
+        re.IGNORECASE,
+    ),
+    "job_numbers": re.compile(
+        r"\b(?:\d{1,3}(?:,\d{3})+|\d+)\s+(?:jobs|positions)\b|\bnational(?:ly| economy)\b",
+        re.IGNORECASE,
+    ),
+    "cited_job": re.compile(
+        DOT_CODE_PATTERN.pattern + r"|\bDOT\b|Dictionary of Occupational Titles"
+    ),
+}
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOP_WORDS = frozenset(
+    "a an and are as at be but by did do for from had has have he her his i if in is it its "
+    "me my no not of on or she so that the their them then there they this to was we were "
+    "what which who will with would you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stop words."""
+    return [token for token in _TOKEN.findall(text.lower()) if token not in _STOP_WORDS]
+
+
+@dataclass
+class Chunk:
+    """One speaker turn (or part of a long one)."""
+
+    chunk_id: int
+    speaker: Optional[str]
+    page: Optional[int]
+    first_line: int
+    last_line: int
+    text: str
+    tags: Tuple[str, ...] = ()
+    length: int = 0  # Token count, for BM25
+
+    def to_dict(self, max_chars: Optional[int] = None) -> Dict[str, Any]:
+        text = self.text
+        if max_chars is not None and len(text) > max_chars:
+            text = text[:max_chars].rstrip() + " ..."
+        return {
+            "id": self.chunk_id,
+            "speaker": self.speaker,
+            "page": self.page,
+            "lines": f"{self.first_line}-{self.last_line}",
+            "tags": list(self.tags),
+            "text": text,
+        }
+
+
+def _speaker_label(raw: str, witness: Optional[str]) -> str:
+    label = " ".join(raw.upper().split())
+    if label == "A":
+        return witness or "A"
+    return _SPEAKER_ALIASES.get(label, label)
+
+
+def chunk_transcript(text: str) -> List[Chunk]:
+    """Splits a transcript into speaker-aware chunks with page and line numbers."""
+    chunks: List[Chunk] = []
+    page: Optional[int] = None
+    witness: Optional[str] = None
+    current: Optional[Dict[str, Any]] = None
+
+    def flush() -> None:
+        if current is not None and current["lines"]:
+            body = "\n".join(current["lines"]).strip()
+            if body:
+                chunks.append(
+                    Chunk(
+                        len(chunks),
+                        current["speaker"],
+                        current["page"],
+                        current["first"],
+                        current["last"],
+                        body,
+                    )
+                )
+
+    # Not splitlines(): it would also split on the form feeds that mark page breaks
+    for line_number, line in enumerate(re.split(r"\r?\n", text), start=1):
+        if "\f" in line:
+            page = (page or 1) + line.count("\f")
+            line = line.replace("\f", "")
+        page_match = _PAGE_BREAK.match(line)
+        if page_match:
+            page = int(page_match.group(1))
+            continue
+        witness_match = _WITNESS.search(line)
+        if witness_match:
+            witness = _WITNESS_SPEAKERS[witness_match.group(1).lower()]
+
+        speaker_match = _SPEAKER.match(line)
+        starts_turn = speaker_match is not None
+        too_long = current is not None and current["size"] + len(line) > MAX_CHUNK_CHARS
+        if current is None or starts_turn or too_long:
+            flush()
+            speaker = (
+                _speaker_label(speaker_match.group(1) or speaker_match.group(2), witness)
+                if starts_turn
+                else (current["speaker"] if current else None)
+            )
+            current = {
+                "speaker": speaker,
+                "page": page,
+                "first": line_number,
+                "last": line_number,
+                "lines": [],
+                "size": 0,
+            }
+        current["lines"].append(line.strip())
+        current["last"] = line_number
+        current["size"] += len(line) + 1
+    flush()
+
+    for chunk in chunks:
+        tags = [tag for tag, pattern in _TAG_PATTERNS.items() if pattern.search(chunk.text)]
+        if chunk.speaker == "VE":
+            tags.append("ve_testimony")
+        chunk.tags = tuple(tag for tag in TAGS if tag in tags)
+    return chunks
+
+
+class TranscriptIndex:
+    """Chunks of one transcript with a BM25 inverted index."""
+
+    def __init__(self, transcript_id: str, text: str):
+        self.transcript_id = transcript_id
+        self.chunks = chunk_transcript(text)
+        self.characters = len(text)
+        self.citations = find_dot_codes(text)
+        self._postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        for chunk in self.chunks:
+            counts = Counter(tokenize(chunk.text))
+            chunk.length = sum(counts.values())
+            for token, count in counts.items():
+                self._postings[token].append((chunk.chunk_id, count))
+        self._average_length = (
+            sum(chunk.length for chunk in self.chunks) / len(self.chunks) if self.chunks else 0.0
+        )
+
+    def _bm25(self, query: str) -> Dict[int, float]:
+        scores: Dict[int, float] = defaultdict(float)
+        chunk_count = len(self.chunks)
+        for token in set(tokenize(query)):
+            postings = self._postings.get(token)
+            if not postings:
+                continue
+            idf = math.log(1 + (chunk_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for chunk_id, count in postings:
+                length = self.chunks[chunk_id].length
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * length / (self._average_length or 1))
+                scores[chunk_id] += idf * count * (BM25_K1 + 1) / (count + norm)
+        return scores
+
+    def search(
+        self,
+        query: Optional[str] = None,
+        tags: Iterable[str] = (),
+        speaker: Optional[str] = None,
+        limit: int = DEFAULT_SEARCH_LIMIT,
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns the passages matching a query and/or filters.
+
+        Args:
+            query: Free-text query, ranked with BM25. Without one, matching
+                   chunks are returned in transcript order.
+            tags: Only chunks with all of these tags (see TAGS).
+            speaker: Only chunks by this speaker (e.g. "VE", "ALJ", "ATTY").
+            limit: Maximum number of passages.
+
+        Raises:
+            ValueError: If a tag is unknown.
+        """
+        tags = list(tags)
+        unknown = [tag for tag in tags if tag not in TAGS]
+        if unknown:
+            raise ValueError(f"Unknown tags {unknown}. Available: {', '.join(TAGS)}")
+        speaker_label = _speaker_label(speaker, None) if speaker else None
+
+        def wanted(chunk: Chunk) -> bool:
+            return all(tag in chunk.tags for tag in tags) and (
+                speaker_label is None or chunk.speaker == speaker_label
+            )
+
+        if query and query.strip():
+            scores = self._bm25(query)
+            ranked = sorted(
+                (chunk_id for chunk_id in scores if wanted(self.chunks[chunk_id])),
+                key=lambda chunk_id: (-scores[chunk_id], chunk_id),
+            )[:limit]
+            return [{**self.chunks[i].to_dict(), "score": round(scores[i], 3)} for i in ranked]
+        return [chunk.to_dict() for chunk in self.chunks if wanted(chunk)][:limit]
+
+    def get_chunks(self, chunk_ids: Iterable[int]) -> List[Dict[str, Any]]:
+        """Returns chunks by id (e.g. the VE answer following a hypothetical)."""
+        return [self.chunks[i].to_dict() for i in chunk_ids if 0 <= i < len(self.chunks)]
+
+    def outline(self, preview_chars: int = 160) -> Dict[str, Any]:
+        """Returns a digest: sizes, speakers, tag counts, hypotheticals and cited codes."""
+        pages = [chunk.page for chunk in self.chunks if chunk.page is not None]
+        return {
+            "transcript_id": self.transcript_id,
+            "characters": self.characters,
+            "chunks": len(self.chunks),
+            "pages": max(pages) if pages else None,
+            "speakers": dict(Counter(chunk.speaker or "unknown" for chunk in self.chunks)),
+            "tags": {tag: sum(tag in chunk.tags for chunk in self.chunks) for tag in TAGS},
+            "hypotheticals": [
+                chunk.to_dict(preview_chars)
+                for chunk in self.chunks
+                if "hypothetical" in chunk.tags
+            ],
+            "cited_codes": [
+                {"dotCode": citation["dotCode"], "lines": citation["lines"]}
+                for citation in self.citations.values()
+            ],
+        }
+
+    def outline_text(self) -> str:
+        """Renders the outline as prompt text, with instructions for retrieving passages."""
+        outline = self.outline()
+        lines = [
+            f"[Transcript indexed for retrieval: transcript_id={self.transcript_id}, "
+            f"{outline['characters']} characters, {outline['chunks']} passages"
+            + (f", {outline['pages']} pages" if outline["pages"] else "")
+            + "]",
+            "The full transcript is NOT included here. Use the `transcript_search` tool with "
+            f"transcript_id \"{self.transcript_id}\" to read passages: search by query "
+            "(e.g. \"sedentary hypothetical\"), by tags (hypothetical, ve_testimony, "
+            "cited_job, job_numbers), by speaker, or fetch passages by id (chunk_ids).",
+            "",
+            "Speakers (passages): "
+            + ", ".join(f"{name} ({count})" for name, count in outline["speakers"].items()),
+            "",
+            "Hypothetical passages:",
+        ]
+        for chunk in outline["hypotheticals"] or []:
+            lines.append(
+                f"- #{chunk['id']} ({chunk['speaker'] or 'unknown'}, lines {chunk['lines']}"
+                + (f", page {chunk['page']}" if chunk["page"] else "")
+                + f"): {' '.join(chunk['text'].split())}"
+            )
+        if not outline["hypotheticals"]:
+            lines.append("- none detected; search for the ALJ's questions to the VE")
+        lines += ["", "DOT codes cited (transcript lines):"]
+        lines += [
+            f"- {code['dotCode']}: lines {', '.join(map(str, code['lines']))}"
+            for code in outline["cited_codes"]
+        ] or ["- none detected"]
+        return "\n".join(lines)
+
+
+def transcript_id_for(text: str) -> str:
+    """Returns the content-derived id of a transcript."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+class TranscriptStore:
+    """Indexed transcripts keyed by transcript_id, least recently used dropped first."""
+
+    def __init__(self, max_transcripts: int = MAX_TRANSCRIPTS):
+        self.max_transcripts = max_transcripts
+        self._indexes: "OrderedDict[str, TranscriptIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, text: str) -> TranscriptIndex:
+        """Indexes a transcript (once; the same text returns the existing index)."""
+        transcript_id = transcript_id_for(text)
+        existing = self.get(transcript_id)
+        if existing is not None:
+            return existing
+        index = TranscriptIndex(transcript_id, text)
+        with self._lock:
+            self._indexes[transcript_id] = index
+            while len(self._indexes) > self.max_transcripts:
+                self._indexes.popitem(last=False)
+        logger.info(
+            f"Indexed transcript {transcript_id}: {index.characters} characters, "
+            f"{len(index.chunks)} passages."
+        )
+        return index
+
+    def get(self, transcript_id: str) -> Optional[TranscriptIndex]:
+        """Returns an indexed transcript, or None if unknown or evicted."""
+        with self._lock:
+            index = self._indexes.get(transcript_id)
+            if index is not None:
+                self._indexes.move_to_end(transcript_id)
+            return index
@@ -0,0 +1,190 @@
+# transcript_preprocessor.py
+
+"""
+One-pass extraction and resolution of the jobs cited in a hearing transcript.
+
+Instead of the model reading the transcript and calling generate_job_report and
+check_job_obsolescence once per job, preprocess_transcript:
+
+    1. Scans the transcript with a compiled DOT code pattern (209.587-034,
+       209587034, "209 587 034", ...) and normalizes each hit with DotCode.clean.
+    2. Finds mentions of DOT titles and alternate titles, fuzzy-matched by the
+       TitleIndex (word order, split compounds), for jobs not cited by code.
+    3. Resolves all cited codes with one DOT query, then adds obsolescence
+       reference data and the O*NET-SOC crosswalk with BLS employment and wages.
+
+The result is a compact digest the model can read instead of dozens of tool results.
+"""
+
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+from . import config
+from .job_obsolescence import check_job_obsolescence
+from .models import DotCode
+from .soc_crosswalk import soc_codes_for
+from .title_index import get_title_index, normalize_title
+
+logger = logging.getLogger(__name__)
+
+# Nine digits grouped 3-3-3, separated by ".", "-", spaces or nothing
+DOT_CODE_PATTERN = re.compile(r"(?<![\d.-])(\d{3})[.\s-]?(\d{3})[.\s-]?(\d{3})(?![\d-]|\.\d)")
+CONTEXT_CHARS = 80  # Transcript text kept before each first citation
+MAX_LINES_LISTED = 5  # Line numbers listed per cited code
+MAX_TITLE_CANDIDATES = 5  # DOT codes listed per title mention
+
+JOB_COLUMNS = ["Ncode", "Title", "StrengthNum", "SVPNum", "GEDR", "GEDM", "GEDL"]
+
+
+def find_dot_codes(transcript: str) -> Dict[int, Dict[str, Any]]:
+    """
+    Finds the DOT codes cited in a transcript.
+
+    Returns:
+        Dictionary keyed by Ncode of {"dotCode", "mentions", "lines", "context"},
+        in order of first citation. context is the text before the first citation.
+    """
+    line_starts = [0] + [match.end() for match in re.finditer(r"\n", transcript)]
+    citations: Dict[int, Dict[str, Any]] = {}
+    line_index = 0
+    for match in DOT_CODE_PATTERN.finditer(transcript):
+        ncode, formatted = DotCode.clean("".join(match.groups()))
+        if ncode is None:
+            continue
+        while line_index + 1 < len(line_starts) and line_starts[line_index + 1] <= match.start():
+            line_index += 1
+        citation = citations.get(ncode)
+        if citation is None:
+            context = transcript[max(0, match.start() - CONTEXT_CHARS) : match.start()]
+            citation = citations[ncode] = {
+                "dotCode": formatted,
+                "mentions": 0,
+                "lines": [],
+                "context": " ".join(context.split()),
+            }
+        citation["mentions"] += 1
+        line_number = line_index + 1
+        if len(citation["lines"]) < MAX_LINES_LISTED and line_number not in citation["lines"]:
+            citation["lines"].append(line_number)
+    return citations
+
+
+def _bls_for(bls_handler: Any, occ_code: str, cache: Dict[str, Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+    if occ_code not in cache:
+        try:
+            rows = bls_handler.query_by_soc_code(occ_code)
+        except Exception as e:
+            logger.warning(f"BLS lookup failed for SOC {occ_code}: {e}")
+            rows = []
+        cache[occ_code] = rows[0] if rows else None
+    return cache[occ_code]
+
+
+def preprocess_transcript(
+    transcript: str, db: Any, bls_handler: Any = None, include_titles: bool = True
+) -> Dict[str, Any]:
+    """
+    Extracts the jobs cited in a transcript and resolves them in one pass.
+
+    Args:
+        transcript: Hearing transcript text.
+        db: DatabaseHandler used to resolve the codes (one batch query).
+        bls_handler: Loaded BLSExcelHandler for employment and wages, or None.
+        include_titles: Also report DOT titles mentioned without a code.
+
+    Returns:
+        Digest with a summary, cited_jobs (one row per resolved code),
+        unresolved_codes (code-like text not in the DOT) and title_mentions.
+
+    Raises:
+        ValueError: If the transcript is empty.
+    """
+    if not isinstance(transcript, str) or not transcript.strip():
+        raise ValueError("Transcript must be a non-empty string.")
+
+    citations = find_dot_codes(transcript)
+    rows = db.batch_get_jobs_by_codes(
+        [citation["dotCode"] for citation in citations.values()], columns=JOB_COLUMNS
+    ) if citations else []
+    rows_by_ncode = {row["Ncode"]: row for row in rows}
+
+    bls_cache: Dict[str, Optional[Dict[str, Any]]] = {}
+    cited_jobs: List[Dict[str, Any]] = []
+    unresolved: List[Dict[str, Any]] = []
+    for ncode, citation in citations.items():
+        row = rows_by_ncode.get(ncode)
+        if row is None:
+            unresolved.append(
+                {key: citation[key] for key in ("dotCode", "mentions", "lines", "context")}
+            )
+            continue
+
+        obsolescence = check_job_obsolescence(citation["dotCode"])
+        soc_entries = []
+        for soc in soc_codes_for(citation["dotCode"]):
+            entry = {"code": soc["onetSocCode"], "title": soc["onetSocTitle"]}
+            if bls_handler is not None:
+                bls = _bls_for(bls_handler, soc["blsOccCode"], bls_cache)
+                if bls is not None:
+                    entry["employment"] = bls.get("employmentTotal")
+                    entry["medianWage"] = bls.get("medianWage")
+            soc_entries.append(entry)
+
+        title = row.get("Title") or ""
+        title_words = set(normalize_title(title).split())
+        svp = row.get("SVPNum")
+        cited_jobs.append(
+            {
+                "dotCode": citation["dotCode"],
+                "title": title,
+                "strength": config.strength_num_to_code.get(row.get("StrengthNum")),
+                "svp": svp,
+                "skill": config.svp_to_skill_level.get(svp),
+                "ged": f"R{row.get('GEDR')} M{row.get('GEDM')} L{row.get('GEDL')}",
+                "mentions": citation["mentions"],
+                "lines": citation["lines"],
+                "context": citation["context"],
+                # False when the title was not spoken just before the code (possible miscitation)
+                "titleInContext": bool(title_words)
+                and title_words <= set(normalize_title(citation["context"]).split()),
+                "obsolescence": obsolescence.get("reference_status"),
+                "obsolescenceSource": obsolescence.get("data_source"),
+                "onetSoc": soc_entries,
+            }
+        )
+
+    title_mentions: List[Dict[str, Any]] = []
+    if include_titles:
+        index = get_title_index(db)
+        for mention in index.find_mentions(transcript):
+            ncodes = [ncode for ncode in mention["Ncodes"] if ncode not in citations]
+            if not ncodes:
+                continue  # Title of a job already cited by code
+            title_mentions.append(
+                {
+                    "title": mention["title"],
+                    "spoken": mention["spoken"],
+                    "score": mention["score"],
+                    "mentions": mention["count"],
+                    "dotCodes": [DotCode.format(ncode) for ncode in ncodes[:MAX_TITLE_CANDIDATES]],
+                    "moreDotCodes": max(0, len(ncodes) - MAX_TITLE_CANDIDATES),
+                }
+            )
+
+    logger.info(
+        f"Preprocessed transcript: {len(cited_jobs)} cited jobs, {len(unresolved)} unresolved "
+        f"codes, {len(title_mentions)} title mentions."
+    )
+    return {
+        "summary": {
+            "dot_codes_cited": len(citations),
+            "resolved": len(cited_jobs),
+            "unresolved": len(unresolved),
+            "title_mentions": len(title_mentions),
+            "bls_data": bls_handler is not None,
+        },
+        "cited_jobs": cited_jobs,
+        "unresolved_codes": unresolved,
+        "title_mentions": title_mentions,
+    }
@@ -0,0 +1,177 @@
+# transports.py
+
+"""
+Transports the VE server can be run over.
+
+stdio (the default) serves the one client that launched the process. The HTTP
+transports serve any number of clients from one long-lived process. The
+database handlers, caches, analysis and report stores, BLS workbook and
+reference data are then loaded and warmed once and shared by every session,
+and a client connecting pays no startup cost.
+
+    - streamable-http: the current MCP HTTP transport, one endpoint at /mcp.
+    - sse: the older HTTP+SSE transport (GET /sse, POST /messages/), for
+      clients that do not support streamable HTTP yet.
+"""
+
+import contextlib
+import logging
+from typing import Any, Callable, Optional
+
+import mcp.server.stdio
+from mcp.server import Server
+from mcp.server.models import InitializationOptions
+
+logger = logging.getLogger(__name__)
+
+TRANSPORTS = ("stdio", "streamable-http", "sse")
+DEFAULT_HOST = "127.0.0.1"  # Local clients only unless a host is given explicitly
+DEFAULT_PORT = 8000
+STREAMABLE_HTTP_PATH = "/mcp"
+SSE_PATH = "/sse"
+SSE_MESSAGE_PATH = "/messages/"
+
+
+async def run_stdio(server: Server, init_options: InitializationOptions) -> None:
+    """Serves one client over stdin/stdout until it disconnects."""
+    async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+        logger.info("stdio transport acquired, running server run loop...")
+        await server.run(read_stream, write_stream, init_options)
+
+
+async def _serve_http(app: Any, host: str, port: int) -> None:
+    import uvicorn
+
+    config = uvicorn.Config(
+        app,
+        host=host,
+        port=port,
+        log_level=logging.getLevelName(logging.getLogger().getEffectiveLevel()).lower(),
+    )
+    await uvicorn.Server(config).serve()
+
+
+ShutdownHook = Optional[Callable[[], None]]
+
+
+def _lifespan(on_shutdown: ShutdownHook, session_manager: Any = None):
+    """
+    Builds the Starlette lifespan: runs the session manager, then the shutdown hook.
+
+    uvicorn re-raises SIGINT/SIGTERM once it has stopped, which ends the process
+    before the caller's cleanup runs, so shutdown work happens here instead.
+    """
+
+    @contextlib.asynccontextmanager
+    async def lifespan(_app):
+        try:
+            if session_manager is not None:
+                async with session_manager.run():
+                    yield
+            else:
+                yield
+        finally:
+            if on_shutdown is not None:
+                on_shutdown()
+
+    return lifespan
+
+
+class _SessionManagerApp:
+    """ASGI app forwarding to a session manager (a class, so Starlette routes raw ASGI to it)."""
+
+    def __init__(self, session_manager: Any):
+        self.session_manager = session_manager
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.session_manager.handle_request(scope, receive, send)
+
+
+async def run_streamable_http(
+    server: Server,
+    init_options: InitializationOptions,
+    host: str,
+    port: int,
+    on_shutdown: ShutdownHook = None,
+) -> None:
+    """Serves any number of clients over streamable HTTP at http://host:port/mcp."""
+    from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+    from starlette.applications import Starlette
+    from starlette.routing import Route
+
+    # The session manager creates its own options from the server (name/version)
+    session_manager = StreamableHTTPSessionManager(app=server)
+
+    app = Starlette(
+        routes=[Route(STREAMABLE_HTTP_PATH, endpoint=_SessionManagerApp(session_manager))],
+        lifespan=_lifespan(on_shutdown, session_manager),
+    )
+    logger.info(
+        f"Serving streamable HTTP at http://{host}:{port}{STREAMABLE_HTTP_PATH}"
+    )
+    await _serve_http(app, host, port)
+
+
+async def run_sse(
+    server: Server,
+    init_options: InitializationOptions,
+    host: str,
+    port: int,
+    on_shutdown: ShutdownHook = None,
+) -> None:
+    """Serves any number of clients over HTTP+SSE at http://host:port/sse."""
+    from mcp.server.sse import SseServerTransport
+    from starlette.applications import Starlette
+    from starlette.responses import Response
+    from starlette.routing import Mount, Route
+
+    sse = SseServerTransport(SSE_MESSAGE_PATH)
+
+    async def handle_sse(request) -> Response:
+        async with sse.connect_sse(
+            request.scope, request.receive, request._send
+        ) as (read_stream, write_stream):
+            await server.run(read_stream, write_stream, init_options)
+        return Response()
+
+    app = Starlette(
+        routes=[
+            Route(SSE_PATH, endpoint=handle_sse, methods=["GET"]),
+            Mount(SSE_MESSAGE_PATH, app=sse.handle_post_message),
+        ],
+        lifespan=_lifespan(on_shutdown),
+    )
+    logger.info(f"Serving HTTP+SSE at http://{host}:{port}{SSE_PATH}")
+    await _serve_http(app, host, port)
+
+
+async def run_transport(
+    transport: str,
+    server: Server,
+    init_options: InitializationOptions,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    on_shutdown: ShutdownHook = None,
+) -> None:
+    """
+    Runs the server over the named transport until it stops.
+
+    Args:
+        transport: One of TRANSPORTS.
+        server: The configured MCP server.
+        init_options: Initialization options for stdio and SSE sessions.
+        host: Interface the HTTP transports bind to.
+        port: Port the HTTP transports listen on.
+        on_shutdown: Called when an HTTP server shuts down (including on a signal).
+
+    Raises:
+        ValueError: If the transport name is not one of TRANSPORTS.
+    """
+    if transport == "stdio":
+        await run_stdio(server, init_options)
+    elif transport == "streamable-http":
+        await run_streamable_http(server, init_options, host, port, on_shutdown)
+    elif transport == "sse":
+        await run_sse(server, init_options, host, port, on_shutdown)
+    else:
+        raise ValueError(f"Unknown transport '{transport}'. Choose from: {', '.join(TRANSPORTS)}")
@@ -9,10 +9,12 @@ expert standards and SSA guidelines.
 import json
 import logging
 from pathlib import Path
-from typing import Dict, Any, Optional, List, TYPE_CHECKING, Union
+from typing import Dict, Any, Optional, List, TYPE_CHECKING, Tuple, Union
 
 # For type checking only to avoid circular imports
 if TYPE_CHECKING:
+    from .analysis_store import AnalysisStore
+    from .singleflight import SingleFlight
     from .db_handler import DatabaseHandler
 else:
     # Runtime import that doesn't create circular dependency
@@ -21,55 +23,66 @@ else:
 
 from . import config
 
-# from . import analysis_utils # Not currently used, commented out
+from . import analysis_utils
 from .ve_logic import get_job_analysis  # Import necessary function from ve_logic
+from .analysis_store import get_analyses_for_rows
+from .dispatch import run_in_thread
+from .models.dot_code import DotCode
 
 # Constants from ve_logic needed here (or defined centrally)
 UNKNOWN_STRING = "Unknown"
 
 logger = logging.getLogger(__name__)
 
-# --- Load Grid Rules Data --- #
-GRID_RULES_DATA: Optional[Dict[str, Any]] = None
+# --- Load Reference Data (Grid Rules, SSR 82-41) --- #
 GRID_RULES_PATH = (
     Path(__file__).parent / "reference_json" / "medical_vocational_guidelines.json"
 )
+SSR_82_41_PATH = Path(__file__).parent / "reference_json" / "ssr_82-41.json"
 
-try:
-    with open(GRID_RULES_PATH, "r") as f:
-        GRID_RULES_DATA = json.load(f)
-        logger.info(f"Successfully loaded Grid Rules data from {GRID_RULES_PATH}")
-except FileNotFoundError:
-    logger.error(
-        f"Grid Rules JSON file not found at {GRID_RULES_PATH}. Grid rule application will not work."
-    )
-except json.JSONDecodeError:
-    logger.error(
-        f"Error decoding JSON from {GRID_RULES_PATH}. Grid rule application will not work."
-    )
-except Exception as e:
-    logger.error(f"An unexpected error occurred loading {GRID_RULES_PATH}: {e}")
-# --- End Load Grid Rules Data --- #
 
-# --- Load SSR 82-41 Data --- #
-SSR_82_41_DATA: Optional[Dict[str, Any]] = None
-SSR_82_41_PATH = Path(__file__).parent / "reference_json" / "ssr_82-41.json"
+def _load_reference_json(
+    path: Path, label: str, consequence: str
+) -> Optional[Dict[str, Any]]:
+    """Loads a reference JSON file, logging (not raising) on failure."""
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+            logger.info(f"Successfully loaded {label} data from {path}")
+            return data
+    except FileNotFoundError:
+        logger.error(f"{label} JSON file not found at {path}. {consequence}")
+    except json.JSONDecodeError:
+        logger.error(f"Error decoding JSON from {path}. {consequence}")
+    except Exception as e:
+        logger.error(f"An unexpected error occurred loading {path}: {e}")
+    return None
+
 
-try:
-    with open(SSR_82_41_PATH, "r") as f:
-        SSR_82_41_DATA = json.load(f)
-        logger.info(f"Successfully loaded SSR 82-41 data from {SSR_82_41_PATH}")
-except FileNotFoundError:
-    logger.error(
-        f"SSR 82-41 JSON file not found at {SSR_82_41_PATH}. Detailed TSA rules may not be applied correctly."
+def reload_reference_data() -> None:
+    """(Re)loads the Grid Rules and SSR 82-41 reference data."""
+    global GRID_RULES_DATA, SSR_82_41_DATA, _REFERENCE_DATA_LOADED
+    GRID_RULES_DATA = _load_reference_json(
+        GRID_RULES_PATH, "Grid Rules", "Grid rule application will not work."
     )
-except json.JSONDecodeError:
-    logger.error(
-        f"Error decoding JSON from {SSR_82_41_PATH}. Detailed TSA rules may not be applied correctly."
+    SSR_82_41_DATA = _load_reference_json(
+        SSR_82_41_PATH,
+        "SSR 82-41",
+        "Detailed TSA rules may not be applied correctly.",
     )
-except Exception as e:
-    logger.error(f"An unexpected error occurred loading {SSR_82_41_PATH}: {e}")
-# --- End Load SSR 82-41 Data --- #
+    _REFERENCE_DATA_LOADED = True
+
+
+def ensure_reference_data() -> None:
+    """Loads the reference data on first use (it is not parsed at import, to keep startup fast)."""
+    if not _REFERENCE_DATA_LOADED:
+        reload_reference_data()
+
+
+GRID_RULES_DATA: Optional[Dict[str, Any]] = None
+SSR_82_41_DATA: Optional[Dict[str, Any]] = None
+_REFERENCE_DATA_LOADED = False
+# --- End Load Reference Data --- #
 
 # --- Helper Functions for Grid Rule Application --- #
 
@@ -205,6 +218,7 @@ def apply_grid_rule(
     Returns:
         A dictionary with 'rule_id' and 'decision' if a rule applies, otherwise indicates no rule matched.
     """
+    ensure_reference_data()
     if GRID_RULES_DATA is None:
         return {
             "rule_id": None,
@@ -607,6 +621,29 @@ def _evaluate_transferability(
 # --- Tool-Specific Logic Wrappers/Implementations ---
 
 
+def load_source_analysis(
+    db_handler: DatabaseHandler,
+    source_dot_code: str,
+    analysis_store: Optional["AnalysisStore"] = None,
+) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Retrieves the PRW row (skills profile columns) and its analysis.
+
+    Returns:
+        (source_job_data, source_analysis); source_job_data is None if the code was not found.
+    """
+    # Only the skills profile columns are needed; skip long text such as Definitions
+    source_job_data = db_handler.get_job_by_code(
+        source_dot_code, columns="skills_profile"
+    )
+    if not source_job_data:
+        return None, {}
+    # Note: get_job_analysis is imported from ve_logic
+    if analysis_store is not None:
+        return source_job_data, analysis_store.get_or_compute(source_job_data)
+    return source_job_data, get_job_analysis(source_job_data)
+
+
 async def perform_tsa_analysis(
     db_handler: DatabaseHandler,
     source_dot_code: str,
@@ -614,6 +651,8 @@ async def perform_tsa_analysis(
     age_category: str,
     education_level: str,
     target_dot_codes: Optional[List[str]] = None,
+    analysis_store: Optional["AnalysisStore"] = None,
+    flights: Optional["SingleFlight"] = None,
 ) -> Dict[str, Any]:
     """
     Performs Transferable Skills Analysis (TSA).
@@ -627,6 +666,8 @@ async def perform_tsa_analysis(
         age_category: Claimant's age category based on SSA rules (e.g., "ADVANCED AGE").
         education_level: Claimant's education level based on SSA rules (e.g., "LIMITED", "HIGH SCHOOL").
         target_dot_codes: Optional list of specific target DOT codes to evaluate against.
+        analysis_store: Optional AnalysisStore to read precomputed job analyses from.
+        flights: Optional SingleFlight that coalesces concurrent source job lookups.
 
     Returns:
         Dictionary containing the preliminary TSA results.
@@ -635,19 +676,25 @@ async def perform_tsa_analysis(
         f"Performing TSA: PRW={source_dot_code}, RFC={rfc_strength}, Age={age_category}, Edu={education_level}"
     )
 
-    # 1. Get Source Job Data & Analysis
-    source_job_data = db_handler.get_job_by_code(
-        source_dot_code
-    )  # Assuming synchronous for now
+    # 1. Get Source Job Data & Analysis (shared with concurrent TSAs of the same PRW)
+    if flights is not None:
+        source_ncode, _ = DotCode.clean(str(source_dot_code))
+        source_job_data, source_analysis = await flights.do(
+            ("tsa_source", db_handler, analysis_store, source_ncode or source_dot_code),
+            load_source_analysis,
+            db_handler,
+            source_dot_code,
+            analysis_store,
+        )
+    else:
+        source_job_data, source_analysis = await run_in_thread(
+            load_source_analysis, db_handler, source_dot_code, analysis_store
+        )
     if not source_job_data:
         logger.error(
             f"TSA failed: Could not retrieve data for source DOT {source_dot_code}"
         )
         return {"error": f"Could not retrieve data for source DOT {source_dot_code}"}
-
-    # Perform analysis on the source job data
-    # Note: get_job_analysis is imported from ve_logic
-    source_analysis = get_job_analysis(source_job_data)
     if "error" in source_analysis:
         logger.error(
             f"TSA failed: Error analyzing source DOT {source_dot_code}: {source_analysis['error']}"
@@ -702,8 +749,17 @@ async def perform_tsa_analysis(
         logger.info(
             f"Evaluating transferability to specific targets: {target_dot_codes}"
         )
+        # Fetch all targets in one query, keyed by Ncode (off the event loop, so it can be cancelled)
+        target_rows = await run_in_thread(
+            db_handler.batch_get_jobs_by_codes, target_dot_codes, columns="skills_profile"
+        )
+        target_rows_by_ncode = {row.get("Ncode"): row for row in target_rows}
+        target_analyses_by_ncode = await run_in_thread(
+            get_analyses_for_rows, target_rows, analysis_store
+        )
         for target_code in target_dot_codes:
-            target_job_data = db_handler.get_job_by_code(target_code)
+            target_ncode = analysis_utils.validate_dot_code(target_code).get("ncode")
+            target_job_data = target_rows_by_ncode.get(target_ncode)
             if not target_job_data:
                 logger.warning(
                     f"Could not find data for target DOT {target_code}. Skipping evaluation."
@@ -717,7 +773,7 @@ async def perform_tsa_analysis(
                 )
                 continue
 
-            target_analysis = get_job_analysis(target_job_data)
+            target_analysis = target_analyses_by_ncode[target_ncode]
             if "error" in target_analysis:
                 logger.warning(
                     f"Could not analyze target DOT {target_code}: {target_analysis['error']}. Skipping evaluation."
@@ -0,0 +1,196 @@
+# usage_stats.py
+
+"""
+Lookup frequency tracking used to warm caches with the jobs that are actually requested.
+
+The server counts lookups per Ncode and per title query while it runs and
+saves the counts to a small JSON state file on shutdown (and periodically).
+On the next start, the most frequent keys are loaded into the row cache, and
+their analyses and reports are rendered into the stores in a background
+thread. First-request latency then follows real traffic instead of a guessed
+list of common jobs.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .models import DotCode
+
+logger = logging.getLogger(__name__)
+
+STATE_FILE_NAME = "usage_stats.json"
+DEFAULT_WARM_UP_COUNT = 25  # Hot keys warmed at startup (row cache holds 100)
+MAX_TRACKED_KEYS = 1000  # Keys kept in the state file per kind
+AUTOSAVE_INTERVAL = 300.0  # Seconds between saves while running
+DECAY_FACTOR = 0.5  # Applied to loaded counts so recent traffic outweighs old traffic
+
+
+def default_state_path(db_path: Path) -> Path:
+    """Returns the usage state file path for a database (stored next to it)."""
+    return Path(db_path).with_name(STATE_FILE_NAME)
+
+
+class UsageTracker:
+    """Thread-safe lookup counters for Ncodes and title queries, persisted as JSON."""
+
+    def __init__(self, state_path: Path):
+        """
+        Initializes the UsageTracker and loads any saved counts.
+
+        Args:
+            state_path: JSON file the counts are loaded from and saved to.
+        """
+        self.state_path = Path(state_path)
+        self._codes: Counter = Counter()
+        self._titles: Counter = Counter()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.load()
+
+    def load(self) -> None:
+        """Loads saved counts, decayed so that current traffic soon dominates."""
+        if not self.state_path.is_file():
+            logger.info(f"No usage state at {self.state_path}; starting with empty counts.")
+            return
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            codes = Counter(
+                {int(ncode): count * DECAY_FACTOR for ncode, count in state.get("codes", {}).items()}
+            )
+            titles = Counter(
+                {title: count * DECAY_FACTOR for title, count in state.get("titles", {}).items()}
+            )
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            logger.warning(f"Could not load usage state from {self.state_path}: {e}")
+            return
+        with self._lock:
+            self._codes = codes
+            self._titles = titles
+        logger.info(
+            f"Loaded usage state: {len(codes)} DOT codes, {len(titles)} title queries."
+        )
+
+    def save(self) -> None:
+        """Writes the counts to the state file (atomically), if they changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            state = {
+                "codes": {
+                    str(ncode): round(count, 3)
+                    for ncode, count in self._codes.most_common(MAX_TRACKED_KEYS)
+                },
+                "titles": {
+                    title: round(count, 3)
+                    for title, count in self._titles.most_common(MAX_TRACKED_KEYS)
+                },
+            }
+            self._dirty = False
+        temp_path = self.state_path.with_name(self.state_path.name + ".tmp")
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f, separators=(",", ":"))
+            os.replace(temp_path, self.state_path)
+            logger.debug(f"Saved usage state to {self.state_path}")
+        except OSError as e:
+            logger.warning(f"Could not save usage state to {self.state_path}: {e}")
+
+    def record_code(self, ncode: Optional[int]) -> None:
+        """Counts one lookup of a DOT code (by Ncode)."""
+        if ncode is None:
+            return
+        with self._lock:
+            self._codes[ncode] += 1
+            self._dirty = True
+
+    def record_search(self, search_term: str) -> None:
+        """Counts one lookup by DOT code or title, whichever the search term is."""
+        # Only terms with digits can be codes (skips DotCode's warning for titles)
+        ncode = DotCode.clean(search_term)[0] if any(c.isdigit() for c in search_term) else None
+        if ncode is not None:
+            self.record_code(ncode)
+            return
+        title = " ".join(search_term.lower().split())
+        if not title:
+            return
+        with self._lock:
+            self._titles[title] += 1
+            self._dirty = True
+
+    def top_codes(self, n: int = DEFAULT_WARM_UP_COUNT) -> List[int]:
+        """Returns the n most frequently requested Ncodes."""
+        with self._lock:
+            return [ncode for ncode, _ in self._codes.most_common(n)]
+
+    def top_titles(self, n: int = DEFAULT_WARM_UP_COUNT) -> List[str]:
+        """Returns the n most frequent title queries."""
+        with self._lock:
+            return [title for title, _ in self._titles.most_common(n)]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns the tracked key counts and the current top keys."""
+        with self._lock:
+            return {
+                "state_path": str(self.state_path),
+                "tracked_codes": len(self._codes),
+                "tracked_titles": len(self._titles),
+                "top_codes": [DotCode.format(ncode) for ncode, _ in self._codes.most_common(10)],
+                "top_titles": [title for title, _ in self._titles.most_common(10)],
+            }
+
+    async def autosave(self, interval: float = AUTOSAVE_INTERVAL) -> None:
+        """Saves periodically until cancelled, so counts survive an unclean exit."""
+        while True:
+            await asyncio.sleep(interval)
+            await asyncio.to_thread(self.save)
+
+
+def warm_up_from_usage(
+    db: Any,
+    report_store: Any,
+    tracker: Optional[UsageTracker],
+    fallback_codes: List[str],
+    count: int = DEFAULT_WARM_UP_COUNT,
+) -> None:
+    """
+    Warms the row cache and the analysis/report stores with the hottest keys.
+
+    DOT codes come first, then title queries, resolved the same way
+    generate_job_report resolves them. Without usage history (first run), the
+    fallback codes are used instead.
+
+    Args:
+        db: Database handler to warm.
+        report_store: ReportStore whose reports (and analyses) are rendered on a miss.
+        tracker: Usage counters, or None to use only the fallback codes.
+        fallback_codes: DOT codes warmed when there is no usage history.
+        count: Maximum number of codes and of titles to warm.
+    """
+    from .generate_job_report import CacheStats, get_job_data
+
+    codes = [DotCode.format(ncode) for ncode in tracker.top_codes(count)] if tracker else []
+    titles = tracker.top_titles(count) if tracker else []
+    source = "usage history"
+    if not codes and not titles:
+        codes = list(fallback_codes)
+        source = "default list"
+    logger.info(
+        f"Warming caches from {source}: {len(codes)} DOT codes, {len(titles)} title queries."
+    )
+
+    for search_term in [*codes, *titles]:
+        try:
+            job_data = get_job_data(db, search_term)
+            if job_data:
+                report_store.get_or_render(job_data)
+        except Exception as e:
+            logger.error(f"Error warming caches for '{search_term}': {e}")
+
+    logger.info(f"Cache warm-up complete. Stats: {CacheStats.get_stats()}")
@@ -29,9 +29,48 @@ DEFAULT_AGE_CATEGORY = (
 )
 DEFAULT_EDUCATION = "UNKNOWN"  # Default Education if not provided to TSA
 
+# Max GED-R level typically associated with an instruction limit
+# (Simple -> GED-R 1/2, Detailed -> GED-R 3, Complex -> GED-R 4+)
+INSTRUCTION_MAX_GEDR = {
+    "Simple": 2,
+    "Detailed": 3,
+    "Complex": 6,
+}
+
 # --- Core Analysis Functions ---
 
 
+def resolve_applicable_ssr(hearing_date_str: Optional[str] = None) -> str:
+    """
+    Determines the applicable SSR for a hearing date.
+
+    Args:
+        hearing_date_str: Optional hearing date string ('YYYY-MM-DD').
+
+    Returns:
+        The applicable SSR identifier, the default (latest) SSR if no date is given,
+        or an error string if the date format is invalid.
+    """
+    # Handle potential None return from determine_applicable_ssr if date format invalid
+    if hearing_date_str:
+        applicable_ssr_result = analysis_utils.determine_applicable_ssr(
+            hearing_date_str
+        )
+        if applicable_ssr_result:
+            return applicable_ssr_result
+        logger.warning(
+            f"Invalid hearing_date format '{hearing_date_str}', cannot determine SSR."
+        )
+        return "Error: Invalid Date Format"
+
+    # Default based on current date (requires current time context)
+    # Or simply default to the latest known SSR if no date provided
+    # For simplicity, let's assume default is latest if no date given
+    # This might need refinement based on desired behavior for missing dates
+    logger.debug("No hearing date provided, defaulting applicable SSR.")
+    return "24-3p"  # Adjust this default as needed
+
+
 def get_job_analysis(
     job_data: Dict[str, Any], hearing_date_str: Optional[str] = None
 ) -> Dict[str, Any]:
@@ -40,7 +79,8 @@ def get_job_analysis(
     drawing data from the raw DB dictionary and interpreting it using config/utils.
 
     Args:
-        job_data: Raw job data dictionary (presumably from db_handler.find_job_data).
+        job_data: Raw job data dictionary (from db_handler.find_job_data, or a DOT row
+                  projected with a db_handler.COLUMN_SETS set such as "skills_profile").
         hearing_date_str: Optional hearing date string ('YYYY-MM-DD') to determine applicable SSR.
 
     Returns:
@@ -51,31 +91,17 @@ def get_job_analysis(
         logger.warning("get_job_analysis called with invalid job_data.")
         return {"error": "No job data provided to analyze"}
 
-    # Determine applicable SSR using the utility function
-    # Handle potential None return from determine_applicable_ssr if date format invalid
-    applicable_ssr = UNKNOWN_STRING
-    if hearing_date_str:
-        applicable_ssr_result = analysis_utils.determine_applicable_ssr(
-            hearing_date_str
-        )
-        if applicable_ssr_result:
-            applicable_ssr = applicable_ssr_result
-        else:
-            logger.warning(
-                f"Invalid hearing_date format '{hearing_date_str}', cannot determine SSR."
-            )
-            applicable_ssr = "Error: Invalid Date Format"
-    else:
-        # Default based on current date (requires current time context)
-        # Or simply default to the latest known SSR if no date provided
-        # For simplicity, let's assume default is latest if no date given
-        # This might need refinement based on desired behavior for missing dates
-        applicable_ssr = "24-3p"  # Adjust this default as needed
-        logger.debug("No hearing date provided, defaulting applicable SSR.")
+    applicable_ssr = resolve_applicable_ssr(hearing_date_str)
 
     # Extract basic info using .get() for safety
-    dot_code = job_data.get("dotCodeReal", UNKNOWN_STRING)  # From report_query alias
-    n_code = job_data.get("NCode", UNKNOWN_STRING)
+    # Aliased keys come from find_job_data; raw column names from projected DOT rows
+    dot_code = job_data.get(
+        "dotCodeReal", job_data.get("Code", UNKNOWN_STRING)
+    )  # From report_query alias
+    n_code = job_data.get("NCode", job_data.get("Ncode", UNKNOWN_STRING))
+    formatted_dot_code = job_data.get(
+        "dotCode", job_data.get("dotCodeFormatted", job_data.get("Code"))
+    )
     strength_num = job_data.get("StrengthNum", None)  # Get the number from DB data
     svp_num = job_data.get("SVPNum", None)
     gedr_num = job_data.get("GEDR", None)
@@ -92,15 +118,14 @@ def get_job_analysis(
 
     analysis = {
         "job_title": job_data.get(
-            "jobTitle", UNKNOWN_STRING
+            "jobTitle", job_data.get("Title", UNKNOWN_STRING)
         ),  # From report_query alias
         "dot_code_real": dot_code,  # Store the original REAL value if needed
         "n_code": n_code,
-        "formatted_dot_code": job_data.get(
-            "dotCode", UNKNOWN_STRING
-        ),  # Store original formatted code if available
+        "formatted_dot_code": formatted_dot_code
+        or UNKNOWN_STRING,  # Store original formatted code if available
         "applicable_ssr": applicable_ssr,
-        "definition": job_data.get("definition", "N/A"),
+        "definition": job_data.get("definition", job_data.get("Definitions", "N/A")),
         "exertional_level": {
             "num": strength_num,  # Keep the original number
             "code": strength_code_derived,  # Use the derived code ('S','L', None)
@@ -165,7 +190,7 @@ def get_job_analysis(
         "work_fields": [],  # Populated below
         "mpsms": [],  # Populated below
         # Extended analysis using utility functions
-        "obsolescence_analysis": check_job_obsolescence(job_data.get("dotCode", "")),
+        "obsolescence_analysis": check_job_obsolescence(formatted_dot_code or ""),
     }
 
     # Process physical demands using utils
@@ -459,20 +484,14 @@ def _check_mental_ged_conflict(
             )
 
     # --- Instruction Complexity Check ---
-    # Map Simple -> GED-R 1/2, Detailed -> GED-R 3, Complex -> GED-R 4+
     # This provides an *approximate* check against the job's reasoning level.
-    instruction_map = {
-        "Simple": 2,
-        "Detailed": 3,
-        "Complex": 6,
-    }  # Max GED-R level typically associated
     hypo_instructions_val = hypo_mental_limits.get(
         "instructions"
     )  # e.g., 'Simple', 'Detailed'
 
     hypo_max_gedr: Optional[int] = None
     if isinstance(hypo_instructions_val, str):
-        hypo_max_gedr = instruction_map.get(hypo_instructions_val)
+        hypo_max_gedr = INSTRUCTION_MAX_GEDR.get(hypo_instructions_val)
     elif hypo_instructions_val is not None:
         logger.warning(
             f"Hypothetical instructions limit is not a string: {hypo_instructions_val}. Cannot map to GED-R."
@@ -592,7 +611,7 @@ def _check_mental_social_conflict(
     # Public Contact
     hypo_public = hypo_mental_limits.get("contact_public")  # Expect 'N', 'O', 'F', 'C'
     # Conflict if hypo limits public contact (N/O) AND job involves dealing with People (P) or high People WF level
-    if freq_order.get(hypo_public, 5) <= 2:  # Hypo limits to None or Occasional
+    if hypo_public is not None and freq_order.get(hypo_public, 5) <= 2:  # Hypo limits to None or Occasional
         if "P" in temperament_codes or (
             people_wf_level is not None and people_wf_level < 8
         ):  # Job involves People temperament or has significant People WF
@@ -607,7 +626,7 @@ def _check_mental_social_conflict(
 
     # Coworker Contact (Harder to map directly - often assumed unless job is Temperament A: Alone)
     hypo_coworker = hypo_mental_limits.get("contact_coworkers")
-    if freq_order.get(hypo_coworker, 5) <= 2:  # Hypo limits coworker contact
+    if hypo_coworker is not None and freq_order.get(hypo_coworker, 5) <= 2:  # Hypo limits coworker contact
         if "A" not in temperament_codes:  # Job is NOT explicitly 'Alone'
             mental_conflicts.append(
                 {
@@ -1041,6 +1060,121 @@ def generate_formatted_job_report(analysis_data: Dict[str, Any]) -> str:
     return "\n\n".join(report_sections)
 
 
+def _frequency_code(demand: Optional[Dict[str, Any]]) -> str:
+    """Returns the N/O/F/C frequency code of a physical/environmental demand entry."""
+    if not demand:
+        return "-"
+    if "frequency" in demand:
+        return demand["frequency"].get("code", "?")
+    return str(demand.get("level", "?"))  # Noise is reported as a level (1-5)
+
+
+def _obsolescence_flag(obsolescence: Dict[str, Any]) -> str:
+    """Summarizes a check_job_obsolescence() result for one comparison cell."""
+    status = obsolescence.get("reference_status")
+    if status == "Found in Reference":
+        return f"Listed ({obsolescence.get('data_source', 'N/A')})"
+    if status == "Not Found":
+        return "Not listed"
+    return UNKNOWN_STRING
+
+
+def build_job_comparison(analyses: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Builds a compact side-by-side comparison of several job analyses.
+
+    Physical and environmental demands are included only where at least one job
+    has the demand present (frequency other than 'N'), so the table stays small.
+
+    Args:
+        analyses: Dictionaries returned by get_job_analysis(), one per job.
+
+    Returns:
+        Dictionary with 'jobs' (code/title per column) and 'rows' (factor name
+        followed by one value per job).
+    """
+    jobs = [
+        {
+            "dot_code": analysis.get("formatted_dot_code", UNKNOWN_STRING),
+            "title": analysis.get("job_title", UNKNOWN_STRING),
+        }
+        for analysis in analyses
+    ]
+    rows: List[List[Any]] = []
+
+    def add_row(factor: str, values: List[Any]) -> None:
+        rows.append([factor, *values])
+
+    add_row(
+        "Exertion",
+        [a.get("exertional_level", {}).get("code") or "?" for a in analyses],
+    )
+    add_row("SVP", [a.get("skill_level", {}).get("svp") for a in analyses])
+    add_row(
+        "Skill",
+        [a.get("skill_level", {}).get("category", UNKNOWN_STRING) for a in analyses],
+    )
+    for key, label in (("reasoning", "GED-R"), ("math", "GED-M"), ("language", "GED-L")):
+        add_row(
+            label,
+            [a.get("ged_levels", {}).get(key, {}).get("level") for a in analyses],
+        )
+    add_row(
+        "DPT",
+        [
+            "-".join(
+                str(a.get("worker_functions", {}).get(key, {}).get("level", "?"))
+                for key in ("data", "people", "things")
+            )
+            for a in analyses
+        ],
+    )
+
+    for label in config.physical_demand_api_keys_to_labels.values():
+        values = [_frequency_code(a.get("physical_demands", {}).get(label)) for a in analyses]
+        if any(value not in ("N", "-") for value in values):
+            add_row(label, values)
+
+    env_labels = [
+        label
+        for label in config.environmental_condition_api_keys_to_labels.values()
+        if label != "Noise"
+    ] + ["Noise"]
+    for label in env_labels:
+        values = [
+            _frequency_code(a.get("environmental_conditions", {}).get(label))
+            for a in analyses
+        ]
+        if any(value not in ("N", "-") for value in values):
+            add_row(label, values)
+
+    add_row(
+        "Obsolescence",
+        [_obsolescence_flag(a.get("obsolescence_analysis", {})) for a in analyses],
+    )
+    return {"jobs": jobs, "rows": rows}
+
+
+def format_job_comparison_table(comparison: Dict[str, Any]) -> str:
+    """Formats the output of build_job_comparison() as a markdown table."""
+    header = ["Factor"] + [
+        f"{job['dot_code']} {job['title']}" for job in comparison["jobs"]
+    ]
+    lines = [
+        "| " + " | ".join(header) + " |",
+        "|" + "---|" * len(header),
+    ]
+    for row in comparison["rows"]:
+        lines.append(
+            "| " + " | ".join("-" if value is None else str(value) for value in row) + " |"
+        )
+    lines.append(
+        "Frequency: N=Not Present, O=Occasionally, F=Frequently, C=Constantly; "
+        "Noise is the intensity level (1-5). Demands absent from every job are omitted."
+    )
+    return "\n".join(lines)
+
+
 # --- Tool-Specific Logic Wrappers/Implementations ---
 
 # Removed the unused assess_job_obsolescence_detailed function as requested.
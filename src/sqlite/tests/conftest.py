@@ -0,0 +1,114 @@
+import random
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from mcp_server_sqlite import config
+
+DEMAND_COLUMNS = list(config.physical_demand_api_keys_to_labels) + list(
+    config.environmental_condition_api_keys_to_labels
+)
+TEMPERAMENT_COLUMNS = ["Temp1", "Temp2", "Temp3", "Temp4", "Temp5"]
+APTITUDE_COLUMNS = [
+    "AptGenLearn", "AptVerbal", "AptNumerical", "AptSpacial", "AptFormPer", "AptClericalPer",
+    "AptMotor", "AptFingerDext", "AptManualDext", "AptEyeHandCoord", "AptColorDisc",
+]
+NUMERIC_COLUMNS = [
+    "StrengthNum", "SVPNum", "GEDR", "GEDM", "GEDL", "WFData", "WFPeople", "WFThings"
+] + APTITUDE_COLUMNS
+CODE_COLUMNS = ["WField1", "WField2", "WField3", "MPSMS1", "MPSMS2", "MPSMS3"]
+TEXT_COLUMNS = (
+    ["Code", "Title", "CompleteTitle", "AltTitles", "Definitions", "GOE", "GOE1", "OccGroup"]
+    + CODE_COLUMNS
+    + TEMPERAMENT_COLUMNS
+)
+COLUMNS = ["Ncode"] + TEXT_COLUMNS + NUMERIC_COLUMNS + DEMAND_COLUMNS
+
+TITLES = [
+    ("209.587-010", "ADDRESSER"),
+    ("318.687-010", "KITCHEN HELPER"),
+    ("319.677-014", "DISHWASHER, MACHINE"),
+    ("323.687-014", "CLEANER, HOUSEKEEPING"),
+    ("211.462-010", "CASHIER II"),
+    ("249.587-018", "DOCUMENT PREPARER, MICROFILMING"),
+    ("237.367-038", "RECEPTIONIST"),
+    ("920.587-018", "PACKAGER, HAND"),
+    ("372.667-038", "SECURITY GUARD"),
+    ("355.674-014", "NURSE ASSISTANT"),
+]
+
+
+def make_dot_db(path: Path, rows) -> Path:
+    """Writes a DOT table with the given rows (dicts keyed by COLUMNS) to a new database."""
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE DOT (Ncode INTEGER PRIMARY KEY, "
+            + ", ".join(f"{column} TEXT" for column in TEXT_COLUMNS)
+            + ", "
+            + ", ".join(f"{column} INTEGER" for column in NUMERIC_COLUMNS + DEMAND_COLUMNS)
+            + ");"
+        )
+        conn.execute("CREATE TABLE goedb (GOE TEXT, Title TEXT);")
+        conn.executemany(
+            f"INSERT INTO DOT ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))});",
+            [[row.get(column) for column in COLUMNS] for row in rows],
+        )
+    conn.close()
+    return path
+
+
+def random_dot_rows(count: int, seed: int = 7, null_rate: float = 0.05):
+    """Random DOT rows with a few NULLs per column; the first rows carry the real TITLES."""
+    rng = random.Random(seed)
+
+    def maybe(value):
+        return None if rng.random() < null_rate else value
+
+    rows = []
+    for i in range(count):
+        code, title = TITLES[i] if i < len(TITLES) else (
+            f"{rng.randint(100, 999)}.{rng.randint(100, 999)}-{rng.randint(10, 99)}{i % 10}",
+            f"JOB {i}",
+        )
+        row = {
+            "Ncode": 1000 + i,
+            "Code": code,
+            "Title": title,
+            "CompleteTitle": f"{title} (any industry)",
+            "Definitions": f"Performs duties of a {title.lower()}.",
+            "GOE": f"{rng.randint(1, 12):02d}.{rng.randint(1, 9):02d}.01",
+            "OccGroup": f"{code[:3]} OCCUPATIONS IN GROUP {code[:3]}",
+            "StrengthNum": maybe(rng.randint(1, 5)),
+            "SVPNum": maybe(rng.randint(1, 9)),
+            "GEDR": maybe(rng.randint(1, 6)),
+            "GEDM": maybe(rng.randint(1, 6)),
+            "GEDL": maybe(rng.randint(1, 6)),
+            "WFData": rng.randint(0, 8),
+            "WFPeople": rng.randint(0, 8),
+            "WFThings": rng.randint(0, 7),
+        }
+        for column in DEMAND_COLUMNS:
+            row[column] = maybe(rng.randint(1, 5 if column == "NoiseNum" else 4))
+        for column in APTITUDE_COLUMNS:
+            row[column] = rng.randint(1, 5)
+        for column in CODE_COLUMNS:
+            row[column] = f"{rng.randint(1, 300):03d}"
+        for column in TEMPERAMENT_COLUMNS:
+            row[column] = maybe(rng.choice("DEFGHIJ"))
+        rows.append(row)
+    return rows
+
+
+@pytest.fixture
+def dot_db_path(tmp_path: Path) -> Path:
+    return make_dot_db(tmp_path / "DOT.db", random_dot_rows(300))
+
+
+@pytest.fixture
+def coded_dot_db_path(tmp_path: Path) -> Path:
+    """A DOT database whose Ncodes are the numeric DOT codes, as in the real DOT.db."""
+    rows = random_dot_rows(60)
+    for row in rows:
+        row["Ncode"] = int(row["Code"].replace(".", "").replace("-", ""))
+    return make_dot_db(tmp_path / "DOT.db", rows)
@@ -0,0 +1,64 @@
+import sqlite3
+
+from mcp_server_sqlite import analysis_store
+from mcp_server_sqlite.analysis_store import ANALYSIS_TABLE, AnalysisStore
+from mcp_server_sqlite.db_handler import DatabaseHandler
+
+
+def _stored(path):
+    with sqlite3.connect(path) as conn:
+        rows = conn.execute(
+            f"SELECT COUNT(*), MIN(analysis_json) FROM {ANALYSIS_TABLE};"
+        ).fetchone()
+        version = conn.execute("SELECT value FROM job_analysis_meta;").fetchone()[0]
+    conn.close()
+    return rows, version
+
+
+def test_build_writes_every_row_and_is_current(dot_db_path):
+    store = AnalysisStore(DatabaseHandler(dot_db_path))
+    result = store.build()
+
+    assert result["status"] == "built"
+    assert result["rows_written"] + result["errors"] == 300
+    assert store.is_available()
+    assert store.build()["status"] == "current"
+
+
+def test_concurrent_reader_sees_old_build_until_commit(dot_db_path, monkeypatch):
+    store = AnalysisStore(DatabaseHandler(dot_db_path))
+    store.build()
+    old = _stored(dot_db_path)
+
+    seen = set()
+    real_analysis = analysis_store.get_job_analysis
+
+    def analysis_while_reading(job_data, **kwargs):
+        seen.add(_stored(dot_db_path))  # Before, between and after batch commits
+        analysis = real_analysis(job_data, **kwargs)
+        analysis["rebuilt"] = True
+        return analysis
+
+    monkeypatch.setattr(analysis_store, "get_job_analysis", analysis_while_reading)
+    monkeypatch.setattr(analysis_store, "BUILD_BATCH_SIZE", 50)
+    store.build(force=True)
+
+    assert seen == {old}
+    assert '"rebuilt":true' in _stored(dot_db_path)[0][1]
+
+
+def test_failed_build_keeps_old_build(dot_db_path, monkeypatch):
+    store = AnalysisStore(DatabaseHandler(dot_db_path))
+    store.build()
+    old = _stored(dot_db_path)
+
+    def failing_analysis(job_data, **kwargs):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(analysis_store, "get_job_analysis", failing_analysis)
+    try:
+        store.build(force=True)
+    except RuntimeError:
+        pass
+
+    assert _stored(dot_db_path) == old
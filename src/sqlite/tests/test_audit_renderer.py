@@ -0,0 +1,89 @@
+import copy
+
+import pytest
+
+from mcp_server_sqlite.audit_renderer import (
+    enrich_audit,
+    render_audit_report,
+    validate_audit,
+    write_audit_report,
+)
+from mcp_server_sqlite.db_handler import DatabaseHandler
+
+AUDIT = {
+    "case": {"claimant": "J. Doe <test>", "hearing_date": "2025-03-01"},
+    "summary": "First paragraph.\n\nSecond & last.",
+    "hypotheticals": [
+        {"title": "Light", "text": "Light work.", "jobs": [{"dot_code": "209.587-010", "jobs": 12000}]}
+    ],
+    "tsa": {"outcome": "No transferable skills", "skills": ["Recording", "Filing"]},
+    "follow_up_questions": ["What is the source of the job numbers?"],
+}
+
+
+def test_render_escapes_text_and_lists_sections():
+    page = render_audit_report(AUDIT)
+
+    assert "J. Doe &lt;test&gt;" in page
+    assert "<p>First paragraph.</p><p>Second &amp; last.</p>" in page
+    assert "<td>12,000</td>" in page
+    assert "<ul><li>Recording</li><li>Filing</li></ul>" in page
+    assert "<ol><li>What is the source of the job numbers?</li></ol>" in page
+    assert page.count('<section') == 4
+
+
+def test_sections_without_data_are_left_out():
+    page = render_audit_report({"case": {"claimant": "J. Doe"}})
+
+    assert "<section" not in page
+    assert '<nav class="toc' not in page
+
+
+@pytest.mark.parametrize(
+    "audit, message",
+    [
+        ([], "must be a JSON object"),
+        ({}, "requires a 'case' object"),
+        ({"case": {}, "conflicts": "none"}, "'conflicts' must be a list"),
+        ({"case": {}, "hypotheticals": ["text"]}, "Each entry of 'hypotheticals'"),
+        ({"case": {}, "hypotheticals": [{"jobs": "209.587-010"}]}, "must be a list"),
+        ({"case": {}, "hypotheticals": [{"jobs": ["209.587-010"]}]}, "Each job of a hypothetical"),
+        ({"case": {}, "tsa": []}, "'tsa' must be an object"),
+        ({"case": {}, "tsa": {"skills": "Recording"}}, "list of strings"),
+        ({"case": {}, "tsa": {"skills": [{"name": "Recording"}]}}, "list of strings"),
+    ],
+)
+def test_validate_rejects_malformed_data(audit, message):
+    with pytest.raises(ValueError, match=message):
+        validate_audit(audit)
+
+
+def test_invalid_data_writes_nothing(tmp_path):
+    target = tmp_path / "report.html"
+
+    with pytest.raises(ValueError):
+        write_audit_report({"case": {}, "hypotheticals": [{"jobs": ["209.587-010"]}]}, target)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_write_audit_report_writes_the_rendered_page(tmp_path):
+    target = tmp_path / "out" / "report.html"
+
+    size = write_audit_report(AUDIT, target)
+
+    assert target.read_text(encoding="utf-8") == render_audit_report(AUDIT)
+    assert size == target.stat().st_size
+
+
+def test_enrich_fills_job_details_without_changing_the_input(coded_dot_db_path):
+    audit = copy.deepcopy(AUDIT)
+
+    enriched = enrich_audit(audit, DatabaseHandler(coded_dot_db_path))
+
+    assert audit == AUDIT
+    job = enriched["hypotheticals"][0]["jobs"][0]
+    assert job["title"] == "Addresser"
+    assert job["jobs"] == 12000  # Caller's value kept
+    assert {"exertion", "svp", "skill", "ged_r"} <= job.keys()
+    assert [row["dot_code"] for row in enriched["obsolescence"]] == ["209.587-010"]
@@ -0,0 +1,35 @@
+import asyncio
+import logging
+
+from mcp_server_sqlite import server
+
+
+def test_failed_background_task_is_logged_and_released(caplog):
+    async def fail():
+        raise RuntimeError("boom")
+
+    async def run():
+        task = server.start_background_task(fail(), "failing task")
+        assert task in server._background_tasks
+        await asyncio.gather(task, return_exceptions=True)
+        await asyncio.sleep(0)  # Let the done-callback run
+        return task
+
+    with caplog.at_level(logging.ERROR, logger=server.__name__):
+        task = asyncio.run(run())
+
+    assert task not in server._background_tasks
+    assert "Background task failing task failed: boom" in caplog.text
+
+
+def test_cancel_background_tasks_stops_running_tasks():
+    async def run():
+        task = server.start_background_task(asyncio.sleep(3600), "sleeper")
+        await asyncio.sleep(0)
+        await server.cancel_background_tasks()
+        return task
+
+    task = asyncio.run(run())
+
+    assert task.cancelled()
+    assert not server._background_tasks
@@ -0,0 +1,86 @@
+from pathlib import Path
+
+from mcp_server_sqlite.batch_audit import (
+    DEFAULT_OUTPUT_DIR,
+    find_stated_requirements,
+    parse_hypothetical,
+)
+
+
+def test_parse_hypothetical_reads_level_and_explicit_limits():
+    parsed = parse_hypothetical(
+        "Assume an individual who can perform light work, lifting 20 pounds occasionally "
+        "and 10 pounds frequently, standing or walking 4 hours and sitting 6 hours, "
+        "limited to simple routine tasks."
+    )
+
+    assert parsed == {
+        "exertional": {
+            "level": "Light",
+            "lift_carry_occ": 20,
+            "lift_carry_freq": 10,
+            "stand_walk_hours": 4,
+            "sit_hours": 6,
+        },
+        "mental": {"svp": 2, "instructions": "Simple"},
+    }
+
+
+def test_parse_hypothetical_fills_regulatory_limits_of_the_level():
+    assert parse_hypothetical("Now assume sedentary exertion.")["exertional"] == {
+        "level": "Sedentary",
+        "lift_carry_occ": 10,
+        "stand_walk_hours": 2,
+    }
+    assert parse_hypothetical("Very heavy work.")["exertional"]["level"] == "Very Heavy"
+
+
+def test_parse_hypothetical_explicit_lifting_overrides_the_level():
+    parsed = parse_hypothetical("Medium work, but lifting occasionally up to 35 lbs.")
+
+    assert parsed["exertional"]["level"] == "Medium"
+    assert parsed["exertional"]["lift_carry_occ"] == 35
+    assert parsed["exertional"]["lift_carry_freq"] == 25
+
+
+def test_parse_hypothetical_without_limits():
+    assert parse_hypothetical("Please describe the claimant's past work.") == {
+        "exertional": {},
+        "mental": {},
+    }
+
+
+def test_find_stated_requirements_reads_testimony_after_each_citation():
+    transcript = (
+        "She could work as an addresser, 209.587-010, sedentary, SVP 2, unskilled. "
+        "Also cashier II, DOT 211.462-010, light and semiskilled with an SVP of 3."
+    )
+
+    assert find_stated_requirements(transcript) == {
+        209587010: {"strength": "S", "svp": 2, "skill": "unskilled"},
+        211462010: {"strength": "L", "svp": 3, "skill": "semi-skilled"},
+    }
+
+
+def test_find_stated_requirements_stops_at_the_next_citation():
+    transcript = "Jobs such as 209.587-010 and 211.462-010, light work."
+
+    assert find_stated_requirements(transcript) == {
+        211462010: {"strength": "L", "svp": None, "skill": None}
+    }
+
+
+def test_find_stated_requirements_keeps_the_first_statement_of_a_code():
+    transcript = (
+        "Addresser, 209.587-010, sedentary. Kitchen helper, 318.687-010, with no details. "
+        "Again, 209.587-010 would be medium."
+    )
+
+    assert find_stated_requirements(transcript) == {
+        209587010: {"strength": "S", "svp": None, "skill": None}
+    }
+
+
+def test_default_output_dir_is_relative_to_the_working_directory():
+    assert not DEFAULT_OUTPUT_DIR.is_absolute()
+    assert DEFAULT_OUTPUT_DIR == Path("audits") / "batch"
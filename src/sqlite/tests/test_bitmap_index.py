@@ -0,0 +1,111 @@
+import random
+import sqlite3
+
+import pytest
+
+from conftest import make_dot_db, random_dot_rows
+from mcp_server_sqlite.bitmap_index import INDEXED_COLUMNS, TEMPERAMENT_COLUMNS, BitmapIndex, count_matches
+from mcp_server_sqlite.db_handler import DatabaseHandler
+from mcp_server_sqlite.filter_dsl import compile_filter_expression, parse_filter_expression
+
+FUZZ_EXPRESSIONS = 2000
+OPERATORS = ("eq", "ne", "lt", "lte", "gt", "gte", "in", "not_in", "between", "is_null", "not_null")
+
+
+@pytest.fixture(scope="module")
+def dot(tmp_path_factory):
+    rows = random_dot_rows(400, seed=5, null_rate=0.1)
+    path = make_dot_db(tmp_path_factory.mktemp("bitmap") / "DOT.db", rows)
+    return rows, path
+
+
+def _operand(rng, column):
+    if column in TEMPERAMENT_COLUMNS:
+        return rng.choice("CDEFGHIJK")  # C and K never occur
+    return rng.randint(0, 10)  # Includes values outside every column's range
+
+
+def _random_expression(rng, depth=0):
+    roll = rng.random()
+    if depth < 3 and roll < 0.2:
+        return {"not": _random_expression(rng, depth + 1)}
+    if depth < 3 and roll < 0.45:
+        key = rng.choice(("and", "or"))
+        return {key: [_random_expression(rng, depth + 1) for _ in range(rng.randint(2, 3))]}
+    column = rng.choice(INDEXED_COLUMNS)
+    op = rng.choice(OPERATORS)
+    if op in ("in", "not_in"):
+        value = [_operand(rng, column) for _ in range(rng.randint(1, 4))]
+    elif op == "between":
+        value = sorted([_operand(rng, column), _operand(rng, column)])
+    elif op in ("is_null", "not_null"):
+        value = None
+    else:
+        value = _operand(rng, column)
+    return {"column": column, "op": op, "value": value}
+
+
+def test_counts_match_sql_for_random_expressions(dot):
+    rows, path = dot
+    index = BitmapIndex(rows)
+    rng = random.Random(2024)
+    mismatches = []
+    with sqlite3.connect(path) as conn:
+        for _ in range(FUZZ_EXPRESSIONS):
+            expression = _random_expression(rng)
+            where_sql, params = compile_filter_expression(expression, INDEXED_COLUMNS)
+            expected = conn.execute(f"SELECT COUNT(*) FROM DOT WHERE {where_sql}", params).fetchone()[0]
+            if index.count(expression) != expected:
+                mismatches.append((expression, index.count(expression), expected))
+    conn.close()
+
+    assert mismatches == []
+
+
+def test_select_matches_sql_rows(dot):
+    rows, path = dot
+    index = BitmapIndex(rows)
+    expression = {"or": [{"GEDR": {"lte": 2}, "Temp1": "D"}, {"not": {"StrengthNum": {"in": [3, 4, 5]}}}]}
+    where_sql, params = compile_filter_expression(expression, INDEXED_COLUMNS)
+
+    with sqlite3.connect(path) as conn:
+        expected = [ncode for (ncode,) in conn.execute(f"SELECT Ncode FROM DOT WHERE {where_sql} ORDER BY Ncode", params)]
+    conn.close()
+
+    positions = index.job_positions(index.select(expression))
+    assert [index.ncodes[position] for position in positions] == expected
+
+
+def test_at_most_can_include_missing_values(dot):
+    rows, _ = dot
+    index = BitmapIndex(rows)
+
+    assert index.count({"ClimbingNum": {"lte": 2}}) == sum(
+        1 for row in rows if row["ClimbingNum"] is not None and row["ClimbingNum"] <= 2
+    )
+    bits = index.at_most("ClimbingNum", 2, include_missing=True)
+    assert len(index.job_positions(bits)) == sum(
+        1 for row in rows if row["ClimbingNum"] is None or row["ClimbingNum"] <= 2
+    )
+
+
+def test_unsupported_expressions_are_rejected(dot):
+    rows, _ = dot
+    index = BitmapIndex(rows)
+
+    # Text operand on a numeric column
+    assert not index.supports(parse_filter_expression({"GEDR": {"eq": "2"}}, index.columns))
+    with pytest.raises(ValueError):
+        index.count({"GEDR": {"eq": "2"}})
+    with pytest.raises(ValueError):
+        index.count({"WFData": 1})  # Not indexed
+
+
+def test_count_matches_falls_back_for_columns_outside_the_index(dot):
+    _, path = dot
+    db = DatabaseHandler(path)
+
+    assert count_matches(db, {"SVPNum": {"between": [1, 2]}}) is not None
+    assert count_matches(db, {"WFData": 1}) is None
+    assert count_matches(db, {"GEDR": {"eq": "2"}}) is None
+    assert count_matches(db, {}) is None
@@ -0,0 +1,127 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from mcp_server_sqlite.dispatch import (
+    ToolDispatcher,
+    ToolLimits,
+    ToolTimeoutError,
+    current_call_cancelled,
+    run_in_thread,
+)
+
+
+def test_deadline_raises_timeout_and_cancels_token():
+    dispatcher = ToolDispatcher({"slow": ToolLimits(2, 0.05)})
+    seen = {}
+
+    def work():
+        time.sleep(0.2)
+        seen["cancelled"] = current_call_cancelled()
+
+    async def main():
+        with pytest.raises(ToolTimeoutError):
+            await dispatcher.run("slow", lambda: run_in_thread(work))
+        await asyncio.sleep(0.3)
+
+    asyncio.run(main())
+
+    metrics = dispatcher.metrics()["slow"]
+    assert seen == {"cancelled": True}
+    assert metrics["timeouts"] == 1
+    assert metrics["in_flight"] == 0
+    assert metrics["draining"] == 0
+
+
+def test_client_cancellation_is_counted_and_cancels_token():
+    dispatcher = ToolDispatcher({"tool": ToolLimits(2, None)})
+    started = threading.Event()
+    seen = {}
+
+    def work():
+        started.set()
+        time.sleep(0.1)
+        seen["cancelled"] = current_call_cancelled()
+
+    async def main():
+        task = asyncio.create_task(dispatcher.run("tool", lambda: run_in_thread(work)))
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0.2)
+
+    asyncio.run(main())
+
+    assert seen == {"cancelled": True}
+    assert dispatcher.metrics()["tool"]["cancelled"] == 1
+
+
+def test_per_tool_concurrency_and_queue_delay():
+    dispatcher = ToolDispatcher({"heavy": ToolLimits(2, None), "cheap": ToolLimits(4, None)})
+    running = []
+    peak = []
+
+    async def heavy():
+        running.append(1)
+        peak.append(len(running))
+        await asyncio.sleep(0.05)
+        running.pop()
+
+    async def main():
+        heavy_calls = [asyncio.create_task(dispatcher.run("heavy", heavy)) for _ in range(6)]
+        await asyncio.sleep(0.01)
+        # Heavy calls are queued, but the cheap tool has its own budget
+        started = time.perf_counter()
+        assert await dispatcher.run("cheap", lambda: asyncio.sleep(0, "ok")) == "ok"
+        cheap_wait = time.perf_counter() - started
+        assert dispatcher.metrics()["heavy"]["queued"] == 4
+        await asyncio.gather(*heavy_calls)
+        return cheap_wait
+
+    cheap_wait = asyncio.run(main())
+
+    metrics = dispatcher.metrics()
+    assert max(peak) == 2
+    assert cheap_wait < 0.04
+    assert metrics["heavy"]["calls"] == 6
+    assert metrics["heavy"]["queued"] == 0
+    assert metrics["heavy"]["queue_delay_ms"]["max"] >= 100
+    assert metrics["cheap"]["queue_delay_ms"]["max"] < 40
+
+
+def test_timed_out_call_keeps_slot_until_its_thread_finishes():
+    dispatcher = ToolDispatcher({"heavy": ToolLimits(1, 0.05)})
+    release = threading.Event()
+    order = []
+
+    def stuck():
+        release.wait(5)
+        order.append("first thread done")
+
+    async def second():
+        order.append("second call started")
+
+    async def main():
+        with pytest.raises(ToolTimeoutError):
+            await dispatcher.run("heavy", lambda: run_in_thread(stuck))
+        assert dispatcher.metrics()["heavy"]["draining"] == 1
+        waiting = asyncio.create_task(dispatcher.run("heavy", second))
+        await asyncio.sleep(0.1)
+        assert order == []  # The slot is still held by the timed-out call's thread
+        release.set()
+        await waiting
+
+    asyncio.run(main())
+
+    metrics = dispatcher.metrics()["heavy"]
+    assert order == ["first thread done", "second call started"]
+    assert metrics["draining"] == 0
+    assert metrics["in_flight"] == 0
+
+
+def test_run_in_thread_outside_a_tool_call():
+    assert asyncio.run(run_in_thread(lambda x: x * 2, 21)) == 42
@@ -0,0 +1,119 @@
+import sqlite3
+
+import pytest
+
+from conftest import make_dot_db, random_dot_rows
+from mcp_server_sqlite.filter_dsl import (
+    MAX_EXPRESSION_DEPTH,
+    MAX_LIST_OPERAND_SIZE,
+    Condition,
+    Group,
+    Not,
+    compile_filter_expression,
+    parse_filter_expression,
+)
+
+COLUMNS = {"StrengthNum", "SVPNum", "GEDR", "ClimbingNum", "Temp1"}
+
+
+def test_column_mapping_compiles_to_and_of_conditions():
+    sql, params = compile_filter_expression(
+        {"StrengthNum": {"in": [1, 2]}, "SVPNum": {"between": [1, 2]}, "GEDR": {"lte": 2}, "ClimbingNum": 1},
+        COLUMNS,
+    )
+
+    assert sql == '"StrengthNum" IN (?,?) AND "SVPNum" BETWEEN ? AND ? AND "GEDR" <= ? AND "ClimbingNum" = ?'
+    assert params == [1, 2, 1, 2, 2, 1]
+
+
+def test_groups_and_negation_are_parenthesized():
+    sql, params = compile_filter_expression(
+        {"and": [{"or": [{"GEDR": 1}, {"GEDR": {"gte": 5}}]}, {"not": {"Temp1": {"not_in": ["D", "E"]}}}]},
+        COLUMNS,
+    )
+
+    assert sql == '("GEDR" = ? OR "GEDR" >= ?) AND NOT ("Temp1" NOT IN (?,?))'
+    assert params == [1, 5, "D", "E"]
+
+
+def test_explicit_condition_and_null_operators():
+    assert compile_filter_expression({"column": "SVPNum", "op": "GT", "value": 4}, COLUMNS) == (
+        '"SVPNum" > ?',
+        [4],
+    )
+    assert compile_filter_expression({"GEDR": None}, COLUMNS) == ('"GEDR" IS NULL', [])
+    assert compile_filter_expression({"GEDR": {"not_null": True}}, COLUMNS) == ('"GEDR" IS NOT NULL', [])
+
+
+def test_empty_expression_compiles_to_nothing():
+    assert compile_filter_expression({}, COLUMNS) == ("", [])
+    assert compile_filter_expression(None, COLUMNS) == ("", [])
+
+
+def test_single_child_groups_are_flattened():
+    node = parse_filter_expression({"or": [{"and": [{"GEDR": 2}]}]}, COLUMNS)
+
+    assert node == Condition("GEDR", "eq", 2)
+
+
+def test_parse_builds_nodes():
+    node = parse_filter_expression({"not": {"GEDR": {"lt": 3}, "SVPNum": {"in": [1, 2]}}}, COLUMNS)
+
+    assert node == Not(Group("and", (Condition("GEDR", "lt", 3), Condition("SVPNum", "in", (1, 2)))))
+
+
+@pytest.mark.parametrize(
+    "expression, message",
+    [
+        ({"Title": "CLERK"}, "Invalid filter column"),
+        ({"GEDR": {"like": "1%"}}, "Unsupported filter operator"),
+        ({"GEDR": {"eq": [1, 2]}}, "expects a single value"),
+        ({"GEDR": {"eq": None}}, "requires a value"),
+        ({"GEDR": {"in": []}}, "non-empty list"),
+        ({"GEDR": {"in": list(range(MAX_LIST_OPERAND_SIZE + 1))}}, "at most"),
+        ({"GEDR": {"between": [1]}}, r"\[low, high\]"),
+        ({"GEDR": {"is_null": "yes"}}, "takes no value"),
+        ({"GEDR": {}}, "Empty operator mapping"),
+        ({"and": []}, "non-empty list"),
+        ({"and": [{"GEDR": 1}], "GEDR": 2}, "exactly one"),
+        ({"column": "GEDR", "op": "eq", "value": 1, "extra": 1}, "Unexpected keys"),
+        ({"column": "GEDR", "op": 1, "value": 1}, "must be a string"),
+        ([{"GEDR": 1}], "non-empty object"),
+    ],
+)
+def test_invalid_expressions_raise_value_error(expression, message):
+    with pytest.raises(ValueError, match=message):
+        compile_filter_expression(expression, COLUMNS)
+
+
+def test_nesting_depth_is_limited():
+    expression = {"GEDR": 1}
+    for _ in range(MAX_EXPRESSION_DEPTH + 1):
+        expression = {"not": expression}
+
+    with pytest.raises(ValueError, match="nested too deeply"):
+        compile_filter_expression(expression, COLUMNS)
+
+
+def test_compiled_sql_selects_the_matching_rows(tmp_path):
+    rows = random_dot_rows(200, seed=3)
+    path = make_dot_db(tmp_path / "DOT.db", rows)
+    sql, params = compile_filter_expression(
+        {"or": [{"StrengthNum": {"lte": 2}, "GEDR": {"between": [2, 3]}}, {"Temp1": {"in": ["D", "J"]}}]},
+        COLUMNS,
+    )
+
+    with sqlite3.connect(path) as conn:
+        selected = {ncode for (ncode,) in conn.execute(f"SELECT Ncode FROM DOT WHERE {sql}", params)}
+    conn.close()
+
+    expected = {
+        row["Ncode"]
+        for row in rows
+        if (
+            row["StrengthNum"] is not None and row["StrengthNum"] <= 2
+            and row["GEDR"] is not None and 2 <= row["GEDR"] <= 3
+        )
+        or row["Temp1"] in ("D", "J")
+    }
+    assert selected == expected
@@ -0,0 +1,110 @@
+import json
+
+import pytest
+
+from mcp_server_sqlite.format_report import build_job_document, get_job_document
+
+JOB = {
+    "Ncode": 209587010,
+    "Title": "ADDRESSER",
+    "Code": "209.587-010",
+    "WField1": "231",
+    "WField1Short": "Recording",
+    "WField2": "011",
+    "MPSMS1": "890",
+    "MPSMS1Short": "Clerical services",
+}
+
+GOLDEN_CODES = {
+    "text": (
+        "Work Fields\n"
+        "-----------\n"
+        "Code        Description\n"
+        "----------  ----------------------------------------\n"
+        "231         Recording\n"
+        "011\n"
+        "\n"
+        + "-" * 80 + "\n"
+        "\n"
+        "MPSMS Code\n"
+        "----------\n"
+        "Code        Description\n"
+        "----------  ----------------------------------------\n"
+        "890         Clerical services\n"
+    ),
+    "markdown": (
+        "## Work Fields\n"
+        "\n"
+        "| Code       | Description                              |\n"
+        "| :--------- | :--------------------------------------- |\n"
+        "| `231` | Recording |\n"
+        "| `011` |  |\n"
+        "\n"
+        "---\n"
+        "\n"
+        "## MPSMS Code\n"
+        "\n"
+        "| Code       | Description                              |\n"
+        "| :--------- | :--------------------------------------- |\n"
+        "| `890` | Clerical services |\n"
+    ),
+    "html": (
+        "<h2>Work Fields</h2>\n"
+        "<table>\n"
+        "<thead><tr><th>Code</th><th>Description</th></tr></thead>\n"
+        "<tbody>\n"
+        "<tr><td>231</td><td>Recording</td></tr>\n"
+        "<tr><td>011</td><td></td></tr>\n"
+        "</tbody>\n"
+        "</table>\n"
+        "<hr>\n"
+        "<h2>MPSMS Code</h2>\n"
+        "<table>\n"
+        "<thead><tr><th>Code</th><th>Description</th></tr></thead>\n"
+        "<tbody>\n"
+        "<tr><td>890</td><td>Clerical services</td></tr>\n"
+        "</tbody>\n"
+        "</table>\n"
+    ),
+}
+
+
+@pytest.mark.parametrize("target", sorted(GOLDEN_CODES))
+def test_coded_sections_put_code_before_description(target):
+    assert GOLDEN_CODES[target] in build_job_document(JOB).render(target)
+
+
+def test_coded_sections_json():
+    sections = json.loads(build_job_document(JOB).render("json"))["sections"]
+
+    assert sections["Work Fields"] == [
+        {"columns": ["Code", "Description"], "rows": [["231", "Recording"], ["011", ""]]}
+    ]
+    assert sections["MPSMS Code"] == [
+        {"columns": ["Code", "Description"], "rows": [["890", "Clerical services"]]}
+    ]
+
+
+def test_missing_codes_are_reported():
+    sections = json.loads(build_job_document({"Title": "NONE"}).render("json"))["sections"]
+
+    assert sections["Work Fields"][0]["rows"] == [["", "No work fields specified"]]
+    assert sections["MPSMS Code"][0]["rows"] == [["", "No MPSMS codes specified"]]
+
+
+def test_details_without_svp_or_strength():
+    details = json.loads(build_job_document({"Title": "NONE"}).render("json"))["sections"]["Details"]
+
+    assert ["SVP", "Level N/A: N/A"] in details[0]["rows"]
+    assert ["Strength", "N/A: N/A"] in details[0]["rows"]
+
+
+def test_documents_are_cached_per_handler():
+    class Handler:
+        pass
+
+    first, second = Handler(), Handler()
+    document = get_job_document(first, JOB)
+
+    assert get_job_document(first, JOB) is document
+    assert get_job_document(second, JOB) is not document
@@ -0,0 +1,122 @@
+import gc
+import json
+
+from mcp_server_sqlite import generate_job_report
+from mcp_server_sqlite.db_handler import DatabaseHandler
+from mcp_server_sqlite.generate_job_report import (
+    cached_get_job_by_code,
+    resolve_search_terms,
+    run_batch,
+)
+
+
+class FakeDatabase:
+    def __init__(self, title: str):
+        self.title = title
+        self.queries = 0
+
+    def get_job_by_code(self, code_text, columns=None):
+        self.queries += 1
+        return {"Code": code_text, "Title": self.title}
+
+
+def test_row_cache_is_kept_per_handler():
+    old, new = FakeDatabase("OLD"), FakeDatabase("NEW")
+
+    assert cached_get_job_by_code(209587010, "209.587-010", old)["Title"] == "OLD"
+    assert cached_get_job_by_code(209587010, "209.587-010", old)["Title"] == "OLD"
+    assert cached_get_job_by_code(209587010, "209.587-010", new)["Title"] == "NEW"
+    assert (old.queries, new.queries) == (1, 1)
+
+
+def test_row_cache_does_not_keep_old_handlers_alive():
+    db = FakeDatabase("OLD")
+    cached_get_job_by_code(209587010, "209.587-010", db)
+
+    del db
+    gc.collect()
+
+    assert not any(isinstance(handler, FakeDatabase) for handler in generate_job_report._row_caches._values)
+
+
+def test_row_cache_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(generate_job_report, "ROW_CACHE_SIZE", 2)
+    db = FakeDatabase("JOB")
+
+    cached_get_job_by_code(1, "1", db)
+    cached_get_job_by_code(2, "2", db)
+    cached_get_job_by_code(1, "1", db)  # Most recently used again
+    cached_get_job_by_code(3, "3", db)  # Evicts 2
+    cached_get_job_by_code(1, "1", db)
+    cached_get_job_by_code(2, "2", db)
+
+    assert db.queries == 4
+
+
+def test_cache_stats_count_hits_on_the_hit_path():
+    generate_job_report.CacheStats.reset()
+    db = FakeDatabase("JOB")
+
+    cached_get_job_by_code(1, "1", db)
+    cached_get_job_by_code(1, "1", db)
+    cached_get_job_by_code(1, "1", db)
+    stats = generate_job_report.CacheStats.get_stats()
+
+    assert stats == {"hits": 2, "misses": 1, "calls": 3, "hit_rate": "66.67%"}
+    assert generate_job_report.CacheStats.get_stats() == stats  # Reading does not change them
+
+
+def test_resolve_search_terms_exact_fuzzy_and_not_found(coded_dot_db_path):
+    db = DatabaseHandler(coded_dot_db_path)
+
+    resolved = resolve_search_terms(
+        db,
+        ["209.587-010", "209587010", "RECEPTIONIST", "recepshionist", "kitchen", "zzzz qqq", "999.999-999"],
+    )
+
+    addresser = {"Ncode": 209587010, "dotCode": "209.587-010", "title": "ADDRESSER"}
+    assert resolved["209.587-010"] == addresser
+    assert resolved["209587010"] == addresser
+    assert resolved["RECEPTIONIST"] == {"Ncode": 237367038, "dotCode": "237.367-038", "title": "RECEPTIONIST"}
+    fuzzy = resolved["recepshionist"]
+    assert fuzzy is not None
+    assert fuzzy["dotCode"] == "237.367-038"
+    assert fuzzy["fuzzyMatch"]["jobTitle"] == "RECEPTIONIST"
+    assert resolved["kitchen"] == {"Ncode": 318687010, "dotCode": "318.687-010", "title": "KITCHEN HELPER"}
+    assert resolved["zzzz qqq"] is None
+    assert resolved["999.999-999"] is None
+
+
+def test_run_batch_writes_ndjson_in_term_order(coded_dot_db_path, tmp_path):
+    output = tmp_path / "reports.ndjson"
+
+    summary = run_batch(
+        DatabaseHandler(coded_dot_db_path),
+        ["237.367-038", "no such job qqq", "209.587-010", "237367038"],
+        output,
+        workers=1,
+    )
+
+    records = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    assert [record["term"] for record in records] == [
+        "237.367-038", "no such job qqq", "209.587-010", "237367038"
+    ]
+    assert records[1] == {"term": "no such job qqq", "error": "No job data found"}
+    assert records[0]["title"] == "RECEPTIONIST"
+    assert records[0]["report"].startswith("--- Job Analysis Report ---")
+    assert records[3]["report"] == records[0]["report"]
+    assert summary["jobs"] == 2
+    assert summary["written"] == 3
+    assert summary["not_found"] == ["no such job qqq"]
+
+
+def test_run_batch_writes_one_report_per_job_to_a_directory(coded_dot_db_path, tmp_path):
+    output = tmp_path / "reports"
+
+    summary = run_batch(
+        DatabaseHandler(coded_dot_db_path), ["209.587-010", "RECEPTIONIST"], output, workers=1
+    )
+
+    assert sorted(path.name for path in output.iterdir()) == ["209.587-010.txt", "237.367-038.txt"]
+    assert summary["written"] == 2
+    assert summary["not_found"] == []
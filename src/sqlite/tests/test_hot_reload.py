@@ -0,0 +1,52 @@
+import gc
+import threading
+
+from mcp_server_sqlite.hot_reload import PerHandlerCache
+
+
+class Handler:
+    pass
+
+
+def test_per_handler_cache_builds_once_per_handler():
+    builds = []
+    cache = PerHandlerCache(lambda handler: builds.append(handler) or object())
+    first, second = Handler(), Handler()
+
+    value = cache.get(first)
+
+    assert cache.get(first) is value
+    assert cache.get(second) is not value
+    assert builds == [first, second]
+
+
+def test_per_handler_cache_builds_once_under_concurrent_calls():
+    builds = []
+    started = threading.Barrier(8)
+    cache = PerHandlerCache(lambda handler: builds.append(handler) or object())
+    handler = Handler()
+    values = []
+
+    def get():
+        started.wait()
+        values.append(cache.get(handler))
+
+    threads = [threading.Thread(target=get) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(builds) == 1
+    assert all(value is values[0] for value in values)
+
+
+def test_per_handler_cache_drops_values_with_their_handler():
+    cache = PerHandlerCache(lambda handler: object())
+    handler = Handler()
+    cache.get(handler)
+
+    del handler
+    gc.collect()
+
+    assert len(cache._values) == 0
@@ -0,0 +1,45 @@
+from mcp_server_sqlite.job_obsolescence import check_job_obsolescence
+from mcp_server_sqlite.ve_logic import build_job_comparison
+
+
+def _analysis(dot_code: str, title: str) -> dict:
+    return {
+        "formatted_dot_code": dot_code,
+        "job_title": title,
+        "exertional_level": {"code": "S"},
+        "skill_level": {"svp": 2, "category": "Unskilled"},
+        "obsolescence_analysis": check_job_obsolescence(dot_code),
+    }
+
+
+def _row(comparison: dict, factor: str) -> list:
+    return next(row[1:] for row in comparison["rows"] if row[0] == factor)
+
+
+def test_obsolescence_row_reports_reference_listing():
+    comparison = build_job_comparison(
+        [_analysis("209.587-010", "ADDRESSER"), _analysis("999.999-999", "NOT LISTED")]
+    )
+
+    assert _row(comparison, "Obsolescence") == ["Listed (EM-24027)", "Not listed"]
+
+
+def test_obsolescence_row_without_analysis_is_unknown():
+    analysis = _analysis("209.587-010", "ADDRESSER")
+    del analysis["obsolescence_analysis"]
+    errored = _analysis("209.587-010", "ADDRESSER")
+    errored["obsolescence_analysis"] = {"reference_status": "Error", "message": "failed"}
+
+    comparison = build_job_comparison([analysis, errored])
+
+    assert _row(comparison, "Obsolescence") == ["Unknown", "Unknown"]
+
+
+def test_comparison_columns_follow_input_order():
+    comparison = build_job_comparison(
+        [_analysis("999.999-999", "NOT LISTED"), _analysis("209.587-010", "ADDRESSER")]
+    )
+
+    assert [job["dot_code"] for job in comparison["jobs"]] == ["999.999-999", "209.587-010"]
+    assert _row(comparison, "Exertion") == ["S", "S"]
+    assert _row(comparison, "SVP") == [2, 2]
@@ -0,0 +1,65 @@
+import pytest
+
+from conftest import random_dot_rows
+from mcp_server_sqlite.bitmap_index import BitmapIndex
+from mcp_server_sqlite.occupational_base import OccupationalBaseIndex
+
+
+@pytest.fixture(scope="module")
+def index():
+    return OccupationalBaseIndex(BitmapIndex(random_dot_rows(500, seed=11)))
+
+
+def _instructions_limit(result):
+    return next(limit for limit in result["limitations"] if limit["limit"] == "instructions")
+
+
+@pytest.mark.parametrize("value", ["Simple", "simple", " SIMPLE "])
+def test_instructions_limit_is_case_insensitive(index, value):
+    result = index.compute({"exertional": {"level": "Light"}, "mental": {"instructions": value}})
+
+    limit = _instructions_limit(result)
+    assert limit["columns"] == ["GEDR"]
+    assert "notApplied" not in result
+
+
+def test_instructions_limit_caps_reasoning_level(index):
+    rows = random_dot_rows(500, seed=11)
+    base = [
+        row for row in rows
+        if row["StrengthNum"] is not None and row["StrengthNum"] <= 2
+        and row["SVPNum"] is not None and row["SVPNum"] <= 2
+    ]
+
+    result = index.compute({"exertional": {"level": "light"}, "mental": {"instructions": "detailed"}})
+
+    assert result["base"]["jobs"] == len(base)
+    assert result["remaining"]["jobs"] == sum(
+        1 for row in base if row["GEDR"] is not None and row["GEDR"] <= 3
+    )
+
+
+@pytest.mark.parametrize("value", [["Simple"], {"level": "Simple"}, 2, "routine"])
+def test_invalid_instructions_limit_raises_value_error(index, value):
+    with pytest.raises(ValueError, match="instructions"):
+        index.compute({"exertional": {"level": "Light"}, "mental": {"instructions": value}})
+
+
+def test_mental_section_must_be_an_object(index):
+    with pytest.raises(ValueError, match="mental"):
+        index.compute({"exertional": {"level": "Light"}, "mental": ["simple"]})
+
+
+@pytest.mark.parametrize("value", ["O", "occasionally", 2, "2", " 2 "])
+def test_frequency_limit_accepts_codes_words_and_numbers(index, value):
+    expected = index.compute({"exertional": {"level": "Light"}, "postural": {"climbing": "O"}})
+
+    result = index.compute({"exertional": {"level": "Light"}, "postural": {"climbing": value}})
+
+    assert result["remaining"] == expected["remaining"]
+
+
+@pytest.mark.parametrize("value", ["X", "5", "0"])
+def test_invalid_frequency_limit_raises_value_error(index, value):
+    with pytest.raises(ValueError, match="climbing"):
+        index.compute({"exertional": {"level": "Light"}, "postural": {"climbing": value}})
@@ -0,0 +1,113 @@
+import sqlite3
+import threading
+
+from mcp_server_sqlite import hot_reload, report_store
+from mcp_server_sqlite.analysis_store import AnalysisStore
+from mcp_server_sqlite.db_handler import DatabaseHandler
+from mcp_server_sqlite.hot_reload import HandlerRegistry, Handlers, SourceWatcher
+from mcp_server_sqlite.report_store import ReportStore
+
+
+def _store(db, version):
+    return ReportStore(db, AnalysisStore(db, version=version))
+
+
+def test_current_version_is_reused(dot_db_path, monkeypatch):
+    db = DatabaseHandler(dot_db_path)
+    reports = _store(db, "v1")
+    assert reports.build()["reports_rendered"] > 0
+
+    def fail(analysis):
+        raise AssertionError("current report was re-rendered")
+
+    monkeypatch.setattr(report_store, "generate_formatted_job_report", fail)
+    assert reports.build()["reports_rendered"] == 0
+    assert reports.get_or_render({"Ncode": 1000}) == reports.get(1000)
+    assert reports.status()["stale_reports"] == 0
+
+
+def test_stale_version_triggers_rebuild(dot_db_path):
+    db = DatabaseHandler(dot_db_path)
+    old = _store(db, "v1")
+    built = old.build()["reports_rendered"]
+    new = _store(db, "v2")
+
+    assert new.get(1000) is None
+    assert new.status()["stale_reports"] == built
+    assert new.build()["reports_rendered"] == built
+    assert new.status() | {"version": None} == {
+        "table": "job_report_cache",
+        "version": None,
+        "current_reports": built,
+        "stale_reports": 0,
+        "dot_rows": 300,
+    }
+    assert old.get(1000) is None
+
+
+def test_put_is_not_blocked_by_build(dot_db_path, monkeypatch):
+    db = DatabaseHandler(dot_db_path)
+    reports = _store(db, "v1")
+    monkeypatch.setattr(report_store, "BUILD_BATCH_SIZE", 50)
+    real_render = report_store.generate_formatted_job_report
+    put_done = threading.Event()
+
+    def render_with_concurrent_put(analysis):
+        if not put_done.is_set():
+            with sqlite3.connect(dot_db_path, timeout=0.5) as conn:
+                conn.execute(report_store.CREATE_REPORT_TABLE)
+                conn.execute(
+                    "INSERT OR REPLACE INTO job_report_cache VALUES (999999, 'v1', x'00');"
+                )
+            conn.close()
+            put_done.set()
+        return real_render(analysis)
+
+    monkeypatch.setattr(report_store, "generate_formatted_job_report", render_with_concurrent_put)
+    reports.build(force=True)
+
+    assert put_done.is_set()
+
+
+def _watcher(db, tmp_path):
+    analysis_store = AnalysisStore(db, version="v1")
+    registry = HandlerRegistry(Handlers(db, analysis_store, ReportStore(db, analysis_store)))
+    return SourceWatcher(registry, db.db_path, tmp_path / "missing.xlsx", tmp_path / "reference")
+
+
+def test_watcher_ignores_own_report_writes(dot_db_path, tmp_path, monkeypatch):
+    db = DatabaseHandler(dot_db_path)
+    watcher = _watcher(db, tmp_path)
+    fingerprints = []
+    monkeypatch.setattr(
+        hot_reload, "compute_dot_table_fingerprint", lambda path: fingerprints.append(path) or "x"
+    )
+
+    watcher.registry.current.report_store.put(1000, "first")
+    watcher.registry.current.report_store.put(1001, "second")
+    assert watcher.check_once() == []
+    assert fingerprints == []
+
+    with sqlite3.connect(dot_db_path) as conn:
+        conn.execute("UPDATE DOT SET Title = 'CHANGED' WHERE Ncode = 1000;")
+    conn.close()
+    watcher.check_once()
+    assert fingerprints == [db.db_path]
+
+
+def test_watcher_checks_external_write_between_own_writes(dot_db_path, tmp_path, monkeypatch):
+    db = DatabaseHandler(dot_db_path)
+    watcher = _watcher(db, tmp_path)
+    fingerprints = []
+    monkeypatch.setattr(
+        hot_reload, "compute_dot_table_fingerprint", lambda path: fingerprints.append(path) or "x"
+    )
+
+    watcher.registry.current.report_store.put(1000, "first")
+    with sqlite3.connect(dot_db_path) as conn:
+        conn.execute("UPDATE DOT SET Title = 'CHANGED' WHERE Ncode = 1000;")
+    conn.close()
+    watcher.registry.current.report_store.put(1001, "second")
+    watcher.check_once()
+
+    assert fingerprints == [db.db_path]
@@ -0,0 +1,75 @@
+import json
+
+from mcp_server_sqlite.response_encoding import _truncate_rows, columnarize, dumps, encode_response
+
+
+def _table(count, text="x" * 20):
+    return columnarize([{"Ncode": i, "Title": f"{text} {i}"} for i in range(count)])
+
+
+def _size(text):
+    return len(text.encode("utf-8"))
+
+
+def test_truncate_rows_keeps_the_longest_prefix_that_fits():
+    table = _table(200)
+    budget = 2000
+
+    text = _truncate_rows(table, budget)
+
+    decoded = json.loads(text)
+    kept = decoded["truncated"]["rows"]["rows_returned"]
+    assert _size(text) <= budget
+    assert decoded["truncated"]["rows"]["rows_total"] == 200
+    assert decoded["rows"] == table["rows"][:kept]
+    assert decoded["columns"] == ["Ncode", "Title"]
+    # One more row would not have fitted
+    one_more = {**table, "rows": table["rows"][: kept + 1], "truncated": decoded["truncated"]}
+    assert _size(dumps(one_more)) > budget
+
+
+def test_truncate_rows_trims_nested_tables_and_keeps_other_keys():
+    result = {"summary": {"jobs": 300}, "jobs": _table(200), "matches": _table(100)}
+
+    text = _truncate_rows(result, 3000)
+
+    decoded = json.loads(text)
+    assert _size(text) <= 3000
+    assert decoded["summary"] == {"jobs": 300}
+    jobs, matches = decoded["truncated"]["jobs"], decoded["truncated"]["matches"]
+    assert (jobs["rows_total"], matches["rows_total"]) == (200, 100)
+    assert 0 < jobs["rows_returned"] < 200 and 0 < matches["rows_returned"] < 100
+    assert decoded["jobs"]["rows"] == result["jobs"]["rows"][: jobs["rows_returned"]]
+    assert decoded["matches"]["rows"] == result["matches"]["rows"][: matches["rows_returned"]]
+
+
+def test_truncate_rows_counts_bytes_not_characters():
+    table = _table(200, text="é" * 20)
+
+    text = _truncate_rows(table, 2000)
+
+    assert _size(text) <= 2000
+    assert len(text) < 2000
+
+
+def test_truncate_rows_gives_up_without_tables_or_room():
+    assert _truncate_rows({"text": "x" * 5000}, 1000) is None
+    assert _truncate_rows([1, 2, 3], 1) is None
+    assert _truncate_rows({"notes": "x" * 5000, "jobs": _table(10)}, 1000) is None
+
+
+def test_encode_response_falls_back_to_partial_text_within_budget():
+    text = encode_response({"text": "\"quoted\" " * 100000}, "read_query")
+
+    decoded = json.loads(text)
+    assert _size(text) <= 512 * 1024
+    assert decoded["truncated"]["bytes_total"] > decoded["truncated"]["bytes_returned"]
+
+
+def test_encode_response_leaves_small_results_intact():
+    records = [{"Ncode": 1, "Title": "ADDRESSER"}, {"Ncode": 2, "Title": "CASHIER II"}]
+
+    assert json.loads(encode_response(records, "read_query")) == {
+        "columns": ["Ncode", "Title"],
+        "rows": [[1, "ADDRESSER"], [2, "CASHIER II"]],
+    }
@@ -0,0 +1,46 @@
+import sqlite3
+
+from mcp_server_sqlite.analysis_store import AnalysisStore
+from mcp_server_sqlite.db_handler import DatabaseHandler
+from mcp_server_sqlite.report_store import ReportStore
+
+
+def test_own_report_writes_do_not_reload_snapshot(dot_db_path):
+    db = DatabaseHandler(dot_db_path, in_memory=True)
+    reports = ReportStore(db, AnalysisStore(db, version="test"))
+    snapshot = db._snapshot_uri
+
+    reports.put(1000, "report text")
+    db._refresh_snapshot_if_changed()
+    db._snapshot_checked_at = 0.0  # Skip the check interval
+    db._refresh_snapshot_if_changed()
+
+    assert db._snapshot_uri == snapshot
+    assert reports.get(1000) == "report text"
+
+
+def test_report_reads_use_snapshot(dot_db_path):
+    db = DatabaseHandler(dot_db_path, in_memory=True)
+    reports = ReportStore(db, AnalysisStore(db, version="test"))
+    reports.put(1000, "report text")
+
+    # Drop the table from the file only: reads must still be served from memory
+    with sqlite3.connect(dot_db_path) as conn:
+        conn.execute("DROP TABLE job_report_cache;")
+    conn.close()
+
+    assert reports.get(1000) == "report text"
+
+
+def test_external_writes_reload_snapshot(dot_db_path):
+    db = DatabaseHandler(dot_db_path, in_memory=True)
+    snapshot = db._snapshot_uri
+
+    with sqlite3.connect(dot_db_path) as conn:
+        conn.execute("UPDATE DOT SET Title = 'CHANGED' WHERE Ncode = 1000;")
+    conn.close()
+    db._snapshot_checked_at = 0.0
+    db._refresh_snapshot_if_changed()
+
+    assert db._snapshot_uri != snapshot
+    assert db.execute_select_query("SELECT Title FROM DOT WHERE Ncode = 1000")[0]["Title"] == "CHANGED"
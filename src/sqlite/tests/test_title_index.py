@@ -0,0 +1,99 @@
+import pytest
+
+from mcp_server_sqlite.title_index import DEFAULT_MIN_SCORE, TitleIndex
+
+TITLES = [
+    "ADDRESSER", "DISHWASHER, MACHINE", "KITCHEN HELPER", "CLEANER, HOUSEKEEPING", "CASHIER II",
+    "CASHIER-CHECKER", "DOCUMENT PREPARER, MICROFILMING", "RECEPTIONIST", "PACKAGER, HAND",
+    "SECURITY GUARD", "NURSE ASSISTANT", "SURVEILLANCE-SYSTEM MONITOR", "CHARGE-ACCOUNT CLERK",
+    "CALL-OUT OPERATOR", "TOUCH-UP SCREENER, PRINTED CIRCUIT BOARD ASSEMBLY", "ORDER CLERK, FOOD AND BEVERAGE",
+    "HAND PACKAGER", "MARKER", "ROUTING CLERK", "OFFICE HELPER", "MAIL CLERK", "ASSEMBLER, SMALL PRODUCTS I",
+    "BENCH ASSEMBLER", "ELECTRONICS WORKER", "LAUNDRY WORKER I", "JANITOR", "CLEANER, INDUSTRIAL",
+    "HOUSECLEANER", "TELEPHONE SOLICITOR", "INFORMATION CLERK", "ORDER FILLER", "STOCK CLERK",
+    "FAST-FOODS WORKER", "COOK, SHORT ORDER", "BUS PERSON", "CAR WASHER", "FORKLIFT OPERATOR",
+    "GROUNDSKEEPER, INDUSTRIAL-COMMERCIAL", "WAREHOUSE WORKER", "TOLL COLLECTOR", "LENS INSERTER",
+    "CHECK WEIGHER", "EYEGLASS-FRAME POLISHER", "GATE GUARD", "PHLEBOTOMIST", "DIETARY AIDE",
+    "BOOKKEEPER", "MEAT CUTTER", "TABLE WORKER", "SECRETARY", "PRESSER, ALL-AROUND",
+]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return TitleIndex({"Ncode": 1000 + i, "Title": title} for i, title in enumerate(TITLES))
+
+
+@pytest.mark.parametrize(
+    "query, title",
+    [
+        ("dish washer", "DISHWASHER, MACHINE"),
+        ("dishwasher", "DISHWASHER, MACHINE"),
+        ("addressor", "ADDRESSER"),
+        ("surveilance monitor", "SURVEILLANCE-SYSTEM MONITOR"),
+        ("monitor surveillance system", "SURVEILLANCE-SYSTEM MONITOR"),
+        ("touch up screener", "TOUCH-UP SCREENER, PRINTED CIRCUIT BOARD ASSEMBLY"),
+        ("grounds keeper", "GROUNDSKEEPER, INDUSTRIAL-COMMERCIAL"),
+        ("document preparor", "DOCUMENT PREPARER, MICROFILMING"),
+        ("house keeping cleaner", "CLEANER, HOUSEKEEPING"),
+        ("reciptionist", "RECEPTIONIST"),
+        ("security gaurd", "SECURITY GUARD"),
+        ("fork lift operator", "FORKLIFT OPERATOR"),
+        ("carwasher", "CAR WASHER"),
+        ("short order cook", "COOK, SHORT ORDER"),
+        ("flebotomist", "PHLEBOTOMIST"),
+        ("janiter", "JANITOR"),
+    ],
+)
+def test_best_match_resolves_misspelled_and_split_titles(index, query, title):
+    match = index.best_match(query)
+
+    assert match is not None
+    assert match["jobTitle"] == title
+
+
+def test_full_title_outranks_head_match(index):
+    match = index.best_match("cleaner housekeeping")
+
+    assert match["jobTitle"] == "CLEANER, HOUSEKEEPING"
+    assert match["score"] == 100.0
+
+
+@pytest.mark.parametrize(
+    "query",
+    ["astronaut", "software engineer", "veterinarian", "lawyer", "hypothetical individual", "teacher"],
+)
+def test_unrelated_queries_get_no_suggestions(index, query):
+    assert index.search(query, min_score=DEFAULT_MIN_SCORE) == []
+    assert index.best_match(query) is None
+
+
+def test_look_alike_word_is_suggested_but_not_used_as_fallback(index):
+    assert [match["jobTitle"] for match in index.search("sedentary")] == ["SECRETARY"]
+    assert index.best_match("sedentary") is None
+
+
+TESTIMONY = """Q. What work could that person do? A. She could work as a dish washer, the machine
+dishwasher, about 20,000 jobs nationally. Also a monitor, surveillance system, and touch up screener.
+Q. And the kitchen helper job? A. She would be a cashier at times; hand packager jobs remain."""
+
+
+def test_find_mentions_matches_reordered_and_split_titles(index):
+    mentions = {mention["title"]: mention for mention in index.find_mentions(TESTIMONY)}
+
+    assert mentions["DISHWASHER, MACHINE"]["count"] == 2
+    assert mentions["DISHWASHER, MACHINE"]["spoken"] == "dish washer"
+    assert mentions["SURVEILLANCE-SYSTEM MONITOR"]["spoken"] == "monitor surveillance system"
+    assert "TOUCH-UP SCREENER, PRINTED CIRCUIT BOARD ASSEMBLY" in mentions
+    assert mentions["KITCHEN HELPER"]["score"] == 100.0
+
+
+def test_find_mentions_lists_every_job_with_the_same_title_score(index):
+    mentions = {mention["title"]: mention for mention in index.find_mentions(TESTIMONY)}
+    packager = next(mention for title, mention in mentions.items() if "PACKAGER" in title)
+
+    assert packager["Ncodes"] == [1000 + TITLES.index("PACKAGER, HAND"), 1000 + TITLES.index("HAND PACKAGER")]
+
+
+def test_find_mentions_skips_single_words_and_ordinary_speech(index):
+    mentions = index.find_mentions("A cashier or marker. The worker would clerk as needed. I have nothing further.")
+
+    assert mentions == []